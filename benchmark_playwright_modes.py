@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark Playwright product scrapes: full page load vs. fast mode.
+
+Scrapes the same ASINs in both modes and reports wall time and bytes
+transferred per scrape, plus whether the image/price were still found.
+
+Usage:
+    python benchmark_playwright_modes.py B0DXXXXXXX B0DYYYYYYY --marketplace es
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project to path - must come BEFORE imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from dealbot.services.playwright_scraper import PlaywrightScraper  # noqa: E402
+
+
+async def _scrape_once(scraper: PlaywrightScraper, asin: str, marketplace: str) -> dict:
+    """Scrape one ASIN on a fresh page, counting response bytes."""
+    context = await scraper._ensure_browser(marketplace)
+    page = await context.new_page()
+
+    transferred = 0
+    requests_seen = 0
+
+    async def on_finished(request) -> None:
+        nonlocal transferred, requests_seen
+        requests_seen += 1
+        try:
+            sizes = await request.sizes()
+            transferred += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        except Exception:
+            pass
+
+    page.on("requestfinished", lambda request: asyncio.ensure_future(on_finished(request)))
+
+    start = time.perf_counter()
+    try:
+        info = await scraper._scrape_page(page, asin, marketplace)
+    finally:
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.5)  # Let pending size lookups finish
+        await page.close()
+
+    return {
+        "seconds": elapsed,
+        "bytes": transferred,
+        "requests": requests_seen,
+        "image": bool(info.image_url),
+        "price": info.current_price is not None,
+    }
+
+
+async def _run_mode(asins: list[str], marketplace: str, fast_mode: bool, repeat: int) -> list[dict]:
+    scraper = PlaywrightScraper(fast_mode=fast_mode)
+    try:
+        # Warm up so browser launch isn't counted against the first scrape
+        await scraper._ensure_browser(marketplace)
+        return [
+            await _scrape_once(scraper, asin, marketplace)
+            for _ in range(repeat)
+            for asin in asins
+        ]
+    finally:
+        await scraper.close()
+
+
+def _report(label: str, samples: list[dict]) -> None:
+    seconds = [s["seconds"] for s in samples]
+    kib = [s["bytes"] / 1024 for s in samples]
+    found = sum(1 for s in samples if s["image"] and s["price"])
+    print(
+        f"{label:<6} scrapes={len(samples):<3} "
+        f"wall median={statistics.median(seconds):.2f}s mean={statistics.mean(seconds):.2f}s  "
+        f"transfer median={statistics.median(kib):.0f} KiB mean={statistics.mean(kib):.0f} KiB  "
+        f"requests mean={statistics.mean(s['requests'] for s in samples):.0f}  "
+        f"image+price found={found}/{len(samples)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare full vs. fast Playwright scrapes")
+    parser.add_argument("asins", nargs="+", help="ASINs to scrape")
+    parser.add_argument("--marketplace", default="es", help="Amazon marketplace (default: es)")
+    parser.add_argument("--repeat", type=int, default=1, help="Scrapes per ASIN per mode")
+    args = parser.parse_args()
+
+    full = asyncio.run(_run_mode(args.asins, args.marketplace, fast_mode=False, repeat=args.repeat))
+    fast = asyncio.run(_run_mode(args.asins, args.marketplace, fast_mode=True, repeat=args.repeat))
+
+    print()
+    _report("full", full)
+    _report("fast", fast)
+
+    full_bytes = sum(s["bytes"] for s in full) or 1
+    full_time = sum(s["seconds"] for s in full) or 1
+    print(
+        f"\nfast mode: {100 * (1 - sum(s['bytes'] for s in fast) / full_bytes):.0f}% fewer bytes, "
+        f"{100 * (1 - sum(s['seconds'] for s in fast) / full_time):.0f}% less wall time"
+    )
+
+
+if __name__ == "__main__":
+    main()
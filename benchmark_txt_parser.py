@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark TxtParser throughput on the TXT corpus.
+
+Parses every file in the corpus several times and reports files/s, deals/s
+and MiB/s. With --compare REV the parser from that git revision is timed on
+the same files and its output is checked against the current parser.
+
+Usage:
+    python benchmark_txt_parser.py
+    python benchmark_txt_parser.py gdrive_sync_test --repeat 10 --compare HEAD~1
+"""
+import argparse
+import logging
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+# Add project to path - must come BEFORE imports
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from dealbot.parsers.txt_parser import TxtParser  # noqa: E402
+
+
+def _load_parser_at(rev: str) -> type:
+    """Load TxtParser as it was at a git revision."""
+    source = subprocess.run(
+        ["git", "show", f"{rev}:dealbot/parsers/txt_parser.py"],
+        cwd=project_root, capture_output=True, text=True, check=True,
+    ).stdout
+    module = types.ModuleType("dealbot.parsers._baseline_txt_parser")
+    module.__package__ = "dealbot.parsers"
+    exec(compile(source, f"{rev}:txt_parser.py", "exec"), module.__dict__)
+    return module.TxtParser
+
+
+def _parse_all(parser, files: list[Path]) -> tuple[dict[Path, list], int]:  # type: ignore[no-untyped-def]
+    """Parse every file; files the parser raises on are counted, not fatal."""
+    results: dict[Path, list] = {}
+    failures = 0
+    for path in files:
+        try:
+            results[path] = [d.model_dump(exclude={"deal_id"}) for d in parser.parse_file(path)]
+        except Exception:
+            failures += 1
+    return results, failures
+
+
+def _bench(label: str, parser, files: list[Path], repeat: int, total_bytes: int) -> tuple[float, dict]:  # type: ignore[no-untyped-def]
+    results, failures = _parse_all(parser, files)  # Warm-up, and the output to compare
+    deals = sum(len(d) for d in results.values())
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path in files:
+            try:
+                parser.parse_file(path)
+            except Exception:
+                pass
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{label:<9} {elapsed / repeat * 1000:8.1f} ms/corpus  "
+        f"{len(files) * repeat / elapsed:8.0f} files/s  "
+        f"{deals * repeat / elapsed:9.0f} deals/s  "
+        f"{total_bytes * repeat / elapsed / 2**20:6.2f} MiB/s  "
+        f"({deals} deals, {failures} file(s) raised)"
+    )
+    return elapsed, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark TxtParser on a TXT corpus")
+    parser.add_argument("corpus", nargs="?", default="gdrive_sync_test", help="Directory of TXT files")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the corpus")
+    parser.add_argument("--compare", metavar="REV", help="Also time the parser from this git revision")
+    args = parser.parse_args()
+
+    files = sorted(Path(args.corpus).glob("*.txt"))
+    if not files:
+        sys.exit(f"No TXT files in {args.corpus}")
+    total_bytes = sum(f.stat().st_size for f in files)
+    print(f"Corpus: {len(files)} files, {total_bytes / 1024:.0f} KiB, {args.repeat} pass(es)\n")
+
+    # Per-deal log lines would dominate the timing
+    logging.disable(logging.CRITICAL)
+
+    current_time, current = _bench("current", TxtParser(), files, args.repeat, total_bytes)
+
+    if args.compare:
+        baseline_time, baseline = _bench(args.compare, _load_parser_at(args.compare)(), files, args.repeat, total_bytes)
+        mismatched = [p.name for p in files if current.get(p) != baseline.get(p)]
+        print(f"\nspeedup: {baseline_time / current_time:.2f}x")
+        print(f"output: {'identical' if not mismatched else f'{len(mismatched)} file(s) differ: {mismatched[:5]}'}")
+
+
+if __name__ == "__main__":
+    main()
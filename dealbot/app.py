@@ -289,21 +289,24 @@ class DealBot(toga.App):
                 self.processed_deals = []
                 duplicates_found = 0
                 
+                # Same dedup index as the daemon: one query, then in-memory lookups
+                self.controller.dedup.load()
+                
                 for i, deal in enumerate(self.current_deals, 1):
                     try:
                         # Check if this ASIN was recently published (within 48h)
-                        recent = self.controller.db.was_recently_published(deal.asin, hours=48) if deal.asin else None
+                        recent = self.controller.dedup.last_published(deal.asin, within_hours=48) if deal.asin else None
                         
                         if recent:
                             duplicates_found += 1
-                            logger.info(f"⚠️ Duplicate found: {deal.asin} was published {recent['published_at']}")
+                            logger.info(f"⚠️ Duplicate found: {deal.asin} was published {recent.published_at}")
                         
                         processed = self.controller.process_deal(deal)
                         
                         # Mark as duplicate if recently published
                         if recent:
                             processed.is_duplicate = True
-                            processed.last_published = recent['published_at']
+                            processed.last_published = recent.published_at
                         
                         self.processed_deals.append(processed)
                         
@@ -573,16 +576,13 @@ class DealBot(toga.App):
                 include_group = self.send_to_group_switch.value
                 published_count = 0
                 
-                # Enrich all deals with Scrapula data BEFORE publishing (for PVP/discounts/images)
-                logger.info("Enriching deals with Scrapula data for PVP/discounts...")
-                deals_to_enrich = [processed.deal for processed in ready_deals]
-                self.controller.enrich_deals_before_publish(deals_to_enrich)
+                # Upgrade the preview results instead of reprocessing: prices are re-checked only
+                # if stale, and only short links, ratings and AI reviews are added
+                logger.info("Preparing previewed deals for publishing...")
+                self.controller.prepare_for_publish(ready_deals)
                 
                 for i, processed in enumerate(ready_deals, 1):
                     try:
-                        # Reprocess with for_preview=False to generate shortlinks and ratings
-                        processed = self.controller.process_deal(processed.deal, for_preview=False)
-                        
                         # Publish the deal
                         result = self.controller.publish_deal(processed, include_group=include_group)
                         
@@ -1,21 +1,43 @@
 """Main controller orchestrating the deal processing pipeline."""
 
+import sqlite3
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from .models import Deal, DealStatus, ProcessedDeal, PublishResult
+from .models import Deal, DealStatus, PriceInfo, ProcessedDeal, PublishResult, Rating
 from .parsers.txt_parser import TxtParser
 from .services.affiliates import AffiliateService
 from .services.amazon_paapi import AmazonPAAPIService
+from .services.enrichment import (
+    ENRICHED_FIELDS,
+    EnrichmentPlanner,
+    EnrichmentSource,
+    fetch_amazon_page_fields,
+)
+from .services.playwright_scraper import PlaywrightBrowserPool, scrape_product_sync
 from .services.pricing import PricingService
+from .services.publish_worker import PublishWorker
 from .services.ratings import RatingsService
-from .services.scrapula import ScrapulaService
+from .services.scrapula import ScrapulaJob, ScrapulaProductInfo, ScrapulaService
 from .services.shortlinks import ShortLinkService
 from .services.whapi import WhapiService
+from .storage.ai_cache import AIValidationCache
 from .storage.db import Database
+from .storage.dedup import DedupIndex
+from .storage.link_registry import ShortLinkRegistry
+from .storage.outbox import Outbox
+from .storage.product_cache import ProductCache
 from .ui.whatsapp_format import WhatsAppFormatter
 from .utils.config import Config
+from .utils.http import configure_transport
 from .utils.logging import get_logger
+from .utils.metrics import track_stage
+from .utils.rate_limit import ServiceLimits
+
+if TYPE_CHECKING:
+    from .services.ai_validator import AIValidationResult
 
 # Optional interstitial server (only for GUI)
 try:
@@ -33,23 +55,83 @@ class DealController:
         """Initialize controller with all services."""
         self.config = config
 
+        # Storage first: the product cache lives in the same SQLite file
+        self.db = Database()
+        cache_cfg = config.get("cache", {}) or {}
+        self.cache = ProductCache(
+            self.db.db_path,
+            ttl_hours=cache_cfg.get("ttl_hours"),
+            enabled=cache_cfg.get("enabled", True),
+        )
+
+        # Durable AI verdicts and reviews (same SQLite file), so repeat deals skip the LLM
+        ai_cache_cfg = config.get("ai_validation", {}).get("cache", {}) or {}
+        self.ai_cache = AIValidationCache(
+            self.db.db_path,
+            price_tolerance_pct=float(ai_cache_cfg.get("price_tolerance_pct", AIValidationCache.DEFAULT_PRICE_TOLERANCE_PCT)),
+            discount_tolerance_pct=float(ai_cache_cfg.get("discount_tolerance_pct", AIValidationCache.DEFAULT_DISCOUNT_TOLERANCE_PCT)),
+            approved_ttl_hours=float(ai_cache_cfg.get("approved_ttl_hours", AIValidationCache.DEFAULT_APPROVED_TTL_HOURS)),
+            rejected_ttl_hours=float(ai_cache_cfg.get("rejected_ttl_hours", AIValidationCache.DEFAULT_REJECTED_TTL_HOURS)),
+            review_ttl_hours=float(ai_cache_cfg.get("review_ttl_hours", AIValidationCache.DEFAULT_REVIEW_TTL_HOURS)),
+            enabled=ai_cache_cfg.get("enabled", True),
+        )
+
+        # Recently published ASINs (loaded once per run, shared by daemon and GUI)
+        dedup_cfg = config.get("dedup", {}) or {}
+        self.dedup = DedupIndex(
+            self.db,
+            window_days=dedup_cfg.get("window_days", 7),
+            price_change_pct=dedup_cfg.get("price_change_pct", 10.0),
+        )
+
         # Initialize services
         self.parser = TxtParser()
-        self.amazon_api = AmazonPAAPIService(config)
+        self.amazon_api = AmazonPAAPIService(config, cache=self.cache)
         self.pricing = PricingService(config)
         self.affiliates = AffiliateService(config)
         
+        # Created short links by canonical long URL (same SQLite file); publishing reads from here
+        self.link_registry = ShortLinkRegistry(
+            self.db.db_path,
+            enabled=(config.get("shortlinks", {}) or {}).get("registry", True),
+        )
+
         # Shortlinks service (optional)
         try:
-            self.shortlinks = ShortLinkService(config)
+            self.shortlinks = ShortLinkService(config, registry=self.link_registry)
         except ValueError as e:
             logger.warning(f"Shortlinks disabled: {e}")
             self.shortlinks = None  # type: ignore
         
-        self.ratings = RatingsService(config)
-        self.whapi = WhapiService(config)
+        self.ratings = RatingsService(config, cache=self.cache)
+        self.whapi = WhapiService(config, db=self.db)
         self.formatter = WhatsAppFormatter()
-        self.db = Database()
+
+        # Shared keep-alive HTTP pools with per-service timeouts
+        configure_transport(config)
+
+        # Per-service concurrency caps and pacing (shared by all worker threads)
+        self.limits = ServiceLimits(config)
+
+        # Durable queue of formatted messages; the worker sends them at a controlled pace
+        publishing_cfg = config.get("publishing", {}) or {}
+        self.outbox = Outbox(
+            self.db.db_path,
+            max_attempts=int(publishing_cfg.get("max_attempts", Outbox.DEFAULT_MAX_ATTEMPTS)),
+            retry_base_seconds=float(publishing_cfg.get("retry_base_seconds", Outbox.DEFAULT_RETRY_BASE_SECONDS)),
+        )
+        self.publish_worker = PublishWorker(
+            self.outbox,
+            self.whapi,
+            limiter=self.limits.get("whapi"),
+            interval_seconds=float(publishing_cfg.get("interval_seconds", 0.0)),
+        )
+
+        # One long-lived browser for Playwright fallbacks; launched on first use
+        self.browser_pool = PlaywrightBrowserPool(
+            max_pages=self.limits.get("playwright").max_concurrent,
+            fast_mode=config.get("playwright", {}).get("fast_mode", False),
+        )
         
         # Initialize Scrapula service if enabled
         self.scrapula: Optional[ScrapulaService] = None
@@ -59,7 +141,7 @@ class DealController:
                 if not api_key:
                     raise ValueError("SCRAPULA_API_KEY not found in environment")
                 service_name = config.get("scrapula", {}).get("service_name", "amazon_products_service_v2")
-                self.scrapula = ScrapulaService(api_key, service_name=service_name)
+                self.scrapula = ScrapulaService(api_key, service_name=service_name, cache=self.cache)
                 logger.info("Scrapula service initialized")
             except Exception as e:
                 logger.warning(f"Scrapula disabled: {e}")
@@ -67,6 +149,7 @@ class DealController:
 
         # Initialize AI validator if enabled
         self.ai_validator = None
+        self.ai_batch_size = 8
         if config.get("ai_validation", {}).get("enabled", False):
             try:
                 from .services.ai_validator import AIValidator
@@ -75,6 +158,7 @@ class DealController:
                     raise ValueError("DEEPSEEK_API_KEY not found in environment")
                 model = config.get("ai_validation", {}).get("model", "deepseek-chat")
                 self.ai_validator = AIValidator(ai_key, model=model)
+                self.ai_batch_size = int(config.get("ai_validation", {}).get("batch_size", 8))
                 logger.info("AI validator initialized with DeepSeek")
             except Exception as e:
                 logger.warning(f"AI validation disabled: {e}")
@@ -87,12 +171,49 @@ class DealController:
             self.interstitial_server.start()
         
         # Cache for Scrapula enrichment data
-        self._scrapula_cache = {}
+        self._scrapula_cache: dict[str, ScrapulaProductInfo] = {}
+        
+        # Scrapula batches still running in the background
+        self._scrapula_jobs: list[ScrapulaJob] = []
+        self._scrapula_lock = threading.Lock()
+
+        # PA-API results prefetched in batches (ASIN -> PriceInfo)
+        self._price_cache: dict[str, PriceInfo] = {}
+
+        # Which source fills which missing product field, cheapest first
+        self.enrichment = self._build_enrichment_planner()
+
+    def _build_enrichment_planner(self) -> EnrichmentPlanner:
+        """Enrichment sources after PA-API, with the fields each can supply."""
+        enrichment_cfg = self.config.get("enrichment", {}) or {}
+        return EnrichmentPlanner(
+            [
+                EnrichmentSource(
+                    "media_cache", EnrichmentPlanner.COST_MEDIA_CACHE,
+                    frozenset({"main_image_url"}), self._media_cache_fields,
+                ),
+                EnrichmentSource(
+                    "scrapula", EnrichmentPlanner.COST_SCRAPULA,
+                    frozenset({"main_image_url", "list_price", "review_rating", "review_count"}),
+                    self._scrapula_fields,
+                ),
+                EnrichmentSource(
+                    "amazon_html", EnrichmentPlanner.COST_AMAZON_HTML,
+                    frozenset({"main_image_url", "list_price"}), self._amazon_html_fields,
+                ),
+                EnrichmentSource(
+                    "playwright", EnrichmentPlanner.COST_PLAYWRIGHT,
+                    frozenset({"main_image_url", "list_price", "savings_percentage"}), self._playwright_fields,
+                ),
+            ],
+            max_cost=enrichment_cfg.get("max_cost"),
+        )
 
     def parse_file(self, file_path: str | Path) -> list[Deal]:
         """Parse deals from TXT file."""
         logger.info(f"Parsing file: {file_path}")
-        deals = self.parser.parse_file(file_path)
+        with track_stage("parse"):
+            deals = self.parser.parse_file(file_path)
         logger.info(f"Parsed {len(deals)} deals")
         
         # Skip Scrapula enrichment during initial file load to avoid 60s delay
@@ -104,37 +225,147 @@ class DealController:
         return deals
     
     def _enrich_with_scrapula(self, deals: list[Deal]) -> None:
-        """Enrich deals with Scrapula product data (images, ratings, etc.)."""
-        # Collect ASINs from deals
-        asins = [deal.asin for deal in deals if deal.asin]
+        """Enrich deals with Scrapula product data (images, ratings, etc.), waiting for results."""
+        self.start_scrapula_enrichment(deals)
+        
+        asins = {deal.asin for deal in deals if deal.asin}
+        for job in list(self._scrapula_jobs):
+            if job.asins & asins:
+                self._collect_scrapula_job(job)
+        
+        successful = sum(1 for asin in asins if asin in self._scrapula_cache and self._scrapula_cache[asin].success)
+        logger.info(f"Scrapula enrichment: {successful}/{len(asins)} products retrieved successfully")
+
+    def start_scrapula_enrichment(self, deals: list[Deal]) -> None:
+        """
+        Submit a Scrapula batch without waiting for it.
+        
+        Results are collected in process_deal, and only for deals whose
+        PA-API data is missing fields Scrapula can fill.
+        """
+        if not self.scrapula or not deals:
+            return
+        
+        pending = {asin for job in self._scrapula_jobs for asin in job.asins}
+        asins = list(dict.fromkeys(
+            deal.asin for deal in deals
+            if deal.asin and deal.asin not in self._scrapula_cache and deal.asin not in pending
+        ))
         
         if not asins:
-            logger.warning("No ASINs found in deals, skipping Scrapula enrichment")
             return
         
         try:
-            # Get marketplace from config
             marketplace = self.config.get("scrapula", {}).get("marketplace", "es")
             max_wait = self.config.get("scrapula", {}).get("max_wait_seconds", 60)
             
-            # Fetch batch product data
-            logger.info(f"Fetching Scrapula data for {len(asins)} products...")
-            scrapula_data = self.scrapula.get_batch_product_data(
+            logger.info(f"Submitting Scrapula batch for {len(asins)} products...")
+            job = self.scrapula.submit_batch(
                 asins=asins,
                 marketplace=marketplace,
-                max_wait_seconds=max_wait
+                max_wait_seconds=max_wait,
+                limiter=self.limits.get("scrapula")
             )
-            
-            # Cache the data for use in process_deal
-            self._scrapula_cache = scrapula_data
-            
-            # Log success rate
-            successful = sum(1 for data in scrapula_data.values() if data.success)
-            logger.info(f"Scrapula enrichment: {successful}/{len(asins)} products retrieved successfully")
+            self._scrapula_jobs.append(job)
             
         except Exception as e:
-            logger.error(f"Failed to enrich deals with Scrapula: {e}")
-            self._scrapula_cache = {}
+            logger.error(f"Failed to submit Scrapula batch: {e}")
+
+    def _collect_scrapula_job(self, job: ScrapulaJob) -> None:
+        """Wait for a Scrapula job and move its results into the cache."""
+        results = job.result()
+        # Deal workers may collect the same job concurrently
+        with self._scrapula_lock:
+            self._scrapula_cache.update(results)
+            if job in self._scrapula_jobs:
+                self._scrapula_jobs.remove(job)
+
+    def _get_scrapula_info(self, asin: str) -> Optional[ScrapulaProductInfo]:
+        """Get Scrapula data for an ASIN, waiting on its batch only if still running."""
+        if asin in self._scrapula_cache:
+            return self._scrapula_cache[asin]
+        
+        for job in list(self._scrapula_jobs):
+            if asin in job.asins:
+                if not job.done():
+                    logger.info(f"Waiting for Scrapula results for {asin}...")
+                self._collect_scrapula_job(job)
+                break
+        
+        return self._scrapula_cache.get(asin)
+
+    @property
+    def _marketplace(self) -> str:
+        return self.config.get("scrapula", {}).get("marketplace", "es")
+
+    def _media_cache_fields(self, asin: str, price_info: PriceInfo) -> Optional[dict]:
+        """Enrichment source: long-lived media cache (an image seen in an earlier run)."""
+        media = self.cache.get(self._marketplace, asin, "media")
+        return {"main_image_url": media.get("image_url")} if media else {}
+
+    def _scrapula_fields(self, asin: str, price_info: PriceInfo) -> Optional[dict]:
+        """Enrichment source: Scrapula batch results (waits for the batch if still running)."""
+        scrapula_info = self._get_scrapula_info(asin)
+        if scrapula_info is None:
+            return None  # No batch submitted for this product (yet)
+        if not scrapula_info.success:
+            return {}
+        return {
+            "main_image_url": scrapula_info.image_url,
+            "list_price": scrapula_info.list_price,
+            "review_rating": scrapula_info.rating,
+            "review_count": scrapula_info.review_count,
+        }
+
+    def _amazon_html_fields(self, asin: str, price_info: PriceInfo) -> Optional[dict]:
+        """Enrichment source: image/PVP from the public Amazon product page."""
+        with self.limits.slot("amazon"):
+            return fetch_amazon_page_fields(asin, price_info.current_price)
+
+    def _playwright_fields(self, asin: str, price_info: PriceInfo) -> Optional[dict]:
+        """Enrichment source: Playwright scrape (image, PVP, discount and delivery cost)."""
+        logger.info(f"🎭 Trying Playwright fallback for {asin}...")
+        with self.limits.slot("playwright"):
+            pw_result = scrape_product_sync(asin, self._marketplace, cache=self.cache, pool=self.browser_pool)
+        if not (pw_result.success and pw_result.image_url):
+            logger.warning(f"❌ Playwright could not find image for {asin}")
+            return {}
+        return {
+            "main_image_url": pw_result.image_url,
+            "list_price": pw_result.list_price,
+            "savings_percentage": pw_result.discount_pct,
+            "delivery_cost": pw_result.delivery_cost,
+            "has_mandatory_delivery": pw_result.has_mandatory_delivery,
+        }
+
+    def _enrich_fields(self, processed: ProcessedDeal) -> None:
+        """Run the enrichment planner for a processed deal's remaining gaps."""
+        extras = self.enrichment.enrich(
+            processed.deal.asin, processed.price_info, processed.provenance, processed.enrichment_tried
+        )
+        if "delivery_cost" in extras:
+            processed.delivery_cost = extras["delivery_cost"]
+        if "has_mandatory_delivery" in extras:
+            processed.has_mandatory_delivery = extras["has_mandatory_delivery"]
+
+    def prefetch_prices(self, deals: list[Deal]) -> None:
+        """Validate prices for all deals up front using batched PA-API requests."""
+        asins = {deal.asin for deal in deals if deal.asin and deal.asin not in self._price_cache}
+        if not asins:
+            return
+
+        logger.info(f"Prefetching PA-API prices for {len(asins)} ASINs...")
+        try:
+            self._price_cache.update(
+                self.amazon_api.validate_prices(
+                    [deal for deal in deals if deal.asin in asins],
+                    limiter=self.limits.get("paapi"),
+                )
+            )
+        except Exception as e:
+            # Failed GetItems batches are handled inside validate_prices (TXT-price fallbacks);
+            # only an unexpected error lands here, and process_deal then calls validate_price per ASIN
+            logger.error(f"PA-API prefetch failed: {e}")
 
     def _generate_fallback_reviews(self, title: str, discount_pct: Optional[float] = None) -> tuple[str, str]:
         """
@@ -316,12 +547,41 @@ class DealController:
         logger.info(f"✅ Fallback validation passed for {title[:50]}... (€{current_price})")
         return True
 
-    def process_deal(self, deal: Deal, for_preview: bool = True) -> ProcessedDeal:
+    def process_deal(self, deal: Deal, for_preview: bool = True, validate_ai: bool = True) -> ProcessedDeal:
         """Process a single deal through the pipeline.
         
         Args:
             deal: The deal to process
             for_preview: If True, skips expensive operations (shortlinks, ratings) to prevent crashes
+            validate_ai: If False, leave AI validation to a later validate_deals_with_ai() batch
+        """
+        processed = self.enrich_deal(deal)
+
+        if not for_preview:
+            self.finalize_deal(processed)
+
+        # Step 6: AI validation and review generation (optional)
+        if validate_ai and not for_preview:
+            self.validate_deals_with_ai([processed])
+
+        return processed
+
+    def prefetched_price(self, asin: Optional[str]) -> Optional[PriceInfo]:
+        """PA-API data from prefetch_prices() for an ASIN, without consuming it."""
+        return self._price_cache.get(asin) if asin else None
+
+    def enrich_deal(self, deal: Deal) -> ProcessedDeal:
+        """
+        Price validation and product data enrichment (steps 1-3).
+
+        No short link, rating or AI validation yet: those are only worth their
+        calls once the deal has passed the filters (see finalize_deal()).
+
+        Args:
+            deal: The deal to enrich
+
+        Returns:
+            ProcessedDeal without short_link/rating
         """
         logger.info(f"Processing deal: {deal.title[:50]}...")
 
@@ -339,60 +599,25 @@ class DealController:
                 needs_review=True,
             )
         else:
-            price_info = self.amazon_api.validate_price(
-                deal.asin, deal.currency, deal.stated_price,
-                source_pvp=deal.source_pvp, source_discount_pct=deal.source_discount_pct
-            )
-            
-            # Merge Scrapula data if available
-            if deal.asin in self._scrapula_cache:
-                scrapula_info = self._scrapula_cache[deal.asin]
-                if scrapula_info.success:
-                    # Use Scrapula image if available and PA-API didn't provide one
-                    if not price_info.main_image_url and scrapula_info.image_url:
-                        price_info.main_image_url = scrapula_info.image_url
-                        logger.info(f"Added Scrapula image for {deal.asin}")
-                    
-                    # Use Scrapula list_price (PVP) if PA-API didn't provide it
-                    if not price_info.list_price and scrapula_info.list_price:
-                        price_info.list_price = scrapula_info.list_price
-                        # Calculate discount percentage
-                        if price_info.current_price and scrapula_info.list_price > price_info.current_price:
-                            discount = ((scrapula_info.list_price - price_info.current_price) / scrapula_info.list_price) * 100
-                            price_info.savings_percentage = round(discount, 0)
-                        logger.info(f"Added Scrapula PVP €{scrapula_info.list_price} and discount -{price_info.savings_percentage}% for {deal.asin}")
-                    
-                    # Use Scrapula rating/reviews if PA-API didn't provide them
-                    if not price_info.review_rating and scrapula_info.rating:
-                        price_info.review_rating = scrapula_info.rating
-                        logger.info(f"Added Scrapula rating for {deal.asin}")
-                    
-                    if not price_info.review_count and scrapula_info.review_count:
-                        price_info.review_count = scrapula_info.review_count
-
-        # Playwright fallback: If still no image, try scraping directly
-        playwright_delivery_cost = None
-        playwright_has_delivery = False
-        if not price_info.main_image_url and deal.asin:
-            try:
-                from .services.playwright_scraper import scrape_product_sync
-                logger.info(f"🎭 Trying Playwright fallback for {deal.asin}...")
-                pw_result = scrape_product_sync(deal.asin, self.config.get("scrapula", {}).get("marketplace", "es"))
-                if pw_result.success and pw_result.image_url:
-                    price_info.main_image_url = pw_result.image_url
-                    logger.info(f"✅ Playwright found image for {deal.asin}")
-                    # Also use PVP/discount if missing
-                    if not price_info.list_price and pw_result.list_price:
-                        price_info.list_price = pw_result.list_price
-                    if not price_info.savings_percentage and pw_result.discount_pct:
-                        price_info.savings_percentage = pw_result.discount_pct
-                    # Store delivery cost info
-                    playwright_delivery_cost = pw_result.delivery_cost
-                    playwright_has_delivery = pw_result.has_mandatory_delivery
-                else:
-                    logger.warning(f"❌ Playwright could not find image for {deal.asin}")
-            except Exception as e:
-                logger.error(f"Playwright fallback error for {deal.asin}: {e}")
+            prefetched = self._price_cache.pop(deal.asin, None)
+            if prefetched is not None:
+                # Copy so repeated ASINs in a file don't share (and mutate) one object
+                price_info = prefetched.model_copy()
+                logger.info(f"Using prefetched PA-API data for {deal.asin}")
+            else:
+                with self.limits.slot("paapi"):
+                    price_info = self.amazon_api.validate_price(
+                        deal.asin, deal.currency, deal.stated_price,
+                        source_pvp=deal.source_pvp, source_discount_pct=deal.source_discount_pct
+                    )
+
+        # Fill image/PVP/review gaps, each from the cheapest source that has it
+        provenance = {
+            field: "paapi" for field in ("current_price", *ENRICHED_FIELDS)
+            if deal.asin and getattr(price_info, field)
+        }
+        tried: list[str] = []
+        extras = self.enrichment.enrich(deal.asin, price_info, provenance, tried) if deal.asin else {}
 
         # Log comprehensive price info for debugging
         logger.info(
@@ -418,113 +643,292 @@ class DealController:
         final_url = self.affiliates.ensure_affiliate_tag(deal.url)
         deal.url = final_url
 
-        # Step 4: Create short link (to interstitial or directly to Amazon)
-        if for_preview:
-            short_link = None  # Skip shortlink creation during preview
-        elif self.shortlinks:
-            if self.interstitial_server:
-                # Create interstitial URL
-                interstitial_url = self.interstitial_server.get_interstitial_url(deal.deal_id)
-                short_link = self.shortlinks.create_short_link(interstitial_url)
-            else:
-                # Link directly to Amazon
-                short_link = self.shortlinks.create_short_link(final_url)
-        else:
-            # No shortlinks service - use direct Amazon URL
-            from .models import ShortLink
-            short_link = ShortLink(
-                short_url=final_url,
-                long_url=final_url,
-                provider="direct",
-            )
-
-        # Step 5: Get ratings (optional, non-blocking)
-        rating = None
-        if self.ratings and not for_preview:
-            try:
-                rating = self.ratings.get_rating(deal.asin)
-            except Exception as e:
-                logger.warning(f"Failed to get rating for {deal.asin}: {e}")
-
-        # Step 6: AI validation and review generation (optional)
-        ai_review_es = None
-        ai_review_en = None
-        ai_approved = True  # Default to approved if AI disabled
-
-        if self.ai_validator and not for_preview:
-            try:
-                from .services.ai_validator import get_cached_or_validate
-                ai_result = get_cached_or_validate(
-                    self.ai_validator,
-                    deal.asin or "unknown",
-                    deal.title,
-                    price_info.current_price or adjusted_price,
-                    price_info.list_price or deal.source_pvp,
-                    price_info.savings_percentage or deal.source_discount_pct,
-                    playwright_delivery_cost
-                )
-                # If AI service error, use fallback validation (basic sanity checks)
-                if ai_result.error:
-                    logger.warning(f"AI validation error for {deal.asin}, using fallback validation: {ai_result.error}")
-                    ai_approved = self._fallback_validation(
-                        deal.title,
-                        price_info.current_price or adjusted_price,
-                        price_info.list_price or deal.source_pvp,
-                        price_info.savings_percentage or deal.source_discount_pct
-                    )
-                    if not ai_approved:
-                        logger.warning(f"❌ Fallback validation rejected: {deal.title[:50]}")
-                    else:
-                        # Generate fallback reviews for deals that passed validation
-                        logger.info(f"📝 Generating fallback reviews for {deal.asin}")
-                        ai_review_es, ai_review_en = self._generate_fallback_reviews(
-                            deal.title,
-                            price_info.savings_percentage or deal.source_discount_pct
-                        )
-                else:
-                    ai_approved = ai_result.approved
-                    if ai_result.review:
-                        ai_review_es = ai_result.review.spanish
-                        ai_review_en = ai_result.review.english
-            except Exception as e:
-                logger.error(f"AI validation exception for {deal.asin}: {e}")
-                # Use fallback validation on exception
-                ai_approved = self._fallback_validation(
-                    deal.title,
-                    price_info.current_price or adjusted_price,
-                    price_info.list_price or deal.source_pvp,
-                    price_info.savings_percentage or deal.source_discount_pct
-                )
-                if ai_approved:
-                    # Generate fallback reviews for deals that passed validation
-                    logger.info(f"📝 Generating fallback reviews for {deal.asin} (exception fallback)")
-                    ai_review_es, ai_review_en = self._generate_fallback_reviews(
-                        deal.title,
-                        price_info.savings_percentage or deal.source_discount_pct
-                    )
-
         # Create processed deal
         processed = ProcessedDeal(
             deal=deal,
             price_info=price_info,
             adjusted_price=adjusted_price,
-            short_link=short_link,
-            rating=rating,
             interstitial_url=(
                 self.interstitial_server.get_interstitial_url(deal.deal_id)
                 if self.interstitial_server
                 else None
             ),
-            delivery_cost=playwright_delivery_cost,
-            has_mandatory_delivery=playwright_has_delivery,
-            ai_review_es=ai_review_es,
-            ai_review_en=ai_review_en,
-            ai_approved=ai_approved,
+            delivery_cost=extras.get("delivery_cost"),
+            has_mandatory_delivery=extras.get("has_mandatory_delivery", False),
+            provenance=provenance,
+            enrichment_tried=tried,
         )
 
         logger.info(f"Deal processed: {deal.title[:50]}...")
         return processed
 
+    def finalize_deal(self, processed: ProcessedDeal) -> ProcessedDeal:
+        """
+        Create the short link and fetch the rating (steps 4-5) for a deal that is being published.
+
+        Only what the deal doesn't have yet is created.
+
+        Args:
+            processed: Deal from enrich_deal()
+
+        Returns:
+            The same deal with short_link and rating set
+        """
+        self.finalize_deals([processed])
+        return processed
+
+    def finalize_deals(self, processed_deals: list[ProcessedDeal]) -> None:
+        """
+        Short links and ratings (steps 4-5) for a publish batch, each in one batched call.
+
+        A deal whose short link could not be created keeps short_link=None.
+
+        Args:
+            processed_deals: Deals about to be published
+        """
+        # Step 4: Short links (to interstitial or directly to Amazon)
+        try:
+            self.create_short_links(processed_deals)
+        except Exception as e:
+            logger.error(f"Short link creation failed for {len(processed_deals)} deal(s): {e}")
+
+        # Step 5: Ratings (optional, non-blocking)
+        self.fetch_ratings(processed_deals)
+
+    def fetch_ratings(self, processed_deals: list[ProcessedDeal]) -> None:
+        """
+        Set ratings for deals that don't have one, with one batched ratings lookup.
+
+        Deals whose product data already has a review rating use it instead.
+
+        Args:
+            processed_deals: Deals to rate
+        """
+        pending = []
+        for processed in processed_deals:
+            if processed.rating is not None or not processed.deal.asin:
+                continue
+            price_info = processed.price_info
+            if price_info and price_info.review_rating:
+                # PA-API or Scrapula already returned it; no ratings call needed
+                processed.rating = Rating(
+                    value=price_info.review_rating,
+                    count=price_info.review_count or 0,
+                    stars=Rating.render_stars(price_info.review_rating),
+                )
+                processed.provenance["rating"] = processed.provenance.get("review_rating", "paapi")
+            else:
+                pending.append(processed)
+        if not self.ratings or not pending:
+            return
+
+        try:
+            with self.limits.slot("ratings"):
+                ratings = self.ratings.get_ratings([p.deal.asin for p in pending])
+        except Exception as e:
+            logger.warning(f"Failed to get ratings for {len(pending)} deal(s): {e}")
+            return
+
+        for processed in pending:
+            processed.rating = ratings.get(processed.deal.asin)
+            if processed.rating:
+                processed.provenance["rating"] = "ratings"
+
+    def _short_link_target(self, processed: ProcessedDeal) -> str:
+        """URL a deal's short link points to (its interstitial page, or Amazon)."""
+        if self.interstitial_server:
+            return self.interstitial_server.get_interstitial_url(processed.deal.deal_id)
+        return processed.deal.url
+
+    def create_short_links(self, processed_deals: list[ProcessedDeal]) -> None:
+        """
+        Set short links for a publish batch: registry reads plus one bulk create for the rest.
+
+        Args:
+            processed_deals: Deals about to be published (deals with a link are skipped)
+        """
+        pending = [p for p in processed_deals if p.short_link is None]
+        if not pending:
+            return
+
+        if not self.shortlinks:
+            # No shortlinks service - use direct Amazon URL
+            from .models import ShortLink
+            for processed in pending:
+                processed.short_link = ShortLink(
+                    short_url=processed.deal.url,
+                    long_url=processed.deal.url,
+                    provider="direct",
+                )
+            return
+
+        targets = [self._short_link_target(p) for p in pending]
+        with self.limits.slot("shortlinks"):
+            links = self.shortlinks.get_or_create_many(targets)
+        for processed, target in zip(pending, targets):
+            processed.short_link = links.get(target)
+
+    def validate_deals_with_ai(self, processed_deals: list[ProcessedDeal]) -> None:
+        """
+        AI-validate and review processed deals, several per DeepSeek request.
+
+        Sets ai_approved / ai_review_* on each deal, plus the tokens and latency
+        of its request. Deals whose result is unusable (service error, malformed
+        item) get the rule-based fallback instead.
+
+        Args:
+            processed_deals: Deals from process_deal(..., validate_ai=False)
+        """
+        if not self.ai_validator or not processed_deals:
+            return
+
+        from .services.ai_validator import AIValidationRequest, get_cached_or_validate_many
+
+        requests = [
+            AIValidationRequest(
+                title=p.deal.title,
+                current_price=p.price_info.current_price or p.adjusted_price,
+                list_price=p.price_info.list_price or p.deal.source_pvp,
+                discount_pct=p.price_info.savings_percentage or p.deal.source_discount_pct,
+                delivery_cost=p.delivery_cost,
+                asin=p.deal.asin,
+            )
+            for p in processed_deals
+        ]
+
+        try:
+            results = get_cached_or_validate_many(
+                self.ai_validator,
+                requests,
+                batch_size=self.ai_batch_size,
+                limiter=self.limits.get("deepseek"),
+                cache=self.ai_cache,
+            )
+        except Exception as e:
+            logger.error(f"AI validation exception for {len(processed_deals)} deal(s): {e}")
+            results = [None] * len(processed_deals)
+
+        for processed, result in zip(processed_deals, results):
+            self._apply_ai_result(processed, result)
+            processed.ai_validated = True
+
+    def prepare_for_publish(
+        self, processed_deals: list[ProcessedDeal], max_price_age_minutes: Optional[float] = None
+    ) -> list[ProcessedDeal]:
+        """
+        Upgrade preview results in place with only the stages publishing still needs.
+
+        Prices are re-validated (one batched PA-API pass) only for deals whose
+        preview is older than max_price_age_minutes; Scrapula only fills gaps;
+        short links, ratings and AI reviews are created only where missing.
+
+        Args:
+            processed_deals: Results of process_deal(..., for_preview=True)
+            max_price_age_minutes: Staleness window (default: price_validation.max_age_minutes)
+
+        Returns:
+            The same deals, ready for publish_deal()
+        """
+        if max_price_age_minutes is None:
+            max_price_age_minutes = self.config.price_max_age_minutes
+
+        stale = [p for p in processed_deals if p.deal.asin and p.is_price_stale(max_price_age_minutes)]
+        if stale:
+            self.refresh_prices(stale)
+
+        # The preview doesn't wait for Scrapula; fill remaining gaps now
+        # (sources the preview already called are not called again)
+        gaps = [p for p in processed_deals if p.deal.asin and self.enrichment.missing(p.price_info)]
+        if gaps:
+            self.enrich_deals_before_publish([p.deal for p in gaps])
+            for processed in gaps:
+                self._enrich_fields(processed)
+
+        self.finalize_deals(processed_deals)
+
+        self.validate_deals_with_ai([p for p in processed_deals if not p.ai_validated])
+        return processed_deals
+
+    def refresh_prices(self, processed_deals: list[ProcessedDeal]) -> None:
+        """
+        Re-validate current prices (batched PA-API) for already processed deals.
+
+        Product data found earlier (image, PVP from other sources, rating) is
+        kept unless PA-API now returns it too.
+
+        Args:
+            processed_deals: Deals to refresh in place
+        """
+        logger.info(f"Re-validating {len(processed_deals)} stale price(s)...")
+        try:
+            fresh = self.amazon_api.validate_prices(
+                [p.deal for p in processed_deals], limiter=self.limits.get("paapi")
+            )
+        except Exception as e:
+            logger.error(f"Price refresh failed, publishing with previewed prices: {e}")
+            return
+
+        for processed in processed_deals:
+            new = fresh.get(processed.deal.asin)
+            if new is None:
+                continue
+
+            old_price = processed.price_info.current_price
+            updates = {k: v for k, v in new.model_dump().items() if v is not None}
+            # These describe the current offer, so clear them if PA-API no longer reports them
+            for field in ("current_price", "availability", "discrepancy"):
+                updates.setdefault(field, None)
+            processed.price_info = processed.price_info.model_copy(update=updates)
+            for field in updates:
+                if field in ("current_price", *ENRICHED_FIELDS) and updates[field] is not None:
+                    processed.provenance[field] = "paapi"
+
+            price = processed.price_info.current_price or processed.deal.stated_price
+            processed.adjusted_price = self.pricing.adjust_price(price) if price else 0.0
+            processed.validated_at = datetime.now()
+
+            if processed.price_info.current_price != old_price:
+                logger.info(
+                    f"💱 Price changed since preview for {processed.deal.asin}: "
+                    f"€{old_price} -> €{processed.price_info.current_price}"
+                )
+                # The verdict was for the old price (the AI cache makes re-checking cheap)
+                processed.ai_validated = False
+
+    def _apply_ai_result(self, processed: ProcessedDeal, ai_result: Optional["AIValidationResult"]) -> None:
+        """Copy an AI result onto a deal, falling back to rule-based checks on errors."""
+        deal = processed.deal
+        current_price = processed.price_info.current_price or processed.adjusted_price
+        list_price = processed.price_info.list_price or deal.source_pvp
+        discount_pct = processed.price_info.savings_percentage or deal.source_discount_pct
+
+        if ai_result is not None and not ai_result.error:
+            processed.ai_approved = ai_result.approved
+            if ai_result.review:
+                processed.ai_review_es = ai_result.review.spanish
+                processed.ai_review_en = ai_result.review.english
+            processed.ai_latency_ms = ai_result.latency_ms
+            if ai_result.prompt_tokens is not None or ai_result.completion_tokens is not None:
+                processed.ai_tokens = (ai_result.prompt_tokens or 0) + (ai_result.completion_tokens or 0)
+                logger.info(
+                    f"🤖 AI cost for {deal.asin}: ~{processed.ai_tokens} tokens, "
+                    f"{ai_result.latency_ms:.0f} ms (batch of {ai_result.batch_size})"
+                )
+            return
+
+        # If AI service error, use fallback validation (basic sanity checks)
+        error = ai_result.error if ai_result is not None else "exception"
+        logger.warning(f"AI validation error for {deal.asin}, using fallback validation: {error}")
+        processed.ai_approved = self._fallback_validation(deal.title, current_price, list_price, discount_pct)
+        if not processed.ai_approved:
+            logger.warning(f"❌ Fallback validation rejected: {deal.title[:50]}")
+        else:
+            # Generate fallback reviews for deals that passed validation
+            logger.info(f"📝 Generating fallback reviews for {deal.asin}")
+            processed.ai_review_es, processed.ai_review_en = self._generate_fallback_reviews(
+                deal.title, discount_pct
+            )
+
     def publish_to_whatsapp(
         self, processed: ProcessedDeal, to_group: bool = False
     ) -> "PublishResult":
@@ -544,20 +948,25 @@ class DealController:
             return
         
         # Only enrich deals that aren't already in cache
-        asins_to_fetch = [deal.asin for deal in deals if deal.asin and deal.asin not in self._scrapula_cache]
+        to_enrich = [deal for deal in deals if deal.asin and deal.asin not in self._scrapula_cache]
         
-        if not asins_to_fetch:
+        if not to_enrich:
             logger.info("All deals already enriched with Scrapula data")
             return
         
-        logger.info(f"Enriching {len(asins_to_fetch)} deals with Scrapula data (for PVP/discounts/images)...")
-        self._enrich_with_scrapula([d for d in deals if d.asin in asins_to_fetch])
+        logger.info(f"Enriching {len(to_enrich)} deals with Scrapula data (for PVP/discounts/images)...")
+        self._enrich_with_scrapula(to_enrich)
 
-    def publish_deal(
+    def enqueue_deal(
         self, processed: ProcessedDeal, include_group: bool = False
     ) -> ProcessedDeal:
-        """Publish deal to WhatsApp."""
-        logger.info(f"Publishing deal: {processed.deal.title[:50]}...")
+        """
+        Format a deal and queue it in the publish outbox.
+
+        The deal is saved as QUEUED (which dedup treats as published) in the
+        same transaction; the publish worker sends it later.
+        """
+        logger.info(f"Queueing deal: {processed.deal.title[:50]}...")
 
         # Check if product is available for purchase
         if processed.price_info:
@@ -565,7 +974,6 @@ class DealController:
             if not processed.price_info.current_price:
                 logger.error(f"❌ SKIPPING - No price available for {processed.deal.asin} (likely out of stock or unavailable)")
                 processed.deal.status = DealStatus.FAILED
-                from .models import PublishResult
                 processed.publish_result = PublishResult(
                     deal_id=processed.deal.deal_id,
                     success=False,
@@ -581,7 +989,6 @@ class DealController:
             if availability and availability not in ["Now", None, ""]:
                 logger.error(f"❌ SKIPPING - Product is OUT OF STOCK: {processed.deal.asin} (availability: {availability})")
                 processed.deal.status = DealStatus.FAILED
-                from .models import PublishResult
                 processed.publish_result = PublishResult(
                     deal_id=processed.deal.deal_id,
                     success=False,
@@ -595,6 +1002,18 @@ class DealController:
             if processed.price_info.needs_review:
                 logger.warning(f"⚠️ Deal needs review but will publish: {processed.deal.asin}")
 
+        if processed.short_link is None:
+            logger.error(f"❌ SKIPPING - No short link for {processed.deal.asin}")
+            processed.deal.status = DealStatus.FAILED
+            processed.publish_result = PublishResult(
+                deal_id=processed.deal.deal_id,
+                success=False,
+                error="Short link could not be created",
+                destinations=[],
+                message_ids={},
+            )
+            return processed
+
         # Get recipients
         recipients = self.whapi.get_recipients(include_group=include_group)
 
@@ -606,113 +1025,46 @@ class DealController:
         # Format message
         message = self.formatter.format_message(processed)
 
-        # Get image URL from price info (from Amazon PA-API or Scrapula)
+        # Image URL found during enrichment (no fetches on the publish path)
         image_url = processed.price_info.main_image_url if processed.price_info else None
-        
-        # Fallback: Try to extract image AND PVP/discount from Amazon page if missing
-        if (not image_url or not processed.price_info.list_price) and processed.deal.asin:
-            try:
-                import requests
-                import re
-                
-                # Fetch Amazon product page
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-                }
-                response = requests.get(
-                    f"https://www.amazon.es/dp/{processed.deal.asin}",
-                    headers=headers,
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    html = response.text
-                    
-                    # Extract image URL if still missing
-                    if not image_url:
-                        image_patterns = [
-                            r'"hiRes":"(https://[^"]+\.jpg)"',
-                            r'"large":"(https://[^"]+\.jpg)"',
-                            r'data-old-hires="(https://[^"]+\.jpg)"',
-                            r'data-a-dynamic-image="[^"]*?(https://m\.media-amazon\.com/images/I/[^"]+\.jpg)',
-                        ]
-                        
-                        for pattern in image_patterns:
-                            match = re.search(pattern, html)
-                            if match:
-                                image_url = match.group(1)
-                                logger.info(f"Extracted image URL from Amazon page for {processed.deal.asin}")
-                                break
-                    
-                    # Extract PVP/list price if missing
-                    if not processed.price_info.list_price:
-                        # Look for patterns like: "listPrice":{"amount":75.0,"currency":"EUR"}
-                        pvp_patterns = [
-                            r'"listPrice":\s*{\s*"amount":\s*([0-9.]+)',
-                            r'"list_price":\s*{\s*"amount":\s*([0-9.]+)',
-                            r'<span[^>]*class="[^"]*a-price[^"]*a-text-price[^"]*"[^>]*>[^€]*€\s*([0-9.,]+)',
-                            r'data-a-strike="true"[^>]*>[^€]*€\s*([0-9.,]+)',
-                        ]
-                        
-                        for pattern in pvp_patterns:
-                            match = re.search(pattern, html)
-                            if match:
-                                pvp_str = match.group(1).replace(',', '.')
-                                try:
-                                    list_price = float(pvp_str)
-                                    # Only use if it's higher than current price
-                                    if list_price > processed.price_info.current_price:
-                                        processed.price_info.list_price = list_price
-                                        # Calculate discount
-                                        discount = ((list_price - processed.price_info.current_price) / list_price) * 100
-                                        processed.price_info.savings_percentage = round(discount, 0)
-                                        logger.info(f"Extracted PVP €{list_price} and discount -{processed.price_info.savings_percentage}% from Amazon page for {processed.deal.asin}")
-                                        break
-                                except ValueError:
-                                    continue
-                            
-            except Exception as e:
-                logger.warning(f"Failed to extract from Amazon page for {processed.deal.asin}: {e}")
-        
+
         # If still no image, skip image (send text-only to avoid 400 errors)
         if not image_url:
             logger.warning(f"No valid image URL found for {processed.deal.asin}, sending text-only message")
 
-        # Send via Whapi (with image if available)
+        processed.deal.status = DealStatus.QUEUED
         try:
-            result = self.whapi.send_message(
-                recipients, 
-                message, 
-                processed.deal.deal_id,
-                image_url=image_url
-            )
-            processed.publish_result = result
+            self.outbox.enqueue(processed, recipients, message, image_url=image_url)
+        except sqlite3.Error as e:
+            logger.error(f"Error queueing deal {processed.deal.deal_id}: {e}")
+            processed.deal.status = DealStatus.FAILED
+            return processed
 
-            if result.success:
-                processed.deal.status = DealStatus.PUBLISHED
-                logger.info(f"Deal published successfully: {processed.deal.deal_id}")
-            else:
-                processed.deal.status = DealStatus.FAILED
-                logger.error(f"Failed to publish deal: {result.error}")
+        self.dedup.record(processed.deal.asin, processed.adjusted_price, datetime.now())
+        self.publish_worker.notify()
+        logger.info(f"📬 Deal queued for publishing: {processed.deal.deal_id}")
+        return processed
 
-        except Exception as e:
-            logger.error(f"Error publishing deal: {e}")
-            processed.deal.status = DealStatus.FAILED
+    def publish_deal(
+        self, processed: ProcessedDeal, include_group: bool = False
+    ) -> ProcessedDeal:
+        """Publish deal to WhatsApp now (queued through the outbox, then sent on this thread)."""
+        self.enqueue_deal(processed, include_group=include_group)
+        if processed.deal.status != DealStatus.QUEUED:
+            return processed
 
-        # Save to database
-        self.db.save_deal(processed)
-
-        # Log event
-        self.db.log_event(
-            processed.deal.deal_id,
-            "published" if processed.publish_result and processed.publish_result.success else "failed",
-            {
-                "recipients": recipients,
-                "success": (
-                    processed.publish_result.success if processed.publish_result else False
-                ),
-            },
-        )
+        result = self.publish_worker.publish_now(processed.deal.deal_id)
+        if result is None:
+            # The background worker picked it up first
+            return processed
+
+        processed.publish_result = result
+        if result.success:
+            processed.deal.status = DealStatus.PUBLISHED
+        else:
+            # This attempt failed; the outbox keeps retrying it (publishing.max_attempts)
+            processed.deal.status = DealStatus.FAILED
+            logger.error(f"Failed to publish deal: {result.error}")
 
         return processed
 
@@ -724,17 +1076,30 @@ class DealController:
 
         for deal in deals:
             try:
-                processed = self.process_deal(deal)
-                processed = self.publish_deal(processed, include_group=include_group)
-                processed_deals.append(processed)
+                processed_deals.append(self.process_deal(deal))
             except Exception as e:
                 logger.error(f"Failed to process deal {deal.title}: {e}")
 
+        # Short links, ratings and AI validation for the whole batch at once
+        self.prepare_for_publish(processed_deals)
+
+        for processed in processed_deals:
+            try:
+                self.publish_deal(processed, include_group=include_group)
+            except Exception as e:
+                logger.error(f"Failed to publish deal {processed.deal.title}: {e}")
+
         return processed_deals
 
     def shutdown(self) -> None:
         """Clean up resources."""
         if self.interstitial_server:
             self.interstitial_server.stop()
+        self.browser_pool.shutdown()
+        self.publish_worker.stop()
+        self.outbox.close()
+        self.cache.close()
+        self.ai_cache.close()
+        self.link_registry.close()
         self.db.close()
         logger.info("Controller shutdown complete")
@@ -1,13 +1,15 @@
 """Headless daemon service for autonomous deal processing."""
 
-import time
-from datetime import datetime
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
 from .controller import DealController
-from .models import Deal, ProcessedDeal
+from .models import Deal, PriceInfo, ProcessedDeal
 from .services.whapi import WhapiService
+from .storage.ledger import SourceLedger, parse_file_date
 from .utils.config import Config
 from .utils.logging import get_logger
 
@@ -15,15 +17,80 @@ logger = get_logger(__name__)
 
 
 class DealFilter:
-    """Smart filtering logic for determining which deals to publish."""
+    """Smart filtering logic for determining which deals to publish.
+
+    precheck() and check_prices() are the cheap early stages: they only reject
+    deals that should_publish() would reject anyway once enriched (except the
+    source discount rule, which trusts the discount stated in the TXT file),
+    so expensive enrichment is skipped for them.
+    """
+
+    MIN_DISCOUNT_PCT = 20
 
     def __init__(self, config: Config):
         self.config = config
 
-    def should_publish(self, deal: Deal, processed: ProcessedDeal) -> tuple[bool, str]:
+    def precheck(self, deal: Deal) -> tuple[bool, str]:
+        """
+        Rules on the parsed deal alone (before any API call).
+
+        Returns:
+            tuple[bool, str]: (still_a_candidate, reason)
+        """
+        # Without an ASIN there is no product data, so no image (Rule 0a)
+        if not deal.asin:
+            return False, "❌ NO ASIN - Cannot look up product"
+
+        if deal.source_discount_pct is not None and deal.source_discount_pct < self.MIN_DISCOUNT_PCT:
+            return False, (
+                f"❌ INSUFFICIENT SOURCE DISCOUNT - Only {deal.source_discount_pct}% "
+                f"(minimum {self.MIN_DISCOUNT_PCT}% required)"
+            )
+
+        return True, "Passed precheck"
+
+    def check_prices(self, deal: Deal, price_info: Optional[PriceInfo]) -> tuple[bool, str]:
+        """
+        Rules on batched PA-API data (before Scrapula/Playwright/shortlinks/AI).
+
+        Only checks fields that later enrichment never changes.
+
+        Returns:
+            tuple[bool, str]: (still_a_candidate, reason)
+        """
+        if price_info is None:
+            return True, "No prefetched price data"
+
+        # Rule 1: Must have a current price (stock check)
+        if not price_info.current_price:
+            return False, "No current price available (out of stock)"
+
+        # Rule 0c: Price validation
+        if deal.stated_price:
+            price_ratio = price_info.current_price / deal.stated_price
+            if price_ratio > 2.0 or price_ratio < 0.5:
+                return False, f"❌ PRICE ERROR - Actual €{price_info.current_price} vs stated €{deal.stated_price} (ratio: {price_ratio:.2f})"
+
+        # Rule 0d: Scrapula/Playwright only fill PVP/discount when PA-API has none
+        if price_info.list_price and price_info.savings_percentage and price_info.savings_percentage < self.MIN_DISCOUNT_PCT:
+            return False, f"❌ INSUFFICIENT DISCOUNT - Only {price_info.savings_percentage}% (minimum {self.MIN_DISCOUNT_PCT}% required)"
+
+        # Rule 2: Must be available (not out of stock)
+        if price_info.availability and price_info.availability not in ["Now", None, ""]:
+            return False, f"Out of stock (availability: {price_info.availability})"
+
+        return True, "Passed price checks"
+
+    def should_publish(self, deal: Deal, processed: ProcessedDeal, check_ai: bool = True) -> tuple[bool, str]:
         """
         Determine if a deal should be published based on smart rules.
 
+        Args:
+            deal: Parsed deal
+            processed: Enriched deal
+            check_ai: If False, skip the AI verdict (the deal isn't validated yet);
+                a rejection is then final, an approval still needs the AI check
+
         Returns:
             tuple[bool, str]: (should_publish, reason)
         """
@@ -55,8 +122,8 @@ class DealFilter:
 
         # Rule 0d: Minimum discount threshold - Must be a real deal (20%+)
         actual_discount = price_info.savings_percentage or deal.source_discount_pct or 0
-        if actual_discount < 20:
-            return False, f"❌ INSUFFICIENT DISCOUNT - Only {actual_discount}% (minimum 20% required)"
+        if actual_discount < self.MIN_DISCOUNT_PCT:
+            return False, f"❌ INSUFFICIENT DISCOUNT - Only {actual_discount}% (minimum {self.MIN_DISCOUNT_PCT}% required)"
 
         # Rule 0e: No mandatory delivery costs allowed
         # Deals with mandatory delivery fees make the actual price higher than advertised
@@ -66,7 +133,7 @@ class DealFilter:
 
         # Rule 0f: AI validation must approve
         # Claude AI performs final sanity check on price, discount, and product-price match
-        if hasattr(processed, 'ai_approved') and not processed.ai_approved:
+        if check_ai and hasattr(processed, 'ai_approved') and not processed.ai_approved:
             return False, "❌ AI REJECTED - Deal failed AI sanity check (price/discount suspicious)"
 
         # Rule 1: Must have a current price (stock check)
@@ -122,14 +189,32 @@ class DealFilter:
 class DealBotDaemon:
     """Main daemon for autonomous deal processing."""
 
+    # Per-deal calls each stage's rejections avoid (service names as in ServiceLimits).
+    # Playwright is left out: it only runs when no other source found an image.
+    STAGE_SKIPPED_CALLS: dict[str, tuple[str, ...]] = {
+        "parse": ("paapi", "scrapula", "shortlinks", "ratings", "deepseek"),
+        "price": ("scrapula", "shortlinks", "ratings", "deepseek"),
+        "enrich": ("shortlinks", "ratings", "deepseek"),
+        "ai": ("shortlinks", "ratings"),
+    }
+
+    # Files dated (by filename) further back than this are not processed
+    MAX_FILE_AGE_HOURS = 24
+
+    # Watch mode has no run boundary: purge caches and reload dedup this often
+    WATCH_MAINTENANCE_MINUTES = 60
+
     def __init__(self, config: Config):
         self.config = config
         self.controller = DealController(config)
         self.filter = DealFilter(config)
         self.whapi = WhapiService(config)
 
-        # Track processed files to avoid duplicates
-        self.processed_files: set[str] = set()
+        # Durable record of processed source files (path + content hash + mtime)
+        self.ledger = SourceLedger(self.controller.db)
+
+        # When caches were last purged and the dedup index reloaded
+        self.last_maintenance: Optional[datetime] = None
 
         # Stats for status updates
         self.stats = {
@@ -143,7 +228,7 @@ class DealBotDaemon:
 
     def find_latest_deal_files(self, source_dir: Path, since: Optional[datetime] = None) -> list[Path]:
         """
-        Find TXT files in the source directory.
+        Find new or changed TXT files in the source directory.
 
         Args:
             source_dir: Directory to search
@@ -156,41 +241,8 @@ class DealBotDaemon:
             logger.error(f"Source directory does not exist: {source_dir}")
             return []
 
-        # Find all .txt files recursively
-        txt_files = list(source_dir.rglob("*.txt"))
-
-        # Parse date from filename (format: 2025-11-19_1602_evening_whatsapp.txt)
-        import re
-        date_pattern = re.compile(r'(\d{4})-(\d{2})-(\d{2})_(\d{2})(\d{2})')
-
-        def get_file_date(file_path: Path) -> Optional[datetime]:
-            """Extract datetime from filename."""
-            match = date_pattern.search(file_path.name)
-            if match:
-                year, month, day, hour, minute = map(int, match.groups())
-                try:
-                    return datetime(year, month, day, hour, minute)
-                except ValueError:
-                    logger.warning(f"Invalid date in filename: {file_path.name}")
-            return None
-
-        # Filter by date from filename if specified
-        filtered_files = []
-        for f in txt_files:
-            file_date = get_file_date(f)
-            if file_date:
-                if since is None or file_date > since:
-                    filtered_files.append((f, file_date))
-            else:
-                # If we can't parse date, include it anyway (fallback to old behavior)
-                filtered_files.append((f, datetime.fromtimestamp(f.stat().st_mtime)))
-
-        # Sort by date (newest first)
-        filtered_files.sort(key=lambda x: x[1], reverse=True)
-        result = [f for f, _ in filtered_files]
-
-        logger.info(f"Found {len(result)} TXT files in {source_dir} (filtered from {len(txt_files)} total)")
-        return result
+        # The ledger skips files whose exact contents were already processed
+        return self.ledger.discover(source_dir, since=since)
 
     def process_file(self, file_path: Path) -> dict:
         """
@@ -199,10 +251,8 @@ class DealBotDaemon:
         Returns:
             dict with processing stats
         """
-        file_key = str(file_path)
-
-        # Skip if already processed
-        if file_key in self.processed_files:
+        # Skip if this exact content was already processed
+        if not self.ledger.needs_processing(file_path):
             logger.info(f"Skipping already processed file: {file_path.name}")
             return {'deals_found': 0, 'deals_published': 0, 'deals_filtered': 0}
 
@@ -212,79 +262,227 @@ class DealBotDaemon:
             # Parse deals from file
             deals = self.controller.parse_file(file_path)
             logger.info(f"Found {len(deals)} deals in {file_path.name}")
-
-            # Enrich with Scrapula data before processing
-            self.controller.enrich_deals_before_publish(deals)
+            self.ledger.mark_parsed(file_path, len(deals))
 
             published_count = 0
             filtered_count = 0
             duplicate_count = 0
             published_deals = []
 
+            # Deals rejected per stage; each stage only runs on the previous stage's survivors
+            stage_rejections = {stage: 0 for stage in self.STAGE_SKIPPED_CALLS}
+
+            def reject(stage: str, deal: Deal, reason: str) -> None:
+                nonlocal filtered_count
+                logger.info(f"⏭️  Filtering out ({stage}): {deal.title[:50]} - {reason}")
+                stage_rejections[stage] += 1
+                filtered_count += 1
+
+            # Stage "parse": rules on the TXT data and in-memory duplicate lookups.
+            # Nothing from this file is recorded for dedup until it is queued, so
+            # an ASIN listed twice in the file is caught here.
+            candidates = []
+            accepted_asins: set[str] = set()
             for deal in deals:
-                try:
-                    # Check for duplicates first (use stated price if available)
-                    if deal.asin and self.is_duplicate(deal.asin, deal.stated_price):
-                        logger.info(f"⏭️  Skipping duplicate: {deal.title[:50]} (ASIN: {deal.asin})")
-                        duplicate_count += 1
-                        filtered_count += 1
-                        continue
-
-                    # Process the deal (validate price, etc.)
-                    processed = self.controller.process_deal(deal, for_preview=False)
-
-                    # Apply smart filtering
-                    should_publish, reason = self.filter.should_publish(deal, processed)
-
-                    if should_publish:
-                        logger.info(f"✅ Publishing: {deal.title[:50]} - {reason}")
-                        # Publish to WhatsApp
-                        self.controller.publish_deal(processed, include_group=False)
-                        published_count += 1
-                        published_deals.append({
-                            'title': deal.title,  # Full title
-                            'title_en': deal.title_en or deal.title,  # Full English title
-                            'asin': deal.asin,
-                            'price': processed.price_info.current_price if processed.price_info else deal.stated_price
-                        })
-                    else:
-                        logger.info(f"⏭️  Filtering out: {deal.title[:50]} - {reason}")
-                        filtered_count += 1
-
-                except Exception as e:
-                    logger.error(f"Error processing deal {deal.title[:50]}: {e}", exc_info=True)
-                    error_msg = f"{deal.title[:30]}: {str(e)[:50]}"
-                    self.stats['errors'].append(error_msg)
-                    filtered_count += 1
-
-                    # Send immediate error notification for critical errors
-                    if "PA-API" not in str(e):  # Don't spam for PA-API errors (expected)
-                        self.send_status_update(
-                            f"⚠️ Error Processing Deal\n\n"
-                            f"Deal: {deal.title[:50]}\n"
-                            f"Error: {str(e)[:100]}\n"
-                            f"Time: {datetime.now().strftime('%H:%M')}"
-                        )
-
-                # Small delay between deals to avoid rate limits
-                time.sleep(2)
+                passed, reason = self.filter.precheck(deal)
+                if not passed:
+                    reject("parse", deal, reason)
+                    continue
+                if deal.asin in accepted_asins or self.is_duplicate(deal.asin, deal.stated_price):
+                    duplicate_count += 1
+                    reject("parse", deal, f"Duplicate (ASIN: {deal.asin})")
+                    continue
+                if deal.asin:
+                    accepted_asins.add(deal.asin)
+                candidates.append(deal)
+
+            # Stage "price": batch PA-API lookups (10 ASINs per request), then the price rules
+            self.controller.prefetch_prices(candidates)
+            survivors = []
+            for deal in candidates:
+                passed, reason = self.filter.check_prices(deal, self.controller.prefetched_price(deal.asin))
+                if not passed:
+                    reject("price", deal, reason)
+                    continue
+                survivors.append(deal)
+            candidates = survivors
+
+            # Start Scrapula in the background; enrich_deal only waits for it
+            # when PA-API leaves image/PVP/rating gaps
+            self.controller.start_scrapula_enrichment(candidates)
+
+            # Enrich candidates in parallel; per-service limits in the controller
+            # keep each external API within its own concurrency/rate budget
+            workers = max(1, int(self.config.get("concurrency", {}).get("workers", 4)))
+            logger.info(f"Processing {len(candidates)} deals with {workers} worker(s)")
+
+            # AI validation runs once per chunk of this many deals instead of per deal
+            ai_batch_size = max(1, int(self.config.get("ai_validation", {}).get("batch_size", 8)))
+
+            def record_error(deal: Deal, e: Exception) -> None:
+                logger.error(f"Error processing deal {deal.title[:50]}: {e}", exc_info=True)
+                error_msg = f"{deal.title[:30]}: {str(e)[:50]}"
+                self.stats['errors'].append(error_msg)
+
+                # Send immediate error notification for critical errors
+                if "PA-API" not in str(e):  # Don't spam for PA-API errors (expected)
+                    self.send_status_update(
+                        f"⚠️ Error Processing Deal\n\n"
+                        f"Deal: {deal.title[:50]}\n"
+                        f"Error: {str(e)[:100]}\n"
+                        f"Time: {datetime.now().strftime('%H:%M')}"
+                    )
+
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deal") as pool:
+                futures = [pool.submit(self.controller.enrich_deal, deal) for deal in candidates]
+
+                # Consume results in file order so publishing follows the Chollometro rank,
+                # while later deals keep enriching in the background
+                for start in range(0, len(candidates), ai_batch_size):
+                    # Stage "enrich": every rule except the AI verdict, on enriched data
+                    chunk: list[tuple[Deal, ProcessedDeal]] = []
+                    for deal, future in zip(candidates[start:start + ai_batch_size], futures[start:start + ai_batch_size]):
+                        try:
+                            processed = future.result()
+                            passed, reason = self.filter.should_publish(deal, processed, check_ai=False)
+                        except Exception as e:
+                            record_error(deal, e)
+                            filtered_count += 1
+                            continue
+                        if not passed:
+                            reject("enrich", deal, reason)
+                            continue
+                        chunk.append((deal, processed))
+
+                    # Stage "ai": one DeepSeek request validates what is left of the chunk
+                    self.controller.validate_deals_with_ai([processed for _, processed in chunk])
+
+                    approved: list[tuple[Deal, ProcessedDeal, str]] = []
+                    for deal, processed in chunk:
+                        try:
+                            # Apply smart filtering
+                            should_publish, reason = self.filter.should_publish(deal, processed)
+                        except Exception as e:
+                            record_error(deal, e)
+                            filtered_count += 1
+                            continue
+                        if not should_publish:
+                            reject("ai", deal, reason)
+                            continue
+                        approved.append((deal, processed, reason))
+
+                    # Short links and ratings for everything the chunk publishes, one
+                    # batched call each; the publish path below only reads them
+                    self.controller.finalize_deals([processed for _, processed, _ in approved])
+
+                    for deal, processed, reason in approved:
+                        try:
+                            logger.info(f"✅ Publishing: {deal.title[:50]} - {reason}")
+                            # Queue for WhatsApp; the publish worker sends it at its own pace
+                            self.controller.enqueue_deal(processed, include_group=False)
+                            published_count += 1
+                            published_deals.append({
+                                'title': deal.title,  # Full title
+                                'title_en': deal.title_en or deal.title,  # Full English title
+                                'asin': deal.asin,
+                                'price': processed.price_info.current_price if processed.price_info else deal.stated_price
+                            })
+
+                        except Exception as e:
+                            record_error(deal, e)
+                            filtered_count += 1
 
             # Mark file as processed
-            self.processed_files.add(file_key)
+            self.ledger.mark_processed(file_path, len(deals), published_count, filtered_count)
 
             return {
                 'deals_found': len(deals),
                 'deals_published': published_count,
                 'deals_filtered': filtered_count,
                 'duplicates_skipped': duplicate_count,
+                'stage_rejections': stage_rejections,
                 'published_deals': published_deals
             }
 
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}", exc_info=True)
             self.stats['errors'].append(f"File {file_path.name}: {str(e)[:50]}")
+            self.ledger.mark_failed(file_path, str(e))
             return {'deals_found': 0, 'deals_published': 0, 'deals_filtered': 0}
 
+    def ingest_file(self, file_path: Path) -> Optional[dict]:
+        """
+        Process one file as soon as it lands (watch mode).
+
+        Applies the same age cutoff, ledger and dedup checks as run_once(),
+        and the same cache purge and dedup reload once they are due.
+
+        Returns:
+            dict with processing stats, or None if the file was skipped
+        """
+        file_date = parse_file_date(file_path.name)
+        if file_date and file_date <= datetime.now() - timedelta(hours=self.MAX_FILE_AGE_HOURS):
+            logger.info(f"Skipping old file: {file_path.name}")
+            return None
+        if not self.ledger.needs_processing(file_path):
+            logger.info(f"Skipping already processed file: {file_path.name}")
+            return None
+
+        due = datetime.now() - timedelta(minutes=self.WATCH_MAINTENANCE_MINUTES)
+        if self.last_maintenance is None or self.last_maintenance <= due:
+            self.run_maintenance()
+
+        self.stats['errors'] = []
+        result = self.process_file(file_path)
+        self.stats['files_processed'] += 1
+        self.stats['deals_found'] += result['deals_found']
+        self.stats['deals_published'] += result['deals_published']
+        self.stats['deals_filtered'] += result['deals_filtered']
+        self.stats['last_run'] = datetime.now()
+
+        logger.info(f"{file_path.name}: {result['deals_published']} of {result['deals_found']} deals queued")
+        if result['deals_published']:
+            titles = "\n".join(
+                f"{i}. {deal.get('title_en') or deal.get('title')} - €{deal['price']}"
+                for i, deal in enumerate(result.get('published_deals', []), 1)
+            )
+            self.send_status_update(
+                f"🤖 DealBot - {datetime.now().strftime('%H:%M')} CET\n\n"
+                f"👀 New file: {file_path.name}\n"
+                f"📤 Queued: {result['deals_published']} of {result['deals_found']}\n\n"
+                f"{titles}"
+            )
+        return result
+
+    def stage_summary(self, stage_rejections: dict[str, int]) -> str:
+        """
+        Describe deals rejected per stage and the external calls that saved.
+
+        Args:
+            stage_rejections: Rejected deal count per stage
+
+        Returns:
+            One-line summary for status messages
+        """
+        enabled = {"paapi"}
+        for service, client in (
+            ("scrapula", self.controller.scrapula),
+            ("shortlinks", self.controller.shortlinks),
+            ("ratings", self.controller.ratings),
+            ("deepseek", self.controller.ai_validator),
+        ):
+            if client:
+                enabled.add(service)
+
+        parts = []
+        total = 0
+        for stage, skipped in self.STAGE_SKIPPED_CALLS.items():
+            rejected = stage_rejections.get(stage, 0)
+            avoided = rejected * sum(1 for service in skipped if service in enabled)
+            total += avoided
+            parts.append(f"{stage} -{rejected} ({avoided} calls)")
+        return f"{total} calls avoided: " + ", ".join(parts)
+
     def send_status_update(self, message: str):
         """Send status update to personal WhatsApp number."""
         try:
@@ -300,7 +498,8 @@ class DealBotDaemon:
                     recipients,
                     message,
                     deal_id="status_update",
-                    image_url=None
+                    image_url=None,
+                    idempotent=False,
                 )
         except Exception as e:
             logger.error(f"Failed to send status update: {e}")
@@ -317,44 +516,31 @@ class DealBotDaemon:
             True if duplicate (same ASIN published recently at similar price), False otherwise
         """
         try:
-            from datetime import datetime, timedelta
-
-            cursor = self.controller.db.conn.cursor()
-
-            # Check for deals published in the last 7 days
-            cutoff_date = (datetime.now() - timedelta(days=7)).isoformat()
-
-            cursor.execute(
-                """SELECT deal_id, adjusted_price, created_at
-                   FROM deals
-                   WHERE asin = ? AND status = 'published' AND created_at > ?
-                   ORDER BY created_at DESC
-                   LIMIT 1""",
-                (asin, cutoff_date)
-            )
-            result = cursor.fetchone()
-
-            if result is None:
-                return False
-
-            # If we have the current price, check if it's significantly different
-            if current_price and result[1]:  # result[1] is adjusted_price
-                previous_price = float(result[1])
-                price_diff_pct = abs(current_price - previous_price) / previous_price * 100
-
-                # If price changed by more than 10%, consider it a new deal
-                if price_diff_pct > 10:
-                    logger.info(f"Same ASIN {asin} but price changed significantly: €{previous_price} -> €{current_price} ({price_diff_pct:.1f}%)")
-                    return False
-
-            # Same ASIN, recently published, similar price = duplicate
-            logger.info(f"Duplicate detected: {asin} (last published: {result[2]})")
-            return True
-
+            return self.controller.dedup.is_duplicate(asin, current_price)
         except Exception as e:
             logger.error(f"Error checking duplicate for {asin}: {e}")
             return False
 
+    def purge_expired_caches(self) -> None:
+        """Delete expired cache rows, so the database (replicated to GCS each run) stays bounded."""
+        try:
+            removed = self.controller.cache.purge_expired()
+            if removed:
+                logger.info(f"🧹 Purged {removed} expired product cache entries")
+            removed = self.controller.ai_cache.purge_expired()
+            if removed:
+                logger.info(f"🧹 Purged {removed} expired AI verdicts/reviews")
+        except sqlite3.Error as e:
+            logger.warning(f"Could not purge expired cache entries: {e}")
+
+    def run_maintenance(self) -> None:
+        """Purge expired cache rows and reload the dedup index (start of each run, hourly in watch mode)."""
+        self.purge_expired_caches()
+
+        # One query for every recent publication; duplicate checks are then in-memory
+        self.controller.dedup.load()
+        self.last_maintenance = datetime.now()
+
     def run_once(self, source_dir: Optional[Path] = None) -> dict:
         """
         Run a single processing cycle.
@@ -372,12 +558,15 @@ class DealBotDaemon:
         logger.info(f"Starting deal processing cycle at {datetime.now()}")
         logger.info("="*60)
 
-        # Reset error list for this run
+        # Reset error list and cache counters for this run
         self.stats['errors'] = []
+        self.controller.cache.reset_stats()
+        self.controller.ai_cache.reset_stats()
+        self.controller.enrichment.reset_stats()
+        self.run_maintenance()
 
         # Find deal files (look for files from last 24 hours)
-        from datetime import timedelta
-        cutoff_time = datetime.now() - timedelta(hours=24)
+        cutoff_time = datetime.now() - timedelta(hours=self.MAX_FILE_AGE_HOURS)
 
         deal_files = self.find_latest_deal_files(source_dir, since=cutoff_time)
 
@@ -396,6 +585,7 @@ class DealBotDaemon:
         total_published = 0
         total_filtered = 0
         total_duplicates = 0
+        stage_rejections = {stage: 0 for stage in self.STAGE_SKIPPED_CALLS}
         all_published_deals = []
 
         for file_path in deal_files[:5]:  # Limit to 5 most recent files per run
@@ -404,6 +594,8 @@ class DealBotDaemon:
             total_published += result['deals_published']
             total_filtered += result['deals_filtered']
             total_duplicates += result.get('duplicates_skipped', 0)
+            for stage, count in result.get('stage_rejections', {}).items():
+                stage_rejections[stage] += count
             all_published_deals.extend(result.get('published_deals', []))
 
         # Update stats
@@ -422,6 +614,11 @@ class DealBotDaemon:
             f"📤 Published: {total_published}\n"
             f"🔁 Duplicates: {total_duplicates}\n"
             f"⏭️  Filtered: {total_filtered - total_duplicates}\n"
+            f"🗄️ Cache: {self.controller.cache.summary()}\n"
+            f"🤖 AI: {self.controller.ai_cache.summary()}\n"
+            f"🧩 Enrichment: {self.controller.enrichment.summary()}\n"
+            f"📬 Outbox: {self.controller.outbox.summary()}\n"
+            f"🪜 Stages: {self.stage_summary(stage_rejections)}\n"
         )
 
         # Add all published deal names
@@ -441,10 +638,32 @@ class DealBotDaemon:
 
         logger.info("="*60)
         logger.info(f"Processing cycle complete: {total_published} deals published")
+        logger.info(f"Stage savings: {self.stage_summary(stage_rejections)}")
         logger.info("="*60)
 
         return self.stats
 
+    def start_publisher(self) -> None:
+        """Send queued deals from a background thread (long-running modes)."""
+        self.controller.publish_worker.start()
+
+    def drain_outbox(self) -> int:
+        """
+        Send every due outbox message now, on this thread.
+
+        For runs that exit (or upload the database) right after run_once();
+        messages waiting out a retry backoff stay queued for the next run.
+
+        Returns:
+            Number of messages processed
+        """
+        worker = self.controller.publish_worker
+        # Messages a crashed run left half-sent go out again (Whapi skips JIDs already sent to)
+        self.controller.outbox.recover()
+        processed = worker.drain()
+        logger.info(f"📬 Outbox drained: {processed} message(s), {self.controller.outbox.summary()}")
+        return processed
+
     def send_daily_summary(self):
         """
         Query today's top 3 published deals and send a single summary post
@@ -470,6 +689,7 @@ class DealBotDaemon:
             message,
             deal_id="daily_summary",
             image_url=None,
+            idempotent=False,
         )
         logger.info("Daily summary sent successfully")
 
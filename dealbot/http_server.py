@@ -1,18 +1,43 @@
-"""Simple HTTP server for Cloud Run integration."""
+"""HTTP server for Cloud Run integration.
 
+Endpoints:
+    POST /runs            Start a processing run; returns its job id right away (202, see below)
+    GET  /runs            Recent runs
+    GET  /runs/{id}       Run status, current stage and stats
+    GET  /                Run and wait for the result (Cloud Scheduler)
+    GET  /daily-summary   Send the daily top-3 summary and wait for it
+    GET  /health          Liveness, answered even while a run is in progress
+    GET  /metrics         Prometheus metrics (stage latencies, external calls, caches, queues)
+
+Requests are served on their own threads. Only one run executes at a time:
+a trigger for the run in progress (e.g. a Cloud Scheduler retry) joins it,
+any other kind of run is rejected with 409.
+
+Cloud Run only allocates CPU while a request is open (unless the service is
+deployed with --no-cpu-throttling), so on Cloud Run (K_SERVICE set) POST /runs
+holds the request until the run ends, like GET /. Set CPU_ALWAYS_ALLOCATED=true
+on services with always-on CPU to get the immediate 202 back.
+"""
+
+import json
 import os
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from threading import Thread
+from typing import Any, Optional
 
 from .daemon import DealBotDaemon
+from .jobs import RunConflict, RunJob, RunJobs
 from .services.gdrive import GoogleDriveService
 from .services.gcs_storage import GCSStorage
 from .utils.config import Config
 from .utils.logging import get_logger
+from .utils.metrics import REGISTRY
 
 logger = get_logger(__name__)
 
+OUTBOX_MESSAGES = REGISTRY.gauge("dealbot_outbox_messages", "Publish outbox messages by status", ("status",))
+RUNS_IN_PROGRESS = REGISTRY.gauge("dealbot_runs_in_progress", "Runs currently executing")
+
 
 class DealBotHTTPHandler(BaseHTTPRequestHandler):
     """HTTP request handler for Cloud Run triggers."""
@@ -21,6 +46,155 @@ class DealBotHTTPHandler(BaseHTTPRequestHandler):
     gdrive_service: GoogleDriveService = None
     folder_id: str = None
     gcs_storage: GCSStorage = None  # For database persistence
+    jobs: RunJobs = None
+
+    # Longest a synchronous trigger (GET /, /daily-summary) waits for its run
+    WAIT_TIMEOUT_SECONDS = 3600
+
+    # Keep POST /runs open until the run ends (request-based CPU on Cloud Run)
+    hold_async_runs: bool = False
+
+    @classmethod
+    def _db_path(cls) -> Path:
+        return Path(cls.daemon.controller.db.db_path)
+
+    @classmethod
+    def _download_database(cls) -> None:
+        """Download database from GCS (for duplicate detection).
+
+        A failed download (DatabaseDownloadError) propagates and aborts the run:
+        a stale or empty database would republish deals and then be uploaded.
+        """
+        if not cls.gcs_storage:
+            return
+        db_path = cls._db_path()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"📥 Downloading database from GCS...")
+        if cls.gcs_storage.download_database(db_path, "dealbot.db"):
+            logger.info("✅ Database downloaded from GCS")
+        else:
+            logger.info("ℹ️  No existing database in GCS (first run)")
+
+    @classmethod
+    def _upload_database(cls) -> None:
+        """Upload database to GCS (to persist for next run).
+
+        A DatabaseConflict (another run pushed first) propagates and fails the run.
+        """
+        if not cls.gcs_storage:
+            return
+        logger.info("📤 Uploading database to GCS...")
+        db_path = cls._db_path()
+        if db_path.exists():
+            success = cls.gcs_storage.upload_database(db_path, "dealbot.db")
+            if success:
+                logger.info("✅ Database uploaded to GCS successfully")
+            else:
+                logger.error("❌ Failed to upload database to GCS")
+        else:
+            logger.warning(f"⚠️  Database file not found at {db_path}, skipping upload")
+
+    @classmethod
+    def process_deals(cls, job: RunJob) -> dict[str, Any]:
+        """Full cycle: download DB, sync files, process, send, upload DB."""
+        job.stage = "downloading database"
+        cls._download_database()
+
+        # Sync deal files from Google Drive if configured
+        if cls.gdrive_service and cls.folder_id:
+            job.stage = "syncing files"
+            logger.info("🔄 Syncing deal files from Google Drive...")
+            local_sync_dir = Path("/app/gdrive_sync")
+
+            cls.gdrive_service.sync_folder_to_local(
+                cls.folder_id,
+                local_sync_dir,
+                file_extension=".txt"
+            )
+            source_dir = local_sync_dir
+            logger.info(f"✅ Deal files synced to {local_sync_dir}")
+        else:
+            logger.warning("⚠️ Google Drive not configured, using local directory")
+            # Use configured source directory
+            config = Config()
+            source_dir = Path(config.get("default_source_dir", "."))
+
+        # Run processing, then send what it queued before the database is uploaded
+        job.stage = "processing"
+        stats = cls.daemon.run_once(source_dir)
+        job.stage = "sending"
+        sent = cls.daemon.drain_outbox()
+
+        job.stage = "uploading database"
+        cls._upload_database()
+
+        return {
+            "files_processed": stats.get("files_processed"),
+            "deals_found": stats.get("deals_found"),
+            "deals_published": stats.get("deals_published"),
+            "deals_filtered": stats.get("deals_filtered"),
+            "messages_sent": sent,
+            "errors": list(stats.get("errors", [])),
+        }
+
+    @classmethod
+    def daily_summary(cls, job: RunJob) -> dict[str, Any]:
+        """Send top-3 hottest deals of the day to the summary group."""
+        # Download latest DB so we have today's published deals
+        job.stage = "downloading database"
+        if cls.gcs_storage:
+            try:
+                db_path = cls._db_path()
+                db_path.parent.mkdir(parents=True, exist_ok=True)
+                cls.gcs_storage.download_database(db_path, "dealbot.db")
+            except Exception as e:
+                logger.warning(f"Could not download DB for summary: {e}")
+
+        job.stage = "sending"
+        cls.daemon.send_daily_summary()
+        return {}
+
+    @classmethod
+    def collect_metrics(cls) -> None:
+        """Refresh queue gauges right before a scrape."""
+        if cls.jobs:
+            RUNS_IN_PROGRESS.set(1 if cls.jobs.active else 0)
+        if cls.daemon:
+            for status, count in cls.daemon.controller.outbox.counts().items():
+                OUTBOX_MESSAGES.set(count, status=status)
+
+    def _send(self, status: int, body: str | bytes, content_type: str = "text/plain") -> None:
+        data = body.encode() if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        self._send(status, json.dumps(payload, default=str), "application/json")
+
+    def _submit(self, kind: str) -> Optional[tuple[RunJob, bool]]:
+        """Start (or join) a run; answers 409 itself and returns None on conflict."""
+        func = self.process_deals if kind == "process" else self.daily_summary
+        try:
+            return self.jobs.submit(kind, func)
+        except RunConflict as e:
+            self._send_json(409, {"error": str(e), "job": e.job.to_dict()})
+            return None
+
+    def _run_and_wait(self, kind: str, success_message: bytes) -> None:
+        """Synchronous trigger: the request stays open until the run ends (Cloud Run keeps CPU allocated)."""
+        submitted = self._submit(kind)
+        if submitted is None:
+            return
+        job, _ = submitted
+        if not job.done.wait(self.WAIT_TIMEOUT_SECONDS):
+            self._send(504, f'Run {job.id} still in progress')
+        elif job.status == "succeeded":
+            self._send(200, success_message)
+        else:
+            self._send(500, f'Error: {job.error}')
 
     def do_HEAD(self):
         """Handle HEAD requests (for Cloud Run health checks)."""
@@ -29,113 +203,51 @@ class DealBotHTTPHandler(BaseHTTPRequestHandler):
         self.send_header('Content-type', 'text/plain')
         self.end_headers()
 
+    def do_POST(self):
+        """Handle POST /runs (asynchronous trigger)."""
+        if self.path.split('?')[0].rstrip('/') == '/runs':
+            submitted = self._submit("process")
+            if submitted is None:
+                return
+            job, created = submitted
+            if self.hold_async_runs and job.done.wait(self.WAIT_TIMEOUT_SECONDS):
+                self._send_json(200, {**job.to_dict(), "coalesced": not created})
+                return
+            self._send_json(202 if created else 200, {**job.to_dict(), "coalesced": not created})
+        else:
+            self._send(404, b'Not found')
+
     def do_GET(self):
         """Handle GET requests from Cloud Scheduler."""
-        if self.path.startswith('/?') or self.path == '/':
-            # Trigger deal processing
-            logger.info("Received HTTP trigger for deal processing")
+        path = self.path.split('?')[0]
 
-            try:
-                # Download database from GCS (for duplicate detection)
-                db_path = Path.home() / "Library" / "Application Support" / "DealBot" / "dealbot.db"
-                if self.gcs_storage:
-                    try:
-                        db_path.parent.mkdir(parents=True, exist_ok=True)
-                        logger.info(f"📥 Downloading database from GCS...")
-                        success = self.gcs_storage.download_file("dealbot.db", db_path)
-                        if success:
-                            logger.info("✅ Database downloaded from GCS")
-                        else:
-                            logger.info("ℹ️  No existing database in GCS (first run)")
-                    except Exception as e:
-                        logger.error(f"❌ Failed to download database from GCS: {e}", exc_info=True)
-                        # Continue anyway - database will be created fresh
-
-                # Sync deal files from Google Drive if configured
-                if self.gdrive_service and self.folder_id:
-                    logger.info("🔄 Syncing deal files from Google Drive...")
-                    local_sync_dir = Path("/app/gdrive_sync")
-
-                    self.gdrive_service.sync_folder_to_local(
-                        self.folder_id,
-                        local_sync_dir,
-                        file_extension=".txt"
-                    )
-                    source_dir = local_sync_dir
-                    logger.info(f"✅ Deal files synced to {local_sync_dir}")
-                else:
-                    logger.warning("⚠️ Google Drive not configured, using local directory")
-                    # Use configured source directory
-                    config = Config()
-                    source_dir = Path(config.get("default_source_dir", "."))
-
-                # Run processing
-                self.daemon.run_once(source_dir)
-
-                # Upload database to GCS (to persist for next run)
-                if self.gcs_storage:
-                    logger.info("📤 Uploading database to GCS...")
-                    db_path = Path.home() / "Library" / "Application Support" / "DealBot" / "dealbot.db"
-                    if db_path.exists():
-                        success = self.gcs_storage.upload_file(db_path, "dealbot.db")
-                        if success:
-                            logger.info("✅ Database uploaded to GCS successfully")
-                        else:
-                            logger.error("❌ Failed to upload database to GCS")
-                    else:
-                        logger.warning(f"⚠️  Database file not found at {db_path}, skipping upload")
-
-                # Send success response
-                self.send_response(200)
-                self.send_header('Content-type', 'text/plain')
-                self.end_headers()
-                self.wfile.write(b'Deal processing completed successfully')
+        if path == '/':
+            logger.info("Received HTTP trigger for deal processing")
+            self._run_and_wait("process", b'Deal processing completed successfully')
 
-            except Exception as e:
-                logger.error(f"Error processing deals: {e}", exc_info=True)
-                self.send_response(500)
-                self.send_header('Content-type', 'text/plain')
-                self.end_headers()
-                self.wfile.write(f'Error: {str(e)}'.encode())
-
-        elif self.path == '/daily-summary':
-            # Send top-3 hottest deals of the day to the summary group
+        elif path == '/daily-summary':
             logger.info("Received HTTP trigger for daily summary")
-            try:
-                db_path = Path.home() / "Library" / "Application Support" / "DealBot" / "dealbot.db"
+            self._run_and_wait("daily-summary", b'Daily summary sent')
 
-                # Download latest DB so we have today's published deals
-                if self.gcs_storage:
-                    try:
-                        db_path.parent.mkdir(parents=True, exist_ok=True)
-                        self.gcs_storage.download_file("dealbot.db", db_path)
-                    except Exception as e:
-                        logger.warning(f"Could not download DB for summary: {e}")
+        elif path.rstrip('/') == '/runs':
+            self._send_json(200, [job.to_dict() for job in self.jobs.recent()])
 
-                self.daemon.send_daily_summary()
+        elif path.startswith('/runs/'):
+            job = self.jobs.get(path[len('/runs/'):])
+            if job:
+                self._send_json(200, job.to_dict())
+            else:
+                self._send_json(404, {"error": "Unknown run"})
 
-                self.send_response(200)
-                self.send_header('Content-type', 'text/plain')
-                self.end_headers()
-                self.wfile.write(b'Daily summary sent')
-
-            except Exception as e:
-                logger.error(f"Error sending daily summary: {e}", exc_info=True)
-                self.send_response(500)
-                self.send_header('Content-type', 'text/plain')
-                self.end_headers()
-                self.wfile.write(f'Error: {str(e)}'.encode())
+        elif path == '/metrics':
+            self._send(200, REGISTRY.render(), "text/plain; version=0.0.4; charset=utf-8")
 
-        elif self.path == '/health':
+        elif path == '/health':
             # Health check endpoint
-            self.send_response(200)
-            self.send_header('Content-type', 'text/plain')
-            self.end_headers()
-            self.wfile.write(b'OK')
+            self._send(200, b'OK')
 
         else:
-            self.send_response(404)
-            self.end_headers()
+            self._send(404, b'Not found')
 
     def log_message(self, format, *args):
         """Override to use our logger."""
@@ -158,8 +270,17 @@ def run_http_server(daemon: DealBotDaemon, gdrive_service=None, folder_id=None,
     DealBotHTTPHandler.gdrive_service = gdrive_service
     DealBotHTTPHandler.folder_id = folder_id
     DealBotHTTPHandler.gcs_storage = gcs_storage
+    DealBotHTTPHandler.jobs = RunJobs()
+    DealBotHTTPHandler.hold_async_runs = bool(os.getenv("K_SERVICE")) and (
+        os.getenv("CPU_ALWAYS_ALLOCATED", "").lower() not in ("1", "true", "yes")
+    )
+    if DealBotHTTPHandler.hold_async_runs:
+        logger.info("Cloud Run with request-based CPU: POST /runs waits for the run to finish")
+    REGISTRY.add_collector(DealBotHTTPHandler.collect_metrics)
 
-    server = HTTPServer(('0.0.0.0', port), DealBotHTTPHandler)
+    # One thread per request, so /health and /runs/{id} answer during a run
+    server = ThreadingHTTPServer(('0.0.0.0', port), DealBotHTTPHandler)
+    server.daemon_threads = True
     logger.info(f"HTTP server listening on port {port}")
     logger.info("Ready to receive triggers from Cloud Scheduler")
 
@@ -0,0 +1,148 @@
+"""Background run jobs for the HTTP server (one run at a time)."""
+
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from .utils.logging import get_logger
+from .utils.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+RUNS = REGISTRY.counter("dealbot_runs_total", "Finished runs by kind and status", ("kind", "status"))
+RUN_SECONDS = REGISTRY.histogram("dealbot_run_duration_seconds", "Duration of whole runs", ("kind",))
+
+
+@dataclass
+class RunJob:
+    """A triggered run and its progress."""
+
+    id: str
+    kind: str
+    status: str = "queued"  # queued | running | succeeded | failed
+    stage: Optional[str] = None  # Current step, e.g. "processing"
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    triggers: int = 1  # Requests coalesced into this job
+    result: dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready view of the job."""
+        def iso(value: Optional[datetime]) -> Optional[str]:
+            return value.isoformat(timespec="seconds") if value else None
+
+        end = self.finished_at or datetime.now()
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "created_at": iso(self.created_at),
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+            "duration_seconds": round((end - self.started_at).total_seconds(), 1) if self.started_at else None,
+            "triggers": self.triggers,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class RunConflict(Exception):
+    """Raised when a different kind of run is already in progress."""
+
+    def __init__(self, job: RunJob) -> None:
+        super().__init__(f"{job.kind} run {job.id} is in progress")
+        self.job = job
+
+
+class RunJobs:
+    """Runs jobs on background threads, one at a time.
+
+    A trigger for the kind of job already in progress (e.g. a Cloud
+    Scheduler retry arriving mid-run) joins that job instead of starting an
+    overlapping one; any other kind is rejected with RunConflict.
+    """
+
+    MAX_HISTORY = 50
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jobs: dict[str, RunJob] = {}
+        self._active: Optional[RunJob] = None
+
+    def submit(self, kind: str, func: Callable[[RunJob], Optional[dict[str, Any]]]) -> tuple[RunJob, bool]:
+        """
+        Start a job unless one is already running.
+
+        Args:
+            kind: Job kind ("process", "daily-summary")
+            func: Does the work; may update job.stage, returns the job result
+
+        Returns:
+            (job, created): created is False if the trigger joined the running job
+
+        Raises:
+            RunConflict: If a job of another kind is running
+        """
+        with self._lock:
+            active = self._active
+            if active and active.active:
+                if active.kind != kind:
+                    raise RunConflict(active)
+                active.triggers += 1
+                logger.info(f"⏭️  {kind} run {active.id} already in progress - joining it")
+                return active, False
+
+            job = RunJob(id=uuid.uuid4().hex[:12], kind=kind)
+            self._jobs[job.id] = job
+            self._active = job
+            # Oldest finished jobs go first
+            while len(self._jobs) > self.MAX_HISTORY:
+                del self._jobs[next(iter(self._jobs))]
+
+        threading.Thread(target=self._run, args=(job, func), name=f"run-{job.id}", daemon=True).start()
+        return job, True
+
+    def _run(self, job: RunJob, func: Callable[[RunJob], Optional[dict[str, Any]]]) -> None:
+        job.status = "running"
+        job.started_at = datetime.now()
+        logger.info(f"▶️  {job.kind} run {job.id} started")
+        try:
+            job.result = func(job) or {}
+            job.status = "succeeded"
+        except Exception as e:
+            logger.error(f"{job.kind} run {job.id} failed: {e}", exc_info=True)
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.now()
+            job.stage = None
+            RUNS.inc(kind=job.kind, status=job.status)
+            RUN_SECONDS.observe((job.finished_at - job.started_at).total_seconds(), kind=job.kind)
+            job.done.set()
+            logger.info(f"⏹️  {job.kind} run {job.id} {job.status}")
+
+    def get(self, job_id: str) -> Optional[RunJob]:
+        """Look up a job by ID."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def recent(self) -> list[RunJob]:
+        """Known jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    @property
+    def active(self) -> Optional[RunJob]:
+        """The job in progress, if any."""
+        with self._lock:
+            return self._active if self._active and self._active.active else None
@@ -21,6 +21,7 @@ class DealStatus(str, Enum):
     PARSED = "parsed"
     VALIDATED = "validated"
     NEEDS_REVIEW = "needs_review"
+    QUEUED = "queued"  # In the publish outbox, not sent yet
     PUBLISHED = "published"
     FAILED = "failed"
 
@@ -99,6 +100,7 @@ class PublishResult(BaseModel):
     deal_id: str
     destinations: list[str]  # Channel/group JIDs
     message_ids: dict[str, str]  # destination -> message_id
+    latencies_ms: dict[str, float] = Field(default_factory=dict)  # destination -> send time incl. retries
     sent_at: datetime = Field(default_factory=datetime.now)
     success: bool
     error: Optional[str] = None
@@ -121,3 +123,13 @@ class ProcessedDeal(BaseModel):
     ai_review_es: Optional[str] = None  # AI-generated Spanish product review
     ai_review_en: Optional[str] = None  # AI-generated English product review
     ai_approved: bool = True  # AI validation approval (default True for backward compatibility)
+    ai_latency_ms: Optional[float] = None  # Latency of the DeepSeek request that validated this deal
+    ai_tokens: Optional[int] = None  # This deal's share of that request's tokens
+    ai_validated: bool = False  # AI (or fallback) validation has run
+    validated_at: datetime = Field(default_factory=datetime.now)  # When prices were last checked
+    provenance: dict[str, str] = Field(default_factory=dict)  # Field -> source that supplied it
+    enrichment_tried: list[str] = Field(default_factory=list)  # Enrichment sources already called
+
+    def is_price_stale(self, max_age_minutes: float) -> bool:
+        """Check if prices were validated longer ago than max_age_minutes."""
+        return (datetime.now() - self.validated_at).total_seconds() > max_age_minutes * 60
@@ -1,6 +1,8 @@
 """TXT file parser for Amazon deals."""
 
+import io
 import re
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 from typing import Optional
 
@@ -9,17 +11,41 @@ from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Patterns are compiled once at import; the parser runs them per line/block.
+ASIN_PATTERN = re.compile(r"/dp/([A-Z0-9]{10})")
+# Handles "Precio/Price: €X.XX" format (fallback search over the whole block)
+PRICE_PATTERN = re.compile(r"(?:Precio/Price:|Price:|Precio:)?\s*[€£$]?\s*(\d+[.,]\d{1,2})\s*[€£$]?", re.IGNORECASE)
+URL_PATTERN = re.compile(r"https?://[^\s]+")
+# Support emoji flags (🇪🇸, 🇬🇧) and text flags (ES, EN)
+LANGUAGE_FLAG_PATTERN = re.compile(r"(?:🇪🇸|🇬🇧|\b(?:ES|EN|UK|GB)\b)")
+
+# Separator lines (━━━━━) or deal headers (🎯 #1, #2, etc)
+SEPARATOR_PATTERN = re.compile(r"^[━─]+\s*$|^🎯\s*#\d+")
+# Chollometro degree/temperature score (e.g. "#1 - 906°")
+DEGREE_PATTERN = re.compile(r"#\d+\s*-\s*(\d+)°")
+# "€0.01", "11.99€" or "€105" (with or without decimals) on the price line
+LINE_PRICE_PATTERN = re.compile(r"[€£$]\s*(\d+(?:[.,]\d{1,2})?)|(\d+(?:[.,]\d{1,2})?)\s*[€£$]")
+# PVP (original price) in "€18.59 (PVP:€28.49)"
+PVP_PATTERN = re.compile(r"\(PVP:\s*[€£$]?\s*(\d+[.,]\d{1,2})\s*[€£$]?\)", re.IGNORECASE)
+# Percentage in "💸 Descuento/Discount: -€9.90 (-35%)"
+DISCOUNT_PATTERN = re.compile(r"\(?-(\d+)%\)?")
+
+# Title clean-up
+PRICE_TEXT_PATTERN = re.compile(r"Precio/Price:.*", re.IGNORECASE)
+DISCOUNT_TEXT_PATTERN = re.compile(r"Descuento/Discount:.*", re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+EMOJI_PATTERN = re.compile(r"[🔥📅💰💸🛒🎯━─]+")
+DEAL_NUMBER_PATTERN = re.compile(r"#\d+\s*-\s*\d+°?")
+
 
 class TxtParser:
     """Parse deal records from TXT files."""
 
-    # Regex patterns
-    ASIN_PATTERN = re.compile(r"/dp/([A-Z0-9]{10})")
-    # Updated to handle "Precio/Price: €X.XX" format
-    PRICE_PATTERN = re.compile(r"(?:Precio/Price:|Price:|Precio:)?\s*[€£$]?\s*(\d+[.,]\d{1,2})\s*[€£$]?", re.IGNORECASE)
-    URL_PATTERN = re.compile(r"https?://[^\s]+")
-    # Support emoji flags (🇪🇸, 🇬🇧) and text flags (ES, EN)
-    LANGUAGE_FLAG_PATTERN = re.compile(r"(?:🇪🇸|🇬🇧|\b(?:ES|EN|UK|GB)\b)")
+    # Kept as class attributes for callers that reference them
+    ASIN_PATTERN = ASIN_PATTERN
+    PRICE_PATTERN = PRICE_PATTERN
+    URL_PATTERN = URL_PATTERN
+    LANGUAGE_FLAG_PATTERN = LANGUAGE_FLAG_PATTERN
 
     def __init__(self) -> None:
         """Initialize parser."""
@@ -32,96 +58,130 @@ class TxtParser:
             raise FileNotFoundError(f"File not found: {file_path}")
 
         with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+            deals = list(self.iter_deals(f))
 
-        return self.parse_content(content)
+        logger.info(f"Parsed {len(deals)} deals from content")
+        return deals
 
     def parse_content(self, content: str) -> list[Deal]:
         """Parse deals from text content."""
-        deals: list[Deal] = []
+        deals = list(self.iter_deals(io.StringIO(content)))
+        logger.info(f"Parsed {len(deals)} deals from content")
+        return deals
+
+    def iter_deals(self, lines: Iterable[str]) -> Iterator[Deal]:
+        """
+        Stream deals from lines (e.g. an open file handle).
+
+        Each deal is yielded as soon as its block ends, so only one block is
+        held in memory.
+
+        Args:
+            lines: Text lines, with or without trailing newlines
 
-        # Split by separator lines (━━━━━) or deal headers (#1, #2, etc)
-        separator_pattern = re.compile(r'^[━─]+\s*$|^🎯\s*#\d+')
-        
-        lines = content.strip().split("\n")
+        Yields:
+            Parsed deals in file order
+        """
         current_block: list[str] = []
-        blocks: list[str] = []
+        started = False
+        # Whether the last non-blank line was added to the current block.
+        # The whole-content strip() of the original parser trims that line's
+        # trailing whitespace, and the first non-blank line's leading whitespace.
+        last_in_block = False
 
         for line in lines:
+            if line.endswith("\n"):
+                line = line[:-1]
             stripped = line.strip()
-            
+            if not stripped:
+                continue
+
+            if not started:
+                started = True
+                line = line.lstrip()
+
             # Skip header lines (CHOLLOS AMAZON, date, etc)
-            if '🔥' in stripped or '📅' in stripped:
+            if "🔥" in stripped or "📅" in stripped:
+                last_in_block = False
                 continue
-            
-            # Check if this is a separator or new deal header
-            if separator_pattern.search(stripped):
-                # Save the current block if it has content
+
+            # Separator or new deal header ends the current block
+            if SEPARATOR_PATTERN.search(stripped):
+                last_in_block = False
                 if current_block:
-                    blocks.append("\n".join(current_block))
+                    deal = self._parse_lines(current_block)
                     current_block = []
+                    if deal:
+                        yield deal
                 continue
-            
-            # Add line to current block
-            if stripped:
-                current_block.append(line)
+
+            current_block.append(line)
+            last_in_block = True
 
         # Don't forget the last block
         if current_block:
-            blocks.append("\n".join(current_block))
-
-        # Parse each block
-        for block in blocks:
-            deal = self._parse_block(block)
+            if last_in_block:
+                current_block[-1] = current_block[-1].rstrip()
+            deal = self._parse_lines(current_block)
             if deal:
-                deals.append(deal)
-
-        logger.info(f"Parsed {len(deals)} deals from content")
-        return deals
+                yield deal
 
     def _parse_block(self, block: str) -> Optional[Deal]:
         """Parse a single deal block."""
-        # Extract URL
-        url_match = self.URL_PATTERN.search(block)
-        if not url_match:
+        return self._parse_lines(block.split("\n"))
+
+    def _parse_lines(self, lines: list[str]) -> Optional[Deal]:
+        """Parse a deal from the lines of one block in a single pass."""
+        url: Optional[str] = None
+        price_line: Optional[str] = None
+        discount_line: Optional[str] = None
+        title_es = ""
+        title_en = ""
+
+        for line in lines:
+            if url is None:
+                url_match = URL_PATTERN.search(line)
+                if url_match:
+                    url = url_match.group(0)
+
+            if price_line is None and ("Precio" in line or "Price:" in line or "💰" in line):
+                price_line = line
+            if discount_line is None and ("Descuento" in line or "Discount:" in line or "💸" in line):
+                discount_line = line
+
+            # Bilingual titles: flag-prefixed lines (the last one of each wins)
+            if "🇪🇸" in line or line.strip().startswith("ES"):
+                title_es = line.replace("🇪🇸", "").replace("ES", "").strip()
+            elif "🇬🇧" in line or "UK" in line.upper():
+                title_en = line.replace("🇬🇧", "").replace("UK", "").strip()
+
+        block = "\n".join(lines)
+
+        if url is None:
             logger.warning(f"No URL found in block: {block[:50]}...")
             return None
 
-        url = url_match.group(0)
-
-        # Extract ASIN
-        asin_match = self.ASIN_PATTERN.search(url)
+        asin_match = ASIN_PATTERN.search(url)
         asin = asin_match.group(1) if asin_match else None
 
-        # Extract Chollometro degree/temperature score (e.g. "🎯 #1 - 906°")
-        degree_match = re.search(r'#\d+\s*-\s*(\d+)°', block)
+        degree_match = DEGREE_PATTERN.search(block)
         degree = int(degree_match.group(1)) if degree_match else None
 
-        # Extract price - look specifically for Precio/Price line first
         stated_price: Optional[float] = None
         source_pvp: Optional[float] = None
         source_discount_pct: Optional[float] = None
-        
-        price_lines = [line for line in block.split('\n') if 'Precio' in line or 'Price:' in line or '💰' in line]
-        
-        if price_lines:
-            # Search for price in the price-specific line
-            price_line = price_lines[0]
-            # Look for pattern like "€0.01", "11.99", or "€105" (with or without decimals)
-            price_pattern = re.compile(r'[€£$]\s*(\d+(?:[.,]\d{1,2})?)|(\d+(?:[.,]\d{1,2})?)\s*[€£$]')
-            price_match = price_pattern.search(price_line)
+
+        if price_line is not None:
+            price_match = LINE_PRICE_PATTERN.search(price_line)
             if price_match:
                 # Get whichever group matched
-                price_str = price_match.group(1) or price_match.group(2)
-                price_str = price_str.replace(",", ".")
+                price_str = (price_match.group(1) or price_match.group(2)).replace(",", ".")
                 try:
                     stated_price = float(price_str)
                 except ValueError:
                     logger.warning(f"Failed to parse price: {price_str}")
-            
-            # Extract PVP (original price) from format like "€18.59 (PVP:€28.49)"
-            pvp_pattern = re.compile(r'\(PVP:\s*[€£$]?\s*(\d+[.,]\d{1,2})\s*[€£$]?\)', re.IGNORECASE)
-            pvp_match = pvp_pattern.search(price_line)
+
+            pvp_match = PVP_PATTERN.search(price_line)
             if pvp_match:
                 pvp_str = pvp_match.group(1).replace(",", ".")
                 try:
@@ -129,24 +189,19 @@ class TxtParser:
                     logger.info(f"Extracted source PVP: €{source_pvp}")
                 except ValueError:
                     logger.warning(f"Failed to parse PVP: {pvp_str}")
-        
-        # Extract discount from lines like "💸 Descuento/Discount: -€9.90 (-35%)"
-        discount_lines = [line for line in block.split('\n') if 'Descuento' in line or 'Discount:' in line or '💸' in line]
-        if discount_lines:
-            discount_line = discount_lines[0]
-            # Look for percentage like "(-35%)" or "-35%"
-            discount_pattern = re.compile(r'\(?-(\d+)%\)?')
-            discount_match = discount_pattern.search(discount_line)
+
+        if discount_line is not None:
+            discount_match = DISCOUNT_PATTERN.search(discount_line)
             if discount_match:
                 try:
                     source_discount_pct = float(discount_match.group(1))
                     logger.info(f"Extracted source discount: -{source_discount_pct}%")
                 except ValueError:
                     logger.warning(f"Failed to parse discount: {discount_match.group(1)}")
-        
+
         # Fallback to searching entire block if no price line found
         if stated_price is None:
-            price_match = self.PRICE_PATTERN.search(block)
+            price_match = PRICE_PATTERN.search(block)
             if price_match:
                 price_str = price_match.group(1).replace(",", ".")
                 try:
@@ -163,47 +218,29 @@ class TxtParser:
 
         # Determine currency from symbols or context
         currency = Currency.EUR  # Default
-        if "£" in block or "GBP" in block.upper():
+        upper_block = block.upper()
+        if "£" in block or "GBP" in upper_block:
             currency = Currency.GBP
-        elif "$" in block or "USD" in block.upper():
+        elif "$" in block or "USD" in upper_block:
             currency = Currency.USD
 
-        # Extract language flag
-        lang_match = self.LANGUAGE_FLAG_PATTERN.search(block)
+        lang_match = LANGUAGE_FLAG_PATTERN.search(block)
         language_flag = lang_match.group(0) if lang_match else None
 
-        # Extract BOTH Spanish and English titles from bilingual format
-        lines = block.split('\n')
-        title_es = ""
-        title_en = ""
-        
-        # Look for flag-prefixed titles
-        for line in lines:
-            if '🇪🇸' in line or line.strip().startswith('ES'):
-                # Extract Spanish title
-                title_es = line.replace('🇪🇸', '').replace('ES', '').strip()
-            elif '🇬🇧' in line or 'UK' in line.upper():
-                # Extract English title
-                title_en = line.replace('🇬🇧', '').replace('UK', '').strip()
-        
         # Primary title is English if available, otherwise Spanish
         title = title_en if title_en else title_es
-        
+
         # If no flag-based title found, extract from cleaned block
         if not title:
-            title = block.strip()
-            title = self.URL_PATTERN.sub("", title)
-            title = re.sub(r"Precio/Price:.*", "", title, flags=re.IGNORECASE)
-            title = re.sub(r"Descuento/Discount:.*", "", title, flags=re.IGNORECASE)
-            title = re.sub(r"[\n\r]+", " ", title)
-            title = re.sub(r"\s+", " ", title)
-            title = title.strip()
-        
-        # Remove emojis and clean up
-        title = re.sub(r"[🔥📅💰💸🛒🎯━─]+", "", title)
-        title = re.sub(r"#\d+\s*-\s*\d+°?", "", title)  # Remove deal numbers
-        title = title.strip()[:200]  # Limit title length
-        title = " ".join(title.split())  # Normalize whitespace
+            title = URL_PATTERN.sub("", block.strip())
+            title = PRICE_TEXT_PATTERN.sub("", title)
+            title = DISCOUNT_TEXT_PATTERN.sub("", title)
+            title = WHITESPACE_PATTERN.sub(" ", title).strip()
+
+        # Remove emojis and deal numbers, limit length, normalize whitespace
+        title = EMOJI_PATTERN.sub("", title)
+        title = DEAL_NUMBER_PATTERN.sub("", title)
+        title = " ".join(title.strip()[:200].split())
 
         if not title:
             title = f"Deal {asin or 'Unknown'}"
@@ -1,93 +1,200 @@
 """Scheduler for running deal processing at specific times."""
 
-import time
+import threading
 from datetime import datetime, timedelta
-from typing import Callable
+from typing import Callable, Optional
 
 import pytz
+from apscheduler.triggers.cron import CronTrigger
 
+from .storage.run_history import RunHistory
 from .utils.logging import get_logger
 
 logger = get_logger(__name__)
 
 
 class DealBotScheduler:
-    """Scheduler for running deal processing at 6am and 6pm Spain time."""
-
-    def __init__(self, task_func: Callable, timezone: str = "Europe/Madrid"):
+    """Scheduler for running deal processing on a cron schedule (6am and 6pm Spain time by default).
+
+    Sleeps until the next trigger instead of polling. Handled slots are
+    stored in RunHistory, so after a restart (or a run that overran the
+    next slot) the missed slots are caught up according to the policy:
+    "latest" runs once for the most recent missed slot, "all" runs every
+    missed slot, "none" only runs slots that are on time. Only one run
+    executes at a time; a slot that comes up during a run (e.g. a manual
+    one) is skipped.
+    """
+
+    DEFAULT_CRON = "0 6,18 * * *"
+    CATCH_UP_POLICIES = ("none", "latest", "all")
+
+    # A slot started this late still counts as on time
+    MISFIRE_GRACE_SECONDS = 60
+    # Re-check the clock at least this often (suspend/resume, clock changes)
+    MAX_SLEEP_SECONDS = 3600
+
+    def __init__(
+        self,
+        task_func: Callable,
+        timezone: str = "Europe/Madrid",
+        cron: str = DEFAULT_CRON,
+        history: Optional[RunHistory] = None,
+        catch_up: str = "latest",
+        catch_up_hours: float = 6.0,
+        job: str = "process_deals",
+    ):
         """
         Initialize scheduler.
 
         Args:
             task_func: Function to call at scheduled times
             timezone: Timezone for schedule (default: Spain/Madrid)
+            cron: Crontab expression (minute hour day month day-of-week)
+            history: Persisted run history (without it, nothing is caught up after a restart)
+            catch_up: Missed-slot policy: "none", "latest" or "all"
+            catch_up_hours: Missed slots older than this are never caught up
+            job: Job name in the run history
         """
+        if catch_up not in self.CATCH_UP_POLICIES:
+            raise ValueError(f"Unknown catch-up policy {catch_up!r} (expected one of {self.CATCH_UP_POLICIES})")
+
         self.task_func = task_func
         self.timezone = pytz.timezone(timezone)
-        self.schedule_times = [6, 18]  # 6am and 6pm
-        self.last_run_date: dict[int, str] = {}  # Track last run for each hour
-
-    def get_next_run_time(self) -> datetime:
-        """Calculate the next scheduled run time."""
-        now = datetime.now(self.timezone)
-        today = now.date()
-
-        # Check each scheduled time today
-        for hour in self.schedule_times:
-            scheduled_time = self.timezone.localize(
-                datetime.combine(today, datetime.min.time()).replace(hour=hour)
-            )
-
-            # Check if this time hasn't passed yet and hasn't run today
-            if scheduled_time > now:
-                run_key = f"{today}_{hour}"
-                if run_key not in self.last_run_date:
-                    return scheduled_time
-
-        # If all today's times have passed, schedule for first time tomorrow
-        tomorrow = today + timedelta(days=1)
-        next_scheduled = self.timezone.localize(
-            datetime.combine(tomorrow, datetime.min.time()).replace(hour=self.schedule_times[0])
-        )
-
-        return next_scheduled
-
-    def should_run_now(self) -> bool:
-        """Check if we should run the task now."""
-        now = datetime.now(self.timezone)
-        current_hour = now.hour
-        today = now.date()
-
-        # Check if current hour matches a schedule time
-        if current_hour in self.schedule_times:
-            run_key = f"{today}_{current_hour}"
-
-            # Check if we haven't run yet this hour today
-            if run_key not in self.last_run_date:
-                # Mark as run
-                self.last_run_date[run_key] = now.isoformat()
-                return True
-
-        return False
+        self.cron = cron
+        self.trigger = CronTrigger.from_crontab(cron, timezone=timezone)
+        self.history = history
+        self.catch_up = catch_up
+        self.catch_up_hours = catch_up_hours
+        self.job = job
+
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started_at = datetime.now(self.timezone)
+        self._last_slot: Optional[datetime] = None  # Last slot handled by this process
+
+    @property
+    def is_running(self) -> bool:
+        """Whether a run is in progress."""
+        return self._run_lock.locked()
+
+    def get_next_run_time(self, now: Optional[datetime] = None) -> datetime:
+        """Calculate the next scheduled run time (at or after now)."""
+        now = now or datetime.now(self.timezone)
+        return self.trigger.get_next_fire_time(None, now)
+
+    def due_runs(self, now: Optional[datetime] = None) -> list[datetime]:
+        """Slots after the last handled one, up to now and within the catch-up window (oldest first)."""
+        now = now or datetime.now(self.timezone)
+        last = self.history.last_scheduled(self.job) if self.history else None
+        if self._last_slot and (last is None or self._last_slot > last):
+            last = self._last_slot
+
+        floor = now - timedelta(hours=self.catch_up_hours)
+        if last is None:
+            # First run ever: catch up within the window; no history: only slots from now on
+            last = floor if self.history else self._started_at - timedelta(seconds=1)
+        start = max(last + timedelta(seconds=1), floor)
+
+        slots: list[datetime] = []
+        slot = self.trigger.get_next_fire_time(None, start)
+        while slot and slot <= now:
+            slots.append(slot)
+            slot = self.trigger.get_next_fire_time(None, slot + timedelta(seconds=1))
+        return slots
+
+    def run_pending(self, now: Optional[datetime] = None) -> int:
+        """
+        Run or skip every due slot according to the catch-up policy.
+
+        Returns:
+            Number of runs executed
+        """
+        now = now or datetime.now(self.timezone)
+        due = self.due_runs(now)
+        if not due:
+            return 0
+
+        on_time = [slot for slot in due if (now - slot).total_seconds() <= self.MISFIRE_GRACE_SECONDS]
+        if self.catch_up == "all":
+            to_run = due
+        elif self.catch_up == "latest":
+            to_run = due[-1:]
+        else:
+            to_run = on_time
+
+        runs = 0
+        for slot in due:
+            if slot not in to_run:
+                reason = "coalesced into a later run" if self.catch_up == "latest" else "missed"
+                logger.info(f"⏭️  Skipping {slot.astimezone(self.timezone):%Y-%m-%d %H:%M} run ({reason})")
+                self._mark_skipped(slot, reason)
+                continue
+            if slot not in on_time:
+                logger.info(f"⏰ Catching up missed run from {slot.astimezone(self.timezone):%Y-%m-%d %H:%M}")
+            else:
+                logger.info(f"⏰ Scheduled run triggered at {datetime.now(self.timezone)}")
+            if self.run_task(slot):
+                runs += 1
+        return runs
+
+    def _mark_skipped(self, slot: datetime, reason: str, trigger: str = "schedule") -> None:
+        if trigger == "schedule":
+            self._last_slot = slot
+        if self.history:
+            self.history.skip(self.job, slot, reason, trigger=trigger)
+
+    def run_task(self, scheduled_for: datetime, trigger: str = "schedule") -> bool:
+        """
+        Run the task for a slot unless another run is in progress.
+
+        Args:
+            scheduled_for: Slot time (run time for manual runs)
+            trigger: "schedule" or "manual"
+
+        Returns:
+            True if the task ran (successfully or not), False if skipped for overlap
+        """
+        if not self._run_lock.acquire(blocking=False):
+            logger.warning("⏭️  Previous run still in progress - skipping")
+            self._mark_skipped(scheduled_for, "overlap", trigger=trigger)
+            return False
+
+        try:
+            if trigger == "schedule":
+                self._last_slot = scheduled_for
+            run_id = self.history.start(self.job, scheduled_for, trigger=trigger) if self.history else None
+            status, error = RunHistory.SUCCESS, None
+            try:
+                self.task_func()
+            except Exception as e:
+                logger.error(f"❌ Scheduled task failed: {e}", exc_info=True)
+                status, error = RunHistory.FAILED, str(e)
+            if self.history and run_id is not None:
+                self.history.finish(run_id, status, error)
+            return True
+        finally:
+            self._run_lock.release()
 
     def run_forever(self):
         """Run the scheduler forever, executing tasks at scheduled times."""
         logger.info("="*60)
         logger.info("DealBot Scheduler Started")
-        logger.info(f"Schedule: {', '.join([f'{h}:00' for h in self.schedule_times])} CET")
+        logger.info(f"Schedule: {self.cron} ({self.timezone.zone}), catch-up: {self.catch_up}")
         logger.info("="*60)
 
-        while True:
+        if self.history:
+            interrupted = self.history.recover()
+            if interrupted:
+                logger.warning(f"⚠️ {interrupted} run(s) were interrupted by a restart")
+
+        while not self._stop.is_set():
             try:
-                if self.should_run_now():
-                    logger.info(f"⏰ Scheduled run triggered at {datetime.now(self.timezone)}")
-                    self.task_func()
-                else:
-                    next_run = self.get_next_run_time()
-                    logger.debug(f"Next run scheduled for: {next_run}")
+                self.run_pending()
 
-                # Check every minute
-                time.sleep(60)
+                next_run = self.get_next_run_time()
+                logger.info(f"Next run scheduled for: {next_run}")
+                wait = (next_run - datetime.now(self.timezone)).total_seconds()
+                self._stop.wait(min(max(wait, 0.0), self.MAX_SLEEP_SECONDS))
 
             except KeyboardInterrupt:
                 logger.info("Scheduler stopped by user")
@@ -95,13 +202,14 @@ class DealBotScheduler:
             except Exception as e:
                 logger.error(f"Error in scheduler: {e}", exc_info=True)
                 # Continue running even if there's an error
-                time.sleep(60)
+                self._stop.wait(60)
+
+    def stop(self) -> None:
+        """Stop run_forever() after the run in progress (if any)."""
+        self._stop.set()
 
     def run_once_now(self):
         """Run the task immediately (for testing)."""
         logger.info("▶️  Running task immediately (manual trigger)")
-        try:
-            self.task_func()
+        if self.run_task(datetime.now(self.timezone), trigger="manual"):
             logger.info("✅ Manual run completed")
-        except Exception as e:
-            logger.error(f"❌ Manual run failed: {e}", exc_info=True)
@@ -2,10 +2,16 @@
 
 import logging
 import json
-from dataclasses import dataclass
-from typing import Optional
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Optional
 from openai import OpenAI
 
+if TYPE_CHECKING:
+    from ..storage.ai_cache import AIValidationCache
+    from ..utils.rate_limit import ServiceLimiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +30,65 @@ class AIValidationResult:
     review: Optional[ProductReview] = None
     confidence: str = "medium"  # low, medium, high
     error: Optional[str] = None
+    latency_ms: Optional[float] = None  # Wall time of the request this deal was in
+    prompt_tokens: Optional[int] = None  # This deal's share of the request's usage
+    completion_tokens: Optional[int] = None
+    batch_size: int = 1
+
+
+@dataclass
+class AIValidationRequest:
+    """Deal data sent to the validator."""
+    title: str
+    current_price: float
+    list_price: Optional[float]
+    discount_pct: Optional[float]
+    delivery_cost: Optional[float] = None
+    asin: Optional[str] = None
+    need_review: bool = True  # False when stored reviews will be reused
+
+
+# Static instructions, sent as the system message so the provider's prefix
+# cache can reuse them across requests. Only the deal data varies.
+SYSTEM_PROMPT = """You are a deal validator for an Amazon deals aggregator. For each deal you receive:
+1. Validate if it's legitimate and accurate
+2. Generate a brief bilingual product review (Spanish and English)
+
+The user message is a JSON object {"deals": [...]}. Each deal has: id, product,
+current_price (EUR), list_price (PVP in EUR, or null), discount_pct,
+delivery_cost (mandatory delivery cost in EUR, or null), asin and need_review.
+
+Validation Criteria:
+1. Price Reasonableness: Does the current price match typical market prices for this product?
+2. Price Consistency: Does current price vs list price match the stated discount?
+3. Discount Legitimacy: Is the PVP realistic or inflated to fake a bigger discount?
+4. Total Cost: If there's delivery cost, is the total still a good deal?
+5. Product-Price Match: Does the price make sense for this type of product?
+
+Review Guidelines (if approved):
+- Keep reviews under 150 characters per language
+- Focus on: what it is, who it's for, 1-2 key features
+- Be helpful and concise
+- Don't mention the price/discount in the review
+
+Respond with valid JSON in this exact format, with one result per deal and the deal's id:
+{
+  "results": [
+    {
+      "id": 0,
+      "approved": true,
+      "reasoning": "Brief explanation of decision",
+      "confidence": "medium",
+      "review": {
+        "es": "Spanish review here",
+        "en": "English review here"
+      }
+    }
+  ]
+}
+
+If rejected, or if the deal's need_review is false, omit the "review" field.
+"""
 
 
 class AIValidator:
@@ -67,116 +132,133 @@ class AIValidator:
         Returns:
             AIValidationResult with approval and review
         """
-        try:
-            prompt = self._build_validation_prompt(
-                title, current_price, list_price, discount_pct, delivery_cost, asin
-            )
+        return self.validate_batch([
+            AIValidationRequest(title, current_price, list_price, discount_pct, delivery_cost, asin)
+        ])[0]
+
+    # Output budget per deal (reasoning + two short reviews) and the API's cap
+    TOKENS_PER_DEAL = 300
+    MAX_TOKENS = 8192
+
+    def validate_batch(self, requests: list[AIValidationRequest]) -> list[AIValidationResult]:
+        """
+        Validate and review several deals in one chat completion.
 
-            logger.info(f"🤖 AI validating deal: {title[:50]}...")
+        A response item that is missing or malformed fails only its own deal;
+        a failed request (or unparseable response) fails every deal in it.
 
+        Args:
+            requests: Deals to validate
+
+        Returns:
+            One AIValidationResult per request, in the same order
+        """
+        if not requests:
+            return []
+
+        logger.info(f"🤖 AI validating {len(requests)} deal(s) in one request...")
+        start = time.perf_counter()
+        try:
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }],
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": self._build_batch_message(requests)},
+                ],
                 temperature=0.3,  # Lower temperature for more consistent validation
-                max_tokens=1024,
+                max_tokens=min(self.MAX_TOKENS, 100 + self.TOKENS_PER_DEAL * len(requests)),
                 response_format={"type": "json_object"}
             )
+            latency_ms = (time.perf_counter() - start) * 1000
 
             # Parse JSON response
             response_text = response.choices[0].message.content
-            result_data = json.loads(response_text)
+            data = json.loads(response_text)
+            items = data.get("results") if isinstance(data, dict) else None
+            if not isinstance(items, list):
+                raise json.JSONDecodeError("'results' is not a list", response_text, 0)
 
-            # Create result
-            result = AIValidationResult(
-                approved=result_data.get("approved", False),
-                reasoning=result_data.get("reasoning", ""),
-                confidence=result_data.get("confidence", "medium"),
-                review=ProductReview(
-                    spanish=result_data.get("review", {}).get("es", ""),
-                    english=result_data.get("review", {}).get("en", "")
-                ) if result_data.get("approved") else None
-            )
-
-            if result.approved:
-                logger.info(f"✅ AI approved: {title[:50]}... ({result.confidence} confidence)")
+        except json.JSONDecodeError as e:
+            logger.error(f"AI response parsing error: {e}")
+            return [
+                AIValidationResult(approved=False, reasoning="AI response parsing failed", error=str(e))
+                for _ in requests
+            ]
+        except Exception as e:
+            logger.error(f"AI validation error: {e}")
+            return [
+                AIValidationResult(approved=False, reasoning="AI validation service error", error=str(e))
+                for _ in requests
+            ]
+
+        by_id = {item.get("id"): item for item in items if isinstance(item, dict)}
+
+        # Usage is reported per request; split it evenly across its deals
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+
+        results = []
+        for index, request in enumerate(requests):
+            result = self._parse_item(by_id.get(index))
+            result.latency_ms = latency_ms
+            result.batch_size = len(requests)
+            if isinstance(prompt_tokens, int):
+                result.prompt_tokens = prompt_tokens // len(requests)
+            if isinstance(completion_tokens, int):
+                result.completion_tokens = completion_tokens // len(requests)
+
+            if result.error:
+                logger.error(f"AI result for {request.title[:50]}... unusable: {result.error}")
+            elif result.approved:
+                logger.info(f"✅ AI approved: {request.title[:50]}... ({result.confidence} confidence)")
             else:
-                logger.warning(f"❌ AI rejected: {title[:50]}... Reason: {result.reasoning}")
+                logger.warning(f"❌ AI rejected: {request.title[:50]}... Reason: {result.reasoning}")
+            results.append(result)
 
-            return result
+        return results
 
-        except json.JSONDecodeError as e:
-            logger.error(f"AI response parsing error: {e}")
+    @staticmethod
+    def _parse_item(item: Any) -> AIValidationResult:
+        """Turn one response item into a result (an error result if malformed)."""
+        if not isinstance(item, dict):
             return AIValidationResult(
-                approved=False,
-                reasoning="AI response parsing failed",
-                error=str(e)
+                approved=False, reasoning="AI response parsing failed", error="Missing result for deal"
             )
-        except Exception as e:
-            logger.error(f"AI validation error: {e}")
+        approved = item.get("approved", False)
+        review = item.get("review") or {}
+        if not isinstance(approved, bool) or not isinstance(review, dict):
             return AIValidationResult(
-                approved=False,
-                reasoning="AI validation service error",
-                error=str(e)
+                approved=False, reasoning="AI response parsing failed", error=f"Malformed result: {item!r:.200}"
             )
 
-    def _build_validation_prompt(
-        self,
-        title: str,
-        current_price: float,
-        list_price: Optional[float],
-        discount_pct: Optional[float],
-        delivery_cost: Optional[float],
-        asin: Optional[str]
-    ) -> str:
-        """Build validation prompt for DeepSeek."""
-
-        delivery_note = f"\n- Mandatory delivery cost: €{delivery_cost}" if delivery_cost else ""
-
-        prompt = f"""You are a deal validator for an Amazon deals aggregator. Analyze this deal and:
-1. Validate if it's legitimate and accurate
-2. Generate a brief bilingual product review (Spanish and English)
-
-Deal Information:
-- Product: {title}
-- Current Price: €{current_price}
-- List Price (PVP): €{list_price if list_price else 'N/A'}
-- Discount: {discount_pct}%{delivery_note}
-- ASIN: {asin or 'N/A'}
-
-Validation Criteria:
-1. Price Reasonableness: Does the current price match typical market prices for this product?
-2. Price Consistency: Does current price vs list price match the stated discount?
-3. Discount Legitimacy: Is the PVP realistic or inflated to fake a bigger discount?
-4. Total Cost: If there's delivery cost, is the total still a good deal?
-5. Product-Price Match: Does the price make sense for this type of product?
-
-Review Guidelines (if approved):
-- Keep reviews under 150 characters per language
-- Focus on: what it is, who it's for, 1-2 key features
-- Be helpful and concise
-- Don't mention the price/discount in the review
-
-Respond with valid JSON in this exact format:
-{{
-  "approved": true,
-  "reasoning": "Brief explanation of decision",
-  "confidence": "medium",
-  "review": {{
-    "es": "Spanish review here",
-    "en": "English review here"
-  }}
-}}
-
-If rejected, set approved to false and omit the "review" field.
-"""
-        return prompt
-
+        return AIValidationResult(
+            approved=approved,
+            reasoning=str(item.get("reasoning", "")),
+            confidence=str(item.get("confidence", "medium")),
+            review=ProductReview(
+                spanish=str(review.get("es", "")),
+                english=str(review.get("en", ""))
+            ) if approved else None
+        )
 
-# Cache for AI validation results to avoid repeated API calls
-_ai_validation_cache = {}
+    @staticmethod
+    def _build_batch_message(requests: list[AIValidationRequest]) -> str:
+        """Build the per-request (variable) part of the prompt."""
+        deals = [
+            {
+                "id": index,
+                "product": request.title,
+                "current_price": request.current_price,
+                "list_price": request.list_price,
+                "discount_pct": request.discount_pct,
+                "delivery_cost": request.delivery_cost or None,
+                "asin": request.asin,
+                "need_review": request.need_review,
+            }
+            for index, request in enumerate(requests)
+        ]
+        return json.dumps({"deals": deals}, ensure_ascii=False)
 
 
 def get_cached_or_validate(
@@ -186,18 +268,97 @@ def get_cached_or_validate(
     current_price: float,
     list_price: Optional[float],
     discount_pct: Optional[float],
-    delivery_cost: Optional[float] = None
+    delivery_cost: Optional[float] = None,
+    cache: Optional["AIValidationCache"] = None,
 ) -> AIValidationResult:
     """Get cached validation or perform new validation."""
-    cache_key = f"{asin}_{current_price}_{list_price}_{discount_pct}"
+    return get_cached_or_validate_many(
+        validator,
+        [AIValidationRequest(title, current_price, list_price, discount_pct, delivery_cost, asin)],
+        cache=cache,
+    )[0]
 
-    if cache_key in _ai_validation_cache:
-        logger.info(f"Using cached AI validation for {asin}")
-        return _ai_validation_cache[cache_key]
 
-    result = validator.validate_and_review(
-        title, current_price, list_price, discount_pct, delivery_cost, asin
-    )
+def _total_price(request: AIValidationRequest) -> float:
+    """Price the verdict is about: a mandatory delivery cost changes the deal."""
+    return request.current_price + (request.delivery_cost or 0)
 
-    _ai_validation_cache[cache_key] = result
-    return result
+
+def get_cached_or_validate_many(
+    validator: AIValidator,
+    requests: list[AIValidationRequest],
+    batch_size: int = 8,
+    limiter: Optional["ServiceLimiter"] = None,
+    cache: Optional["AIValidationCache"] = None,
+) -> list[AIValidationResult]:
+    """
+    Get cached validations, validating the rest in batches of batch_size.
+
+    Deals with a cached verdict at a similar price are not sent at all. Deals
+    whose product was reviewed before are sent for a verdict only, and the
+    stored reviews are attached to the result.
+
+    Args:
+        validator: AI validator
+        requests: Deals to validate
+        batch_size: Deals per chat completion
+        limiter: DeepSeek limiter; each request holds one slot
+        cache: Durable verdict/review store (None = no caching)
+
+    Returns:
+        One AIValidationResult per request, in the same order
+    """
+    results: list[Optional[AIValidationResult]] = [None] * len(requests)
+    stored_reviews: dict[int, tuple[str, str]] = {}
+    pending: list[tuple[int, AIValidationRequest]] = []
+
+    for index, request in enumerate(requests):
+        verdict = cache.get_verdict(request.asin, _total_price(request), request.discount_pct) if cache else None
+        if verdict:
+            logger.info(f"Using cached AI validation for {request.asin}")
+            results[index] = AIValidationResult(
+                approved=verdict["approved"],
+                reasoning=verdict["reasoning"],
+                confidence=verdict["confidence"],
+                review=ProductReview(
+                    spanish=verdict["review_es"], english=verdict["review_en"]
+                ) if verdict["approved"] else None,
+            )
+            continue
+
+        review = cache.get_review(request.asin) if cache else None
+        if review:
+            # Only the price changed: ask for the verdict, keep the reviews
+            stored_reviews[index] = review
+            request = replace(request, need_review=False)
+        pending.append((index, request))
+
+    batch_size = max(1, batch_size)
+    for start in range(0, len(pending), batch_size):
+        chunk = pending[start:start + batch_size]
+        with limiter.slot() if limiter else nullcontext():
+            batch_results = validator.validate_batch([request for _, request in chunk])
+
+        for (index, request), result in zip(chunk, batch_results):
+            results[index] = result
+            if result.error:
+                continue
+
+            if result.approved and index in stored_reviews and not (result.review and result.review.spanish):
+                spanish, english = stored_reviews[index]
+                result.review = ProductReview(spanish=spanish, english=english)
+                if cache:
+                    cache.record_review_reuse()
+
+            if cache:
+                cache.put(
+                    request.asin,
+                    _total_price(request),
+                    request.discount_pct,
+                    approved=result.approved,
+                    reasoning=result.reasoning,
+                    confidence=result.confidence,
+                    review=(result.review.spanish, result.review.english) if result.review else None,
+                )
+
+    return results  # type: ignore[return-value]
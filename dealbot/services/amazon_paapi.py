@@ -1,14 +1,17 @@
 """Amazon Product Advertising API integration."""
 
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 from amazon_paapi import AmazonApi
+from amazon_paapi.errors import ItemsNotFound
 from amazon_paapi.sdk.models.get_items_resource import GetItemsResource
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from ..models import Currency, PriceInfo
+from ..models import Currency, Deal, PriceInfo
+from ..storage.product_cache import ProductCache
 from ..utils.config import Config
 from ..utils.logging import get_logger
+from ..utils.rate_limit import ServiceLimiter
 
 logger = get_logger(__name__)
 
@@ -22,9 +25,12 @@ class AmazonPAAPIService:
         Currency.USD: "US",
     }
 
-    def __init__(self, config: Config) -> None:
+    ITEMS_PER_REQUEST = 10  # PA-API GetItems limit
+
+    def __init__(self, config: Config, cache: Optional[ProductCache] = None) -> None:
         """Initialize Amazon PA-API client."""
         self.config = config
+        self.cache = cache
         self.access_key = config.require_env("AMAZON_PAAPI_ACCESS_KEY")
         self.secret_key = config.require_env("AMAZON_PAAPI_SECRET_KEY")
         self.associate_tag = config.affiliate_tag
@@ -52,6 +58,14 @@ class AmazonPAAPIService:
     ) -> PriceInfo:
         """Validate product price via PA-API."""
         marketplace = self.MARKETPLACE_MAP.get(currency, "ES")
+
+        cached = self.cache.get(marketplace, asin, "paapi") if self.cache else None
+        if cached:
+            logger.info(f"Using cached PA-API data for {asin}")
+            return self._apply_source_data(
+                PriceInfo.model_validate(cached), stated_price, source_pvp, source_discount_pct
+            )
+
         api = self._get_api(marketplace)
 
         logger.info(f"Validating price for ASIN {asin} in {marketplace}")
@@ -63,212 +77,327 @@ class AmazonPAAPIService:
 
             if not items or len(items) == 0:
                 logger.warning(f"No data returned for ASIN {asin}")
-                
-                # FALLBACK: Use stated price from TXT file when PA-API returns no data
-                if stated_price:
-                    logger.warning(f"No PA-API data for {asin}, using stated price from file: {currency}{stated_price}")
-                    return PriceInfo(
-                        asin=asin,
-                        title=f"Product {asin}",
-                        currency=currency,
-                        current_price=stated_price,  # Use stated price as fallback
-                        list_price=source_pvp,  # Use source PVP if available
-                        savings_percentage=source_discount_pct,  # Use source discount
-                        availability="Now",  # Assume available since we have a price in the file
-                        needs_review=True,  # Mark for review since PA-API returned no data
-                    )
-                
-                # No fallback available
-                return PriceInfo(
-                    asin=asin,
-                    title=f"Product {asin}",
-                    currency=currency,
-                    needs_review=True,
+                return self._fallback_price_info(
+                    asin, currency, stated_price, source_pvp, source_discount_pct, reason="returned no data"
                 )
 
-            item = items[0]
+            return self._build_price_info(
+                item=items[0],
+                asin=asin,
+                currency=currency,
+                stated_price=stated_price,
+                source_pvp=source_pvp,
+                source_discount_pct=source_discount_pct,
+            )
+
+        except Exception as e:
+            logger.error(f"PA-API error for {asin}: {e}")
+            return self._fallback_price_info(
+                asin, currency, stated_price, source_pvp, source_discount_pct, reason="failed"
+            )
+
+    def validate_prices(
+        self, deals: list[Deal], limiter: Optional[ServiceLimiter] = None
+    ) -> dict[str, PriceInfo]:
+        """
+        Validate prices for many deals with batched GetItems calls.
+
+        ASINs are grouped per marketplace and requested in chunks of
+        ITEMS_PER_REQUEST. ASINs missing from the response (or whose chunk
+        failed) fall back to the price/PVP stated in the source file.
+
+        Args:
+            deals: Deals to validate (deals without ASIN are ignored)
+            limiter: Optional rate limiter held for each GetItems request
+
+        Returns:
+            Dict mapping ASIN to PriceInfo
+        """
+        # First deal wins for repeated ASINs (its stated price drives the fallback)
+        by_marketplace: dict[str, dict[str, Deal]] = {}
+        for deal in deals:
+            if not deal.asin:
+                continue
+            marketplace = self.MARKETPLACE_MAP.get(deal.currency, "ES")
+            by_marketplace.setdefault(marketplace, {}).setdefault(deal.asin, deal)
+
+        results: dict[str, PriceInfo] = {}
+
+        for marketplace, deals_by_asin in by_marketplace.items():
+            asins = list(deals_by_asin)
+
+            # Serve fresh cached entries without spending PA-API quota
+            if self.cache:
+                cached = self.cache.get_many(marketplace, asins, "paapi")
+                for asin, payload in cached.items():
+                    deal = deals_by_asin[asin]
+                    results[asin] = self._apply_source_data(
+                        PriceInfo.model_validate(payload),
+                        deal.stated_price, deal.source_pvp, deal.source_discount_pct,
+                    )
+                asins = [asin for asin in asins if asin not in cached]
+                if cached:
+                    logger.info(f"PA-API cache served {len(cached)} ASINs in {marketplace}")
+
+            for i in range(0, len(asins), self.ITEMS_PER_REQUEST):
+                chunk = asins[i:i + self.ITEMS_PER_REQUEST]
+                logger.info(f"Validating {len(chunk)} ASINs in {marketplace} (batch {i // self.ITEMS_PER_REQUEST + 1})")
+
+                try:
+                    if limiter:
+                        with limiter.slot():
+                            items = self._get_items(marketplace, chunk)
+                    else:
+                        items = self._get_items(marketplace, chunk)
+                except Exception as e:
+                    logger.error(f"PA-API batch error for {chunk}: {e}")
+                    items = []
+
+                items_by_asin = {str(getattr(item, "asin", "")): item for item in items or []}
+
+                for asin in chunk:
+                    deal = deals_by_asin[asin]
+                    item = items_by_asin.get(asin)
+                    try:
+                        if item is None:
+                            raise LookupError("missing from GetItems response")
+                        results[asin] = self._build_price_info(
+                            item=item,
+                            asin=asin,
+                            currency=deal.currency,
+                            stated_price=deal.stated_price,
+                            source_pvp=deal.source_pvp,
+                            source_discount_pct=deal.source_discount_pct,
+                        )
+                    except Exception as e:
+                        logger.warning(f"No usable PA-API data for {asin}: {e}")
+                        results[asin] = self._fallback_price_info(
+                            asin, deal.currency, deal.stated_price,
+                            deal.source_pvp, deal.source_discount_pct, reason="returned no data",
+                        )
+
+        return results
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        reraise=True,
+    )
+    def _get_items(self, marketplace: str, asins: list[str]) -> list[Any]:
+        """Fetch up to ITEMS_PER_REQUEST items in a single GetItems request."""
+        # python-amazon-paapi automatically requests all available resources including customer reviews
+        try:
+            return self._get_api(marketplace).get_items(asins) or []
+        except ItemsNotFound:
+            # None of the ASINs exist - not worth retrying
+            return []
+
+    def _fallback_price_info(
+        self, asin: str, currency: Currency, stated_price: Optional[float],
+        source_pvp: Optional[float], source_discount_pct: Optional[float], reason: str
+    ) -> PriceInfo:
+        """Build PriceInfo from the TXT file data when PA-API has nothing for an ASIN."""
+        # FALLBACK: Use stated price from TXT file when PA-API fails or returns no data
+        if stated_price:
+            logger.warning(f"PA-API {reason} for {asin}, using stated price from file: {currency}{stated_price}")
+            return PriceInfo(
+                asin=asin,
+                title=f"Product {asin}",
+                currency=currency,
+                current_price=stated_price,  # Use stated price as fallback
+                list_price=source_pvp,  # Use source PVP if available
+                savings_percentage=source_discount_pct,  # Use source discount
+                availability="Now",  # Assume available since we have a price in the file
+                needs_review=True,  # Mark for review since PA-API had no usable data
+            )
+
+        # No fallback available
+        return PriceInfo(
+            asin=asin,
+            title=f"Product {asin}",
+            currency=currency,
+            needs_review=True,
+        )
 
-            # Extract current price and list price (PVP)
-            current_price: Optional[float] = None
-            list_price: Optional[float] = None
-            savings_percentage: Optional[float] = None
+    def _build_price_info(
+        self, item: Any, asin: str, currency: Currency, stated_price: Optional[float],
+        source_pvp: Optional[float], source_discount_pct: Optional[float]
+    ) -> PriceInfo:
+        """Extract price, PVP, image, rating and availability from a PA-API item."""
+
+        # Extract current price and list price (PVP)
+        current_price: Optional[float] = None
+        list_price: Optional[float] = None
+        savings_percentage: Optional[float] = None
+        
+        if hasattr(item, "offers") and item.offers and item.offers.listings:
+            listing = item.offers.listings[0]
             
-            if hasattr(item, "offers") and item.offers and item.offers.listings:
-                listing = item.offers.listings[0]
-                
-                # Current/sale price
-                if hasattr(listing, "price") and listing.price:
-                    current_price = float(listing.price.amount)
-                    logger.info(f"Current price for {asin}: {current_price}")
-                
-                # Try to get list price from multiple possible fields
-                # 1. Try saving_basis (common for discounted items)
-                if hasattr(listing, "saving_basis") and listing.saving_basis:
-                    list_price = float(listing.saving_basis.amount)
-                    logger.info(f"Found list price (saving_basis) for {asin}: {list_price}")
-                
-                # 2. Try list_price directly from offers
-                if not list_price and hasattr(item.offers, "listings") and item.offers.listings:
-                    for listing_item in item.offers.listings:
-                        if hasattr(listing_item, "list_price") and listing_item.list_price:
-                            list_price = float(listing_item.list_price.amount)
-                            logger.info(f"Found list price (listings.list_price) for {asin}: {list_price}")
-                            break
-                
-                # 3. Check if offers has summaries with list price
-                if not list_price and hasattr(item.offers, "summaries") and item.offers.summaries:
-                    for summary in item.offers.summaries:
-                        if hasattr(summary, "highest_price") and summary.highest_price:
-                            list_price = float(summary.highest_price.amount)
-                            logger.info(f"Found list price (summaries.highest_price) for {asin}: {list_price}")
+            # Current/sale price
+            if hasattr(listing, "price") and listing.price:
+                current_price = float(listing.price.amount)
+                logger.info(f"Current price for {asin}: {current_price}")
+            
+            # Try to get list price from multiple possible fields
+            # 1. Try saving_basis (common for discounted items)
+            if hasattr(listing, "saving_basis") and listing.saving_basis:
+                list_price = float(listing.saving_basis.amount)
+                logger.info(f"Found list price (saving_basis) for {asin}: {list_price}")
+            
+            # 2. Try list_price directly from offers
+            if not list_price and hasattr(item.offers, "listings") and item.offers.listings:
+                for listing_item in item.offers.listings:
+                    if hasattr(listing_item, "list_price") and listing_item.list_price:
+                        list_price = float(listing_item.list_price.amount)
+                        logger.info(f"Found list price (listings.list_price) for {asin}: {list_price}")
+                        break
+            
+            # 3. Check if offers has summaries with list price
+            if not list_price and hasattr(item.offers, "summaries") and item.offers.summaries:
+                for summary in item.offers.summaries:
+                    if hasattr(summary, "highest_price") and summary.highest_price:
+                        list_price = float(summary.highest_price.amount)
+                        logger.info(f"Found list price (summaries.highest_price) for {asin}: {list_price}")
+                        break
+                    elif hasattr(summary, "lowest_price") and summary.lowest_price:
+                        # Sometimes lowest_price in summaries is actually the list price
+                        potential_list = float(summary.lowest_price.amount)
+                        if current_price and potential_list > current_price:
+                            list_price = potential_list
+                            logger.info(f"Found list price (summaries.lowest_price > current) for {asin}: {list_price}")
                             break
-                        elif hasattr(summary, "lowest_price") and summary.lowest_price:
-                            # Sometimes lowest_price in summaries is actually the list price
-                            potential_list = float(summary.lowest_price.amount)
-                            if current_price and potential_list > current_price:
-                                list_price = potential_list
-                                logger.info(f"Found list price (summaries.lowest_price > current) for {asin}: {list_price}")
-                                break
-                
-                # Calculate discount percentage
-                if current_price and list_price and list_price > current_price:
-                    savings_percentage = ((list_price - current_price) / list_price) * 100
-                    logger.info(f"Discount found: {currency}{current_price} (was {currency}{list_price}) = -{savings_percentage:.0f}%")
             
-            # Fallback: Use source PVP if PA-API didn't provide list price
-            if not list_price and source_pvp and current_price:
-                if source_pvp > current_price:
-                    list_price = source_pvp
-                    savings_percentage = source_discount_pct if source_discount_pct else ((list_price - current_price) / list_price) * 100
-                    logger.info(f"Using source PVP: {currency}{list_price} (discount: -{savings_percentage:.0f}%)")
-
-            # Extract title
-            title = str(item.item_info.title.display_value) if item.item_info.title else asin
-
-            # Extract image
-            main_image_url: Optional[str] = None
-            if hasattr(item, "images") and item.images and item.images.primary:
-                main_image_url = str(item.images.primary.large.url)
-
-            # Extract customer reviews/ratings from PA-API
-            review_rating: Optional[float] = None
-            review_count: Optional[int] = None
+            # Calculate discount percentage
+            if current_price and list_price and list_price > current_price:
+                savings_percentage = ((list_price - current_price) / list_price) * 100
+                logger.info(f"Discount found: {currency}{current_price} (was {currency}{list_price}) = -{savings_percentage:.0f}%")
+        
+        # Extract title
+        title = str(item.item_info.title.display_value) if item.item_info.title else asin
+
+        # Extract image
+        main_image_url: Optional[str] = None
+        if hasattr(item, "images") and item.images and item.images.primary:
+            main_image_url = str(item.images.primary.large.url)
+
+        # Extract customer reviews/ratings from PA-API
+        review_rating: Optional[float] = None
+        review_count: Optional[int] = None
+        
+        logger.debug(f"Checking customer_reviews for {asin}: exists={hasattr(item, 'customer_reviews')}, value={getattr(item, 'customer_reviews', None)}")
+        
+        if hasattr(item, "customer_reviews") and item.customer_reviews:
+            logger.debug(f"CustomerReviews object found for {asin}")
             
-            logger.debug(f"Checking customer_reviews for {asin}: exists={hasattr(item, 'customer_reviews')}, value={getattr(item, 'customer_reviews', None)}")
+            if hasattr(item.customer_reviews, "star_rating") and item.customer_reviews.star_rating:
+                # Star rating comes as "4.5 out of 5 stars" or just a float
+                rating_value = getattr(item.customer_reviews.star_rating, "value", None)
+                if rating_value:
+                    review_rating = float(rating_value)
+                    logger.info(f"⭐ Found rating for {asin}: {review_rating}/5")
             
-            if hasattr(item, "customer_reviews") and item.customer_reviews:
-                logger.debug(f"CustomerReviews object found for {asin}")
-                
-                if hasattr(item.customer_reviews, "star_rating") and item.customer_reviews.star_rating:
-                    # Star rating comes as "4.5 out of 5 stars" or just a float
-                    rating_value = getattr(item.customer_reviews.star_rating, "value", None)
-                    if rating_value:
-                        review_rating = float(rating_value)
-                        logger.info(f"⭐ Found rating for {asin}: {review_rating}/5")
+            if hasattr(item.customer_reviews, "count") and item.customer_reviews.count:
+                review_count = int(item.customer_reviews.count)
+                logger.info(f"📝 Found {review_count:,} reviews for {asin}")
+            
+            if review_rating:
+                logger.info(f"✅ Reviews extracted for {asin}: {review_rating}/5 ({review_count or 0} reviews)")
+            else:
+                logger.warning(f"⚠️ CustomerReviews exists for {asin} but no rating found")
+        else:
+            logger.debug(f"ℹ️ No customer_reviews data available from PA-API for {asin}")
+
+        # Initialize review flags
+        needs_review = False
+
+        # Extract availability and check if in stock
+        availability: Optional[str] = None
+        if hasattr(item, "offers") and item.offers and item.offers.listings:
+            listing = item.offers.listings[0]
+            if hasattr(listing, "availability") and listing.availability:
+                availability_type = getattr(listing.availability, "type", None)
+                availability_message = getattr(listing.availability, "message", None)
                 
-                if hasattr(item.customer_reviews, "count") and item.customer_reviews.count:
-                    review_count = int(item.customer_reviews.count)
-                    logger.info(f"📝 Found {review_count:,} reviews for {asin}")
+                # Check if available for purchase
+                if availability_type:
+                    availability = str(availability_type)
+                    logger.info(f"Availability for {asin}: {availability}")
                 
-                if review_rating:
-                    logger.info(f"✅ Reviews extracted for {asin}: {review_rating}/5 ({review_count or 0} reviews)")
-                else:
-                    logger.warning(f"⚠️ CustomerReviews exists for {asin} but no rating found")
-            else:
-                logger.debug(f"ℹ️ No customer_reviews data available from PA-API for {asin}")
-
-            # Initialize review flags
-            discrepancy: Optional[float] = None
-            needs_review = False
-
-            # Extract availability and check if in stock
-            availability: Optional[str] = None
-            if hasattr(item, "offers") and item.offers and item.offers.listings:
-                listing = item.offers.listings[0]
-                if hasattr(listing, "availability") and listing.availability:
-                    availability_type = getattr(listing.availability, "type", None)
-                    availability_message = getattr(listing.availability, "message", None)
-                    
-                    # Check if available for purchase
-                    if availability_type:
-                        availability = str(availability_type)
-                        logger.info(f"Availability for {asin}: {availability}")
-                    
-                    # Only mark as unavailable if explicitly stated (not just missing "Now")
-                    # Common availability_type values: "Now", "Backorder", "Preorder"
-                    if availability_type and availability_type not in ["Now", "Backorder", "Preorder"]:
-                        logger.warning(f"⚠️ Product {asin} may not be available: {availability_message or availability_type}")
-                        needs_review = True
-                    elif not availability_type and current_price:
-                        # If we have a price but no availability info, assume available
-                        availability = "Now"
-                        logger.info(f"Assuming {asin} is available (has price, no explicit unavailability)")
-                elif current_price:
-                    # No availability object but has price - assume available
+                # Only mark as unavailable if explicitly stated (not just missing "Now")
+                # Common availability_type values: "Now", "Backorder", "Preorder"
+                if availability_type and availability_type not in ["Now", "Backorder", "Preorder"]:
+                    logger.warning(f"⚠️ Product {asin} may not be available: {availability_message or availability_type}")
+                    needs_review = True
+                elif not availability_type and current_price:
+                    # If we have a price but no availability info, assume available
                     availability = "Now"
-                    logger.info(f"Assuming {asin} is available (has price)")
+                    logger.info(f"Assuming {asin} is available (has price, no explicit unavailability)")
             elif current_price:
-                # No offers.listings but has price - assume available
+                # No availability object but has price - assume available
                 availability = "Now"
-                logger.info(f"Assuming {asin} is available (has current price)")
-
-            # If we still don't have a price, use stated_price as fallback
-            if not current_price and stated_price:
-                current_price = stated_price
-                availability = "Now"  # Assume available if we have a stated price
-                logger.info(f"Using stated price as fallback for {asin}: {currency}{current_price}")
-
-            # Calculate discrepancy
-            if stated_price and current_price:
-                discrepancy = abs(current_price - stated_price) / stated_price
-                threshold = self.config.price_discrepancy_threshold
-                if discrepancy > threshold:
-                    needs_review = True
-                    logger.warning(
-                        f"Price discrepancy for {asin}: "
-                        f"stated={stated_price}, current={current_price}, "
-                        f"diff={discrepancy:.1%}"
-                    )
+                logger.info(f"Assuming {asin} is available (has price)")
+        elif current_price:
+            # No offers.listings but has price - assume available
+            availability = "Now"
+            logger.info(f"Assuming {asin} is available (has current price)")
 
-            price_info = PriceInfo(
-                asin=asin,
-                title=title,
-                current_price=current_price,
-                list_price=list_price,
-                savings_percentage=savings_percentage,
-                currency=currency,
-                main_image_url=main_image_url,
-                availability=availability,
-                review_rating=review_rating,
-                review_count=review_count,
-                discrepancy=discrepancy,
-                needs_review=needs_review,
-            )
+        price_info = PriceInfo(
+            asin=asin,
+            title=title,
+            current_price=current_price,
+            list_price=list_price,
+            savings_percentage=savings_percentage,
+            currency=currency,
+            main_image_url=main_image_url,
+            availability=availability,
+            review_rating=review_rating,
+            review_count=review_count,
+            needs_review=needs_review,
+        )
 
-            logger.info(f"Validated {asin}: price={current_price} {currency}")
-            return price_info
+        # Cache what PA-API itself returned (before any TXT-file fallbacks are mixed in)
+        if self.cache and current_price:
+            marketplace = self.MARKETPLACE_MAP.get(currency, "ES")
+            self.cache.put(marketplace, asin, "paapi", price_info.model_dump(mode="json"))
+            self.cache.remember_media(marketplace, asin, main_image_url, title)
 
-        except Exception as e:
-            logger.error(f"PA-API error for {asin}: {e}")
-            
-            # FALLBACK: Use stated price from TXT file when PA-API fails
-            if stated_price:
-                logger.warning(f"PA-API failed for {asin}, using stated price from file: {currency}{stated_price}")
-                return PriceInfo(
-                    asin=asin,
-                    title=f"Product {asin}",
-                    currency=currency,
-                    current_price=stated_price,  # Use stated price as fallback
-                    list_price=source_pvp,  # Use source PVP if available
-                    savings_percentage=source_discount_pct,  # Use source discount
-                    availability="Now",  # Assume available since we have a price in the file
-                    needs_review=True,  # Mark for review since PA-API failed
+        price_info = self._apply_source_data(price_info, stated_price, source_pvp, source_discount_pct)
+
+        logger.info(f"Validated {asin}: price={price_info.current_price} {currency}")
+        return price_info
+
+    def _apply_source_data(
+        self, price_info: PriceInfo, stated_price: Optional[float],
+        source_pvp: Optional[float], source_discount_pct: Optional[float]
+    ) -> PriceInfo:
+        """Fill gaps from the TXT file and flag discrepancies against the stated price."""
+        asin = price_info.asin
+        currency = price_info.currency
+        current_price = price_info.current_price
+
+        # Fallback: Use source PVP if PA-API didn't provide list price
+        if not price_info.list_price and source_pvp and current_price:
+            if source_pvp > current_price:
+                price_info.list_price = source_pvp
+                price_info.savings_percentage = source_discount_pct if source_discount_pct else ((source_pvp - current_price) / source_pvp) * 100
+                logger.info(f"Using source PVP: {currency}{source_pvp} (discount: -{price_info.savings_percentage:.0f}%)")
+
+        # If we still don't have a price, use stated_price as fallback
+        if not current_price and stated_price:
+            current_price = price_info.current_price = stated_price
+            price_info.availability = "Now"  # Assume available if we have a stated price
+            logger.info(f"Using stated price as fallback for {asin}: {currency}{current_price}")
+
+        # Calculate discrepancy
+        if stated_price and current_price:
+            price_info.discrepancy = abs(current_price - stated_price) / stated_price
+            threshold = self.config.price_discrepancy_threshold
+            if price_info.discrepancy > threshold:
+                price_info.needs_review = True
+                logger.warning(
+                    f"Price discrepancy for {asin}: "
+                    f"stated={stated_price}, current={current_price}, "
+                    f"diff={price_info.discrepancy:.1%}"
                 )
-            
-            # No fallback available
-            return PriceInfo(
-                asin=asin,
-                title=f"Product {asin}",
-                currency=currency,
-                needs_review=True,
-            )
+
+        return price_info
@@ -0,0 +1,233 @@
+"""Field-level enrichment planner: fill product data gaps from the cheapest source that has them."""
+
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from ..models import PriceInfo
+from ..utils.http import get_transport
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# PriceInfo fields the planner fills (savings_percentage follows list_price)
+ENRICHED_FIELDS = ("main_image_url", "list_price", "savings_percentage", "review_rating", "review_count")
+# Extra values a source may return alongside them (stored on the ProcessedDeal)
+DELIVERY_FIELDS = ("delivery_cost", "has_mandatory_delivery")
+
+
+@dataclass(frozen=True)
+class EnrichmentSource:
+    """A source of product fields and its relative cost.
+
+    fetch(asin, price_info) returns the values it found (missing keys or
+    None = not found), or None if the source wasn't available for this
+    product (e.g. no Scrapula batch was submitted), so it isn't marked as tried.
+    """
+
+    name: str
+    cost: int
+    fields: frozenset[str]
+    fetch: Callable[[str, PriceInfo], Optional[dict[str, Any]]]
+
+
+class EnrichmentPlanner:
+    """Calls sources cheapest first, each only for fields that are still missing.
+
+    A field's gap is only worth sources up to its max cost: a missing image
+    justifies a browser scrape, a missing PVP only a page fetch, and missing
+    review data only Scrapula (the ratings service covers the rest at
+    publish time). Whatever a called source returns for other missing fields
+    is used too. Every filled field's source is recorded as its provenance.
+    """
+
+    # Costs of the built-in sources (see DealController._build_enrichment_planner())
+    COST_MEDIA_CACHE = 0
+    COST_SCRAPULA = 1
+    COST_AMAZON_HTML = 2
+    COST_PLAYWRIGHT = 3
+
+    # Most expensive source worth calling for each missing field
+    DEFAULT_MAX_COST: dict[str, int] = {
+        "main_image_url": COST_PLAYWRIGHT,
+        "list_price": COST_AMAZON_HTML,
+        "review_rating": COST_SCRAPULA,
+        "review_count": COST_SCRAPULA,
+    }
+
+    def __init__(self, sources: list[EnrichmentSource], max_cost: Optional[dict[str, int]] = None) -> None:
+        """
+        Initialize planner.
+
+        Args:
+            sources: Available sources (called in order of cost)
+            max_cost: Per-field overrides of DEFAULT_MAX_COST
+        """
+        self.sources = sorted(sources, key=lambda s: s.cost)
+        self.max_cost = {**self.DEFAULT_MAX_COST, **(max_cost or {})}
+        self._lock = threading.Lock()
+        self._calls: Counter[str] = Counter()
+        self._filled: Counter[str] = Counter()
+
+    def missing(self, price_info: PriceInfo) -> set[str]:
+        """Fields worth enriching that price_info doesn't have yet."""
+        return {field for field in self.max_cost if not getattr(price_info, field, None)}
+
+    def enrich(
+        self,
+        asin: str,
+        price_info: PriceInfo,
+        provenance: dict[str, str],
+        tried: list[str],
+    ) -> dict[str, Any]:
+        """
+        Fill price_info gaps in place.
+
+        Args:
+            asin: Product ASIN
+            price_info: Product data to complete
+            provenance: Field -> source name, updated for every field filled
+            tried: Names of sources already called for this product (skipped; appended to)
+
+        Returns:
+            Delivery values (delivery_cost, has_mandatory_delivery) if a source reported them
+        """
+        extras: dict[str, Any] = {}
+        for source in self.sources:
+            wanted = {
+                field for field in self.missing(price_info) & source.fields
+                if source.cost <= self.max_cost[field]
+            }
+            if not wanted or source.name in tried:
+                continue
+
+            try:
+                values = source.fetch(asin, price_info)
+            except Exception as e:
+                logger.warning(f"Enrichment source {source.name} failed for {asin}: {e}")
+                values = {}
+            if values is None:
+                continue
+
+            tried.append(source.name)
+            filled = self._apply(price_info, values, provenance, source.name)
+            for key in DELIVERY_FIELDS:
+                if key not in extras and values.get(key) is not None:
+                    extras[key] = values[key]
+                    provenance.setdefault("delivery", source.name)
+
+            with self._lock:
+                self._calls[source.name] += 1
+                self._filled[source.name] += len(filled)
+            if filled:
+                logger.info(f"🧩 {source.name} filled {', '.join(sorted(filled))} for {asin}")
+
+        return extras
+
+    @staticmethod
+    def _apply(price_info: PriceInfo, values: dict[str, Any], provenance: dict[str, str], source: str) -> list[str]:
+        """Copy values into fields that are still empty. Returns the fields filled."""
+        filled = []
+        list_price = values.get("list_price")
+        current = price_info.current_price
+        # A PVP at or below the current price is not a discount
+        if list_price and not price_info.list_price and (not current or list_price > current):
+            price_info.list_price = list_price
+            filled.append("list_price")
+            savings = values.get("savings_percentage")
+            if not savings and current:
+                savings = round((list_price - current) / list_price * 100, 0)
+            if savings:
+                price_info.savings_percentage = savings
+                filled.append("savings_percentage")
+
+        for field in ("main_image_url", "review_rating", "review_count"):
+            if values.get(field) and not getattr(price_info, field):
+                setattr(price_info, field, values[field])
+                filled.append(field)
+
+        if not price_info.savings_percentage and values.get("savings_percentage"):
+            price_info.savings_percentage = values["savings_percentage"]
+            filled.append("savings_percentage")
+
+        for field in filled:
+            provenance[field] = source
+        return filled
+
+    @property
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Calls and fields filled per source since the last reset."""
+        with self._lock:
+            return {name: {"calls": self._calls[name], "filled": self._filled[name]} for name in self._calls}
+
+    def reset_stats(self) -> None:
+        """Reset counters (called at the start of each run)."""
+        with self._lock:
+            self._calls.clear()
+            self._filled.clear()
+
+    def summary(self) -> str:
+        """One-line summary for status messages."""
+        stats = self.stats
+        if not stats:
+            return "no gaps"
+        return ", ".join(f"{name} {s['filled']} fields/{s['calls']} calls" for name, s in sorted(stats.items()))
+
+
+# Amazon product page fallback (image and PVP embedded in the HTML)
+IMAGE_PATTERNS = [
+    re.compile(r'"hiRes":"(https://[^"]+\.jpg)"'),
+    re.compile(r'"large":"(https://[^"]+\.jpg)"'),
+    re.compile(r'data-old-hires="(https://[^"]+\.jpg)"'),
+    re.compile(r'data-a-dynamic-image="[^"]*?(https://m\.media-amazon\.com/images/I/[^"]+\.jpg)'),
+]
+PVP_PATTERNS = [
+    # e.g. "listPrice":{"amount":75.0,"currency":"EUR"}
+    re.compile(r'"listPrice":\s*{\s*"amount":\s*([0-9.]+)'),
+    re.compile(r'"list_price":\s*{\s*"amount":\s*([0-9.]+)'),
+    re.compile(r'<span[^>]*class="[^"]*a-price[^"]*a-text-price[^"]*"[^>]*>[^€]*€\s*([0-9.,]+)'),
+    re.compile(r'data-a-strike="true"[^>]*>[^€]*€\s*([0-9.,]+)'),
+]
+
+
+def fetch_amazon_page_fields(asin: str, current_price: Optional[float] = None) -> dict[str, Any]:
+    """
+    Extract image URL and PVP from the public Amazon product page.
+
+    Args:
+        asin: Product ASIN
+        current_price: Only a PVP above this is returned
+
+    Returns:
+        Dict with main_image_url and/or list_price (empty if nothing found)
+    """
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+    }
+    response = get_transport().get(f"https://www.amazon.es/dp/{asin}", "amazon", headers=headers)
+    if response.status_code != 200:
+        return {}
+    html = response.text
+
+    fields: dict[str, Any] = {}
+    for pattern in IMAGE_PATTERNS:
+        match = pattern.search(html)
+        if match:
+            fields["main_image_url"] = match.group(1)
+            break
+
+    for pattern in PVP_PATTERNS:
+        match = pattern.search(html)
+        if not match:
+            continue
+        try:
+            list_price = float(match.group(1).replace(',', '.'))
+        except ValueError:
+            continue
+        if not current_price or list_price > current_price:
+            fields["list_price"] = list_price
+            break
+
+    return fields
@@ -1,8 +1,16 @@
 """Google Cloud Storage service for database persistence."""
 
+import hashlib
+import json
+import shutil
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+from google.api_core.exceptions import NotFound, PreconditionFailed
 from google.cloud import storage
 
 from ..utils.logging import get_logger
@@ -10,6 +18,19 @@ from ..utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+class DatabaseConflict(Exception):
+    """Raised when GCS was updated by another run since our download, so our changes weren't pushed."""
+
+    def __init__(self, remote_name: str, conflict_copy: Optional[str]) -> None:
+        where = f"saved as gs://.../{conflict_copy}" if conflict_copy else "NOT saved (copy upload failed)"
+        super().__init__(f"{remote_name} was updated in GCS by another run; this run's database {where}")
+        self.conflict_copy = conflict_copy
+
+
+class DatabaseDownloadError(Exception):
+    """Raised when the database exists in GCS but could not be brought down."""
+
+
 class GCSStorage:
     """Service for storing and retrieving files from Google Cloud Storage."""
 
@@ -98,3 +119,267 @@ class GCSStorage:
         except Exception as e:
             logger.error(f"Error checking if {remote_name} exists: {e}")
             return False
+
+    # --- SQLite replication -------------------------------------------------
+    #
+    # The database is stored as content-addressed chunks plus a small manifest:
+    #   <name>.manifest.json          {"size", "chunk_size", "chunks": [sha256, ...]}
+    #   <name>.chunks/<sha256>        immutable chunk data
+    # A pull is skipped when the manifest generation matches the one we last
+    # synced; otherwise only chunks that differ from the local file are fetched.
+    # A push uploads only chunks the bucket doesn't have yet, then swaps the
+    # manifest with an if_generation_match precondition, so a concurrent run
+    # that pushed first makes our push fail instead of being overwritten.
+
+    CHUNK_SIZE = 256 * 1024  # Multiple of SQLite's page size
+    TRANSFER_WORKERS = 8
+
+    def _manifest_name(self, remote_name: str) -> str:
+        return f"{remote_name}.manifest.json"
+
+    def _chunk_name(self, remote_name: str, digest: str) -> str:
+        return f"{remote_name}.chunks/{digest}"
+
+    @staticmethod
+    def _state_path(local_path: Path) -> Path:
+        return local_path.with_name(local_path.name + ".gcs-state.json")
+
+    def _load_state(self, local_path: Path) -> dict:
+        try:
+            return json.loads(self._state_path(local_path).read_text())
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self, local_path: Path, state: dict) -> None:
+        self._state_path(local_path).write_text(json.dumps(state))
+
+    @staticmethod
+    def _split_chunks(data: bytes, chunk_size: int) -> list[bytes]:
+        return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+    @staticmethod
+    def _digest(chunk: bytes) -> str:
+        return hashlib.sha256(chunk).hexdigest()
+
+    def download_database(self, local_path: Path, remote_name: str = "dealbot.db") -> bool:
+        """
+        Bring the local SQLite database up to date with GCS.
+
+        Args:
+            local_path: Local database path
+            remote_name: Base name of the database in the bucket
+
+        Returns:
+            True if the local copy is now current (including "nothing to do"),
+            False if there is no database in GCS yet (first run)
+
+        Raises:
+            DatabaseDownloadError: If GCS has a database that could not be downloaded
+                (a run must not go on with a stale or empty copy and upload it)
+        """
+        try:
+            manifest_blob = self.bucket.blob(self._manifest_name(remote_name))
+            try:
+                manifest_blob.reload()
+            except NotFound:
+                # Not replicated yet: fall back to a legacy whole-file copy if present
+                if not self.bucket.blob(remote_name).exists():
+                    logger.info(f"{remote_name} does not exist in GCS bucket (first run)")
+                    return False
+                if not self.download_file(remote_name, local_path):
+                    raise DatabaseDownloadError(f"Legacy copy of {remote_name} could not be downloaded")
+                return True
+
+            state = self._load_state(local_path)
+            if local_path.exists() and state.get("generation") == manifest_blob.generation:
+                logger.info(f"✅ {remote_name} unchanged in GCS (generation {manifest_blob.generation}), skipping download")
+                return True
+
+            manifest = json.loads(manifest_blob.download_as_bytes(if_generation_match=manifest_blob.generation))
+            chunk_size = manifest["chunk_size"]
+
+            # Reuse every chunk the local file already has
+            local_chunks: dict[str, bytes] = {}
+            if local_path.exists():
+                for chunk in self._split_chunks(local_path.read_bytes(), chunk_size):
+                    local_chunks[self._digest(chunk)] = chunk
+
+            missing = sorted(set(manifest["chunks"]) - set(local_chunks))
+            if missing:
+                with ThreadPoolExecutor(max_workers=self.TRANSFER_WORKERS, thread_name_prefix="gcs") as pool:
+                    fetched = pool.map(
+                        lambda d: self.bucket.blob(self._chunk_name(remote_name, d)).download_as_bytes(),
+                        missing,
+                    )
+                    local_chunks.update(zip(missing, fetched))
+
+            data = b"".join(local_chunks[digest] for digest in manifest["chunks"])
+            if len(data) != manifest["size"]:
+                raise ValueError(f"Assembled {len(data)} bytes, manifest says {manifest['size']}")
+
+            self._install_database(data, local_path)
+            self._save_state(local_path, {
+                "generation": manifest_blob.generation,
+                "chunks": manifest["chunks"],
+                "previous_chunks": manifest.get("previous_chunks", []),
+            })
+
+            logger.info(
+                f"✅ Downloaded {remote_name} from GCS: {len(missing)}/{len(manifest['chunks'])} chunks fetched "
+                f"(generation {manifest_blob.generation})"
+            )
+            return True
+
+        except DatabaseDownloadError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Failed to download database {remote_name}: {e}")
+            raise DatabaseDownloadError(f"Failed to download {remote_name}: {e}") from e
+
+    def upload_database(self, local_path: Path, remote_name: str = "dealbot.db") -> bool:
+        """
+        Push local database changes to GCS.
+
+        Args:
+            local_path: Local database path
+            remote_name: Base name of the database in the bucket
+
+        Returns:
+            True if GCS now holds this database, False on failure
+
+        Raises:
+            DatabaseConflict: If another run updated GCS since our last download.
+                Nothing is overwritten; this run's database is kept in the bucket
+                under "{remote_name}.conflicts/" for reconciliation, because the
+                next download would otherwise replace it (and its publications).
+        """
+        if not local_path.exists():
+            logger.error(f"File not found: {local_path}")
+            return False
+
+        try:
+            data = self._snapshot_database(local_path)
+            chunks = self._split_chunks(data, self.CHUNK_SIZE)
+            digests = [self._digest(chunk) for chunk in chunks]
+
+            state = self._load_state(local_path)
+            if state.get("chunks") == digests:
+                logger.info(f"✅ {remote_name} unchanged since last sync, skipping upload")
+                return True
+
+            # Upload only chunks the bucket doesn't already hold
+            known = set(state.get("chunks", []))
+            new_chunks = {d: c for d, c in zip(digests, chunks) if d not in known}
+
+            def upload_chunk(item: tuple[str, bytes]) -> None:
+                digest, chunk = item
+                try:
+                    # Content-addressed: an existing chunk is identical, so never rewrite it
+                    self.bucket.blob(self._chunk_name(remote_name, digest)).upload_from_string(
+                        chunk, if_generation_match=0
+                    )
+                except PreconditionFailed:
+                    pass
+
+            with ThreadPoolExecutor(max_workers=self.TRANSFER_WORKERS, thread_name_prefix="gcs") as pool:
+                list(pool.map(upload_chunk, new_chunks.items()))
+
+            # The replaced manifest's chunks stay referenced for one more generation,
+            # so a reader that fetched it just before this upload can still finish
+            manifest = {
+                "size": len(data),
+                "chunk_size": self.CHUNK_SIZE,
+                "chunks": digests,
+                "previous_chunks": state.get("chunks", []),
+            }
+            manifest_blob = self.bucket.blob(self._manifest_name(remote_name))
+            try:
+                # 0 = "must not exist yet" when we never synced a manifest
+                manifest_blob.upload_from_string(
+                    json.dumps(manifest),
+                    content_type="application/json",
+                    if_generation_match=state.get("generation", 0),
+                )
+            except PreconditionFailed:
+                conflict = DatabaseConflict(remote_name, self._save_conflict_copy(data, remote_name))
+                logger.error(f"❌ {conflict}")
+                raise conflict
+
+            self._save_state(local_path, {
+                "generation": manifest_blob.generation,
+                "chunks": digests,
+                "previous_chunks": manifest["previous_chunks"],
+            })
+            self._delete_stale_chunks(
+                remote_name,
+                stale=state.get("previous_chunks", []),
+                live=digests + manifest["previous_chunks"],
+            )
+
+            logger.info(
+                f"✅ Uploaded {remote_name} to GCS: {len(new_chunks)}/{len(digests)} chunks changed "
+                f"(generation {manifest_blob.generation})"
+            )
+            return True
+
+        except DatabaseConflict:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Failed to upload database {remote_name}: {e}")
+            return False
+
+    def _save_conflict_copy(self, data: bytes, remote_name: str) -> Optional[str]:
+        """Store a whole-file snapshot that lost an upload race. Returns its blob name."""
+        name = f"{remote_name}.conflicts/{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')}.db"
+        try:
+            self.bucket.blob(name).upload_from_string(data, content_type="application/x-sqlite3")
+            return name
+        except Exception as e:
+            logger.error(f"❌ Could not save conflicting database copy {name}: {e}")
+            return None
+
+    def _delete_stale_chunks(self, remote_name: str, stale: list[str], live: list[str]) -> None:
+        """Best-effort removal of chunks neither of the last two manifests references."""
+        for digest in set(stale) - set(live):
+            try:
+                self.bucket.blob(self._chunk_name(remote_name, digest)).delete()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _snapshot_database(local_path: Path) -> bytes:
+        """Consistent copy of the database bytes, even with connections open."""
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot = Path(tmp) / "snapshot.db"
+            source = sqlite3.connect(str(local_path))
+            target = sqlite3.connect(str(snapshot))
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            return snapshot.read_bytes()
+
+    @staticmethod
+    def _install_database(data: bytes, local_path: Path) -> None:
+        """Replace the local database contents.
+
+        An existing file is overwritten through SQLite's backup API so that
+        connections already open on it (the daemon's) see the new data.
+        """
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            incoming = Path(tmp) / "incoming.db"
+            incoming.write_bytes(data)
+
+            if not local_path.exists():
+                shutil.copyfile(incoming, local_path)
+                return
+
+            source = sqlite3.connect(str(incoming))
+            target = sqlite3.connect(str(local_path), timeout=30)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
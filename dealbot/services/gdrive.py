@@ -1,7 +1,10 @@
 """Google Drive API integration for accessing deal files."""
 
 import io
+import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
@@ -20,6 +23,13 @@ class GoogleDriveService:
 
     SCOPES = ['https://www.googleapis.com/auth/drive']  # Read and write access
 
+    FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+    FILE_FIELDS = "id, name, mimeType, modifiedTime, md5Checksum, size, parents, trashed"
+
+    # Sync state (changes page token + known files) kept next to the synced files
+    SYNC_STATE_FILE = ".gdrive_sync_state.json"
+    DOWNLOAD_WORKERS = 8
+
     def __init__(self, credentials_path: Optional[str] = None):
         """
         Initialize Google Drive service.
@@ -64,9 +74,23 @@ class GoogleDriveService:
         )
 
         # Build the Drive service
-        self.service = build('drive', 'v3', credentials=self.credentials)
+        self.service = self._build_service()
+        # httplib2 isn't thread-safe: parallel downloads get a client per thread
+        self._local = threading.local()
         logger.info("Google Drive service initialized")
 
+    def _build_service(self):
+        """Build a Drive v3 client."""
+        return build('drive', 'v3', credentials=self.credentials, cache_discovery=False)
+
+    def _thread_service(self):
+        """Get the Drive client for the current thread."""
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = self._build_service()
+            self._local.service = service
+        return service
+
     def get_folder_id_from_path(self, folder_path: str) -> Optional[str]:
         """
         Get folder ID from a shared drive path.
@@ -108,28 +132,40 @@ class GoogleDriveService:
             # Query for files in this folder
             query = f"'{folder_id}' in parents and trashed=false"
             if mime_type:
-                query += f" and mimeType='{mime_type}'"
+                # Keep subfolders in the results so recursion still works
+                query += f" and (mimeType='{mime_type}' or mimeType='{self.FOLDER_MIME_TYPE}')"
 
-            results = self.service.files().list(
-                q=query,
-                pageSize=1000,
-                fields="files(id, name, mimeType, modifiedTime, size)",
-                supportsAllDrives=True,
-                includeItemsFromAllDrives=True
-            ).execute()
+            files = []
+            page_token = None
+            while True:
+                results = self.service.files().list(
+                    q=query,
+                    pageSize=1000,
+                    pageToken=page_token,
+                    fields=f"nextPageToken, files({self.FILE_FIELDS})",
+                    supportsAllDrives=True,
+                    includeItemsFromAllDrives=True
+                ).execute()
+
+                files.extend(results.get('files', []))
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
 
-            files = results.get('files', [])
             logger.info(f"Found {len(files)} items in folder {folder_id}")
 
             for file in files:
                 # If it's a folder and we want recursive, search it too
-                if file['mimeType'] == 'application/vnd.google-apps.folder' and recursive:
-                    subfolder_files = self.list_files_in_folder(
-                        file['id'],
-                        mime_type=mime_type,
-                        recursive=True
-                    )
-                    all_files.extend(subfolder_files)
+                if file['mimeType'] == self.FOLDER_MIME_TYPE:
+                    if recursive:
+                        subfolder_files = self.list_files_in_folder(
+                            file['id'],
+                            mime_type=mime_type,
+                            recursive=True
+                        )
+                        all_files.extend(subfolder_files)
+                    elif not mime_type:
+                        all_files.append(file)
                 else:
                     all_files.append(file)
 
@@ -139,28 +175,24 @@ class GoogleDriveService:
             logger.error(f"Error listing files in folder {folder_id}: {e}", exc_info=True)
             return []
 
-    def download_file(self, file_id: str, destination_path: Path) -> bool:
+    def download_file(self, file_id: str, destination_path: Path, service=None) -> bool:
         """
         Download a file from Google Drive.
 
         Args:
             file_id: Google Drive file ID
             destination_path: Local path to save file
+            service: Drive client to use (defaults to the shared one)
 
         Returns:
             True if successful, False otherwise
         """
+        service = service or self.service
         try:
-            # Get file metadata
-            file_metadata = self.service.files().get(
-                fileId=file_id,
-                supportsAllDrives=True
-            ).execute()
-
-            logger.info(f"Downloading file: {file_metadata['name']}")
+            logger.info(f"Downloading file: {destination_path.name}")
 
             # Download file content
-            request = self.service.files().get_media(
+            request = service.files().get_media(
                 fileId=file_id,
                 supportsAllDrives=True
             )
@@ -168,14 +200,16 @@ class GoogleDriveService:
             # Create directory if it doesn't exist
             destination_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Download to file
-            with io.FileIO(str(destination_path), 'wb') as fh:
+            # Download to a temp file first so readers never see a partial file
+            tmp_path = destination_path.with_name(destination_path.name + ".part")
+            with io.FileIO(str(tmp_path), 'wb') as fh:
                 downloader = MediaIoBaseDownload(fh, request)
                 done = False
                 while not done:
                     status, done = downloader.next_chunk()
                     if status:
                         logger.debug(f"Download progress: {int(status.progress() * 100)}%")
+            os.replace(tmp_path, destination_path)
 
             logger.info(f"Downloaded: {destination_path}")
             return True
@@ -193,45 +227,174 @@ class GoogleDriveService:
         """
         Sync files from Google Drive folder to local directory.
 
+        The first sync lists the whole folder tree; later syncs only read the
+        Drive changes feed since the saved page token. Files are downloaded
+        (in parallel) only when new, missing locally, or changed by
+        modifiedTime/md5Checksum.
+
         Args:
             folder_id: Google Drive folder ID
             local_dir: Local directory to sync to
             file_extension: Only sync files with this extension
 
         Returns:
-            List of downloaded file paths
+            List of local paths for all synced files
         """
         logger.info(f"Syncing Google Drive folder {folder_id} to {local_dir}")
 
         # Create local directory
         local_dir.mkdir(parents=True, exist_ok=True)
 
-        # Get list of files from Drive
-        files = self.list_files_in_folder(folder_id, recursive=True)
-
-        # Filter by extension
-        txt_files = [f for f in files if f['name'].endswith(file_extension)]
-        logger.info(f"Found {len(txt_files)} {file_extension} files")
+        previous = self._load_sync_state(local_dir)
+        known = previous.get("files", {}) if previous.get("folder_id") == folder_id else {}
 
-        downloaded_paths = []
-
-        for file in txt_files:
-            # Create local path (preserving structure would be complex, so flat structure)
-            local_path = local_dir / file['name']
-
-            # Check if file exists and is up to date
-            if local_path.exists():
-                # Compare modification times (simplified - just skip existing)
-                logger.debug(f"Skipping existing file: {file['name']}")
-                downloaded_paths.append(local_path)
-                continue
+        if previous.get("folder_id") != folder_id or not previous.get("page_token"):
+            state = self._full_scan(folder_id, file_extension)
+        else:
+            state = {**previous, "files": dict(known)}
+            try:
+                self._apply_changes(state, file_extension)
+            except Exception as e:
+                # Expired/invalid token: fall back to a full listing
+                logger.warning(f"Drive changes feed failed ({e}), doing a full listing")
+                state = self._full_scan(folder_id, file_extension)
+
+        # Download what's new, changed, or missing on disk
+        to_download = [
+            file for file_id, file in state["files"].items()
+            if not (local_dir / file["name"]).exists()
+            or self._file_version(known.get(file_id)) != self._file_version(file)
+        ]
+
+        failed: set[str] = set()
+        if to_download:
+            logger.info(f"Downloading {len(to_download)} new/changed {file_extension} files")
+            workers = min(self.DOWNLOAD_WORKERS, len(to_download))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gdrive") as pool:
+                results = pool.map(
+                    lambda f: self.download_file(f["id"], local_dir / f["name"], service=self._thread_service()),
+                    to_download,
+                )
+                failed = {f["id"] for f, ok in zip(to_download, results) if not ok}
+        else:
+            logger.info("Google Drive folder unchanged since last sync")
+
+        # Failed downloads keep their previous version in the state so they're retried next time
+        saved_files = dict(state["files"])
+        for file_id in failed:
+            if file_id in known:
+                saved_files[file_id] = known[file_id]
+            else:
+                saved_files.pop(file_id, None)
+        self._save_sync_state(local_dir, {**state, "files": saved_files})
+
+        synced_paths = [
+            local_dir / file["name"] for file_id, file in state["files"].items() if file_id not in failed
+        ]
+        logger.info(f"Synced {len(synced_paths)} files to {local_dir} ({len(to_download) - len(failed)} downloaded)")
+        return synced_paths
+
+    @staticmethod
+    def _file_version(file: Optional[dict]) -> Optional[tuple]:
+        if not file:
+            return None
+        return (file.get("modifiedTime"), file.get("md5Checksum"))
 
-            # Download the file
-            if self.download_file(file['id'], local_path):
-                downloaded_paths.append(local_path)
+    def _load_sync_state(self, local_dir: Path) -> dict:
+        state_path = local_dir / self.SYNC_STATE_FILE
+        try:
+            return json.loads(state_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_sync_state(self, local_dir: Path, state: dict) -> None:
+        state_path = local_dir / self.SYNC_STATE_FILE
+        tmp_path = state_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state, indent=2))
+        os.replace(tmp_path, state_path)
+
+    def _full_scan(self, folder_id: str, file_extension: str) -> dict:
+        """List the whole folder tree and start a new changes feed."""
+        # Take the token first so changes made during the listing aren't missed
+        page_token = self.service.changes().getStartPageToken(supportsAllDrives=True).execute()["startPageToken"]
+
+        folders = [folder_id]
+        files: dict[str, dict] = {}
+        index = 0
+        while index < len(folders):
+            for item in self.list_files_in_folder(folders[index], recursive=False):
+                if item["mimeType"] == self.FOLDER_MIME_TYPE:
+                    folders.append(item["id"])
+                elif item["name"].endswith(file_extension):
+                    files[item["id"]] = self._file_record(item)
+            index += 1
+
+        logger.info(f"Full Drive listing: {len(files)} {file_extension} files in {len(folders)} folders")
+        return {"folder_id": folder_id, "page_token": page_token, "folders": folders, "files": files}
+
+    def _apply_changes(self, state: dict, file_extension: str) -> None:
+        """Fold the changes feed since state["page_token"] into the state."""
+        root = state["folder_id"]
+        folders = set(state.get("folders", [])) | {root}
+        files = state.setdefault("files", {})
+        page_token = state["page_token"]
+        changed = 0
+
+        while page_token:
+            response = self.service.changes().list(
+                pageToken=page_token,
+                pageSize=1000,
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({self.FILE_FIELDS}))",
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True,
+            ).execute()
 
-        logger.info(f"Synced {len(downloaded_paths)} files to {local_dir}")
-        return downloaded_paths
+            for change in response.get("changes", []):
+                file_id = change.get("fileId")
+                if file_id == root:
+                    # The synced folder itself (renamed, shared, ...); its parents are outside the tree
+                    continue
+
+                item = change.get("file") or {}
+                in_tree = bool(folders.intersection(item.get("parents", [])))
+
+                if change.get("removed") or item.get("trashed") or not in_tree:
+                    # Deleted, trashed or moved out of the synced tree (only matters if tracked)
+                    if files.pop(file_id, None) is not None:
+                        changed += 1
+                    folders.discard(file_id)
+                    continue
+
+                if item.get("mimeType") == self.FOLDER_MIME_TYPE:
+                    if file_id not in folders:
+                        # A folder moved into the tree: its children produce no changes of their own
+                        folders.add(file_id)
+                        for child in self.list_files_in_folder(file_id, recursive=True):
+                            if child["name"].endswith(file_extension):
+                                files[child["id"]] = self._file_record(child)
+                                changed += 1
+                    continue
+
+                if item.get("name", "").endswith(file_extension):
+                    files[file_id] = self._file_record(item)
+                    changed += 1
+
+            if response.get("newStartPageToken"):
+                state["page_token"] = response["newStartPageToken"]
+                break
+            page_token = response.get("nextPageToken")
+
+        state["folders"] = sorted(folders)
+        logger.info(f"Drive changes feed: {changed} relevant changes")
+
+    @staticmethod
+    def _file_record(item: dict) -> dict:
+        return {
+            "id": item["id"],
+            "name": item["name"],
+            "modifiedTime": item.get("modifiedTime"),
+            "md5Checksum": item.get("md5Checksum"),
+        }
 
     def upload_file(self, file_path: Path, folder_id: str, filename: Optional[str] = None) -> Optional[str]:
         """
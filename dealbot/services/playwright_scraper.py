@@ -1,12 +1,74 @@
 """Playwright-based Amazon scraper for fallback image/price extraction."""
 
+import asyncio
 import logging
 import re
-from dataclasses import dataclass
-from typing import Optional
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from ..storage.product_cache import ProductCache
 
 logger = logging.getLogger(__name__)
 
+DOMAIN_MAP = {
+    "es": "amazon.es",
+    "uk": "amazon.co.uk",
+    "us": "amazon.com",
+    "de": "amazon.de",
+    "fr": "amazon.fr",
+    "it": "amazon.it",
+}
+
+# Browser locale and timezone per marketplace
+LOCALE_MAP = {
+    "es": ("es-ES", "Europe/Madrid"),
+    "uk": ("en-GB", "Europe/London"),
+    "us": ("en-US", "America/New_York"),
+    "de": ("de-DE", "Europe/Berlin"),
+    "fr": ("fr-FR", "Europe/Paris"),
+    "it": ("it-IT", "Europe/Rome"),
+}
+
+# Selectors read by the extractors (fast mode waits on these instead of sleeping)
+IMAGE_SELECTORS = ["#landingImage", "#imgBlkFront", "#main-image", ".a-dynamic-image"]
+CURRENT_PRICE_SELECTORS = [
+    ".a-price .a-offscreen",
+    "#priceblock_ourprice",
+    "#priceblock_dealprice",
+    ".a-price-whole",
+    "#corePrice_feature_div .a-offscreen",
+]
+LIST_PRICE_SELECTORS = [
+    ".basisPrice .a-offscreen",
+    ".a-text-price .a-offscreen",
+    "#priceblock_saleprice",
+    ".a-price.a-text-price .a-offscreen",
+    "[data-a-strike='true'] .a-offscreen",
+]
+DELIVERY_SELECTORS = [
+    "#mir-layout-DELIVERY_BLOCK",
+    "#deliveryMessageMirId",
+    "#deliveryBlockMessage",
+    "[data-csa-c-delivery-price]",
+]
+
+# Fast mode: request types the extractors never need
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+BLOCKED_HOST_FRAGMENTS = (
+    "amazon-adsystem.com",
+    "fls-eu.amazon",
+    "fls-na.amazon",
+    "unagi.amazon",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "/uedata",
+    "/csm/",
+)
+
 
 @dataclass
 class PlaywrightProductInfo:
@@ -25,7 +87,15 @@ class PlaywrightProductInfo:
 class PlaywrightScraper:
     """Fallback scraper using Playwright with stealth for Amazon product pages."""
 
-    def __init__(self):
+    def __init__(self, fast_mode: bool = False):
+        """
+        Initialize scraper.
+
+        Args:
+            fast_mode: Block images/media/fonts/CSS/trackers and wait on the
+                extractor selectors instead of a fixed 3s settle time
+        """
+        self.fast_mode = fast_mode
         self._browser = None
         self._context = None
         self._playwright = None
@@ -40,15 +110,7 @@ class PlaywrightScraper:
             self._browser = await self._playwright.chromium.launch(headless=True)
 
             # Set locale based on marketplace
-            locale_map = {
-                "es": ("es-ES", "Europe/Madrid"),
-                "uk": ("en-GB", "Europe/London"),
-                "us": ("en-US", "America/New_York"),
-                "de": ("de-DE", "Europe/Berlin"),
-                "fr": ("fr-FR", "Europe/Paris"),
-                "it": ("it-IT", "Europe/Rome"),
-            }
-            locale, timezone = locale_map.get(marketplace, ("es-ES", "Europe/Madrid"))
+            locale, timezone = LOCALE_MAP.get(marketplace, ("es-ES", "Europe/Madrid"))
 
             self._context = await self._browser.new_context(
                 viewport={"width": 1920, "height": 1080},
@@ -60,8 +122,45 @@ class PlaywrightScraper:
             stealth = Stealth()
             await stealth.apply_stealth_async(self._context)
 
+            if self.fast_mode:
+                await self._context.route("**/*", self._route_request)
+
         return self._context
 
+    @staticmethod
+    def should_block(resource_type: str, url: str) -> bool:
+        """True if fast mode should abort this request."""
+        if resource_type in BLOCKED_RESOURCE_TYPES:
+            return True
+        return any(fragment in url for fragment in BLOCKED_HOST_FRAGMENTS)
+
+    async def _route_request(self, route) -> None:
+        """Abort requests the extractors don't need (fast mode only)."""
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _wait_for_content(self, page) -> None:
+        """Wait until the nodes the extractors read are in the DOM."""
+        if not self.fast_mode:
+            await page.wait_for_timeout(3000)  # Let page settle and load images
+            return
+
+        async def wait(selectors: list[str], timeout: int) -> None:
+            try:
+                await page.wait_for_selector(", ".join(selectors), state="attached", timeout=timeout)
+            except Exception:
+                pass  # Extractors fall back to what is there
+
+        # Image and price blocks are server-rendered; delivery can arrive a bit later
+        await asyncio.gather(
+            wait(IMAGE_SELECTORS, 10000),
+            wait(CURRENT_PRICE_SELECTORS, 10000),
+            wait(DELIVERY_SELECTORS, 5000),
+        )
+
     async def scrape_product(self, asin: str, marketplace: str = "es") -> PlaywrightProductInfo:
         """
         Scrape Amazon product page for image and price info.
@@ -73,58 +172,13 @@ class PlaywrightScraper:
         Returns:
             PlaywrightProductInfo with scraped data
         """
-        domain_map = {
-            "es": "amazon.es",
-            "uk": "amazon.co.uk",
-            "us": "amazon.com",
-            "de": "amazon.de",
-            "fr": "amazon.fr",
-            "it": "amazon.it",
-        }
-        domain = domain_map.get(marketplace, "amazon.es")
-        url = f"https://www.{domain}/dp/{asin}"
-
-        logger.info(f"🎭 Playwright scraping: {url}")
-
         try:
             context = await self._ensure_browser(marketplace)
             page = await context.new_page()
-
-            # Increased timeout from 30s to 90s to handle slow Amazon responses
-            # Using "domcontentloaded" instead of "networkidle" for faster loading
-            await page.goto(url, wait_until="domcontentloaded", timeout=90000)
-            await page.wait_for_timeout(3000)  # Let page settle and load images
-
-            # Extract image URL
-            image_url = await self._extract_image(page)
-
-            # Extract prices
-            current_price, list_price, discount_pct = await self._extract_prices(page)
-
-            # Extract delivery costs
-            delivery_cost, has_mandatory_delivery = await self._extract_delivery_cost(page)
-
-            await page.close()
-
-            # Log findings
-            if image_url:
-                logger.info(f"✅ Playwright found image for {asin}: {image_url[:60]}...")
-            else:
-                logger.warning(f"❌ Playwright could not find image for {asin}")
-
-            if has_mandatory_delivery:
-                logger.warning(f"⚠️ Mandatory delivery cost €{delivery_cost} for {asin}")
-
-            return PlaywrightProductInfo(
-                asin=asin,
-                image_url=image_url,
-                current_price=current_price,
-                list_price=list_price,
-                discount_pct=discount_pct,
-                delivery_cost=delivery_cost,
-                has_mandatory_delivery=has_mandatory_delivery,
-                success=image_url is not None
-            )
+            try:
+                return await self._scrape_page(page, asin, marketplace)
+            finally:
+                await page.close()
 
         except Exception as e:
             logger.error(f"Playwright scrape error for {asin}: {e}")
@@ -134,6 +188,47 @@ class PlaywrightScraper:
                 success=False
             )
 
+    async def _scrape_page(self, page, asin: str, marketplace: str) -> PlaywrightProductInfo:
+        """Load the product page in an open page and extract image, prices and delivery."""
+        domain = DOMAIN_MAP.get(marketplace, "amazon.es")
+        url = f"https://www.{domain}/dp/{asin}"
+
+        logger.info(f"🎭 Playwright scraping: {url}")
+
+        # Increased timeout from 30s to 90s to handle slow Amazon responses
+        # Using "domcontentloaded" instead of "networkidle" for faster loading
+        await page.goto(url, wait_until="domcontentloaded", timeout=90000)
+        await self._wait_for_content(page)
+
+        # Extract image URL
+        image_url = await self._extract_image(page)
+
+        # Extract prices
+        current_price, list_price, discount_pct = await self._extract_prices(page)
+
+        # Extract delivery costs
+        delivery_cost, has_mandatory_delivery = await self._extract_delivery_cost(page)
+
+        # Log findings
+        if image_url:
+            logger.info(f"✅ Playwright found image for {asin}: {image_url[:60]}...")
+        else:
+            logger.warning(f"❌ Playwright could not find image for {asin}")
+
+        if has_mandatory_delivery:
+            logger.warning(f"⚠️ Mandatory delivery cost €{delivery_cost} for {asin}")
+
+        return PlaywrightProductInfo(
+            asin=asin,
+            image_url=image_url,
+            current_price=current_price,
+            list_price=list_price,
+            discount_pct=discount_pct,
+            delivery_cost=delivery_cost,
+            has_mandatory_delivery=has_mandatory_delivery,
+            success=image_url is not None
+        )
+
     async def _extract_image(self, page) -> Optional[str]:
         """Extract main product image URL."""
         # Primary selector - landing image
@@ -148,7 +243,7 @@ class PlaywrightScraper:
                 return src
 
         # Alternative selectors
-        for selector in ["#imgBlkFront", "#main-image", ".a-dynamic-image"]:
+        for selector in IMAGE_SELECTORS[1:]:
             try:
                 element = await page.query_selector(selector)
                 if element:
@@ -182,15 +277,7 @@ class PlaywrightScraper:
         discount_pct = None
 
         # Current price - try multiple selectors
-        current_price_selectors = [
-            ".a-price .a-offscreen",
-            "#priceblock_ourprice",
-            "#priceblock_dealprice",
-            ".a-price-whole",
-            "#corePrice_feature_div .a-offscreen",
-        ]
-
-        for selector in current_price_selectors:
+        for selector in CURRENT_PRICE_SELECTORS:
             price_el = await page.query_selector(selector)
             if price_el:
                 text = await price_el.text_content()
@@ -200,15 +287,7 @@ class PlaywrightScraper:
                     break
 
         # List price (PVP) - try multiple selectors
-        list_price_selectors = [
-            ".basisPrice .a-offscreen",
-            ".a-text-price .a-offscreen",
-            "#priceblock_saleprice",
-            ".a-price.a-text-price .a-offscreen",
-            "[data-a-strike='true'] .a-offscreen",
-        ]
-
-        for selector in list_price_selectors:
+        for selector in LIST_PRICE_SELECTORS:
             list_el = await page.query_selector(selector)
             if list_el:
                 text = await list_el.text_content()
@@ -252,14 +331,7 @@ class PlaywrightScraper:
 
         try:
             # Check delivery message block
-            delivery_selectors = [
-                "#mir-layout-DELIVERY_BLOCK",
-                "#deliveryMessageMirId",
-                "#deliveryBlockMessage",
-                "[data-csa-c-delivery-price]",
-            ]
-
-            for selector in delivery_selectors:
+            for selector in DELIVERY_SELECTORS:
                 el = await page.query_selector(selector)
                 if el:
                     text = await el.text_content()
@@ -312,7 +384,196 @@ class PlaywrightScraper:
             await self._playwright.stop()
 
 
-def scrape_product_sync(asin: str, marketplace: str = "es", max_retries: int = 2) -> PlaywrightProductInfo:
+class PlaywrightBrowserPool(PlaywrightScraper):
+    """
+    Long-lived browser shared by all fallback scrapes.
+
+    One Chromium process is launched on first use and kept for the lifetime of
+    the pool. Each marketplace gets its own warm stealth context (locale and
+    timezone), pages are reused between scrapes, and at most `max_pages`
+    scrapes run at once. All Playwright work happens on a private event loop
+    thread, so the sync methods can be called from any worker thread.
+    """
+
+    def __init__(self, max_pages: int = 4, fast_mode: bool = False):
+        super().__init__(fast_mode=fast_mode)
+        self.max_pages = max(1, max_pages)
+        self._contexts: dict = {}  # marketplace -> BrowserContext
+        self._idle_pages: dict = {}  # marketplace -> [Page]
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self.launch_count = 0
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop thread if needed."""
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="playwright-pool", daemon=True
+                )
+                self._thread.start()
+        return self._loop
+
+    async def _launch_browser(self):
+        """Start Playwright and launch Chromium."""
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(headless=True)
+
+    async def _new_context(self, marketplace: str):
+        """Create a stealth context with the marketplace's locale."""
+        from playwright_stealth import Stealth
+
+        locale, timezone = LOCALE_MAP.get(marketplace, ("es-ES", "Europe/Madrid"))
+        context = await self._browser.new_context(
+            viewport={"width": 1920, "height": 1080},
+            locale=locale,
+            timezone_id=timezone,
+        )
+        await Stealth().apply_stealth_async(context)
+        if self.fast_mode:
+            await context.route("**/*", self._route_request)
+        return context
+
+    async def _ensure_browser(self, marketplace: str = "es"):
+        """Return the warm context for a marketplace, launching Chromium once."""
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+
+        async with self._launch_lock:
+            if self._browser is not None and not self._browser.is_connected():
+                logger.warning("🎭 Playwright browser disconnected, relaunching")
+                await self._reset()
+
+            if self._browser is None:
+                self._browser = await self._launch_browser()
+                self.launch_count += 1
+                logger.info("🎭 Playwright browser launched")
+
+            if marketplace not in self._contexts:
+                self._contexts[marketplace] = await self._new_context(marketplace)
+                self._idle_pages[marketplace] = []
+
+        return self._contexts[marketplace]
+
+    async def _reset(self) -> None:
+        """Forget (and best-effort close) the browser and everything opened in it."""
+        for context in self._contexts.values():
+            try:
+                await context.close()
+            except Exception:
+                pass
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        if self._playwright:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._contexts = {}
+        self._idle_pages = {}
+        self._browser = None
+        self._playwright = None
+
+    async def scrape_product(self, asin: str, marketplace: str = "es") -> PlaywrightProductInfo:
+        """Scrape one product using a pooled page (waits for a free slot)."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pages)
+
+        async with self._semaphore:
+            page = None
+            try:
+                context = await self._ensure_browser(marketplace)
+                idle = self._idle_pages[marketplace]
+                page = idle.pop() if idle else await context.new_page()
+
+                result = await self._scrape_page(page, asin, marketplace)
+
+                # Keep the page warm for the next scrape in this marketplace
+                self._idle_pages.setdefault(marketplace, []).append(page)
+                return result
+
+            except Exception as e:
+                logger.error(f"Playwright scrape error for {asin}: {e}")
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                return PlaywrightProductInfo(asin=asin, error=str(e), success=False)
+
+    async def scrape_products(self, asins: list[str], marketplace: str = "es") -> dict[str, PlaywrightProductInfo]:
+        """Scrape many products concurrently (bounded by max_pages)."""
+        results = await asyncio.gather(*(self.scrape_product(asin, marketplace) for asin in asins))
+        return {result.asin: result for result in results}
+
+    def scrape_sync(self, asin: str, marketplace: str = "es", timeout: float = 180) -> PlaywrightProductInfo:
+        """Blocking scrape of one product from any thread."""
+        future = asyncio.run_coroutine_threadsafe(self.scrape_product(asin, marketplace), self._ensure_loop())
+        return future.result(timeout=timeout)
+
+    def scrape_many_sync(
+        self, asins: list[str], marketplace: str = "es", timeout: float = 600
+    ) -> dict[str, PlaywrightProductInfo]:
+        """Blocking concurrent scrape of many products from any thread."""
+        future = asyncio.run_coroutine_threadsafe(self.scrape_products(asins, marketplace), self._ensure_loop())
+        return future.result(timeout=timeout)
+
+    async def close(self):
+        """Close pages, contexts, browser and Playwright."""
+        await self._reset()
+
+    def shutdown(self) -> None:
+        """Close the browser and stop the event loop thread."""
+        with self._thread_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+
+        if loop is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self.close(), loop).result(timeout=30)
+        except Exception as e:
+            logger.warning(f"Error closing Playwright browser: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        if thread:
+            thread.join(timeout=5)
+        loop.close()
+        self._semaphore = None
+        self._launch_lock = None
+        logger.info("🎭 Playwright browser pool shut down")
+
+
+_default_pool: Optional[PlaywrightBrowserPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> PlaywrightBrowserPool:
+    """Get the process-wide browser pool used when callers don't pass their own."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = PlaywrightBrowserPool()
+        return _default_pool
+
+
+def scrape_product_sync(
+    asin: str,
+    marketplace: str = "es",
+    max_retries: int = 2,
+    cache: Optional["ProductCache"] = None,
+    pool: Optional[PlaywrightBrowserPool] = None,
+) -> PlaywrightProductInfo:
     """
     Synchronous wrapper for scrape_product with retry logic.
 
@@ -320,21 +581,23 @@ def scrape_product_sync(asin: str, marketplace: str = "es", max_retries: int = 2
         asin: Amazon product ASIN
         marketplace: Amazon marketplace
         max_retries: Maximum number of retry attempts (default 2 = 3 total attempts)
+        cache: Optional persistent product cache (successful scrapes are stored)
+        pool: Browser pool to scrape with (defaults to the shared process-wide pool)
     """
-    import asyncio
-    import time
+    if cache:
+        cached = cache.get(marketplace, asin, "playwright")
+        if cached:
+            logger.info(f"Using cached Playwright data for {asin}")
+            return PlaywrightProductInfo(**cached)
 
-    async def _scrape():
-        scraper = PlaywrightScraper()
-        try:
-            return await scraper.scrape_product(asin, marketplace)
-        finally:
-            await scraper.close()
+    pool = pool or get_browser_pool()
 
     # Retry logic for handling transient failures
     for attempt in range(max_retries + 1):
         try:
-            result = asyncio.run(_scrape())
+            result = pool.scrape_sync(asin, marketplace)
+            if result.success and cache:
+                _cache_result(cache, marketplace, result)
             if result.success or attempt == max_retries:
                 return result
             # Retry if failed (but not on last attempt)
@@ -348,3 +611,43 @@ def scrape_product_sync(asin: str, marketplace: str = "es", max_retries: int = 2
             time.sleep(2 * (attempt + 1))
 
     return PlaywrightProductInfo(asin=asin, error="Max retries exceeded", success=False)
+
+
+def scrape_products_sync(
+    asins: list[str],
+    marketplace: str = "es",
+    cache: Optional["ProductCache"] = None,
+    pool: Optional[PlaywrightBrowserPool] = None,
+) -> dict[str, PlaywrightProductInfo]:
+    """
+    Scrape many products concurrently on the pooled browser.
+
+    Args:
+        asins: Amazon product ASINs
+        marketplace: Amazon marketplace
+        cache: Optional persistent product cache (hits are not scraped)
+        pool: Browser pool to scrape with (defaults to the shared process-wide pool)
+
+    Returns:
+        Dict mapping ASIN to PlaywrightProductInfo
+    """
+    results: dict[str, PlaywrightProductInfo] = {}
+    if cache:
+        for asin, payload in cache.get_many(marketplace, asins, "playwright").items():
+            results[asin] = PlaywrightProductInfo(**payload)
+
+    pending = [asin for asin in dict.fromkeys(asins) if asin not in results]
+    if pending:
+        pool = pool or get_browser_pool()
+        scraped = pool.scrape_many_sync(pending, marketplace)
+        for asin, result in scraped.items():
+            if result.success and cache:
+                _cache_result(cache, marketplace, result)
+        results.update(scraped)
+
+    return results
+
+
+def _cache_result(cache: "ProductCache", marketplace: str, result: PlaywrightProductInfo) -> None:
+    cache.put(marketplace, result.asin, "playwright", asdict(result))
+    cache.remember_media(marketplace, result.asin, result.image_url)
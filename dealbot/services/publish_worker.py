@@ -0,0 +1,182 @@
+"""Background worker that sends queued outbox messages to WhatsApp."""
+
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Optional
+
+from ..models import PublishResult
+from ..storage.outbox import Outbox, OutboxMessage
+from ..utils.logging import get_logger
+from ..utils.rate_limit import ServiceLimiter
+from .whapi import WhapiService
+
+logger = get_logger(__name__)
+
+
+class PublishWorker:
+    """Drains the publish outbox one message at a time at a configurable pace.
+
+    The pipeline only enqueues (see DealController.enqueue_deal()), so
+    enrichment never waits on WhatsApp. Long-running processes start() the
+    worker thread; one-shot runs call drain() before exiting, and anything
+    still pending (e.g. waiting out a retry backoff) goes out on the next run.
+    """
+
+    # Longest idle sleep; notify() wakes the worker earlier when a message is queued
+    IDLE_SECONDS = 30.0
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        whapi: WhapiService,
+        limiter: Optional[ServiceLimiter] = None,
+        interval_seconds: float = 0.0,
+    ) -> None:
+        """
+        Initialize worker.
+
+        Args:
+            outbox: Queue to drain
+            whapi: WhatsApp client (idempotent per deal and JID)
+            limiter: Optional Whapi limiter shared with other senders
+            interval_seconds: Minimum pause between messages
+        """
+        self.outbox = outbox
+        self.whapi = whapi
+        self.limiter = limiter
+        self.interval_seconds = interval_seconds
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # One send at a time, whether from the worker thread or publish_now()
+        self._send_lock = threading.Lock()
+        self._last_send = 0.0
+
+    def start(self) -> None:
+        """Recover interrupted sends and start the background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        recovered = self.outbox.recover()
+        if recovered:
+            logger.info(f"📬 Resuming {recovered} interrupted send(s) from the outbox")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="publish-worker", daemon=True)
+        self._thread.start()
+        logger.info("Publish worker started")
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stop the background thread after the message in flight (if any)."""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info("Publish worker stopped")
+
+    def notify(self) -> None:
+        """Wake the worker (a message was queued)."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                sent = self.process_next() is not None
+            except Exception as e:
+                logger.error(f"Publish worker error: {e}", exc_info=True)
+                sent = False
+            if not sent:
+                self._wake.wait(self._idle_wait())
+                self._wake.clear()
+
+    def _idle_wait(self) -> float:
+        """Seconds until the next pending message is due (capped at IDLE_SECONDS)."""
+        due = self.outbox.next_due()
+        if due is None:
+            return self.IDLE_SECONDS
+        return min(self.IDLE_SECONDS, max(0.0, (due - datetime.now()).total_seconds()))
+
+    def process_next(self, deal_id: Optional[str] = None) -> Optional[PublishResult]:
+        """
+        Claim and send one message.
+
+        Args:
+            deal_id: Send this deal's message (due or not) instead of the oldest due one
+
+        Returns:
+            The send result, or None if there was nothing to send
+        """
+        claimed = self.outbox.claim(limit=1, deal_id=deal_id)
+        if not claimed:
+            return None
+        return self._send(claimed[0])
+
+    def _send(self, message: OutboxMessage) -> PublishResult:
+        with self._send_lock:
+            self._pace()
+            try:
+                with self.limiter.slot() if self.limiter else nullcontext():
+                    result = self.whapi.send_message(
+                        message.recipients,
+                        message.message,
+                        message.deal_id,
+                        image_url=message.image_url,
+                    )
+            except Exception as e:
+                result = PublishResult(
+                    deal_id=message.deal_id,
+                    success=False,
+                    error=str(e),
+                    destinations=message.recipients,
+                    message_ids={},
+                )
+            self._last_send = time.monotonic()
+
+        # Whapi reports success if any JID got the message; retry the others
+        # (idempotency per deal_id and JID keeps the delivered ones from a re-send)
+        missing = [jid for jid in message.recipients if jid not in result.message_ids]
+        last_attempt = message.attempts + 1 >= self.outbox.max_attempts
+        error = result.error or "Send failed"
+        if result.success and missing:
+            error = f"Not delivered to {', '.join(missing)}: {error}"
+
+        if result.success and (not missing or last_attempt):
+            self.outbox.mark_sent(message, result)
+            if missing:
+                logger.error(f"❌ Giving up on {message.deal_id} for {', '.join(missing)} after {message.attempts + 1} attempts")
+            logger.info(f"Deal published successfully: {message.deal_id}")
+        elif self.outbox.mark_failed(message, error):
+            logger.warning(f"⚠️ Publishing {message.deal_id} failed (attempt {message.attempts + 1}), will retry: {error}")
+        else:
+            logger.error(f"❌ Giving up on {message.deal_id} after {message.attempts + 1} attempts: {error}")
+        return result
+
+    def _pace(self) -> None:
+        """Keep interval_seconds between sends (cut short by stop())."""
+        wait = self.interval_seconds - (time.monotonic() - self._last_send)
+        if wait > 0:
+            self._stop.wait(wait)
+
+    def drain(self, max_messages: Optional[int] = None) -> int:
+        """
+        Send due messages on the calling thread until none are left.
+
+        Args:
+            max_messages: Stop after this many sends
+
+        Returns:
+            Number of messages processed (sent or failed)
+        """
+        count = 0
+        while max_messages is None or count < max_messages:
+            if self.process_next() is None:
+                break
+            count += 1
+        return count
+
+    def publish_now(self, deal_id: str) -> Optional[PublishResult]:
+        """Send one deal's queued message right away (interactive publishing)."""
+        return self.process_next(deal_id=deal_id)
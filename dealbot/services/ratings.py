@@ -1,13 +1,17 @@
 """Product ratings service (Keepa, Rainforest, SerpAPI)."""
 
+import math
+import threading
+import time
 from abc import ABC, abstractmethod
 from typing import Optional
 
-import requests
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from ..models import Rating
+from ..storage.product_cache import ProductCache
 from ..utils.config import Config
+from ..utils.http import get_transport
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -21,11 +25,44 @@ class RatingsProvider(ABC):
         """Get product rating for ASIN."""
         pass
 
+    def get_ratings(self, asins: list[str], marketplace: str = "ES") -> dict[str, Rating]:
+        """
+        Get ratings for several ASINs.
+
+        Providers without a multi-ASIN endpoint look them up one by one.
+
+        Args:
+            asins: Product ASINs
+            marketplace: Marketplace code (ES, UK, US)
+
+        Returns:
+            Dict of ASIN -> Rating for the ASINs that have one
+        """
+        ratings: dict[str, Rating] = {}
+        for asin in asins:
+            rating = self.get_rating(asin, marketplace)
+            if rating:
+                ratings[asin] = rating
+        return ratings
+
 
 class KeepaProvider(RatingsProvider):
-    """Keepa API ratings provider."""
+    """Keepa API ratings provider.
+
+    Keepa bills in tokens (one per product) and reports the balance with
+    every response (tokensLeft, refillIn, refillRate), so requests are paced
+    from the last known balance instead of running into HTTP 429.
+    """
 
     API_BASE = "https://api.keepa.com"
+    MAX_ASINS_PER_REQUEST = 100
+    TOKENS_PER_ASIN = 1
+    DEFAULT_MAX_TOKEN_WAIT_SECONDS = 60.0
+    # Keepa domain codes: 1=US, 3=DE, 4=FR, 5=JP, 6=UK, 8=ES, 9=IT
+    DOMAINS = {"ES": 8, "UK": 6, "US": 1}
+    # Indexes into stats.current / csv
+    RATING_INDEX = 16
+    COUNT_REVIEWS_INDEX = 17
 
     def __init__(self, config: Config) -> None:
         """Initialize Keepa provider."""
@@ -33,46 +70,130 @@ class KeepaProvider(RatingsProvider):
         self.api_key = config.env("KEEPA_API_KEY")
         if not self.api_key:
             raise ValueError("KEEPA_API_KEY not set in environment")
+        self.max_token_wait = float(
+            config.get("ratings.max_token_wait_seconds", self.DEFAULT_MAX_TOKEN_WAIT_SECONDS)
+        )
+
+        # Token balance from the last response (None = unknown, just try)
+        self._token_lock = threading.Lock()
+        self._tokens_left: Optional[int] = None
+        self._refill_rate: Optional[float] = None  # Tokens added per refill (once a minute)
+        self._refill_at = 0.0  # time.monotonic() of the next refill
 
-    @retry(
-        stop=stop_after_attempt(2),
-        wait=wait_exponential(multiplier=1, min=2, max=5),
-        reraise=False,
-    )
     def get_rating(self, asin: str, marketplace: str = "ES") -> Optional[Rating]:
         """Get rating from Keepa API."""
-        # Keepa domain codes: 1=US, 3=DE, 4=FR, 5=JP, 6=UK, 8=ES, 9=IT
-        domain_map = {"ES": 8, "UK": 6, "US": 1}
-        domain = domain_map.get(marketplace, 8)
-
-        try:
-            response = requests.get(
-                f"{self.API_BASE}/product",
-                params={"key": self.api_key, "domain": domain, "asin": asin, "stats": 1},
-                timeout=10,
-            )
-
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("products"):
+        return self.get_ratings([asin], marketplace).get(asin)
+
+    def get_ratings(self, asins: list[str], marketplace: str = "ES") -> dict[str, Rating]:
+        """Get ratings from Keepa, up to MAX_ASINS_PER_REQUEST ASINs per /product request."""
+        domain = self.DOMAINS.get(marketplace, 8)
+        asins = list(dict.fromkeys(a for a in asins if a))
+        ratings: dict[str, Rating] = {}
+
+        for start in range(0, len(asins), self.MAX_ASINS_PER_REQUEST):
+            chunk = asins[start:start + self.MAX_ASINS_PER_REQUEST]
+            products = self._fetch_products(chunk, domain)
+            if products is None:
+                logger.warning(f"Keepa: skipping ratings for {len(asins) - start} ASIN(s)")
+                break
+            for product in products:
+                rating = self._parse_product(product)
+                if rating and product.get("asin") in chunk:
+                    ratings[product["asin"]] = rating
+
+        logger.info(f"Keepa: {len(ratings)}/{len(asins)} ratings in {-(-len(asins) // self.MAX_ASINS_PER_REQUEST)} request(s)")
+        return ratings
+
+    def _fetch_products(self, asins: list[str], domain: int) -> Optional[list[dict]]:
+        """One /product request (retried once after a 429). None if out of tokens or failed."""
+        for attempt in range(2):
+            if not self._wait_for_tokens(len(asins) * self.TOKENS_PER_ASIN):
                 return None
 
-            product = data["products"][0]
-            rating_value = product.get("csv", [None] * 17)[16]  # Rating is at index 16
-
-            if rating_value and rating_value != -1:
-                rating_value = rating_value / 10  # Keepa stores ratings * 10
-                # Keepa doesn't provide review count in basic endpoint
-                return Rating(
-                    value=rating_value, count=0, stars=Rating.render_stars(rating_value)
+            try:
+                response = get_transport().get(
+                    f"{self.API_BASE}/product",
+                    "ratings",
+                    params={"key": self.api_key, "domain": domain, "asin": ",".join(asins), "stats": 1},
                 )
+                data = response.json() if response.content else {}
+            except Exception as e:
+                logger.warning(f"Keepa API error for {len(asins)} ASIN(s): {e}")
+                return None
+            if not isinstance(data, dict):
+                data = {}
+
+            self._update_tokens(data)
+            if response.status_code == 429 and attempt == 0:
+                logger.warning(f"Keepa out of tokens ({self._tokens_left} left), waiting for refill")
+                continue
+            if not response.ok:
+                logger.warning(f"Keepa API error for {len(asins)} ASIN(s): HTTP {response.status_code}")
+                return None
+            return data.get("products") or []
+        return None
 
+    def _update_tokens(self, data: dict) -> None:
+        """Remember the token balance reported in a response."""
+        if not isinstance(data, dict):
+            return
+        with self._token_lock:
+            if isinstance(data.get("tokensLeft"), int):
+                self._tokens_left = data["tokensLeft"]
+            if data.get("refillRate"):
+                self._refill_rate = float(data["refillRate"])
+            if data.get("refillIn") is not None:
+                self._refill_at = time.monotonic() + data["refillIn"] / 1000
+
+    def _wait_for_tokens(self, needed: int) -> bool:
+        """
+        Sleep until the balance should cover a request.
+
+        Returns:
+            False if that would take longer than max_token_wait (request skipped)
+        """
+        with self._token_lock:
+            if self._tokens_left is None or self._tokens_left >= needed:
+                return True
+            deficit = needed - self._tokens_left
+            wait = max(0.0, self._refill_at - time.monotonic())
+            if self._refill_rate:
+                # First refill after refillIn, then one per minute
+                wait += (math.ceil(deficit / self._refill_rate) - 1) * 60
+
+        if wait > self.max_token_wait:
+            logger.warning(f"Keepa needs {deficit} more token(s), ~{wait:.0f}s away (max {self.max_token_wait:.0f}s)")
+            return False
+
+        logger.info(f"⏳ Keepa pacing: waiting {wait:.1f}s for {deficit} token(s)")
+        time.sleep(wait)
+        with self._token_lock:
+            # The refill we waited for should have arrived; the next response reports the real balance
+            self._tokens_left = None
+        return True
+
+    @classmethod
+    def _parse_product(cls, product: dict) -> Optional[Rating]:
+        """Rating from a product's stats (current values), falling back to the csv history."""
+        current = (product.get("stats") or {}).get("current") or []
+        value = current[cls.RATING_INDEX] if len(current) > cls.RATING_INDEX else None
+        count = current[cls.COUNT_REVIEWS_INDEX] if len(current) > cls.COUNT_REVIEWS_INDEX else None
+
+        if value is None or value < 0:
+            # csv series are flat [time, value, time, value, ...] lists
+            csv = product.get("csv") or []
+            history = csv[cls.RATING_INDEX] if len(csv) > cls.RATING_INDEX else None
+            value = history[-1] if history else None
+
+        if not value or value < 0:
             return None
 
-        except Exception as e:
-            logger.warning(f"Keepa API error for {asin}: {e}")
-            return None
+        rating_value = value / 10  # Keepa stores ratings * 10
+        return Rating(
+            value=rating_value,
+            count=count if count and count > 0 else 0,
+            stars=Rating.render_stars(rating_value),
+        )
 
 
 class RainforestProvider(RatingsProvider):
@@ -95,15 +216,15 @@ class RainforestProvider(RatingsProvider):
     def get_rating(self, asin: str, marketplace: str = "ES") -> Optional[Rating]:
         """Get rating from Rainforest API."""
         try:
-            response = requests.get(
+            response = get_transport().get(
                 self.API_BASE,
+                "ratings",
                 params={
                     "api_key": self.api_key,
                     "type": "product",
                     "asin": asin,
                     "amazon_domain": f"amazon.{marketplace.lower()}",
                 },
-                timeout=10,
             )
 
             response.raise_for_status()
@@ -145,15 +266,15 @@ class SerpAPIProvider(RatingsProvider):
     def get_rating(self, asin: str, marketplace: str = "ES") -> Optional[Rating]:
         """Get rating from SerpAPI."""
         try:
-            response = requests.get(
+            response = get_transport().get(
                 self.API_BASE,
+                "ratings",
                 params={
                     "api_key": self.api_key,
                     "engine": "amazon_product",
                     "asin": asin,
                     "amazon_domain": f"amazon.{marketplace.lower()}",
                 },
-                timeout=10,
             )
 
             response.raise_for_status()
@@ -178,9 +299,10 @@ class SerpAPIProvider(RatingsProvider):
 class RatingsService:
     """Ratings service manager."""
 
-    def __init__(self, config: Config) -> None:
+    def __init__(self, config: Config, cache: Optional[ProductCache] = None) -> None:
         """Initialize ratings service."""
         self.config = config
+        self.cache = cache
         self.enabled = config.ratings_enabled
 
         if not self.enabled:
@@ -207,11 +329,43 @@ class RatingsService:
 
     def get_rating(self, asin: str, marketplace: str = "ES") -> Optional[Rating]:
         """Get product rating."""
-        if not self.enabled or not self.provider:
-            return None
+        return self.get_ratings([asin], marketplace).get(asin)
+
+    def get_ratings(self, asins: list[str], marketplace: str = "ES") -> dict[str, Rating]:
+        """
+        Get ratings for a batch of ASINs: cached ones from the product cache, the rest in one provider call.
+
+        Args:
+            asins: Product ASINs
+            marketplace: Marketplace code (ES, UK, US)
+
+        Returns:
+            Dict of ASIN -> Rating for the ASINs that have one
+        """
+        asins = list(dict.fromkeys(a for a in asins if a))
+        if not self.enabled or not self.provider or not asins:
+            return {}
+
+        ratings: dict[str, Rating] = {}
+        if self.cache:
+            for asin, cached in self.cache.get_many(marketplace, asins, "ratings").items():
+                ratings[asin] = Rating.model_validate(cached)
+            if ratings:
+                logger.info(f"Using cached ratings for {len(ratings)}/{len(asins)} ASINs")
+
+        missing = [asin for asin in asins if asin not in ratings]
+        if not missing:
+            return ratings
 
         try:
-            return self.provider.get_rating(asin, marketplace)
+            fetched = self.provider.get_ratings(missing, marketplace)
         except Exception as e:
-            logger.warning(f"Failed to fetch rating for {asin}: {e}")
-            return None
+            logger.warning(f"Failed to fetch ratings for {len(missing)} ASINs: {e}")
+            return ratings
+
+        if self.cache:
+            self.cache.put_many(
+                marketplace, "ratings", {asin: rating.model_dump(mode="json") for asin, rating in fetched.items()}
+            )
+        ratings.update(fetched)
+        return ratings
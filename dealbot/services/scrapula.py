@@ -5,8 +5,14 @@ import requests
 import time
 import openpyxl
 import io
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from typing import Optional, List, Dict
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+
+from ..storage.product_cache import ProductCache
+from ..utils.http import get_transport
+from ..utils.rate_limit import ServiceLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -28,21 +34,72 @@ class ScrapulaProductInfo:
     error: Optional[str] = None
 
 
+class ScrapulaJob:
+    """Handle for a Scrapula batch running in the background."""
+    
+    def __init__(self, asins: List[str], future: Future):
+        self.asins = set(asins)
+        self._future = future
+    
+    def done(self) -> bool:
+        """True once results (or errors) are available."""
+        return self._future.done()
+    
+    def result(self, timeout: Optional[float] = None) -> Dict[str, ScrapulaProductInfo]:
+        """
+        Wait for the batch and return all results.
+        
+        Returns an empty dict if the wait times out (the task keeps running).
+        """
+        try:
+            return self._future.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.warning(f"Still waiting for Scrapula batch after {timeout}s")
+            return {}
+        except Exception as e:
+            logger.error(f"Scrapula batch failed: {e}")
+            return {
+                asin: ScrapulaProductInfo(asin=asin, error=str(e), success=False)
+                for asin in self.asins
+            }
+    
+    def get(self, asin: str, timeout: Optional[float] = None) -> Optional[ScrapulaProductInfo]:
+        """Wait (only if needed) for one ASIN's result."""
+        if asin not in self.asins:
+            return None
+        return self.result(timeout=timeout).get(asin)
+
+
 class ScrapulaService:
     """Service for scraping Amazon product data using Scrapula API."""
     
-    def __init__(self, api_key: str, service_name: str = "amazon_product_service"):
+    def __init__(
+        self,
+        api_key: str,
+        service_name: str = "amazon_product_service",
+        cache: Optional[ProductCache] = None
+    ):
         """
         Initialize Scrapula service.
         
         Args:
             api_key: Scrapula API key
             service_name: Scrapula service name for Amazon scraping
+            cache: Optional persistent product cache
         """
         self.api_key = api_key
+        self.cache = cache
         self.base_url = "https://api.datapipeplatform.cloud"  # Correct working URL
         self.service_name = service_name
         
+        # Completion polling: start at min interval, multiply by backoff up to max
+        self.min_poll_interval = 1.0
+        self.max_poll_interval = 15.0
+        self.poll_backoff = 1.5
+        
+        # Background workers for submitted batches
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="scrapula")
+        
         logger.info(f"ScrapulaService initialized with service: {service_name}")
     
     def get_batch_product_data(
@@ -54,6 +111,8 @@ class ScrapulaService:
         """
         Get product data for multiple ASINs using Scrapula batch API.
         
+        Blocking convenience wrapper around submit_batch().
+        
         Args:
             asins: List of Amazon ASINs
             marketplace: Amazon marketplace (es, us, uk, etc.)
@@ -62,6 +121,69 @@ class ScrapulaService:
         Returns:
             Dict mapping ASIN to ScrapulaProductInfo
         """
+        return self.submit_batch(asins, marketplace, max_wait_seconds).result()
+
+    def submit_batch(
+        self,
+        asins: List[str],
+        marketplace: str = "es",
+        max_wait_seconds: int = 300,
+        limiter: Optional[ServiceLimiter] = None
+    ) -> "ScrapulaJob":
+        """
+        Start a Scrapula batch in the background and return immediately.
+        
+        Cached products are resolved up front; only the remaining ASINs are
+        sent to Scrapula. Call ScrapulaJob.get()/result() when the data is needed.
+        
+        Args:
+            asins: List of Amazon ASINs
+            marketplace: Amazon marketplace (es, us, uk, etc.)
+            max_wait_seconds: Maximum time the task may take before it is abandoned
+            limiter: Optional rate limiter held while the task runs
+            
+        Returns:
+            ScrapulaJob handle
+        """
+        # Serve fresh cached products first and only scrape the rest
+        cached: Dict[str, ScrapulaProductInfo] = {}
+        if self.cache:
+            for asin, payload in self.cache.get_many(marketplace, asins, "scrapula").items():
+                cached[asin] = ScrapulaProductInfo(**payload)
+            if cached:
+                logger.info(f"Scrapula cache served {len(cached)}/{len(asins)} ASINs")
+        pending = [asin for asin in asins if asin not in cached]
+
+        if not pending:
+            future: Future = Future()
+            future.set_result(cached)
+            return ScrapulaJob(asins, future)
+
+        def run() -> Dict[str, ScrapulaProductInfo]:
+            if limiter:
+                with limiter.slot():
+                    products = self._fetch_batch(pending, marketplace, max_wait_seconds)
+            else:
+                products = self._fetch_batch(pending, marketplace, max_wait_seconds)
+
+            if self.cache:
+                for asin, info in products.items():
+                    if info.success:
+                        self.cache.put(marketplace, asin, "scrapula", asdict(info))
+                        self.cache.remember_media(marketplace, asin, info.image_url, info.title)
+
+            return {**cached, **products}
+
+        logger.info(f"Submitting Scrapula batch for {len(pending)} ASINs in the background")
+        return ScrapulaJob(asins, self._executor.submit(run))
+
+    def _fetch_batch(
+        self,
+        asins: List[str],
+        marketplace: str,
+        max_wait_seconds: int
+    ) -> Dict[str, ScrapulaProductInfo]:
+        """Run one Scrapula task for the given ASINs and parse its results."""
         logger.info(f"Fetching batch data for {len(asins)} ASINs from marketplace {marketplace}")
         
         try:
@@ -122,11 +244,11 @@ class ScrapulaService:
         }
         
         try:
-            response = requests.post(
+            response = get_transport().post(
                 f"{self.base_url}/tasks",
+                "scrapula",
                 headers=headers,
-                json=payload,
-                timeout=30
+                json=payload
             )
             
             response.raise_for_status()
@@ -143,60 +265,67 @@ class ScrapulaService:
             return None
     
     def _wait_for_completion(self, task_id: str, max_wait_seconds: int) -> Optional[dict]:
-        """Poll Scrapula task until completion."""
+        """Poll the Scrapula task until completion, backing off between polls."""
         
         headers = {"X-API-KEY": self.api_key}
         start_time = time.time()
-        poll_interval = 5  # Poll every 5 seconds
+        poll_interval = self.min_poll_interval
         
         while time.time() - start_time < max_wait_seconds:
             try:
-                # Use /tasks endpoint with query to get all tasks including completed
-                response = requests.get(
-                    f"{self.base_url}/tasks?limit=50",
-                    headers=headers,
-                    timeout=30
+                response = get_transport().get(
+                    f"{self.base_url}/tasks/{task_id}",
+                    "scrapula",
+                    headers=headers
                 )
                 
-                response.raise_for_status()
-                data = response.json()
+                # Freshly created tasks can take a moment to become visible
+                if response.status_code == 404:
+                    status = None
+                    task = None
+                else:
+                    response.raise_for_status()
+                    data = response.json()
+                    task = data.get("task", data) if isinstance(data, dict) else None
+                    if not task or not task.get("status"):
+                        # Finished tasks come back as {} here; they're only listed in /tasks
+                        task = self._find_in_task_list(task_id, headers)
+                    status = task.get("status") if task else None
                 
-                # Find our task in the list
-                tasks = data.get("tasks", [])
-                our_task = None
-                for task in tasks:
-                    # Match by ui_task_id (short ID from creation response)
-                    if task_id in task.get("id", ""):
-                        our_task = task
-                        break
+                if status == "SUCCESS":
+                    logger.info(f"Scrapula task {task_id} completed successfully")
+                    return task
+                elif status == "FAILURE":
+                    logger.error(f"Scrapula task {task_id} failed")
+                    return None
                 
-                if our_task:
-                    status = our_task.get("status")
-                    
-                    if status == "SUCCESS":
-                        logger.info(f"Scrapula task {task_id} completed successfully")
-                        return our_task
-                    elif status == "FAILURE":
-                        logger.error(f"Scrapula task {task_id} failed")
-                        return None
-                    else:
-                        # Still pending
-                        elapsed = int(time.time() - start_time)
-                        logger.info(f"Scrapula task still processing... ({elapsed}s)")
-                        time.sleep(poll_interval)
-                else:
-                    # Task not found yet, wait
-                    elapsed = int(time.time() - start_time)
-                    logger.info(f"Waiting for task to appear... ({elapsed}s)")
-                    time.sleep(poll_interval)
+                elapsed = int(time.time() - start_time)
+                logger.info(f"Scrapula task {task_id} {status or 'not visible yet'}... ({elapsed}s)")
                     
             except Exception as e:
                 logger.error(f"Error polling Scrapula task: {e}")
-                time.sleep(poll_interval)
+            
+            # Adaptive backoff: poll quickly at first, then progressively less often
+            remaining = max_wait_seconds - (time.time() - start_time)
+            time.sleep(max(0.0, min(poll_interval, remaining)))
+            poll_interval = min(poll_interval * self.poll_backoff, self.max_poll_interval)
         
         logger.warning(f"Scrapula task timed out after {max_wait_seconds}s")
         return None
     
+    def _find_in_task_list(self, task_id: str, headers: dict) -> Optional[dict]:
+        """Look a task up in the recent task list (matched on the short ID from creation)."""
+        response = get_transport().get(
+            f"{self.base_url}/tasks?limit=50",
+            "scrapula",
+            headers=headers
+        )
+        response.raise_for_status()
+        for task in response.json().get("tasks", []):
+            if task_id in task.get("id", ""):
+                return task
+        return None
+    
     def _parse_results(self, task_result: dict, asins: List[str]) -> Dict[str, ScrapulaProductInfo]:
         """Parse Scrapula task results."""
         
@@ -244,7 +373,7 @@ class ScrapulaService:
         
         try:
             # Download file
-            response = requests.get(file_url, timeout=60)
+            response = get_transport().get(file_url, "scrapula_download")
             response.raise_for_status()
             
             # Parse Excel file
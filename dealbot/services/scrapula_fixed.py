@@ -8,6 +8,8 @@ import io
 from typing import Optional, List, Dict
 from dataclasses import dataclass
 
+from ..utils.http import get_transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -122,11 +124,11 @@ class ScrapulaService:
         }
         
         try:
-            response = requests.post(
+            response = get_transport().post(
                 f"{self.base_url}/tasks",
+                "scrapula",
                 headers=headers,
-                json=payload,
-                timeout=30
+                json=payload
             )
             
             response.raise_for_status()
@@ -151,10 +153,10 @@ class ScrapulaService:
         
         while time.time() - start_time < max_wait_seconds:
             try:
-                response = requests.get(
+                response = get_transport().get(
                     f"{self.base_url}/tasks/{task_id}",
-                    headers=headers,
-                    timeout=30
+                    "scrapula",
+                    headers=headers
                 )
                 
                 response.raise_for_status()
@@ -228,7 +230,7 @@ class ScrapulaService:
         
         try:
             # Download file
-            response = requests.get(file_url, timeout=60)
+            response = get_transport().get(file_url, "scrapula_download")
             response.raise_for_status()
             
             # Parse Excel file
@@ -6,11 +6,12 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Optional
 
-import requests
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from ..models import ShortLink
+from ..storage.link_registry import ShortLinkRegistry, canonicalize_url
 from ..utils.config import Config
+from ..utils.http import get_transport
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -24,6 +25,21 @@ class ShortLinkProvider(ABC):
         """Create a short link for the given URL."""
         pass
 
+    def create_short_links(self, long_urls: list[str]) -> list[ShortLink]:
+        """
+        Create short links for several URLs.
+
+        Providers without a bulk API create them one by one. Raises if any
+        link could not be created, so nothing unconfirmed gets registered.
+
+        Args:
+            long_urls: URLs to shorten
+
+        Returns:
+            One ShortLink per URL, in the same order
+        """
+        return [self.create_short_link(url) for url in long_urls]
+
 
 class BitlyProvider(ShortLinkProvider):
     """Bitly short link provider with branded domain."""
@@ -58,11 +74,11 @@ class BitlyProvider(ShortLinkProvider):
         if slug:
             payload["title"] = slug
 
-        response = requests.post(
+        response = get_transport().post(
             f"{self.API_BASE}/bitlinks",
+            "shortlinks",
             headers=headers,
             json=payload,
-            timeout=10,
         )
 
         response.raise_for_status()
@@ -94,63 +110,90 @@ class CloudflareProvider(ShortLinkProvider):
         if not self.account_id or not self.api_token:
             raise ValueError("Cloudflare credentials not set in environment")
 
+    @staticmethod
+    def slug_for(long_url: str) -> str:
+        """Deterministic slug (same canonical URL, same slug), so re-creating a link is idempotent."""
+        return hashlib.md5(canonicalize_url(long_url).encode()).hexdigest()[:8]
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         reraise=True,
     )
     def create_short_link(self, long_url: str, slug: Optional[str] = None) -> ShortLink:
-        """Create short link via Cloudflare Workers API."""
+        """Create short link via Cloudflare Workers API (raises if the Worker didn't store it)."""
         if not slug:
             # Generate slug from URL hash
-            slug = hashlib.md5(long_url.encode()).hexdigest()[:8]
+            slug = self.slug_for(long_url)
 
         # POST to Worker's /shorten endpoint
-        worker_url = f"https://{self.domain}/shorten"
-        
-        payload = {
-            "url": long_url,
-            "slug": slug,
-        }
-        
-        try:
-            response = requests.post(
-                worker_url,
-                json=payload,
-                timeout=10,
-            )
-            response.raise_for_status()
-            data = response.json()
-            short_url = data["short_url"]
-            
-            logger.info(f"Created Cloudflare short link: {short_url}")
-            
-            return ShortLink(
-                short_url=short_url,
-                long_url=long_url,
-                provider="cloudflare",
-                link_id=slug,
-            )
-        except Exception as e:
-            logger.error(f"Failed to create Cloudflare short link: {e}")
-            # Fallback: construct URL directly
-            short_url = f"https://{self.domain}/{slug}"
-            logger.warning(f"Using fallback URL: {short_url}")
-            
-            return ShortLink(
-                short_url=short_url,
-                long_url=long_url,
-                provider="cloudflare",
-                link_id=slug,
-            )
+        response = get_transport().post(
+            f"https://{self.domain}/shorten",
+            "shortlinks",
+            json={"url": long_url, "slug": slug},
+        )
+        response.raise_for_status()
+        short_url = response.json()["short_url"]
+
+        logger.info(f"Created Cloudflare short link: {short_url}")
+
+        return ShortLink(
+            short_url=short_url,
+            long_url=long_url,
+            provider="cloudflare",
+            link_id=slug,
+        )
+
+    # Links per /shorten/bulk request (the Worker's limit)
+    MAX_BULK_LINKS = 100
+
+    def create_short_links(self, long_urls: list[str]) -> list[ShortLink]:
+        """Create several short links, one /shorten/bulk request per MAX_BULK_LINKS."""
+        links: list[ShortLink] = []
+        for start in range(0, len(long_urls), self.MAX_BULK_LINKS):
+            links.extend(self._create_bulk(long_urls[start:start + self.MAX_BULK_LINKS]))
+        return links
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        reraise=True,
+    )
+    def _create_bulk(self, long_urls: list[str]) -> list[ShortLink]:
+        """Create short links with one request to the Worker's /shorten/bulk endpoint."""
+        slugs = [self.slug_for(url) for url in long_urls]
+        response = get_transport().post(
+            f"https://{self.domain}/shorten/bulk",
+            "shortlinks",
+            json={"links": [{"url": url, "slug": slug} for url, slug in zip(long_urls, slugs)]},
+        )
+        response.raise_for_status()
+        created = {item["slug"]: item["short_url"] for item in response.json()["links"]}
+
+        missing = [slug for slug in slugs if slug not in created]
+        if missing:
+            raise ValueError(f"Worker did not create {len(missing)} of {len(slugs)} link(s): {missing[:5]}")
+
+        logger.info(f"Created {len(created)} Cloudflare short link(s) in one request")
+        return [
+            ShortLink(short_url=created[slug], long_url=url, provider="cloudflare", link_id=slug)
+            for url, slug in zip(long_urls, slugs)
+        ]
 
 
 class ShortLinkService:
     """Short link creation service manager."""
 
-    def __init__(self, config: Config) -> None:
-        """Initialize short link service."""
+    def __init__(self, config: Config, registry: Optional[ShortLinkRegistry] = None) -> None:
+        """
+        Initialize short link service.
+
+        Args:
+            config: Configuration
+            registry: Created links by canonical long URL (None = always create)
+        """
         self.config = config
+        self.registry = registry
         provider_name = config.shortlink_provider
 
         # Initialize provider based on configuration
@@ -166,5 +209,51 @@ class ShortLinkService:
             raise ValueError(f"Unknown short link provider: {provider_name}")
 
     def create_short_link(self, long_url: str, slug: Optional[str] = None) -> ShortLink:
-        """Create short link using configured provider."""
+        """Create short link using configured provider (reusing a registered one)."""
+        if slug is None:
+            links = self.get_or_create_many([long_url])
+            if long_url not in links:
+                raise ValueError(f"Could not create short link for {long_url}")
+            return links[long_url]
         return self.provider.create_short_link(long_url, slug)
+
+    def get_or_create_many(self, long_urls: list[str]) -> dict[str, ShortLink]:
+        """
+        Get short links for a batch of URLs, creating the missing ones in one bulk call.
+
+        URLs are shortened in canonical form (see canonicalize_url()), so links
+        that differ only in tracking parameters share one short link.
+
+        Args:
+            long_urls: URLs to shorten
+
+        Returns:
+            Dict of given URL -> ShortLink (URLs whose link could not be created are left out)
+        """
+        canonical = {url: canonicalize_url(url) for url in long_urls}
+        known = self.registry.get_many(canonical.values()) if self.registry else {}
+        missing = sorted(set(canonical.values()) - set(known))
+
+        if missing:
+            try:
+                created = self.provider.create_short_links(missing)
+                if self.registry:
+                    self.registry.put_many(created)
+                known.update(zip(missing, created))
+            except Exception as e:
+                logger.error(f"Bulk short link creation failed for {len(missing)} URL(s): {e}")
+                confirmed: dict[str, ShortLink] = {}
+                for url in missing:
+                    # One bad URL must not cost the rest of the batch their links;
+                    # a failed URL gets no link (the deal is skipped, never a dead link)
+                    try:
+                        confirmed[url] = self.provider.create_short_link(url)
+                    except Exception as e:
+                        logger.error(f"Short link creation failed for {url}: {e}")
+                if self.registry:
+                    self.registry.put_many(confirmed.values())
+                known.update(confirmed)
+
+        if long_urls:
+            logger.info(f"Short links: {len(set(canonical.values())) - len(missing)} from registry, {len(missing)} created")
+        return {url: known[key] for url, key in canonical.items() if key in known}
@@ -1,12 +1,22 @@
 """Whapi.cloud WhatsApp API integration."""
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import Retrying, stop_after_attempt, wait_exponential
 
 from ..models import PublishResult
 from ..utils.config import Config
+from ..utils.http import get_transport
 from ..utils.logging import get_logger
 
+if TYPE_CHECKING:
+    from ..storage.db import Database
+
 logger = get_logger(__name__)
 
 
@@ -15,71 +25,166 @@ class WhapiService:
 
     API_BASE = "https://gate.whapi.cloud"
 
-    def __init__(self, config: Config) -> None:
-        """Initialize Whapi service."""
+    def __init__(self, config: Config, db: Optional["Database"] = None) -> None:
+        """
+        Initialize Whapi service.
+
+        Args:
+            config: Application config
+            db: Optional database; successful sends are recorded there so a
+                deal_id is never re-posted to a JID (across restarts only for
+                outbox messages, which keep their deal_id; a re-parsed deal
+                gets a new one)
+        """
         self.config = config
         self.api_key = config.require_env("WHAPI_API_KEY")
+        self.db = db
+
+        # Per-destination retry policy
+        self.retry_attempts = 3
+        self.retry_wait = wait_exponential(multiplier=2, min=4, max=30)
+
+        # Idempotency key (deal_id, JID) -> message_id for sends in this process
+        self._sent: dict[tuple[str, str], str] = {}
+        self._sent_lock = threading.Lock()
+
+    def _already_sent(self, deal_id: str, destinations: list[str]) -> dict[str, str]:
+        """Get message IDs for destinations this deal has already been posted to."""
+        with self._sent_lock:
+            sent = {
+                dest: self._sent[(deal_id, dest)]
+                for dest in destinations
+                if (deal_id, dest) in self._sent
+            }
+
+        if self.db and len(sent) < len(destinations):
+            try:
+                for dest, msg_id in self.db.get_sent_destinations(deal_id).items():
+                    if dest in destinations:
+                        sent.setdefault(dest, msg_id)
+            except Exception as e:
+                logger.warning(f"Could not check previous sends for {deal_id}: {e}")
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=2, min=4, max=30),
-        reraise=True,
-    )
-    def send_message(
-        self, destinations: list[str], message: str, deal_id: str, image_url: str = None
-    ) -> PublishResult:
-        """Send WhatsApp message to multiple destinations, optionally with image."""
+        return sent
+
+    def _remember_sent(self, deal_id: str, destination: str, msg_id: str) -> None:
+        with self._sent_lock:
+            self._sent[(deal_id, destination)] = msg_id
+
+        if self.db:
+            try:
+                self.db.record_destination(deal_id, destination, msg_id, datetime.now())
+            except Exception as e:
+                logger.warning(f"Could not record send of {deal_id} to {destination}: {e}")
+
+    def _send_one(self, destination: str, message: str, image_url: Optional[str]) -> str:
+        """Send to one destination, retrying only this destination. Returns message ID."""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
-        # Whapi expects individual messages per destination
-        # We'll send to each destination and collect message IDs
-        message_ids: dict[str, str] = {}
-        errors: list[str] = []
-
-        for destination in destinations:
-            try:
-                # If image URL provided, send as image with caption
-                if image_url:
-                    endpoint = f"{self.API_BASE}/messages/image"
-                    payload = {
-                        "to": destination,
-                        "media": image_url,
-                        "caption": message
-                    }
-                    logger.info(f"Sending image message to {destination}")
-                else:
-                    # Otherwise send as text
-                    endpoint = f"{self.API_BASE}/messages/text"
-                    payload = {"to": destination, "body": message}
-                    logger.info(f"Sending text message to {destination}")
-
-                response = requests.post(
+        # If image URL provided, send as image with caption
+        if image_url:
+            endpoint = f"{self.API_BASE}/messages/image"
+            payload = {
+                "to": destination,
+                "media": image_url,
+                "caption": message
+            }
+            logger.info(f"Sending image message to {destination}")
+        else:
+            # Otherwise send as text
+            endpoint = f"{self.API_BASE}/messages/text"
+            payload = {"to": destination, "body": message}
+            logger.info(f"Sending text message to {destination}")
+
+        for attempt in Retrying(
+            stop=stop_after_attempt(self.retry_attempts),
+            wait=self.retry_wait,
+            reraise=True,
+        ):
+            with attempt:
+                response = get_transport().post(
                     endpoint,
+                    "whapi",
                     headers=headers,
                     json=payload,
-                    timeout=30,
                 )
 
                 response.raise_for_status()
                 data = response.json()
 
-                # Extract message ID from response
-                msg_id = data.get("id", data.get("message_id", "unknown"))
-                message_ids[destination] = msg_id
+        # Extract message ID from response
+        return data.get("id", data.get("message_id", "unknown"))
+
+    def send_message(
+        self,
+        destinations: list[str],
+        message: str,
+        deal_id: str,
+        image_url: str = None,
+        idempotent: bool = True,
+    ) -> PublishResult:
+        """
+        Send WhatsApp message to multiple destinations concurrently, optionally with image.
+
+        Each destination is retried on its own, so a slow or failing JID
+        neither delays nor re-sends the others.
+
+        Args:
+            destinations: Channel/group JIDs
+            message: Message text (caption when an image is sent)
+            deal_id: Deal identifier; with the JID it forms the idempotency key
+            image_url: Optional image to send with the message
+            idempotent: Skip destinations this deal_id was already sent to.
+                Disable for recurring messages that reuse a fixed id (status updates).
+
+        Returns:
+            PublishResult with message IDs and per-destination latency
+        """
+        # Whapi expects individual messages per destination
+        # We'll send to each destination and collect message IDs
+        message_ids: dict[str, str] = {}
+        latencies_ms: dict[str, float] = {}
+        errors: list[str] = []
 
-                logger.info(f"Sent WhatsApp message to {destination}: {msg_id}")
+        pending = list(dict.fromkeys(destinations))
+        if idempotent:
+            for dest, msg_id in self._already_sent(deal_id, pending).items():
+                logger.info(f"Skipping {dest}: {deal_id} already sent ({msg_id})")
+                message_ids[dest] = msg_id
+                latencies_ms[dest] = 0.0
+            pending = [dest for dest in pending if dest not in message_ids]
 
+        def send(destination: str) -> tuple[Optional[str], float, Optional[str]]:
+            start = time.perf_counter()
+            try:
+                msg_id = self._send_one(destination, message, image_url)
+                return msg_id, (time.perf_counter() - start) * 1000, None
             except requests.exceptions.HTTPError as e:
                 error_msg = f"Failed to send to {destination}: {e}"
-                logger.error(error_msg)
-                errors.append(error_msg)
             except Exception as e:
                 error_msg = f"Unexpected error sending to {destination}: {e}"
-                logger.error(error_msg)
-                errors.append(error_msg)
+            return None, (time.perf_counter() - start) * 1000, error_msg
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="whapi") as pool:
+                futures = {pool.submit(send, dest): dest for dest in pending}
+
+                # Record each send as soon as it lands, before waiting on slower JIDs
+                for future in as_completed(futures):
+                    destination = futures[future]
+                    msg_id, latency, error_msg = future.result()
+                    latencies_ms[destination] = round(latency, 1)
+                    if msg_id is not None:
+                        message_ids[destination] = msg_id
+                        if idempotent:
+                            self._remember_sent(deal_id, destination, msg_id)
+                        logger.info(f"Sent WhatsApp message to {destination}: {msg_id} ({latency:.0f} ms)")
+                    else:
+                        logger.error(error_msg)
+                        errors.append(error_msg)
 
         success = len(message_ids) > 0
         error = "; ".join(errors) if errors else None
@@ -88,6 +193,7 @@ class WhapiService:
             deal_id=deal_id,
             destinations=destinations,
             message_ids=message_ids,
+            latencies_ms=latencies_ms,
             success=success,
             error=error,
         )
@@ -0,0 +1,244 @@
+"""SQLite-backed store of AI validation verdicts and product reviews."""
+
+import math
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from ..utils.logging import get_logger
+from ..utils.metrics import CACHE_LOOKUPS
+from .store import SQLiteStore
+
+logger = get_logger(__name__)
+
+
+class AIValidationCache(SQLiteStore):
+    """AI verdicts keyed by (ASIN, price bucket, discount bucket), plus reviews per ASIN.
+
+    Prices are bucketed on a log scale, so any two prices within roughly
+    price_tolerance_pct of each other usually share a bucket. Discounts are
+    bucketed in steps of discount_tolerance_pct points. A one-cent price move
+    therefore reuses the verdict instead of paying for a new LLM call.
+
+    Reviews describe the product, not the price, so they are stored per ASIN
+    and reused (with a longer TTL) when the price moved out of the bucket and
+    only the verdict has to be asked for again.
+    """
+
+    DEFAULT_PRICE_TOLERANCE_PCT = 5.0
+    DEFAULT_DISCOUNT_TOLERANCE_PCT = 5.0
+    DEFAULT_APPROVED_TTL_HOURS = 72.0
+    DEFAULT_REJECTED_TTL_HOURS = 12.0  # Rejections are re-checked sooner
+    DEFAULT_REVIEW_TTL_HOURS = 720.0
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS ai_validation_cache (
+            asin TEXT NOT NULL,
+            price_bucket INTEGER NOT NULL,
+            discount_bucket INTEGER NOT NULL,
+            approved INTEGER NOT NULL,
+            reasoning TEXT,
+            confidence TEXT,
+            validated_at REAL NOT NULL,
+            PRIMARY KEY (asin, price_bucket, discount_bucket)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS ai_reviews (
+            asin TEXT PRIMARY KEY,
+            review_es TEXT NOT NULL,
+            review_en TEXT NOT NULL,
+            reviewed_at REAL NOT NULL
+        )
+        """,
+    )
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        price_tolerance_pct: float = DEFAULT_PRICE_TOLERANCE_PCT,
+        discount_tolerance_pct: float = DEFAULT_DISCOUNT_TOLERANCE_PCT,
+        approved_ttl_hours: float = DEFAULT_APPROVED_TTL_HOURS,
+        rejected_ttl_hours: float = DEFAULT_REJECTED_TTL_HOURS,
+        review_ttl_hours: float = DEFAULT_REVIEW_TTL_HOURS,
+        enabled: bool = True,
+    ) -> None:
+        """
+        Initialize cache.
+
+        Args:
+            db_path: SQLite database file (usually the main dealbot.db)
+            price_tolerance_pct: Relative width of a price bucket
+            discount_tolerance_pct: Width of a discount bucket in percentage points
+            approved_ttl_hours: How long an approval is reused
+            rejected_ttl_hours: How long a rejection is reused
+            review_ttl_hours: How long a product's reviews are reused
+            enabled: If False, every lookup is a miss and nothing is stored
+        """
+        self.enabled = enabled
+        self.price_tolerance_pct = price_tolerance_pct
+        self.discount_tolerance_pct = discount_tolerance_pct
+        self.approved_ttl_hours = approved_ttl_hours
+        self.rejected_ttl_hours = rejected_ttl_hours
+        self.review_ttl_hours = review_ttl_hours
+        self._stats = {"hits": 0, "misses": 0, "reviews_reused": 0}
+
+        super().__init__(db_path)
+
+    def price_bucket(self, price: Optional[float]) -> int:
+        """Bucket a price (log scale, price_tolerance_pct wide)."""
+        if not price or price <= 0:
+            return 0
+        if self.price_tolerance_pct <= 0:
+            return round(price * 100)
+        return math.floor(math.log(price) / math.log1p(self.price_tolerance_pct / 100))
+
+    def discount_bucket(self, discount_pct: Optional[float]) -> int:
+        """Bucket a discount percentage (discount_tolerance_pct points wide)."""
+        if discount_pct is None:
+            return -1
+        if self.discount_tolerance_pct <= 0:
+            return round(discount_pct * 100)
+        return math.floor(discount_pct / self.discount_tolerance_pct)
+
+    def get_verdict(
+        self, asin: Optional[str], price: Optional[float], discount_pct: Optional[float]
+    ) -> Optional[dict[str, Any]]:
+        """
+        Get a fresh verdict for this ASIN at a similar price and discount.
+
+        Args:
+            asin: Product ASIN (no ASIN = never cached)
+            price: Total price (including mandatory delivery)
+            discount_pct: Discount percentage
+
+        Returns:
+            Dict with approved, reasoning, confidence, review_es, review_en; or None
+        """
+        if not self.enabled or not asin:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                """SELECT v.approved, v.reasoning, v.confidence, r.review_es, r.review_en
+                   FROM ai_validation_cache v
+                   LEFT JOIN ai_reviews r ON r.asin = v.asin AND r.reviewed_at > ?
+                   WHERE v.asin = ? AND v.price_bucket = ? AND v.discount_bucket = ?
+                   AND v.validated_at > CASE WHEN v.approved THEN ? ELSE ? END""",
+                (
+                    now - self.review_ttl_hours * 3600,
+                    asin,
+                    self.price_bucket(price),
+                    self.discount_bucket(discount_pct),
+                    now - self.approved_ttl_hours * 3600,
+                    now - self.rejected_ttl_hours * 3600,
+                ),
+            ).fetchone()
+
+            # An approval is only reusable together with its reviews
+            usable = row is not None and (not row[0] or row[3] is not None)
+            self._stats["hits" if usable else "misses"] += 1
+            CACHE_LOOKUPS.inc(cache="ai", source="verdict", result="hit" if usable else "miss")
+
+        if not usable:
+            return None
+        approved, reasoning, confidence, review_es, review_en = row
+        return {
+            "approved": bool(approved),
+            "reasoning": reasoning or "",
+            "confidence": confidence or "medium",
+            "review_es": review_es,
+            "review_en": review_en,
+        }
+
+    def get_review(self, asin: Optional[str]) -> Optional[tuple[str, str]]:
+        """Get fresh (Spanish, English) reviews for an ASIN."""
+        if not self.enabled or not asin:
+            return None
+
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT review_es, review_en FROM ai_reviews WHERE asin = ? AND reviewed_at > ?",
+                (asin, time.time() - self.review_ttl_hours * 3600),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def record_review_reuse(self) -> None:
+        """Count a validation that reused stored reviews."""
+        with self._lock:
+            self._stats["reviews_reused"] += 1
+
+    def put(
+        self,
+        asin: Optional[str],
+        price: Optional[float],
+        discount_pct: Optional[float],
+        approved: bool,
+        reasoning: str,
+        confidence: str,
+        review: Optional[tuple[str, str]] = None,
+    ) -> None:
+        """Store a verdict (and the product's reviews, if any)."""
+        if not self.enabled or not asin:
+            return
+
+        now = time.time()
+        try:
+            with self._lock:
+                self.conn.execute(
+                    """INSERT OR REPLACE INTO ai_validation_cache
+                       (asin, price_bucket, discount_bucket, approved, reasoning, confidence, validated_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        asin, self.price_bucket(price), self.discount_bucket(discount_pct),
+                        int(approved), reasoning, confidence, now,
+                    ),
+                )
+                if review and review[0] and review[1]:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO ai_reviews (asin, review_es, review_en, reviewed_at) VALUES (?, ?, ?, ?)",
+                        (asin, review[0], review[1], now),
+                    )
+                self.conn.commit()
+        except sqlite3.Error as e:
+            # A cache write must never break the pipeline
+            logger.warning(f"Failed to cache AI validation for {asin}: {e}")
+
+    def purge_expired(self) -> int:
+        """Delete verdicts and reviews past every TTL. Returns number of rows removed."""
+        now = time.time()
+        verdict_cutoff = now - max(self.approved_ttl_hours, self.rejected_ttl_hours) * 3600
+        with self._lock:
+            removed = self.conn.execute(
+                "DELETE FROM ai_validation_cache WHERE validated_at < ?", (verdict_cutoff,)
+            ).rowcount
+            removed += self.conn.execute(
+                "DELETE FROM ai_reviews WHERE reviewed_at < ?", (now - self.review_ttl_hours * 3600,)
+            ).rowcount
+            self.conn.commit()
+        return removed
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit/miss/review-reuse counters since the last reset."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        """Reset counters (called at the start of each run)."""
+        with self._lock:
+            self._stats = {"hits": 0, "misses": 0, "reviews_reused": 0}
+
+    def summary(self) -> str:
+        """One-line summary for status messages."""
+        stats = self.stats
+        lookups = stats["hits"] + stats["misses"]
+        if not lookups:
+            return "no validations"
+        return (
+            f"{stats['hits']}/{lookups} verdicts from cache (LLM calls saved), "
+            f"{stats['reviews_reused']} reviews reused"
+        )
@@ -2,7 +2,8 @@
 
 import json
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Optional
 
@@ -12,6 +13,73 @@ from ..utils.logging import get_logger
 logger = get_logger(__name__)
 
 
+def _iso(value: datetime) -> str:
+    """Fixed-width ISO timestamp, so text comparison matches time order."""
+    return value.isoformat(timespec="microseconds")
+
+
+UPSERT_DEAL_SQL = """
+    INSERT OR REPLACE INTO deals (
+        deal_id, asin, title, src_url, validated_price, adjusted_price,
+        list_price, discount_pct, degree,
+        currency, rating, rating_count, short_url, provider,
+        created_at, published_at, status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def deal_row(deal: ProcessedDeal, published_at: Optional[datetime] = None) -> tuple:
+    """
+    Parameters for UPSERT_DEAL_SQL.
+
+    Args:
+        deal: Processed deal
+        published_at: Publication time (default: the publish result's send time, if any)
+    """
+    rating = deal.rating.value if deal.rating else None
+    rating_count = deal.rating.count if deal.rating else None
+
+    # Determine best available discount/PVP from either PA-API or source file
+    list_price = deal.price_info.list_price or deal.deal.source_pvp
+    discount_pct = deal.price_info.savings_percentage or deal.deal.source_discount_pct
+
+    if published_at is None and deal.publish_result:
+        published_at = deal.publish_result.sent_at
+
+    return (
+        deal.deal.deal_id,
+        deal.deal.asin,
+        deal.deal.title,
+        deal.deal.url,
+        deal.price_info.current_price,
+        deal.adjusted_price,
+        list_price,
+        discount_pct,
+        deal.deal.degree,
+        deal.price_info.currency.value,
+        rating,
+        rating_count,
+        deal.short_link.short_url,
+        deal.short_link.provider,
+        _iso(datetime.now()),
+        _iso(published_at) if published_at else None,
+        deal.deal.status.value,
+    )
+
+
+def insert_destination(cursor: sqlite3.Cursor, deal_id: str, jid: str, message_id: str, sent_at: datetime) -> None:
+    """Record a send to a JID (at most once per deal and JID)."""
+    dest_type = "channel" if "broadcast" in jid else "group"
+    cursor.execute(
+        """
+        INSERT INTO destinations (deal_id, jid, type, sent_at, message_id)
+        SELECT ?, ?, ?, ?, ?
+        WHERE NOT EXISTS (SELECT 1 FROM destinations WHERE deal_id = ? AND jid = ?)
+    """,
+        (deal_id, jid, dest_type, _iso(sent_at), message_id, deal_id, jid),
+    )
+
+
 class Database:
     """SQLite database wrapper for deal storage and analytics."""
 
@@ -29,6 +97,11 @@ class Database:
         self.conn.row_factory = sqlite3.Row
         self._initialize_schema()
 
+        # Sends are recorded from the Whapi fan-out threads: own connection and lock,
+        # so their commits never interleave with (or flush) a save_deal() on self.conn
+        self._sends_conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._sends_lock = threading.Lock()
+
     def _initialize_schema(self) -> None:
         """Create database tables if they don't exist."""
         cursor = self.conn.cursor()
@@ -88,10 +161,41 @@ class Database:
             )
         """)
 
+        # Source file ledger: which TXT files (by path + content hash) were ingested and how it went
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS source_files (
+                path TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                mtime REAL,
+                size INTEGER,
+                file_date TIMESTAMP,
+                status TEXT,
+                deals_found INTEGER,
+                deals_published INTEGER,
+                deals_filtered INTEGER,
+                error TEXT,
+                first_seen_at TIMESTAMP,
+                updated_at TIMESTAMP
+            )
+        """)
+
         # Create indexes
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_deals_asin ON deals(asin)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_deals_status ON deals(status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_destinations_deal ON destinations(deal_id)")
+        # Dedup lookups: per-ASIN and "everything published since X" range scans
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_deals_asin_status_published ON deals(asin, status, published_at)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_deals_status_published ON deals(status, published_at)"
+        )
+
+        # Timestamps are compared as text, so keep them in one sortable ISO format
+        # ('YYYY-MM-DDTHH:MM:SS.ffffff'); older rows may use a space separator
+        cursor.execute(
+            "UPDATE deals SET published_at = replace(published_at, ' ', 'T') WHERE published_at LIKE '% %'"
+        )
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_deal ON events(deal_id)")
 
         self.conn.commit()
@@ -100,69 +204,34 @@ class Database:
     def save_deal(self, deal: ProcessedDeal) -> None:
         """Save a processed deal to database."""
         cursor = self.conn.cursor()
+        cursor.execute(UPSERT_DEAL_SQL, deal_row(deal))
 
-        rating = deal.rating.value if deal.rating else None
-        rating_count = deal.rating.count if deal.rating else None
-
-        # Determine best available discount/PVP from either PA-API or source file
-        list_price = deal.price_info.list_price or deal.deal.source_pvp
-        discount_pct = deal.price_info.savings_percentage or deal.deal.source_discount_pct
-
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO deals (
-                deal_id, asin, title, src_url, validated_price, adjusted_price,
-                list_price, discount_pct, degree,
-                currency, rating, rating_count, short_url, provider,
-                created_at, published_at, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                deal.deal.deal_id,
-                deal.deal.asin,
-                deal.deal.title,
-                deal.deal.url,
-                deal.price_info.current_price,
-                deal.adjusted_price,
-                list_price,
-                discount_pct,
-                deal.deal.degree,
-                deal.price_info.currency.value,
-                rating,
-                rating_count,
-                deal.short_link.short_url,
-                deal.short_link.provider,
-                datetime.now().isoformat(),
-                (
-                    deal.publish_result.sent_at.isoformat()
-                    if deal.publish_result
-                    else None
-                ),
-                deal.deal.status.value,
-            ),
-        )
-
-        # Save destinations if published
+        # Save destinations if published (send-time records are not duplicated)
         if deal.publish_result:
             for dest, msg_id in deal.publish_result.message_ids.items():
-                dest_type = "channel" if "broadcast" in dest else "group"
-                cursor.execute(
-                    """
-                    INSERT INTO destinations (deal_id, jid, type, sent_at, message_id)
-                    VALUES (?, ?, ?, ?, ?)
-                """,
-                    (
-                        deal.deal.deal_id,
-                        dest,
-                        dest_type,
-                        deal.publish_result.sent_at.isoformat(),
-                        msg_id,
-                    ),
-                )
+                insert_destination(cursor, deal.deal.deal_id, dest, msg_id, deal.publish_result.sent_at)
 
         self.conn.commit()
         logger.debug(f"Saved deal {deal.deal.deal_id} to database")
 
+    def record_destination(self, deal_id: str, jid: str, message_id: str, sent_at: datetime) -> None:
+        """Record a successful send as soon as it happens (idempotency for retries). Thread-safe."""
+        with self._sends_lock:
+            try:
+                insert_destination(self._sends_conn.cursor(), deal_id, jid, message_id, sent_at)
+                self._sends_conn.commit()
+            except sqlite3.Error:
+                self._sends_conn.rollback()
+                raise
+
+    def get_sent_destinations(self, deal_id: str) -> dict[str, str]:
+        """Get JID -> message_id for destinations this deal was already sent to. Thread-safe."""
+        with self._sends_lock:
+            cursor = self._sends_conn.execute(
+                "SELECT jid, message_id FROM destinations WHERE deal_id = ?", (deal_id,)
+            )
+            return dict(cursor.fetchall())
+
     def log_event(self, deal_id: str, event_type: str, meta: dict[str, Any]) -> None:
         """Log an analytics event."""
         cursor = self.conn.cursor()
@@ -172,7 +241,7 @@ class Database:
             INSERT INTO events (deal_id, type, meta, created_at)
             VALUES (?, ?, ?, ?)
         """,
-            (deal_id, event_type, json.dumps(meta), datetime.now().isoformat()),
+            (deal_id, event_type, json.dumps(meta), _iso(datetime.now())),
         )
 
         self.conn.commit()
@@ -196,42 +265,57 @@ class Database:
         return [dict(row) for row in cursor.fetchall()]
 
     def was_recently_published(self, asin: str, hours: int = 48) -> Optional[dict[str, Any]]:
-        """Check if ASIN was published within the last N hours."""
+        """Check if ASIN was published (or queued for publishing) within the last N hours."""
+        # Compare ISO text directly (no datetime() wrapper) so the composite index is used
+        cutoff = _iso(datetime.now() - timedelta(hours=hours))
         cursor = self.conn.cursor()
         cursor.execute(
             """
             SELECT * FROM deals 
             WHERE asin = ? 
-            AND status = 'published'
-            AND published_at IS NOT NULL
-            AND datetime(published_at) > datetime('now', ?)
+            AND status IN ('published', 'queued')
+            AND published_at > ?
             ORDER BY published_at DESC
             LIMIT 1
             """,
-            (asin, f'-{hours} hours'),
+            (asin, cutoff),
         )
         
         row = cursor.fetchone()
         return dict(row) if row else None
 
+    def get_published_since(self, cutoff: str) -> list[dict[str, Any]]:
+        """Get (asin, adjusted_price, published_at) of deals published or queued after an ISO cutoff, oldest first."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT asin, adjusted_price, published_at FROM deals
+            WHERE status IN ('published', 'queued') AND published_at > ? AND asin IS NOT NULL
+            ORDER BY published_at
+            """,
+            (cutoff,),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
     def get_top_deals_today(self, limit: int = 3) -> list[dict[str, Any]]:
         """
         Return today's top published deals sorted by hotness.
         Primary sort: degree (Chollometro temperature) descending.
         Secondary sort: discount_pct descending.
         """
+        cutoff = _iso(datetime.now() - timedelta(hours=24))
         cursor = self.conn.cursor()
         cursor.execute(
             """
             SELECT * FROM deals
             WHERE status = 'published'
-              AND datetime(published_at) > datetime('now', '-24 hours')
+              AND published_at > ?
             ORDER BY
                 COALESCE(degree, 0) DESC,
                 COALESCE(discount_pct, 0) DESC
             LIMIT ?
             """,
-            (limit,),
+            (cutoff, limit),
         )
         return [dict(row) for row in cursor.fetchall()]
 
@@ -254,7 +338,9 @@ class Database:
         logger.info(f"Exported {len(deals)} deals to {output_path}")
 
     def close(self) -> None:
-        """Close database connection."""
+        """Close database connections."""
+        with self._sends_lock:
+            self._sends_conn.close()
         self.conn.close()
 
     def __enter__(self) -> "Database":
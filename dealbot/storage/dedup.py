@@ -0,0 +1,138 @@
+"""In-memory index of recently published deals for duplicate detection."""
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional
+
+from ..utils.logging import get_logger
+from .db import _iso
+
+if TYPE_CHECKING:
+    from .db import Database
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class PublishedRecord:
+    """Most recent publication of an ASIN."""
+
+    asin: str
+    price: Optional[float]
+    published_at: str  # Fixed-width ISO timestamp (local time, db._iso(), as in the deals table)
+
+    @property
+    def published_datetime(self) -> datetime:
+        return datetime.fromisoformat(self.published_at)
+
+
+class DedupIndex:
+    """Last-published price and time per ASIN, loaded from the DB once per run.
+
+    Shared by the daemon (skip duplicates before any API call) and the GUI
+    preview (flag recently published deals). Lookups are dict reads; deals
+    published during the run are added with record().
+    """
+
+    def __init__(self, db: "Database", window_days: float = 7, price_change_pct: float = 10.0) -> None:
+        """
+        Initialize index.
+
+        Args:
+            db: Deals database
+            window_days: How far back publications count as duplicates
+            price_change_pct: A price move larger than this makes a republish a new deal
+        """
+        self.db = db
+        self.window_days = window_days
+        self.price_change_pct = price_change_pct
+        self._latest: dict[str, PublishedRecord] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self) -> int:
+        """(Re)load published deals in the window with one query. Returns ASIN count."""
+        cutoff = _iso(datetime.now() - timedelta(days=self.window_days))
+        rows = self.db.get_published_since(cutoff)
+
+        latest: dict[str, PublishedRecord] = {}
+        # Rows come oldest first, so later publications overwrite earlier ones
+        for row in rows:
+            latest[row["asin"]] = PublishedRecord(
+                asin=row["asin"], price=row["adjusted_price"], published_at=row["published_at"]
+            )
+
+        with self._lock:
+            # Keep deals recorded in this process but still queued (not yet in the deals table)
+            for asin, record in self._latest.items():
+                if record.published_at > cutoff and (
+                    asin not in latest or record.published_at > latest[asin].published_at
+                ):
+                    latest[asin] = record
+            self._latest = latest
+            self._loaded = True
+
+        logger.info(f"Dedup index loaded: {len(latest)} ASINs published in the last {self.window_days:g} days")
+        return len(latest)
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+
+    def last_published(self, asin: str, within_hours: Optional[float] = None) -> Optional[PublishedRecord]:
+        """
+        Get the latest publication of an ASIN inside the window.
+
+        Args:
+            asin: Product ASIN
+            within_hours: Narrower window than the index's (e.g. 48h for the GUI badge)
+
+        Returns:
+            PublishedRecord or None
+        """
+        self._ensure_loaded()
+        with self._lock:
+            record = self._latest.get(asin)
+
+        if record is None:
+            return None
+
+        hours = within_hours if within_hours is not None else self.window_days * 24
+        cutoff = _iso(datetime.now() - timedelta(hours=hours))
+        return record if record.published_at > cutoff else None
+
+    def is_duplicate(self, asin: str, current_price: Optional[float] = None) -> bool:
+        """
+        Check if an ASIN was published recently at a similar price.
+
+        Args:
+            asin: Product ASIN
+            current_price: If it moved more than price_change_pct since the last
+                publication, the deal is treated as new
+
+        Returns:
+            True if duplicate
+        """
+        record = self.last_published(asin)
+        if record is None:
+            return False
+
+        if current_price and record.price:
+            price_diff_pct = abs(current_price - record.price) / record.price * 100
+            if price_diff_pct > self.price_change_pct:
+                logger.info(
+                    f"Same ASIN {asin} but price changed significantly: "
+                    f"€{record.price} -> €{current_price} ({price_diff_pct:.1f}%)"
+                )
+                return False
+
+        logger.info(f"Duplicate detected: {asin} (last published: {record.published_at})")
+        return True
+
+    def record(self, asin: str, price: Optional[float], published_at: datetime) -> None:
+        """Add a publication made during this run."""
+        if not asin:
+            return
+        with self._lock:
+            self._latest[asin] = PublishedRecord(asin=asin, price=price, published_at=_iso(published_at))
@@ -0,0 +1,205 @@
+"""Durable ledger of ingested source TXT files."""
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from ..utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from .db import Database
+
+logger = get_logger(__name__)
+
+# Filename date, e.g. 2025-11-19_1602_evening_whatsapp.txt
+FILE_DATE_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})_(\d{2})(\d{2})')
+
+
+def parse_file_date(name: str) -> Optional[datetime]:
+    """Extract datetime from a deal file name."""
+    match = FILE_DATE_PATTERN.search(name)
+    if match:
+        year, month, day, hour, minute = map(int, match.groups())
+        try:
+            return datetime(year, month, day, hour, minute)
+        except ValueError:
+            logger.warning(f"Invalid date in filename: {name}")
+    return None
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    """Identity of a file's current contents."""
+
+    path: str
+    content_hash: str
+    mtime: float
+    size: int
+
+
+class SourceLedger:
+    """Tracks source files by path + content hash + mtime in the deals database.
+
+    Discovery skips files whose contents were already processed, so a fresh
+    process (e.g. a Cloud Run cold start that re-downloads every file) only
+    parses new or changed files. Unchanged mtime/size means the stored hash
+    is trusted without reading the file.
+    """
+
+    PARSED = "parsed"
+    PROCESSED = "processed"
+    FAILED = "failed"
+
+    def __init__(self, db: "Database") -> None:
+        """
+        Initialize ledger.
+
+        Args:
+            db: Deals database (holds the source_files table)
+        """
+        self.db = db
+        self._fingerprints: dict[str, FileFingerprint] = {}
+
+    def _rows(self) -> dict[str, dict[str, Any]]:
+        cursor = self.db.conn.cursor()
+        cursor.execute("SELECT * FROM source_files")
+        return {row["path"]: dict(row) for row in cursor.fetchall()}
+
+    def _row(self, path: str) -> Optional[dict[str, Any]]:
+        cursor = self.db.conn.cursor()
+        cursor.execute("SELECT * FROM source_files WHERE path = ?", (path,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def fingerprint(self, path: Path, known: Optional[dict[str, Any]] = None) -> FileFingerprint:
+        """Fingerprint a file, reusing the ledger hash when mtime and size are unchanged."""
+        stat = path.stat()
+        cached = self._fingerprints.get(str(path))
+        if known and known["mtime"] == stat.st_mtime and known["size"] == stat.st_size:
+            content_hash = known["content_hash"]
+        elif cached and cached.mtime == stat.st_mtime and cached.size == stat.st_size:
+            content_hash = cached.content_hash
+        else:
+            content_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+        fingerprint = FileFingerprint(str(path), content_hash, stat.st_mtime, stat.st_size)
+        self._fingerprints[fingerprint.path] = fingerprint
+        return fingerprint
+
+    def _is_done(self, fingerprint: FileFingerprint, row: Optional[dict[str, Any]]) -> bool:
+        """True if this exact content was already processed."""
+        if not row or row["content_hash"] != fingerprint.content_hash or row["status"] != self.PROCESSED:
+            return False
+        if row["mtime"] != fingerprint.mtime:
+            # Same content re-written (e.g. re-downloaded): remember the new mtime
+            self.db.conn.execute(
+                "UPDATE source_files SET mtime = ?, size = ? WHERE path = ?",
+                (fingerprint.mtime, fingerprint.size, fingerprint.path),
+            )
+            self.db.conn.commit()
+        return True
+
+    def discover(self, source_dir: Path, since: Optional[datetime] = None) -> list[Path]:
+        """
+        Find TXT files that are new or changed since they were last processed.
+
+        Args:
+            source_dir: Directory to search (recursively)
+            since: Only return files dated after this time (from filename, else mtime)
+
+        Returns:
+            File paths, newest first
+        """
+        rows = self._rows()
+        seen = 0
+        candidates: list[tuple[Path, datetime]] = []
+
+        for root, _, names in os.walk(source_dir):
+            for name in names:
+                if not name.endswith(".txt"):
+                    continue
+                seen += 1
+                # Filter on the filename date first so out-of-window files are never hashed
+                file_date = parse_file_date(name)
+                if file_date and since is not None and file_date <= since:
+                    continue
+
+                path = Path(root) / name
+                try:
+                    fingerprint = self.fingerprint(path, rows.get(str(path)))
+                except OSError as e:
+                    logger.warning(f"Cannot read {path}: {e}")
+                    continue
+
+                if self._is_done(fingerprint, rows.get(str(path))):
+                    continue
+
+                if not file_date:
+                    # If we can't parse date, include it anyway (fallback to old behavior)
+                    file_date = datetime.fromtimestamp(fingerprint.mtime)
+                candidates.append((path, file_date))
+
+        # Sort by date (newest first)
+        candidates.sort(key=lambda x: x[1], reverse=True)
+        logger.info(f"Ledger: {len(candidates)} new/changed of {seen} TXT files in {source_dir}")
+        return [path for path, _ in candidates]
+
+    def needs_processing(self, path: Path) -> bool:
+        """Check a single file against the ledger."""
+        try:
+            row = self._row(str(path))
+            return not self._is_done(self.fingerprint(path, row), row)
+        except OSError:
+            return True
+
+    def _record(self, path: Path, status: str, **fields: Any) -> None:
+        fingerprint = self._fingerprints.get(str(path))
+        if fingerprint is None:
+            fingerprint = self.fingerprint(path)
+
+        now = datetime.now().isoformat(timespec="microseconds")
+        file_date = parse_file_date(path.name)
+        values = {
+            "content_hash": fingerprint.content_hash,
+            "mtime": fingerprint.mtime,
+            "size": fingerprint.size,
+            "file_date": file_date.isoformat() if file_date else None,
+            "status": status,
+            "deals_found": None,
+            "deals_published": None,
+            "deals_filtered": None,
+            "error": None,
+            **fields,
+            "updated_at": now,
+        }
+        columns = ", ".join(values)
+        placeholders = ", ".join("?" for _ in values)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in values)
+        self.db.conn.execute(
+            f"""INSERT INTO source_files (path, first_seen_at, {columns})
+                VALUES (?, ?, {placeholders})
+                ON CONFLICT(path) DO UPDATE SET {updates}""",
+            (fingerprint.path, now, *values.values()),
+        )
+        self.db.conn.commit()
+
+    def mark_parsed(self, path: Path, deals_found: int) -> None:
+        """Record that a file parsed (processing not finished yet)."""
+        self._record(path, self.PARSED, deals_found=deals_found)
+
+    def mark_processed(self, path: Path, deals_found: int, deals_published: int, deals_filtered: int) -> None:
+        """Record that every deal in a file was handled."""
+        self._record(
+            path, self.PROCESSED,
+            deals_found=deals_found, deals_published=deals_published, deals_filtered=deals_filtered,
+        )
+
+    def mark_failed(self, path: Path, error: str) -> None:
+        """Record a file-level failure (the file is retried on the next run)."""
+        try:
+            self._record(path, self.FAILED, error=error[:500])
+        except OSError:
+            pass
@@ -0,0 +1,151 @@
+"""SQLite registry of created short links, keyed by canonical long URL."""
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from ..models import ShortLink
+from ..utils.logging import get_logger
+from ..utils.metrics import CACHE_LOOKUPS
+from .store import SQLiteStore
+
+logger = get_logger(__name__)
+
+# Amazon tracking parameters that don't change where a link goes
+VOLATILE_PARAMS = frozenset({"linkCode", "th", "psc"})
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a long URL for short link reuse.
+
+    Drops linkCode/th/psc and the fragment, keeps every other parameter
+    (including the affiliate tag) in sorted order, and lowercases the host.
+
+    Args:
+        url: Long URL
+
+    Returns:
+        Canonical URL
+    """
+    parsed = urlparse(url.strip())
+    params = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k not in VOLATILE_PARAMS)
+    return urlunparse(
+        (parsed.scheme.lower(), parsed.netloc.lower(), parsed.path, parsed.params, urlencode(params), "")
+    )
+
+
+class ShortLinkRegistry(SQLiteStore):
+    """Created short links, so each canonical long URL is shortened once.
+
+    The publish path reads links from here; they are created in bulk for the
+    whole batch beforehand (see ShortLinkService.get_or_create_many()).
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS short_links (
+            canonical_url TEXT PRIMARY KEY,
+            short_url TEXT NOT NULL,
+            long_url TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            link_id TEXT,
+            created_at TEXT NOT NULL
+        )
+        """,
+    )
+
+    def __init__(self, db_path: str | Path, enabled: bool = True) -> None:
+        """
+        Initialize registry.
+
+        Args:
+            db_path: SQLite database file (usually the main dealbot.db)
+            enabled: If False, every lookup is a miss and nothing is stored
+        """
+        self.enabled = enabled
+        self._stats = {"hits": 0, "misses": 0}
+
+        super().__init__(db_path)
+
+    def get_many(self, urls: Iterable[str]) -> dict[str, ShortLink]:
+        """
+        Look up short links for long URLs.
+
+        Args:
+            urls: Long URLs (canonicalized here)
+
+        Returns:
+            Dict of canonical URL -> ShortLink for the URLs that are registered
+        """
+        canonical = sorted({canonicalize_url(url) for url in urls})
+        if not self.enabled or not canonical:
+            return {}
+
+        found: dict[str, ShortLink] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(canonical), 500):
+                chunk = canonical[start:start + 500]
+                rows = self.conn.execute(
+                    f"""SELECT canonical_url, short_url, long_url, provider, link_id, created_at
+                        FROM short_links WHERE canonical_url IN ({",".join("?" * len(chunk))})""",
+                    chunk,
+                ).fetchall()
+                for key, short_url, long_url, provider, link_id, created_at in rows:
+                    found[key] = ShortLink(
+                        short_url=short_url,
+                        long_url=long_url,
+                        provider=provider,
+                        link_id=link_id,
+                        created_at=datetime.fromisoformat(created_at),
+                    )
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(canonical) - len(found)
+        CACHE_LOOKUPS.inc(len(found), cache="shortlinks", source="registry", result="hit")
+        CACHE_LOOKUPS.inc(len(canonical) - len(found), cache="shortlinks", source="registry", result="miss")
+        return found
+
+    def get(self, url: str) -> Optional[ShortLink]:
+        """Look up the short link for one long URL."""
+        return self.get_many([url]).get(canonicalize_url(url))
+
+    def put_many(self, links: Iterable[ShortLink]) -> None:
+        """Register created short links (keyed by their canonical long URL)."""
+        if not self.enabled:
+            return
+
+        rows = [
+            (
+                canonicalize_url(link.long_url), link.short_url, link.long_url,
+                link.provider, link.link_id, link.created_at.isoformat(),
+            )
+            for link in links
+        ]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self.conn.executemany(
+                    """INSERT OR REPLACE INTO short_links
+                       (canonical_url, short_url, long_url, provider, link_id, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    rows,
+                )
+                self.conn.commit()
+        except sqlite3.Error as e:
+            # A registry write must never break the pipeline
+            logger.warning(f"Failed to register {len(rows)} short link(s): {e}")
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit/miss counters since the last reset."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        """Reset counters (called at the start of each run)."""
+        with self._lock:
+            self._stats = {"hits": 0, "misses": 0}
@@ -0,0 +1,286 @@
+"""Durable publish outbox: formatted WhatsApp messages waiting to be sent."""
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from ..models import DealStatus, ProcessedDeal, PublishResult
+from ..utils.logging import get_logger
+from .db import UPSERT_DEAL_SQL, _iso, deal_row, insert_destination
+from .store import SQLiteStore
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    """A claimed outbox row, ready to send."""
+
+    id: int
+    deal_id: str
+    recipients: list[str]
+    message: str
+    image_url: Optional[str]
+    attempts: int
+
+
+class Outbox(SQLiteStore):
+    """Messages queued for WhatsApp, stored next to the deals they publish.
+
+    enqueue() writes the deal row (status "queued") and its message in one
+    transaction, and mark_sent() flips both to sent/published together with
+    the destinations and the analytics event, so a crash can never leave a
+    sent deal unrecorded or a recorded deal unsent. Rows left in "sending"
+    by a crash go back to "pending" on recover(); Whapi's per-JID
+    idempotency keeps the resend from posting twice.
+    """
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    DEFAULT_MAX_ATTEMPTS = 5
+    DEFAULT_RETRY_BASE_SECONDS = 30.0
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            deal_id TEXT NOT NULL UNIQUE,
+            recipients TEXT NOT NULL,
+            message TEXT NOT NULL,
+            image_url TEXT,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TEXT NOT NULL,
+            last_error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            sent_at TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_outbox_status_due ON outbox(status, next_attempt_at)",
+    )
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_base_seconds: float = DEFAULT_RETRY_BASE_SECONDS,
+    ) -> None:
+        """
+        Initialize outbox.
+
+        Args:
+            db_path: SQLite database file (the main dealbot.db, which holds the deals table)
+            max_attempts: Sends per message before it is marked failed
+            retry_base_seconds: Backoff before the 2nd attempt (doubles after each failure)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_seconds = retry_base_seconds
+
+        super().__init__(db_path)
+
+    def enqueue(
+        self,
+        processed: ProcessedDeal,
+        recipients: list[str],
+        message: str,
+        image_url: Optional[str] = None,
+    ) -> int:
+        """
+        Queue a formatted message and save its deal as queued, atomically.
+
+        Re-enqueuing a deal replaces its message and resets its attempts
+        (unless it is being sent right now).
+
+        Args:
+            processed: Deal to publish (its status is saved as-is, normally QUEUED)
+            recipients: Destination JIDs
+            message: Formatted message text
+            image_url: Optional image sent with the message
+
+        Returns:
+            Outbox row ID
+
+        Raises:
+            sqlite3.Error: If the message could not be stored (nothing is queued)
+        """
+        now = datetime.now()
+        with self._lock:
+            try:
+                # Queued deals count as published for dedup from now on
+                self.conn.execute(UPSERT_DEAL_SQL, deal_row(processed, published_at=now))
+                self.conn.execute(
+                    """
+                    INSERT INTO outbox (
+                        deal_id, recipients, message, image_url, status,
+                        attempts, next_attempt_at, created_at, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?)
+                    ON CONFLICT(deal_id) DO UPDATE SET
+                        recipients = excluded.recipients,
+                        message = excluded.message,
+                        image_url = excluded.image_url,
+                        status = excluded.status,
+                        attempts = 0,
+                        next_attempt_at = excluded.next_attempt_at,
+                        last_error = NULL,
+                        updated_at = excluded.updated_at
+                    WHERE outbox.status != 'sending'
+                    """,
+                    (
+                        processed.deal.deal_id, json.dumps(recipients), message, image_url,
+                        self.PENDING, _iso(now), _iso(now), _iso(now),
+                    ),
+                )
+                row = self.conn.execute(
+                    "SELECT id FROM outbox WHERE deal_id = ?", (processed.deal.deal_id,)
+                ).fetchone()
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+        return row[0]
+
+    def claim(self, limit: int = 1, deal_id: Optional[str] = None) -> list[OutboxMessage]:
+        """
+        Take due pending messages (oldest first) and mark them as sending.
+
+        Args:
+            limit: Maximum messages to claim
+            deal_id: Only claim this deal's message (if it is pending, due or not)
+
+        Returns:
+            Claimed messages
+        """
+        now = _iso(datetime.now())
+        with self._lock:
+            if deal_id is not None:
+                rows = self.conn.execute(
+                    """SELECT id, deal_id, recipients, message, image_url, attempts FROM outbox
+                       WHERE deal_id = ? AND status = ?""",
+                    (deal_id, self.PENDING),
+                ).fetchall()
+            else:
+                rows = self.conn.execute(
+                    """SELECT id, deal_id, recipients, message, image_url, attempts FROM outbox
+                       WHERE status = ? AND next_attempt_at <= ?
+                       ORDER BY next_attempt_at, id LIMIT ?""",
+                    (self.PENDING, now, limit),
+                ).fetchall()
+            if not rows:
+                return []
+            self.conn.executemany(
+                "UPDATE outbox SET status = ?, updated_at = ? WHERE id = ?",
+                [(self.SENDING, now, row[0]) for row in rows],
+            )
+            self.conn.commit()
+
+        return [
+            OutboxMessage(
+                id=row_id, deal_id=row_deal_id, recipients=json.loads(recipients),
+                message=message, image_url=image_url, attempts=attempts,
+            )
+            for row_id, row_deal_id, recipients, message, image_url, attempts in rows
+        ]
+
+    def mark_sent(self, message: OutboxMessage, result: PublishResult) -> None:
+        """Record a successful send: outbox row, deal status, destinations and event in one transaction."""
+        sent_at = _iso(result.sent_at)
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute(
+                    """UPDATE outbox SET status = ?, attempts = attempts + 1, last_error = ?,
+                       sent_at = ?, updated_at = ? WHERE id = ?""",
+                    (self.SENT, result.error, sent_at, _iso(datetime.now()), message.id),
+                )
+                cursor.execute(
+                    "UPDATE deals SET status = ?, published_at = ? WHERE deal_id = ?",
+                    (DealStatus.PUBLISHED.value, sent_at, message.deal_id),
+                )
+                for dest, msg_id in result.message_ids.items():
+                    insert_destination(cursor, message.deal_id, dest, msg_id, result.sent_at)
+                self._log_event(cursor, message, "published", success=True)
+                self.conn.commit()
+        except sqlite3.Error as e:
+            # The message is out; Whapi already recorded the destinations, so it won't be re-sent
+            logger.warning(f"Failed to record send of {message.deal_id}: {e}")
+
+    def mark_failed(self, message: OutboxMessage, error: str) -> bool:
+        """
+        Record a failed send and schedule a retry with exponential backoff.
+
+        Returns:
+            True if the message will be retried, False if it ran out of attempts
+        """
+        attempts = message.attempts + 1
+        retry = attempts < self.max_attempts
+        now = datetime.now()
+        next_attempt = now + timedelta(seconds=self.retry_base_seconds * 2 ** (attempts - 1))
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute(
+                    """UPDATE outbox SET status = ?, attempts = ?, last_error = ?,
+                       next_attempt_at = ?, updated_at = ? WHERE id = ?""",
+                    (
+                        self.PENDING if retry else self.FAILED, attempts, error,
+                        _iso(next_attempt if retry else now), _iso(now), message.id,
+                    ),
+                )
+                if not retry:
+                    cursor.execute(
+                        "UPDATE deals SET status = ?, published_at = NULL WHERE deal_id = ?",
+                        (DealStatus.FAILED.value, message.deal_id),
+                    )
+                    self._log_event(cursor, message, "failed", success=False)
+                self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to record failed send of {message.deal_id}: {e}")
+        return retry
+
+    def _log_event(self, cursor: sqlite3.Cursor, message: OutboxMessage, event_type: str, success: bool) -> None:
+        cursor.execute(
+            "INSERT INTO events (deal_id, type, meta, created_at) VALUES (?, ?, ?, ?)",
+            (
+                message.deal_id, event_type,
+                json.dumps({"recipients": message.recipients, "success": success, "attempts": message.attempts + 1}),
+                _iso(datetime.now()),
+            ),
+        )
+
+    def recover(self) -> int:
+        """Return messages a crashed process left in "sending" to the queue. Returns how many."""
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE outbox SET status = ?, updated_at = ? WHERE status = ?",
+                (self.PENDING, _iso(datetime.now()), self.SENDING),
+            )
+            self.conn.commit()
+            return cursor.rowcount
+
+    def next_due(self) -> Optional[datetime]:
+        """When the next pending message is due (None if nothing is pending)."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = ?", (self.PENDING,)
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def counts(self) -> dict[str, int]:
+        """Messages per status."""
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        counts = {status: 0 for status in (self.PENDING, self.SENDING, self.SENT, self.FAILED)}
+        counts.update(dict(rows))
+        return counts
+
+    def summary(self) -> str:
+        """One-line summary for status messages."""
+        counts = self.counts()
+        return f"{counts[self.PENDING] + counts[self.SENDING]} waiting, {counts[self.FAILED]} failed"
@@ -0,0 +1,190 @@
+"""SQLite-backed product data cache shared across runs."""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from ..utils.logging import get_logger
+from ..utils.metrics import CACHE_LOOKUPS
+from .store import SQLiteStore
+
+logger = get_logger(__name__)
+
+
+class ProductCache(SQLiteStore):
+    """TTL cache of per-product lookups keyed by (marketplace, ASIN, source).
+
+    Lives in the same SQLite file as the deals database so it is persisted
+    wherever the database is (e.g. GCS on Cloud Run) and survives cold starts.
+    """
+
+    # Hours each source stays fresh. Prices move fast; images and titles barely change.
+    DEFAULT_TTL_HOURS: dict[str, float] = {
+        "paapi": 2,
+        "scrapula": 6,
+        "playwright": 6,
+        "ratings": 24,
+        "media": 168,  # image URL + title from any source
+    }
+    FALLBACK_TTL_HOURS = 24
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS product_cache (
+            marketplace TEXT NOT NULL,
+            asin TEXT NOT NULL,
+            source TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (marketplace, asin, source)
+        )
+        """,
+    )
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        ttl_hours: Optional[dict[str, float]] = None,
+        enabled: bool = True,
+    ) -> None:
+        """
+        Initialize cache.
+
+        Args:
+            db_path: SQLite database file (usually the main dealbot.db)
+            ttl_hours: Per-source TTL overrides in hours
+            enabled: If False, every lookup is a miss and nothing is stored
+        """
+        self.enabled = enabled
+        self.ttl_hours = {**self.DEFAULT_TTL_HOURS, **(ttl_hours or {})}
+        self._stats: dict[str, dict[str, int]] = {}
+
+        super().__init__(db_path)
+
+    def ttl_seconds(self, source: str) -> float:
+        """Get TTL for a source in seconds."""
+        return float(self.ttl_hours.get(source, self.FALLBACK_TTL_HOURS)) * 3600
+
+    def _record(self, source: str, hit: bool) -> None:
+        counters = self._stats.setdefault(source, {"hits": 0, "misses": 0})
+        counters["hits" if hit else "misses"] += 1
+        CACHE_LOOKUPS.inc(cache="product", source=source, result="hit" if hit else "miss")
+
+    def get(self, marketplace: str, asin: str, source: str) -> Optional[dict[str, Any]]:
+        """Return cached payload if present and fresh, else None."""
+        return self.get_many(marketplace, [asin], source).get(asin)
+
+    def get_many(self, marketplace: str, asins: list[str], source: str) -> dict[str, dict[str, Any]]:
+        """Return fresh cached payloads for the given ASINs (misses are omitted)."""
+        if not asins:
+            return {}
+        if not self.enabled:
+            with self._lock:
+                for _ in asins:
+                    self._record(source, hit=False)
+            return {}
+
+        cutoff = time.time() - self.ttl_seconds(source)
+        placeholders = ",".join("?" for _ in asins)
+
+        with self._lock:
+            rows = self.conn.execute(
+                f"""SELECT asin, payload FROM product_cache
+                    WHERE marketplace = ? AND source = ? AND fetched_at > ?
+                    AND asin IN ({placeholders})""",
+                (marketplace.lower(), source, cutoff, *asins),
+            ).fetchall()
+
+            found: dict[str, dict[str, Any]] = {}
+            for asin, payload in rows:
+                try:
+                    found[asin] = json.loads(payload)
+                except json.JSONDecodeError:
+                    continue
+
+            for asin in asins:
+                self._record(source, hit=asin in found)
+
+        if found:
+            logger.debug(f"Cache hit for {len(found)}/{len(asins)} ASINs ({source}, {marketplace})")
+        return found
+
+    def put(self, marketplace: str, asin: str, source: str, payload: dict[str, Any]) -> None:
+        """Store a payload, replacing any previous entry."""
+        if not self.enabled or not asin:
+            return
+
+        try:
+            with self._lock:
+                self.conn.execute(
+                    """INSERT OR REPLACE INTO product_cache
+                       (marketplace, asin, source, payload, fetched_at)
+                       VALUES (?, ?, ?, ?, ?)""",
+                    (marketplace.lower(), asin, source, json.dumps(payload, default=str), time.time()),
+                )
+                self.conn.commit()
+        except sqlite3.Error as e:
+            # A cache write must never break the pipeline
+            logger.warning(f"Failed to cache {source} data for {asin}: {e}")
+
+    def put_many(self, marketplace: str, source: str, payloads: dict[str, dict[str, Any]]) -> None:
+        """Store payloads for several ASINs in one transaction."""
+        if not self.enabled or not payloads:
+            return
+
+        now = time.time()
+        rows = [
+            (marketplace.lower(), asin, source, json.dumps(payload, default=str), now)
+            for asin, payload in payloads.items()
+            if asin
+        ]
+        try:
+            with self._lock:
+                self.conn.executemany(
+                    """INSERT OR REPLACE INTO product_cache
+                       (marketplace, asin, source, payload, fetched_at)
+                       VALUES (?, ?, ?, ?, ?)""",
+                    rows,
+                )
+                self.conn.commit()
+        except sqlite3.Error as e:
+            # A cache write must never break the pipeline
+            logger.warning(f"Failed to cache {source} data for {len(rows)} ASINs: {e}")
+
+    def remember_media(
+        self, marketplace: str, asin: str, image_url: Optional[str], title: Optional[str] = None
+    ) -> None:
+        """Store long-lived image/title data discovered by any source."""
+        if image_url:
+            self.put(marketplace, asin, "media", {"image_url": image_url, "title": title})
+
+    def purge_expired(self) -> int:
+        """Delete entries older than the longest TTL. Returns number of rows removed."""
+        cutoff = time.time() - max(self.ttl_seconds(s) for s in self.ttl_hours)
+        with self._lock:
+            cursor = self.conn.execute("DELETE FROM product_cache WHERE fetched_at < ?", (cutoff,))
+            self.conn.commit()
+        return cursor.rowcount
+
+    @property
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Hit/miss counters per source since the last reset."""
+        with self._lock:
+            return {source: dict(counters) for source, counters in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        """Reset hit/miss counters (called at the start of each run)."""
+        with self._lock:
+            self._stats = {}
+
+    def summary(self) -> str:
+        """One-line hit/miss summary for status messages."""
+        stats = self.stats
+        hits = sum(c["hits"] for c in stats.values())
+        misses = sum(c["misses"] for c in stats.values())
+        if not hits and not misses:
+            return "no lookups"
+        parts = ", ".join(f"{s} {c['hits']}/{c['hits'] + c['misses']}" for s, c in sorted(stats.items()))
+        return f"{hits} hits / {misses} misses ({parts})"
@@ -0,0 +1,126 @@
+"""SQLite history of scheduled runs (survives restarts, drives catch-up)."""
+
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from ..utils.logging import get_logger
+from .store import SQLiteStore
+
+logger = get_logger(__name__)
+
+
+def _utc(value: datetime) -> str:
+    """Fixed-width UTC timestamp, so text comparison matches time order across DST changes."""
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+class RunHistory(SQLiteStore):
+    """Scheduled runs per job: which slots ran, were skipped, failed or got interrupted."""
+
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+    INTERRUPTED = "interrupted"
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS scheduler_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job TEXT NOT NULL,
+            scheduled_for TEXT NOT NULL,
+            trigger TEXT NOT NULL,
+            status TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT,
+            error TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_scheduler_runs_job_slot ON scheduler_runs(job, scheduled_for)",
+    )
+
+    def __init__(self, db_path: str | Path) -> None:
+        """
+        Initialize history.
+
+        Args:
+            db_path: SQLite database file (usually the main dealbot.db)
+        """
+        super().__init__(db_path)
+
+    def last_scheduled(self, job: str) -> Optional[datetime]:
+        """
+        Latest slot of a job that was handled (run or skipped), as an aware UTC datetime.
+
+        Interrupted runs don't count, so a slot cut short by a restart is due
+        again and the catch-up policy decides whether it re-runs.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                """SELECT MAX(scheduled_for) FROM scheduler_runs
+                   WHERE job = ? AND trigger = 'schedule' AND status != ?""",
+                (job, self.INTERRUPTED),
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def start(self, job: str, scheduled_for: datetime, trigger: str = "schedule") -> int:
+        """Record a run as started. Returns its ID."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            cursor = self.conn.execute(
+                """INSERT INTO scheduler_runs (job, scheduled_for, trigger, status, started_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (job, _utc(scheduled_for), trigger, self.RUNNING, _utc(now)),
+            )
+            self.conn.commit()
+            return cursor.lastrowid  # type: ignore[return-value]
+
+    def finish(self, run_id: int, status: str, error: Optional[str] = None) -> None:
+        """Record how a started run ended."""
+        try:
+            with self._lock:
+                self.conn.execute(
+                    "UPDATE scheduler_runs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                    (status, _utc(datetime.now(timezone.utc)), error, run_id),
+                )
+                self.conn.commit()
+        except sqlite3.Error as e:
+            # A history write must never break the scheduler
+            logger.warning(f"Failed to record end of scheduled run {run_id}: {e}")
+
+    def skip(self, job: str, scheduled_for: datetime, reason: str, trigger: str = "schedule") -> None:
+        """Record a slot that was deliberately not run."""
+        now = _utc(datetime.now(timezone.utc))
+        try:
+            with self._lock:
+                self.conn.execute(
+                    """INSERT INTO scheduler_runs (job, scheduled_for, trigger, status, finished_at, error)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (job, _utc(scheduled_for), trigger, self.SKIPPED, now, reason),
+                )
+                self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to record skipped run of {job}: {e}")
+
+    def recover(self) -> int:
+        """Mark runs a crashed process left "running" as interrupted. Returns how many."""
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE scheduler_runs SET status = ?, finished_at = ? WHERE status = ?",
+                (self.INTERRUPTED, _utc(datetime.now(timezone.utc)), self.RUNNING),
+            )
+            self.conn.commit()
+            return cursor.rowcount
+
+    def recent(self, job: str, limit: int = 10) -> list[dict[str, Any]]:
+        """Latest runs of a job, newest first."""
+        with self._lock:
+            cursor = self.conn.execute(
+                """SELECT id, job, scheduled_for, trigger, status, started_at, finished_at, error
+                   FROM scheduler_runs WHERE job = ? ORDER BY id DESC LIMIT ?""",
+                (job, limit),
+            )
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -0,0 +1,41 @@
+"""Base class for stores that keep their tables in the shared SQLite file."""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class SQLiteStore:
+    """Tables in the main dealbot.db, on a connection of their own.
+
+    Stores are used from worker threads (enrichment pool, publish worker,
+    scheduler), so each one opens its own connection, serialized by a lock,
+    rather than sharing Database.conn and interleaving with its transactions.
+    """
+
+    # CREATE TABLE / CREATE INDEX statements, run once on open
+    SCHEMA: tuple[str, ...] = ()
+
+    def __init__(self, db_path: str | Path) -> None:
+        """
+        Open the store.
+
+        Args:
+            db_path: SQLite database file (usually the main dealbot.db)
+        """
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
+        self._initialize_schema()
+
+    def _initialize_schema(self) -> None:
+        """Create the store's tables if they don't exist."""
+        with self._lock:
+            for statement in self.SCHEMA:
+                self.conn.execute(statement)
+            self.conn.commit()
+
+    def close(self) -> None:
+        """Close the store's connection."""
+        with self._lock:
+            self.conn.close()
@@ -167,3 +167,8 @@ class Config:
     def price_discrepancy_threshold(self) -> float:
         """Get price discrepancy threshold for warnings."""
         return float(self.get("price_validation.discrepancy_threshold", 0.15))
+
+    @property
+    def price_max_age_minutes(self) -> float:
+        """Get how old previewed prices may be before publishing re-validates them."""
+        return float(self.get("price_validation.max_age_minutes", 30))
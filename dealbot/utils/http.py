@@ -0,0 +1,152 @@
+"""Shared pooled HTTP transport for all service clients."""
+
+import asyncio
+import threading
+import time
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import Config
+from .logging import get_logger
+from .metrics import HTTP_REQUESTS, HTTP_SECONDS
+
+logger = get_logger(__name__)
+
+
+class HttpTransport:
+    """One keep-alive connection pool per host, shared by every service.
+
+    Clients name their service on each call so the right timeout is applied.
+    The sync methods can be used from any thread (urllib3 pools are thread-safe);
+    the async methods run the same pooled calls in a worker thread, so asyncio
+    code reuses the warm connections too.
+    """
+
+    # Seconds per service (connect + read). Override via config "http.timeouts".
+    DEFAULT_TIMEOUTS: dict[str, float] = {
+        "whapi": 30,
+        "shortlinks": 10,
+        "ratings": 10,
+        "scrapula": 30,
+        "scrapula_download": 60,
+        "amazon": 10,
+    }
+    FALLBACK_TIMEOUT = 30.0
+
+    def __init__(
+        self,
+        timeouts: Optional[dict[str, float]] = None,
+        pool_connections: int = 16,
+        pool_maxsize: int = 16,
+    ) -> None:
+        """
+        Initialize transport.
+
+        Args:
+            timeouts: Per-service timeout overrides in seconds
+            pool_connections: Number of hosts to keep pools for
+            pool_maxsize: Keep-alive connections kept per host
+        """
+        self.timeouts = {**self.DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.session = self._build_session()
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def timeout_for(self, service: str) -> float:
+        """Get the timeout in seconds for a service."""
+        return float(self.timeouts.get(service, self.FALLBACK_TIMEOUT))
+
+    def request(self, method: str, url: str, service: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request over the shared pool.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            service: Calling service name (selects the timeout)
+            **kwargs: Passed through to requests (headers, json, params, ...)
+
+        Returns:
+            requests.Response
+        """
+        kwargs.setdefault("timeout", self.timeout_for(service))
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            HTTP_REQUESTS.inc(service=service, status=type(e).__name__)
+            raise
+        finally:
+            HTTP_SECONDS.observe(time.perf_counter() - start, service=service)
+        HTTP_REQUESTS.inc(service=service, status=str(response.status_code))
+        return response
+
+    def get(self, url: str, service: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request."""
+        return self.request("GET", url, service, **kwargs)
+
+    def post(self, url: str, service: str, **kwargs: Any) -> requests.Response:
+        """Send a POST request."""
+        return self.request("POST", url, service, **kwargs)
+
+    async def arequest(self, method: str, url: str, service: str, **kwargs: Any) -> requests.Response:
+        """Async variant of request()."""
+        return await asyncio.to_thread(self.request, method, url, service, **kwargs)
+
+    async def aget(self, url: str, service: str, **kwargs: Any) -> requests.Response:
+        """Async variant of get()."""
+        return await self.arequest("GET", url, service, **kwargs)
+
+    async def apost(self, url: str, service: str, **kwargs: Any) -> requests.Response:
+        """Async variant of post()."""
+        return await self.arequest("POST", url, service, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Get the process-wide transport (created with defaults on first use)."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport()
+        return _transport
+
+
+def configure_transport(config: Config) -> HttpTransport:
+    """
+    Apply the "http" config section to the process-wide transport.
+
+    Args:
+        config: Application config
+
+    Returns:
+        The configured transport
+    """
+    global _transport
+    http_cfg = config.get("http", {}) or {}
+    transport = HttpTransport(
+        timeouts=http_cfg.get("timeouts"),
+        pool_connections=int(http_cfg.get("pool_connections", 16)),
+        pool_maxsize=int(http_cfg.get("pool_maxsize", 16)),
+    )
+    with _transport_lock:
+        previous, _transport = _transport, transport
+    if previous is not None:
+        previous.close()
+    return transport
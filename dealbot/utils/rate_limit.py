@@ -0,0 +1,104 @@
+"""Per-service concurrency caps and call pacing for external APIs."""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import ContextManager, Iterator
+
+from .config import Config
+from .logging import get_logger
+from .metrics import STAGE_WAIT_SECONDS, STAGE_WAITING, track_stage
+
+logger = get_logger(__name__)
+
+
+class ServiceLimiter:
+    """Caps concurrent calls to one service and spaces out call start times."""
+
+    def __init__(self, name: str, max_concurrent: int = 1, min_interval: float = 0.0) -> None:
+        """
+        Initialize limiter.
+
+        Args:
+            name: Service name (used in logs)
+            max_concurrent: Maximum number of calls in flight at once
+            min_interval: Minimum seconds between the start of two calls
+        """
+        self.name = name
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.min_interval = max(0.0, float(min_interval))
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def _wait_for_turn(self) -> None:
+        """Reserve the next start slot and sleep until it arrives."""
+        if self.min_interval <= 0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+
+        delay = start - now
+        if delay > 0:
+            logger.debug(f"Rate limiting {self.name}: waiting {delay:.2f}s")
+            time.sleep(delay)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a concurrency slot for the duration of one call (timed as the service's stage)."""
+        waiting_since = time.perf_counter()
+        STAGE_WAITING.inc(stage=self.name)
+        self._semaphore.acquire()
+        try:
+            try:
+                self._wait_for_turn()
+            finally:
+                STAGE_WAITING.dec(stage=self.name)
+                STAGE_WAIT_SECONDS.observe(time.perf_counter() - waiting_since, stage=self.name)
+            with track_stage(self.name):
+                yield
+        finally:
+            self._semaphore.release()
+
+
+class ServiceLimits:
+    """Registry of limiters for every external service used by the pipeline."""
+
+    # service -> (max_concurrent, min_interval seconds)
+    DEFAULTS: dict[str, tuple[int, float]] = {
+        "paapi": (1, 1.0),  # PA-API allows ~1 TPS on new associate accounts
+        "scrapula": (1, 0.0),
+        "playwright": (2, 0.0),  # Each call drives a Chromium page
+        "amazon": (2, 0.5),  # Product page fetches (enrichment fallback)
+        "deepseek": (4, 0.0),
+        "shortlinks": (4, 0.0),
+        "ratings": (2, 0.0),
+        "whapi": (1, 2.0),  # Keep WhatsApp posts spaced out like the old 2s sleep
+    }
+
+    def __init__(self, config: Config) -> None:
+        """Build limiters from the `concurrency.services` config section."""
+        overrides = config.get("concurrency", {}) or {}
+        overrides = overrides.get("services", {}) or {}
+
+        self._limiters: dict[str, ServiceLimiter] = {}
+        for name, (max_concurrent, min_interval) in self.DEFAULTS.items():
+            service_cfg = overrides.get(name, {}) or {}
+            self._limiters[name] = ServiceLimiter(
+                name,
+                max_concurrent=service_cfg.get("max_concurrent", max_concurrent),
+                min_interval=service_cfg.get("min_interval", min_interval),
+            )
+
+    def get(self, name: str) -> ServiceLimiter:
+        """Get limiter for a service (unknown services get an unrestricted limiter)."""
+        if name not in self._limiters:
+            self._limiters[name] = ServiceLimiter(name, max_concurrent=64)
+        return self._limiters[name]
+
+    def slot(self, name: str) -> ContextManager[None]:
+        """Shortcut for `get(name).slot()`."""
+        return self.get(name).slot()
@@ -0,0 +1,226 @@
+"""Source directory watcher for near-real-time ingestion of deal files."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from .utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Inotify:
+    """Minimal Linux inotify binding (ctypes), watching directories for finished TXT writes."""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._dirs: dict[int, Path] = {}
+
+    def add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), self.MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(directory))
+        self._dirs[wd] = directory
+
+    def read(self, timeout: float) -> Optional[list[tuple[Path, int]]]:
+        """
+        Wait up to timeout for events.
+
+        Returns:
+            (path, mask) per event, or None if the kernel queue overflowed (rescan needed)
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events: list[tuple[Path, int]] = []
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            directory = self._dirs.get(wd)
+            if directory is not None and name:
+                events.append((directory / os.fsdecode(name), mask))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class SourceWatcher:
+    """Hands new or changed TXT files in a directory tree to a callback once they stop changing.
+
+    Uses inotify where available and falls back to polling stat snapshots
+    (e.g. macOS, network or Drive-synced mounts). A file is only delivered
+    after its size and mtime have been stable for settle_seconds, so files
+    that are still being written or synced are never parsed half-way.
+    """
+
+    def __init__(
+        self,
+        source_dir: Path,
+        on_file: Callable[[Path], None],
+        settle_seconds: float = 3.0,
+        poll_interval: float = 5.0,
+        use_inotify: bool = True,
+    ) -> None:
+        """
+        Initialize watcher.
+
+        Args:
+            source_dir: Directory to watch (recursively)
+            on_file: Called with each settled file, on the watcher's thread
+            settle_seconds: How long a file must stay unchanged before delivery
+            poll_interval: Seconds between scans in polling mode
+            use_inotify: Try inotify first (polling is used if it is unavailable)
+        """
+        self.source_dir = source_dir
+        self.on_file = on_file
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+
+        self._stop = threading.Event()
+        self._snapshot: dict[Path, tuple[int, int]] = {}
+        # Path -> (monotonic time of the last observed change, (size, mtime_ns) then)
+        self._pending: dict[Path, tuple[float, Optional[tuple[int, int]]]] = {}
+        self.mode = "polling"
+
+    @staticmethod
+    def _is_deal_file(path: Path) -> bool:
+        return path.suffix == ".txt" and not path.name.startswith(".")
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        """(size, mtime_ns) of every deal file under the source directory."""
+        snapshot: dict[Path, tuple[int, int]] = {}
+        for root, _, names in os.walk(self.source_dir):
+            for name in names:
+                path = Path(root) / name
+                if not self._is_deal_file(path):
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def _rescan(self) -> None:
+        """Mark files that appeared or changed since the last scan."""
+        snapshot = self._scan()
+        for path, signature in snapshot.items():
+            if self._snapshot.get(path) != signature:
+                self._touch(path)
+        self._snapshot = snapshot
+
+    def _touch(self, path: Path) -> None:
+        self._pending[path] = (time.monotonic(), None)
+
+    def _deliver_settled(self) -> None:
+        now = time.monotonic()
+        for path, (changed_at, signature) in list(self._pending.items()):
+            try:
+                stat = path.stat()
+            except OSError:
+                del self._pending[path]  # Deleted or renamed away (e.g. a temp file)
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != signature:
+                self._pending[path] = (now, current)
+                continue
+            if now - changed_at < self.settle_seconds or not stat.st_size:
+                continue
+
+            del self._pending[path]
+            self._snapshot[path] = current
+            logger.info(f"👀 New deal file: {path.name}")
+            try:
+                self.on_file(path)
+            except Exception as e:
+                logger.error(f"Error processing {path.name}: {e}", exc_info=True)
+
+    def _open_inotify(self) -> Optional[_Inotify]:
+        if not self.use_inotify:
+            return None
+        try:
+            inotify = _Inotify()
+            for root, _, _ in os.walk(self.source_dir):
+                inotify.add_watch(Path(root))
+            return inotify
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable ({e}), polling every {self.poll_interval:g}s instead")
+            return None
+
+    def run_forever(self) -> None:
+        """Watch until stop() (or Ctrl+C)."""
+        if not self.source_dir.exists():
+            raise FileNotFoundError(f"Source directory does not exist: {self.source_dir}")
+
+        inotify = self._open_inotify()
+        self.mode = "inotify" if inotify else "polling"
+        # Files already present are left to the catch-up run; only changes from now on count
+        self._snapshot = self._scan()
+        logger.info(f"Watching {self.source_dir} for deal files ({self.mode})")
+
+        try:
+            while not self._stop.is_set():
+                if inotify:
+                    tick = min(0.5, self.settle_seconds) if self._pending else 1.0
+                    events = inotify.read(tick)
+                    if events is None:
+                        logger.warning("inotify queue overflowed, rescanning")
+                        self._rescan()
+                    else:
+                        for path, mask in events:
+                            if mask & _Inotify.IN_ISDIR:
+                                # New subfolder: watch it and pick up files already inside
+                                inotify.add_watch(path)
+                                self._rescan()
+                            elif self._is_deal_file(path):
+                                self._touch(path)
+                else:
+                    tick = min(self.poll_interval, self.settle_seconds) if self._pending else self.poll_interval
+                    self._stop.wait(tick)
+                    self._rescan()
+                self._deliver_settled()
+        except KeyboardInterrupt:
+            logger.info("Watcher stopped by user")
+        finally:
+            if inotify:
+                inotify.close()
+
+    def stop(self) -> None:
+        """Stop run_forever() after the file being processed (if any)."""
+        self._stop.set()
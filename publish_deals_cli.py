@@ -97,14 +97,16 @@ def main():
         published_count = 0
         failed_count = 0
         
+        # Upgrade preview results: stale prices re-checked, shortlinks/ratings/AI reviews added
+        print("🔗 Preparing deals (shortlinks, ratings, AI reviews)...")
+        controller.prepare_for_publish(ready_deals)
+
         for i, processed in enumerate(ready_deals, 1):
             try:
-                # Reprocess with shortlinks enabled (for_preview=False)
-                print(f"   [{i}/{len(ready_deals)}] Processing: {processed.deal.title[:50]}...")
-                final_processed = controller.process_deal(processed.deal, for_preview=False)
+                print(f"   [{i}/{len(ready_deals)}] Publishing: {processed.deal.title[:50]}...")
                 
                 # Publish
-                result = controller.publish_deal(final_processed, include_group=False)
+                result = controller.publish_deal(processed, include_group=False)
                 
                 if result.publish_result and result.publish_result.success:
                     published_count += 1
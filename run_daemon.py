@@ -4,12 +4,12 @@ DealBot Daemon - Autonomous deal processing service.
 
 This script runs the DealBot as a headless daemon service that:
 - Syncs deal files from Google Drive
-- Processes deals automatically at 6am and 6pm Spain time
+- Processes deals automatically on a schedule (default 6am and 6pm Spain time)
 - Publishes qualifying deals to WhatsApp
 - Sends status updates
 
 Usage:
-    python run_daemon.py [--once] [--source-dir PATH] [--use-gdrive] [--http]
+    python run_daemon.py [--once] [--source-dir PATH] [--use-gdrive] [--http] [--watch]
 
 Options:
     --once          Run once immediately and exit (for testing)
@@ -17,6 +17,7 @@ Options:
     --use-gdrive    Sync files from Google Drive before processing
     --folder-id     Google Drive folder ID (required with --use-gdrive)
     --http          Run HTTP server for Cloud Run (default mode if PORT env var set)
+    --watch         Process new files in the source directory as soon as they land
 """
 
 import argparse
@@ -29,6 +30,8 @@ from dealbot.http_server import run_http_server
 from dealbot.scheduler import DealBotScheduler
 from dealbot.services.gdrive import GoogleDriveService
 from dealbot.services.gcs_storage import GCSStorage
+from dealbot.storage.run_history import RunHistory
+from dealbot.watcher import SourceWatcher
 from dealbot.utils.config import Config
 from dealbot.utils.logging import get_logger, setup_logging
 
@@ -64,10 +67,15 @@ def main():
         help="Run HTTP server for Cloud Run (default if PORT env var set)"
     )
 
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Watch the source directory and process new files within seconds"
+    )
     args = parser.parse_args()
 
     # Auto-enable HTTP mode if PORT environment variable is set (Cloud Run standard)
-    if os.getenv("PORT") and not args.once:
+    if os.getenv("PORT") and not args.once and not args.watch:
         args.http = True
         logger.info("PORT env var detected - enabling HTTP server mode")
 
@@ -112,8 +120,11 @@ def main():
                 sys.exit(1)
 
         # Define the task function
-        def process_deals():
-            """Task function that syncs (if needed) and processes deals."""
+        def process_deals(raise_errors: bool = False):
+            """Task function that syncs (if needed) and processes deals.
+
+            Errors are logged, or raised with raise_errors (so the scheduler records the run as failed).
+            """
             try:
                 # Sync from Google Drive if enabled
                 if gdrive_service and local_sync_dir and folder_id:
@@ -135,6 +146,8 @@ def main():
                 daemon.run_once(source_dir)
 
             except Exception as e:
+                if raise_errors:
+                    raise
                 logger.error(f"Error in process_deals: {e}", exc_info=True)
 
         # Run based on mode
@@ -142,7 +155,28 @@ def main():
             # Run once and exit
             logger.info("Running in --once mode (immediate single run)")
             process_deals()
+            daemon.drain_outbox()
             logger.info("Single run complete, exiting")
+        elif args.watch:
+            # Watch a local folder; queued deals are sent in the background
+            if gdrive_service:
+                logger.error("--watch needs a local source directory (it can't watch Google Drive)")
+                sys.exit(1)
+            source_dir = Path(args.source_dir or config.get("default_source_dir", "."))
+            watch_cfg = config.get("watch", {}) or {}
+
+            daemon.start_publisher()
+            # Catch up on files that arrived while the daemon was down
+            process_deals()
+
+            watcher = SourceWatcher(
+                source_dir,
+                on_file=daemon.ingest_file,
+                settle_seconds=float(watch_cfg.get("settle_seconds", 3)),
+                poll_interval=float(watch_cfg.get("poll_interval_seconds", 5)),
+                use_inotify=watch_cfg.get("use_inotify", True),
+            )
+            watcher.run_forever()
         elif args.http:
             # Run HTTP server for Cloud Run
             port = int(os.getenv("PORT", 8080))
@@ -165,8 +199,17 @@ def main():
 
             run_http_server(daemon, gdrive_service, folder_id, gcs_storage, port)
         else:
-            # Run on schedule (internal scheduler)
-            scheduler = DealBotScheduler(task_func=process_deals)
+            # Run on schedule (internal scheduler); queued deals are sent in the background
+            daemon.start_publisher()
+            scheduler_cfg = config.get("scheduler", {}) or {}
+            scheduler = DealBotScheduler(
+                task_func=lambda: process_deals(raise_errors=True),
+                timezone=scheduler_cfg.get("timezone", "Europe/Madrid"),
+                cron=scheduler_cfg.get("cron", DealBotScheduler.DEFAULT_CRON),
+                history=RunHistory(daemon.controller.db.db_path),
+                catch_up=scheduler_cfg.get("catch_up", "latest"),
+                catch_up_hours=float(scheduler_cfg.get("catch_up_hours", 6)),
+            )
             scheduler.run_forever()
 
     except KeyboardInterrupt:
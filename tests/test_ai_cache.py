@@ -0,0 +1,79 @@
+"""Tests for the durable AI validation cache."""
+
+import json
+import time
+from types import SimpleNamespace
+
+from dealbot.services.ai_validator import AIValidationRequest, AIValidator, get_cached_or_validate_many
+from dealbot.storage.ai_cache import AIValidationCache
+
+
+def test_similar_prices_share_a_verdict(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test tolerance buckets for price and discount."""
+    cache = AIValidationCache(tmp_path / "dealbot.db", price_tolerance_pct=5, discount_tolerance_pct=5)
+    cache.put("B000000001", 20.00, 41.0, approved=True, reasoning="ok", confidence="high", review=("Bueno", "Good"))
+
+    assert cache.get_verdict("B000000001", 20.01, 42.0)["review_en"] == "Good"
+    assert cache.get_verdict("B000000001", 30.00, 41.0) is None  # Price moved beyond tolerance
+    assert cache.get_verdict("B000000001", 20.00, 55.0) is None  # Discount moved beyond tolerance
+    assert cache.get_verdict(None, 20.00, 41.0) is None
+
+
+def test_rejections_expire_before_approvals(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test separate TTLs for approvals and rejections, across reopen."""
+    path = tmp_path / "dealbot.db"
+    cache = AIValidationCache(path, approved_ttl_hours=72, rejected_ttl_hours=12)
+    cache.put("B000000001", 10.0, 50.0, approved=True, reasoning="ok", confidence="high", review=("Bueno", "Good"))
+    cache.put("B000000002", 10.0, 50.0, approved=False, reasoning="fake PVP", confidence="high")
+    # Age both entries by one day
+    cache.conn.execute("UPDATE ai_validation_cache SET validated_at = ?", (time.time() - 24 * 3600,))
+    cache.conn.commit()
+    cache.close()
+
+    cache = AIValidationCache(path, approved_ttl_hours=72, rejected_ttl_hours=12)
+    assert cache.get_verdict("B000000001", 10.0, 50.0)["approved"] is True
+    assert cache.get_verdict("B000000002", 10.0, 50.0) is None
+
+
+def test_purge_drops_verdicts_and_reviews_past_their_ttl(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that purging removes only rows older than every TTL that applies to them."""
+    cache = AIValidationCache(tmp_path / "dealbot.db", approved_ttl_hours=72, rejected_ttl_hours=12, review_ttl_hours=24)
+    cache.put("B000000001", 10.0, 50.0, approved=True, reasoning="ok", confidence="high", review=("Bueno", "Good"))
+    cache.put("B000000002", 10.0, 50.0, approved=True, reasoning="ok", confidence="high", review=("Bien", "Fine"))
+    old = time.time() - 100 * 3600
+    cache.conn.execute("UPDATE ai_validation_cache SET validated_at = ? WHERE asin = 'B000000001'", (old,))
+    cache.conn.execute("UPDATE ai_reviews SET reviewed_at = ? WHERE asin = 'B000000001'", (old,))
+    cache.conn.commit()
+
+    assert cache.purge_expired() == 2
+    assert cache.get_verdict("B000000002", 10.0, 50.0)["review_en"] == "Fine"
+    assert cache.purge_expired() == 0
+
+
+def test_price_change_reuses_reviews(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a new price re-asks only for the verdict and keeps the stored reviews."""
+    cache = AIValidationCache(tmp_path / "dealbot.db")
+    cache.put("B000000001", 50.0, 20.0, approved=True, reasoning="ok", confidence="high", review=("Bueno", "Good"))
+
+    sent: list[dict] = []
+
+    def create(**kwargs):  # type: ignore[no-untyped-def]
+        sent.append(json.loads(kwargs["messages"][1]["content"]))
+        content = json.dumps({"results": [{"id": 0, "approved": True, "reasoning": "cheaper"}]})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+    validator = AIValidator.__new__(AIValidator)
+    validator.model = "deepseek-chat"
+    validator.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    request = AIValidationRequest("Headphones", 35.0, 62.5, 44.0, asin="B000000001")
+    (result,) = get_cached_or_validate_many(validator, [request], cache=cache)
+
+    assert sent[0]["deals"][0]["need_review"] is False
+    assert result.approved and result.review.english == "Good"
+    assert cache.stats == {"hits": 0, "misses": 1, "reviews_reused": 1}
+
+    # The new verdict is cached for the new price
+    (again,) = get_cached_or_validate_many(validator, [request], cache=cache)
+    assert len(sent) == 1 and again.review.spanish == "Bueno"
+    assert "1/2 verdicts from cache" in cache.summary()
@@ -0,0 +1,115 @@
+"""Tests for batched DeepSeek validation (with a fake OpenAI client)."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from dealbot.controller import DealController
+from dealbot.models import Deal, PriceInfo, ProcessedDeal
+from dealbot.services.ai_validator import AIValidationRequest, AIValidator, get_cached_or_validate_many
+from dealbot.storage.ai_cache import AIValidationCache
+
+
+class _FakeCompletions:
+    def __init__(self, replies: list[str]) -> None:
+        self.replies = replies
+        self.calls: list[dict] = []
+
+    def create(self, **kwargs):  # type: ignore[no-untyped-def]
+        self.calls.append(kwargs)
+        content = self.replies.pop(0)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=900, completion_tokens=300),
+        )
+
+
+def _validator(replies: list[str]) -> tuple[AIValidator, _FakeCompletions]:
+    validator = AIValidator.__new__(AIValidator)
+    validator.model = "deepseek-chat"
+    completions = _FakeCompletions(replies)
+    validator.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return validator, completions
+
+
+def _request(n: int) -> AIValidationRequest:
+    return AIValidationRequest(f"Product {n}", 10.0 + n, 20.0, 50.0, asin=f"B00000000{n}")
+
+
+def test_batch_fails_only_malformed_items() -> None:
+    """Test that one bad item doesn't fail the rest of the batch."""
+    reply = json.dumps({"results": [
+        {"id": 0, "approved": True, "reasoning": "ok", "review": {"es": "Hola", "en": "Hi"}},
+        {"id": 1, "approved": "maybe"},
+        {"id": 3, "approved": False, "reasoning": "inflated PVP"},
+    ]})
+    validator, completions = _validator([reply])
+
+    results = validator.validate_batch([_request(n) for n in range(4)])
+
+    assert len(completions.calls) == 1
+    messages = completions.calls[0]["messages"]
+    assert messages[0]["role"] == "system"
+    assert "Product 0" not in messages[0]["content"]  # Static, cacheable prefix
+    assert len(json.loads(messages[1]["content"])["deals"]) == 4
+
+    assert results[0].approved and results[0].review.english == "Hi"
+    assert results[1].error and results[2].error  # Malformed, missing
+    assert not results[3].approved and results[3].error is None
+    assert all(r.latency_ms is not None and r.batch_size == 4 for r in results)
+    assert results[0].prompt_tokens == 225 and results[0].completion_tokens == 75
+
+
+def test_unparseable_response_fails_whole_batch() -> None:
+    """Test that invalid JSON yields an error result per deal."""
+    validator, _ = _validator(["not json"])
+
+    results = validator.validate_batch([_request(0), _request(1)])
+
+    assert [r.reasoning for r in results] == ["AI response parsing failed"] * 2
+
+
+def test_many_uses_cache_and_chunks(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that cached deals are skipped and misses are chunked by batch_size."""
+    cache = AIValidationCache(tmp_path / "dealbot.db")
+    approve = lambda ids: json.dumps({"results": [  # noqa: E731
+        {"id": i, "approved": True, "review": {"es": "Bueno", "en": "Good"}} for i in ids
+    ]})
+    validator, completions = _validator([approve(range(2)), approve(range(1)), approve(range(2))])
+
+    get_cached_or_validate_many(validator, [_request(n) for n in range(3)], batch_size=2, cache=cache)
+    results = get_cached_or_validate_many(validator, [_request(n) for n in range(5)], batch_size=2, cache=cache)
+
+    assert len(completions.calls) == 3  # 2 for the first three deals, 1 for the two new ones
+    assert all(r.approved for r in results)
+    assert cache.stats["hits"] == 3
+
+
+def test_controller_applies_results_with_fallback_for_failed_deals() -> None:
+    """Test that the controller validates candidates in one batch and falls back per deal."""
+    reply = json.dumps({"results": [{"id": 0, "approved": False, "reasoning": "fake PVP"}]})
+    validator, completions = _validator([reply])
+
+    controller = DealController.__new__(DealController)
+    controller.ai_validator = validator
+    controller.ai_batch_size = 8
+    controller.ai_cache = None
+    controller.limits = MagicMock()
+    controller.limits.get.return_value = None
+
+    processed = [
+        ProcessedDeal(
+            deal=Deal(title=title, url=f"https://amazon.es/dp/{asin}", asin=asin),
+            price_info=PriceInfo(asin=asin, title=title, current_price=30.0, list_price=60.0),
+            adjusted_price=30.0,
+        )
+        for asin, title in [("B0AAAAAAA1", "Kitchen knife set"), ("B0AAAAAAA2", "Garden hose")]
+    ]
+    controller.validate_deals_with_ai(processed)
+
+    assert len(completions.calls) == 1
+    assert processed[0].ai_approved is False
+    assert processed[0].ai_tokens == 600
+    # Missing from the response: rule-based fallback with template reviews
+    assert processed[1].ai_approved is True
+    assert processed[1].ai_review_en
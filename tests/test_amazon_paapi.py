@@ -0,0 +1,90 @@
+"""Tests for batched PA-API price validation."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from dealbot.models import Currency, Deal
+from dealbot.services.amazon_paapi import AmazonPAAPIService
+from dealbot.utils.config import Config
+
+
+def _service() -> AmazonPAAPIService:
+    config = MagicMock(spec=Config)
+    config.require_env = MagicMock(return_value="dummy")
+    config.affiliate_tag = "test-21"
+    config.price_discrepancy_threshold = 0.15
+    return AmazonPAAPIService(config)
+
+
+def _item(asin: str, price: float, list_price: float) -> SimpleNamespace:
+    listing = SimpleNamespace(
+        price=SimpleNamespace(amount=price),
+        saving_basis=SimpleNamespace(amount=list_price),
+        availability=SimpleNamespace(type="Now", message=None),
+    )
+    return SimpleNamespace(
+        asin=asin,
+        offers=SimpleNamespace(listings=[listing], summaries=None),
+        item_info=SimpleNamespace(title=SimpleNamespace(display_value=f"Item {asin}")),
+        images=None,
+        customer_reviews=None,
+    )
+
+
+def _deal(i: int, currency: Currency = Currency.EUR) -> Deal:
+    asin = f"B{i:09d}"
+    return Deal(
+        title=f"Deal {i}",
+        url=f"https://amazon.es/dp/{asin}",
+        asin=asin,
+        stated_price=10.0,
+        source_pvp=20.0,
+        source_discount_pct=50.0,
+        currency=currency,
+    )
+
+
+def test_validate_prices_chunks_by_ten() -> None:
+    """Test that ASINs are requested at most 10 per GetItems call."""
+    service = _service()
+    api = MagicMock()
+    api.get_items.side_effect = lambda asins: [_item(a, 9.0, 18.0) for a in asins]
+    service._get_api = MagicMock(return_value=api)  # type: ignore[method-assign]
+
+    deals = [_deal(i) for i in range(23)]
+    results = service.validate_prices(deals)
+
+    assert [len(call.args[0]) for call in api.get_items.call_args_list] == [10, 10, 3]
+    assert len(results) == 23
+    assert results[deals[0].asin].current_price == 9.0
+    assert results[deals[0].asin].list_price == 18.0
+
+
+def test_validate_prices_groups_by_marketplace() -> None:
+    """Test that each marketplace gets its own requests."""
+    service = _service()
+    api = MagicMock()
+    api.get_items.side_effect = lambda asins: [_item(a, 9.0, 18.0) for a in asins]
+    service._get_api = MagicMock(return_value=api)  # type: ignore[method-assign]
+
+    service.validate_prices([_deal(1), _deal(2, Currency.GBP), _deal(3)])
+
+    marketplaces = [call.args[0] for call in service._get_api.call_args_list]
+    assert sorted(marketplaces) == ["ES", "UK"]
+
+
+def test_validate_prices_missing_asin_uses_source_fallback() -> None:
+    """Test that ASINs absent from the response keep the TXT price/PVP fallback."""
+    service = _service()
+    api = MagicMock()
+    api.get_items.side_effect = lambda asins: [_item(asins[0], 9.0, 18.0)]
+    service._get_api = MagicMock(return_value=api)  # type: ignore[method-assign]
+
+    deals = [_deal(1), _deal(2)]
+    results = service.validate_prices(deals)
+
+    missing = results[deals[1].asin]
+    assert missing.current_price == 10.0
+    assert missing.list_price == 20.0
+    assert missing.savings_percentage == 50.0
+    assert missing.needs_review is True
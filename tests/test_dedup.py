@@ -0,0 +1,121 @@
+"""Tests for the in-memory dedup index."""
+
+from datetime import datetime, timedelta
+
+from dealbot.models import (
+    Currency,
+    Deal,
+    DealStatus,
+    PriceInfo,
+    ProcessedDeal,
+    PublishResult,
+    ShortLink,
+)
+from dealbot.storage.db import Database
+from dealbot.storage.dedup import DedupIndex
+
+
+def _publish(db: Database, asin: str, price: float, when: datetime) -> None:
+    deal = Deal(
+        title=f"Deal {asin}",
+        url=f"https://amazon.es/dp/{asin}",
+        asin=asin,
+        stated_price=price,
+        currency=Currency.EUR,
+        status=DealStatus.PUBLISHED,
+    )
+    db.save_deal(
+        ProcessedDeal(
+            deal=deal,
+            price_info=PriceInfo(asin=asin, title=deal.title, current_price=price),
+            adjusted_price=price,
+            short_link=ShortLink(short_url="https://s/x", long_url=deal.url, provider="test"),
+            publish_result=PublishResult(
+                deal_id=deal.deal_id, destinations=[], message_ids={}, sent_at=when, success=True
+            ),
+        )
+    )
+
+
+def test_loads_window_with_one_query(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that only publications inside the window are indexed, latest wins."""
+    db = Database(tmp_path / "dealbot.db")
+    now = datetime.now()
+    _publish(db, "B000000001", 20.0, now - timedelta(days=3))
+    _publish(db, "B000000001", 10.0, now - timedelta(hours=1))
+    _publish(db, "B000000002", 10.0, now - timedelta(days=9))
+
+    index = DedupIndex(db, window_days=7)
+
+    assert index.load() == 1
+    assert index.last_published("B000000001").price == 10.0  # type: ignore[union-attr]
+    assert index.last_published("B000000002") is None
+
+
+def test_price_change_makes_new_deal(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test the daemon rule: same ASIN at a similar price is a duplicate."""
+    db = Database(tmp_path / "dealbot.db")
+    _publish(db, "B000000001", 10.0, datetime.now() - timedelta(days=1))
+    index = DedupIndex(db, window_days=7, price_change_pct=10.0)
+
+    assert index.is_duplicate("B000000001", 10.5)
+    assert not index.is_duplicate("B000000001", 8.0)
+    assert not index.is_duplicate("B000000009", 10.0)
+
+
+def test_gui_window_and_run_records(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test the narrower GUI window and publications recorded during a run."""
+    db = Database(tmp_path / "dealbot.db")
+    _publish(db, "B000000001", 10.0, datetime.now() - timedelta(days=3))
+    index = DedupIndex(db, window_days=7)
+    index.load()
+
+    assert index.last_published("B000000001", within_hours=48) is None
+
+    index.record("B000000002", 5.0, datetime.now())
+    assert index.is_duplicate("B000000002", 5.0)
+
+
+def test_was_recently_published_uses_composite_index(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that the per-ASIN lookup no longer wraps published_at in datetime()."""
+    db = Database(tmp_path / "dealbot.db")
+    _publish(db, "B000000001", 10.0, datetime.now() - timedelta(hours=2))
+
+    assert db.was_recently_published("B000000001", hours=48) is not None
+    assert db.was_recently_published("B000000001", hours=1) is None
+
+    plan = db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM deals WHERE asin = ? AND status = 'published' "
+        "AND published_at > ? ORDER BY published_at DESC LIMIT 1",
+        ("B000000001", "2000-01-01"),
+    ).fetchall()
+    assert any("idx_deals_asin_status_published" in str(tuple(row)) for row in plan)
+
+
+def test_whole_second_records_compare_with_fixed_width_cutoffs(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a record on a whole second is not misordered against the cutoff."""
+    db = Database(tmp_path / "dealbot.db")
+    index = DedupIndex(db, window_days=7)
+    index.load()
+
+    recent = (datetime.now() - timedelta(hours=1)).replace(microsecond=0)
+    index.record("B000000003", 5.0, recent)
+
+    assert index.last_published("B000000003", within_hours=2) is not None
+    assert index.last_published("B000000003").published_at.endswith(".000000")  # type: ignore[union-attr]
+
+
+def test_reload_keeps_queued_records(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a reload does not forget deals queued but not yet sent."""
+    db = Database(tmp_path / "dealbot.db")
+    _publish(db, "B000000001", 10.0, datetime.now() - timedelta(days=1))
+    index = DedupIndex(db, window_days=7)
+    index.load()
+
+    index.record("B000000002", 5.0, datetime.now())
+    index.record("B000000003", 5.0, datetime.now() - timedelta(days=8))
+
+    assert index.load() == 2
+    assert index.is_duplicate("B000000001", 10.0)
+    assert index.is_duplicate("B000000002", 5.0)
+    assert not index.is_duplicate("B000000003", 5.0)
@@ -0,0 +1,99 @@
+"""Tests for the field-level enrichment planner."""
+
+from typing import Any, Optional
+from unittest.mock import MagicMock
+
+from dealbot.controller import DealController
+from dealbot.models import Deal, PriceInfo, ProcessedDeal
+from dealbot.services.enrichment import EnrichmentPlanner, EnrichmentSource
+
+
+class _Source:
+    """Records calls and returns canned values."""
+
+    def __init__(self, values: Optional[dict[str, Any]]) -> None:
+        self.values = values
+        self.calls = 0
+
+    def __call__(self, asin: str, price_info: PriceInfo) -> Optional[dict[str, Any]]:
+        self.calls += 1
+        return self.values
+
+
+def _planner(**sources: tuple[int, set[str], _Source]) -> EnrichmentPlanner:
+    return EnrichmentPlanner([
+        EnrichmentSource(name, cost, frozenset(fields), fetch) for name, (cost, fields, fetch) in sources.items()
+    ])
+
+
+def test_sources_are_called_cheapest_first_only_for_gaps() -> None:
+    """Test that a field filled by a cheap source never reaches an expensive one."""
+    media = _Source({"main_image_url": "https://img/cached.jpg"})
+    scrapula = _Source({"list_price": 40.0, "review_rating": 4.2, "review_count": 7, "main_image_url": "https://img/s.jpg"})
+    playwright = _Source({"main_image_url": "https://img/pw.jpg"})
+    planner = _planner(
+        playwright=(3, {"main_image_url", "list_price"}, playwright),
+        media_cache=(0, {"main_image_url"}, media),
+        scrapula=(1, {"main_image_url", "list_price", "review_rating", "review_count"}, scrapula),
+    )
+    price_info = PriceInfo(asin="B000000001", title="x", current_price=20.0)
+    provenance = {"current_price": "paapi"}
+    tried: list[str] = []
+
+    planner.enrich("B000000001", price_info, provenance, tried)
+
+    assert (media.calls, scrapula.calls, playwright.calls) == (1, 1, 0)
+    assert price_info.main_image_url == "https://img/cached.jpg"
+    assert price_info.savings_percentage == 50.0
+    assert provenance == {
+        "current_price": "paapi", "main_image_url": "media_cache", "list_price": "scrapula",
+        "savings_percentage": "scrapula", "review_rating": "scrapula", "review_count": "scrapula",
+    }
+    assert tried == ["media_cache", "scrapula"]
+
+
+def test_field_budget_and_tried_sources() -> None:
+    """Test that a missing PVP alone never pays for a browser scrape, and tried sources aren't repeated."""
+    html = _Source({})
+    playwright = _Source({"list_price": 40.0})
+    scrapula = _Source(None)  # No batch submitted yet
+    planner = _planner(
+        scrapula=(1, {"list_price"}, scrapula),
+        amazon_html=(2, {"main_image_url", "list_price"}, html),
+        playwright=(3, {"main_image_url", "list_price"}, playwright),
+    )
+    price_info = PriceInfo(
+        asin="B000000001", title="x", current_price=20.0, main_image_url="https://img/a.jpg",
+        review_rating=4.0, review_count=3,
+    )
+    tried: list[str] = []
+
+    planner.enrich("B000000001", price_info, {}, tried)
+    planner.enrich("B000000001", price_info, {}, tried)
+
+    assert (scrapula.calls, html.calls, playwright.calls) == (2, 1, 0)
+    assert tried == ["amazon_html"]
+    assert price_info.list_price is None
+
+
+def test_ratings_reuse_review_rating_from_enrichment() -> None:
+    """Test that deals with a review rating from PA-API/Scrapula don't call the ratings service."""
+    controller = DealController.__new__(DealController)
+    controller.ratings = MagicMock()
+    controller.ratings.get_ratings.return_value = {}
+    controller.limits = MagicMock()
+
+    def processed(asin: str, rating: Optional[float]) -> ProcessedDeal:
+        return ProcessedDeal(
+            deal=Deal(title=asin, url=f"https://amazon.es/dp/{asin}", asin=asin),
+            price_info=PriceInfo(asin=asin, title=asin, review_rating=rating, review_count=12 if rating else None),
+            adjusted_price=10.0,
+            provenance={"review_rating": "scrapula"} if rating else {},
+        )
+
+    rated, unrated = processed("B000000001", 4.5), processed("B000000002", None)
+    controller.fetch_ratings([rated, unrated])
+
+    controller.ratings.get_ratings.assert_called_once_with(["B000000002"])
+    assert rated.rating.value == 4.5 and rated.rating.count == 12
+    assert rated.provenance["rating"] == "scrapula"
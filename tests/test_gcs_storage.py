@@ -0,0 +1,212 @@
+"""Tests for chunked, conditional SQLite replication to GCS (fake bucket)."""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+from google.api_core.exceptions import NotFound, PreconditionFailed
+
+from dealbot.services.gcs_storage import DatabaseConflict, DatabaseDownloadError, GCSStorage
+
+
+class _FakeBucket:
+    def __init__(self) -> None:
+        self.objects: dict[str, tuple[bytes, int]] = {}
+        self.generation = 0
+        self.uploads: list[str] = []
+        self.downloads: list[str] = []
+
+    def blob(self, name: str) -> "_FakeBlob":
+        return _FakeBlob(self, name)
+
+
+class _FakeBlob:
+    def __init__(self, bucket: _FakeBucket, name: str) -> None:
+        self.bucket = bucket
+        self.name = name
+        self.generation: Optional[int] = None
+
+    def reload(self) -> None:
+        if self.name not in self.bucket.objects:
+            raise NotFound(self.name)
+        self.generation = self.bucket.objects[self.name][1]
+
+    def exists(self) -> bool:
+        return self.name in self.bucket.objects
+
+    def download_as_bytes(self, if_generation_match: Optional[int] = None) -> bytes:
+        self.bucket.downloads.append(self.name)
+        data, generation = self.bucket.objects[self.name]
+        if if_generation_match is not None and generation != if_generation_match:
+            raise PreconditionFailed(self.name)
+        return data
+
+    def upload_from_string(self, data: Any, content_type: Optional[str] = None, if_generation_match: Optional[int] = None) -> None:
+        current = self.bucket.objects.get(self.name, (b"", 0))[1]
+        if if_generation_match is not None and current != if_generation_match:
+            raise PreconditionFailed(self.name)
+        self.bucket.generation += 1
+        self.bucket.objects[self.name] = (data.encode() if isinstance(data, str) else data, self.bucket.generation)
+        self.bucket.uploads.append(self.name)
+        self.generation = self.bucket.generation
+
+    def delete(self) -> None:
+        self.bucket.objects.pop(self.name, None)
+
+
+def _storage(bucket: _FakeBucket) -> GCSStorage:
+    storage = GCSStorage.__new__(GCSStorage)
+    storage.bucket_name = "test"
+    storage.bucket = bucket
+    storage.CHUNK_SIZE = 4096  # One SQLite page per chunk
+    return storage
+
+
+def _make_db(path: Path, rows: int) -> None:
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY, meta TEXT)")
+    conn.executemany("INSERT INTO events (meta) VALUES (?)", [("x" * 200,)] * rows)
+    conn.commit()
+    conn.close()
+
+
+def _count(path: Path) -> int:
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_roundtrip_and_unchanged_download_is_skipped(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test push/pull and that a matching generation skips the download."""
+    bucket = _FakeBucket()
+    storage = _storage(bucket)
+    local = tmp_path / "a" / "dealbot.db"
+    local.parent.mkdir()
+    _make_db(local, 200)
+    assert storage.upload_database(local)
+
+    other = tmp_path / "b" / "dealbot.db"
+    assert storage.download_database(other)
+    assert _count(other) == 200
+
+    bucket.downloads.clear()
+    assert storage.download_database(other)
+    assert bucket.downloads == []
+
+
+def test_only_changed_chunks_are_shipped(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a small append uploads and downloads a few chunks, not the file."""
+    bucket = _FakeBucket()
+    storage = _storage(bucket)
+    local = tmp_path / "a" / "dealbot.db"
+    local.parent.mkdir()
+    _make_db(local, 500)
+    storage.upload_database(local)
+    total_chunks = sum(1 for name in bucket.objects if ".chunks/" in name)
+
+    replica = tmp_path / "b" / "dealbot.db"
+    storage.download_database(replica)
+
+    bucket.uploads.clear()
+    _make_db(local, 1)
+    assert storage.upload_database(local)
+    uploaded_chunks = [name for name in bucket.uploads if ".chunks/" in name]
+    assert 0 < len(uploaded_chunks) < total_chunks / 4
+
+    bucket.downloads.clear()
+    assert storage.download_database(replica)
+    fetched = [name for name in bucket.downloads if ".chunks/" in name]
+    assert 0 < len(fetched) < total_chunks / 4
+    assert _count(replica) == 501
+
+
+def test_replaced_chunks_survive_one_more_generation(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a reader holding the previous manifest can still fetch its chunks."""
+    bucket = _FakeBucket()
+    storage = _storage(bucket)
+    local = tmp_path / "a" / "dealbot.db"
+    local.parent.mkdir()
+    _make_db(local, 50)
+    storage.upload_database(local)
+    first = set(json.loads(bucket.objects["dealbot.db.manifest.json"][0])["chunks"])
+
+    _make_db(local, 50)
+    assert storage.upload_database(local)
+    chunks = {name.rsplit("/", 1)[-1] for name in bucket.objects if ".chunks/" in name}
+    assert first <= chunks  # Still referenced as previous_chunks
+
+    _make_db(local, 50)
+    assert storage.upload_database(local)
+    manifest = json.loads(bucket.objects["dealbot.db.manifest.json"][0])
+    chunks = {name.rsplit("/", 1)[-1] for name in bucket.objects if ".chunks/" in name}
+    assert chunks == set(manifest["chunks"]) | set(manifest["previous_chunks"])
+    assert first - chunks  # Two generations old: now deleted
+
+
+def test_failed_download_raises(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a database that exists but can't be fetched is an error, not "first run"."""
+    bucket = _FakeBucket()
+    storage = _storage(bucket)
+    local = tmp_path / "a" / "dealbot.db"
+    local.parent.mkdir()
+    assert storage.download_database(local) is False  # Nothing in GCS yet
+
+    _make_db(local, 50)
+    storage.upload_database(local)
+    for name in [name for name in bucket.objects if ".chunks/" in name]:
+        del bucket.objects[name]
+
+    with pytest.raises(DatabaseDownloadError):
+        storage.download_database(tmp_path / "b" / "dealbot.db")
+
+
+def test_concurrent_push_does_not_clobber(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that the second of two overlapping runs fails loudly, keeping its database, instead of overwriting."""
+    bucket = _FakeBucket()
+    storage = _storage(bucket)
+    seed = tmp_path / "seed" / "dealbot.db"
+    seed.parent.mkdir()
+    _make_db(seed, 10)
+    storage.upload_database(seed)
+
+    run_a = tmp_path / "a" / "dealbot.db"
+    run_b = tmp_path / "b" / "dealbot.db"
+    storage.download_database(run_a)
+    storage.download_database(run_b)
+
+    _make_db(run_a, 1)
+    _make_db(run_b, 2)
+    assert storage.upload_database(run_a)
+    with pytest.raises(DatabaseConflict) as conflict:
+        storage.upload_database(run_b)
+
+    check = tmp_path / "check" / "dealbot.db"
+    storage.download_database(check)
+    assert _count(check) == 11
+
+    # Run B's rows survive in the bucket for reconciliation
+    kept = tmp_path / "kept.db"
+    kept.write_bytes(bucket.objects[conflict.value.conflict_copy][0])
+    assert conflict.value.conflict_copy.startswith("dealbot.db.conflicts/")
+    assert _count(kept) == 12
+
+
+def test_legacy_whole_file_is_used_before_first_manifest(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test migration from the old single-blob layout."""
+    bucket = _FakeBucket()
+    storage = _storage(bucket)
+    legacy = tmp_path / "legacy.db"
+    _make_db(legacy, 3)
+    bucket.objects["dealbot.db"] = (legacy.read_bytes(), 1)
+    storage.download_file = lambda remote, path: (path.write_bytes(bucket.objects[remote][0]) or True)  # type: ignore[method-assign]
+
+    local = tmp_path / "run" / "dealbot.db"
+    local.parent.mkdir()
+    assert storage.download_database(local)
+    assert _count(local) == 3
+    assert storage.upload_database(local)
+    assert "dealbot.db.manifest.json" in bucket.objects
@@ -0,0 +1,175 @@
+"""Tests for incremental Google Drive sync (fake Drive client)."""
+
+import re
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from dealbot.services.gdrive import GoogleDriveService
+
+ROOT = "root-folder"
+FOLDER = GoogleDriveService.FOLDER_MIME_TYPE
+
+
+class _Call:
+    def __init__(self, result: Any) -> None:
+        self._result = result
+
+    def execute(self) -> Any:
+        return self._result
+
+
+class _FakeDrive:
+    """Minimal files()/changes() API over an in-memory tree, 2 items per page."""
+
+    def __init__(self) -> None:
+        self.items: dict[str, dict] = {}
+        self.changes_feed: list[dict] = []
+        self.token = 1
+        self.list_calls = 0
+
+    def add(self, file_id: str, name: str, parent: str = ROOT, mime: str = "text/plain", version: str = "1") -> None:
+        self.items[file_id] = {
+            "id": file_id, "name": name, "mimeType": mime, "parents": [parent],
+            "modifiedTime": f"2026-10-0{version}T00:00:00Z", "md5Checksum": f"md5-{file_id}-{version}",
+        }
+
+    def change(self, file_id: str, removed: bool = False) -> None:
+        self.changes_feed.append({"fileId": file_id, "removed": removed, "file": self.items.get(file_id)})
+
+    # files()
+    def files(self) -> "_FakeDrive":
+        return self
+
+    def list(self, q: str, pageToken: Optional[str] = None, **kwargs: Any) -> _Call:
+        self.list_calls += 1
+        parent = re.match(r"'([^']+)' in parents", q).group(1)  # type: ignore[union-attr]
+        children = [i for i in self.items.values() if parent in i["parents"]]
+        start = int(pageToken or 0)
+        page = {"files": children[start:start + 2]}
+        if start + 2 < len(children):
+            page["nextPageToken"] = str(start + 2)
+        return _Call(page)
+
+    # changes()
+    def changes(self) -> "_FakeChanges":
+        return _FakeChanges(self)
+
+
+class _FakeChanges:
+    def __init__(self, drive: _FakeDrive) -> None:
+        self.drive = drive
+
+    def getStartPageToken(self, **kwargs: Any) -> _Call:
+        return _Call({"startPageToken": str(self.drive.token)})
+
+    def list(self, pageToken: str, **kwargs: Any) -> _Call:
+        feed, self.drive.changes_feed = self.drive.changes_feed, []
+        self.drive.token += 1
+        return _Call({"changes": feed, "newStartPageToken": str(self.drive.token)})
+
+
+class _Service(GoogleDriveService):
+    def __init__(self, drive: _FakeDrive) -> None:
+        self.service = drive
+        self._local = threading.local()
+        self.downloads: list[str] = []
+        self._lock = threading.Lock()
+
+    def _build_service(self) -> _FakeDrive:
+        return self.service
+
+    def download_file(self, file_id: str, destination_path: Path, service: Any = None) -> bool:
+        with self._lock:
+            self.downloads.append(file_id)
+        destination_path.write_text(self.service.items[file_id]["md5Checksum"])
+        return True
+
+
+def test_first_sync_lists_all_pages_and_subfolders(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test pagination (nextPageToken) and recursion on the initial full listing."""
+    drive = _FakeDrive()
+    for i in range(5):
+        drive.add(f"f{i}", f"deals{i}.txt")
+    drive.add("sub", "Sub", mime=FOLDER)
+    drive.add("f9", "nested.txt", parent="sub")
+    drive.add("img", "photo.jpg")
+    service = _Service(drive)
+
+    paths = service.sync_folder_to_local(ROOT, tmp_path)
+
+    assert sorted(p.name for p in paths) == sorted([f"deals{i}.txt" for i in range(5)] + ["nested.txt"])
+    assert sorted(service.downloads) == sorted([f"f{i}" for i in range(5)] + ["f9"])
+
+
+def test_second_sync_uses_changes_feed(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that later syncs download only new or modified files without re-listing."""
+    drive = _FakeDrive()
+    drive.add("f1", "a.txt")
+    drive.add("f2", "b.txt")
+    service = _Service(drive)
+    service.sync_folder_to_local(ROOT, tmp_path)
+    service.downloads.clear()
+    list_calls = drive.list_calls
+
+    drive.add("f2", "b.txt", version="2")  # Modified
+    drive.change("f2")
+    drive.add("f3", "c.txt")  # New
+    drive.change("f3")
+    drive.add("x", "other.txt", parent="elsewhere")  # Outside the synced tree
+    drive.change("x")
+
+    paths = service.sync_folder_to_local(ROOT, tmp_path)
+
+    assert sorted(service.downloads) == ["f2", "f3"]
+    assert drive.list_calls == list_calls
+    assert sorted(p.name for p in paths) == ["a.txt", "b.txt", "c.txt"]
+    assert (tmp_path / "b.txt").read_text() == "md5-f2-2"
+
+
+def test_unchanged_folder_downloads_nothing(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a sync with no changes is a single feed call and no downloads."""
+    drive = _FakeDrive()
+    drive.add("f1", "a.txt")
+    service = _Service(drive)
+    service.sync_folder_to_local(ROOT, tmp_path)
+    service.downloads.clear()
+
+    # A metadata-only change (same modifiedTime/md5) must not trigger a download
+    drive.change("f1")
+    service.sync_folder_to_local(ROOT, tmp_path)
+
+    assert service.downloads == []
+
+
+def test_missing_local_file_is_redownloaded(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a file deleted locally is fetched again even without a Drive change."""
+    drive = _FakeDrive()
+    drive.add("f1", "a.txt")
+    service = _Service(drive)
+    service.sync_folder_to_local(ROOT, tmp_path)
+    service.downloads.clear()
+
+    (tmp_path / "a.txt").unlink()
+    service.sync_folder_to_local(ROOT, tmp_path)
+
+    assert service.downloads == ["f1"]
+
+
+def test_change_to_root_folder_keeps_tracking_it(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a rename/share of the synced folder itself doesn't drop later files in it."""
+    drive = _FakeDrive()
+    drive.add(ROOT, "Deals", parent="my-drive", mime=FOLDER)
+    drive.add("f1", "a.txt")
+    service = _Service(drive)
+    service.sync_folder_to_local(ROOT, tmp_path)
+    service.downloads.clear()
+
+    drive.change(ROOT)
+    service.sync_folder_to_local(ROOT, tmp_path)
+    drive.add("f2", "new.txt")
+    drive.change("f2")
+    paths = service.sync_folder_to_local(ROOT, tmp_path)
+
+    assert service.downloads == ["f2"]
+    assert sorted(p.name for p in paths) == ["a.txt", "new.txt"]
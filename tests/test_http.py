@@ -0,0 +1,84 @@
+"""Tests for the shared pooled HTTP transport."""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from unittest.mock import MagicMock
+
+import pytest
+
+from dealbot.utils.config import Config
+from dealbot.utils.http import HttpTransport, configure_transport, get_transport
+
+
+class _EchoPort(BaseHTTPRequestHandler):
+    """Keep-alive server that answers with the client's source port."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:  # type: ignore[no-untyped-def]
+        pass
+
+    def do_GET(self) -> None:
+        body = str(self.client_address[1]).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoPort)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connections_are_reused(server_url: str) -> None:
+    """Test that sequential requests share one keep-alive connection."""
+    transport = HttpTransport()
+
+    ports = {transport.get(f"{server_url}/x", "whapi").text for _ in range(5)}
+
+    assert len(ports) == 1
+    transport.close()
+
+
+def test_async_requests_share_the_pool(server_url: str) -> None:
+    """Test that the asyncio interface reuses the sync connection pool."""
+    transport = HttpTransport()
+    sync_port = transport.get(f"{server_url}/x", "ratings").text
+
+    async def fetch() -> str:
+        return (await transport.aget(f"{server_url}/y", "ratings")).text
+
+    assert asyncio.run(fetch()) == sync_port
+    transport.close()
+
+
+def test_per_service_timeouts() -> None:
+    """Test per-service timeouts, config overrides and the explicit timeout escape hatch."""
+    transport = HttpTransport(timeouts={"whapi": 5})
+    transport.session = MagicMock()
+
+    transport.get("https://example.com", "whapi")
+    transport.get("https://example.com", "unknown")
+    transport.post("https://example.com", "shortlinks", timeout=1)
+
+    timeouts = [call.kwargs["timeout"] for call in transport.session.request.call_args_list]
+    assert timeouts == [5.0, HttpTransport.FALLBACK_TIMEOUT, 1]
+
+
+def test_configure_transport_replaces_shared_instance() -> None:
+    """Test that config applies to the process-wide transport."""
+    config = MagicMock(spec=Config)
+    config.get = MagicMock(return_value={"timeouts": {"scrapula": 45}})
+
+    transport = configure_transport(config)
+
+    assert get_transport() is transport
+    assert transport.timeout_for("scrapula") == 45.0
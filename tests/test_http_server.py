@@ -0,0 +1,143 @@
+"""Tests for the threaded HTTP server and its run jobs."""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+
+from dealbot.http_server import DealBotHTTPHandler
+from dealbot.jobs import RunJobs
+from dealbot.services.gcs_storage import DatabaseConflict, DatabaseDownloadError
+
+
+@pytest.fixture
+def server(tmp_path):  # type: ignore[no-untyped-def]
+    release = threading.Event()
+    daemon = MagicMock()
+    daemon.controller.db.db_path = tmp_path / "dealbot.db"
+    daemon.run_once.side_effect = lambda source_dir: release.wait(5) and {"deals_found": 4, "errors": []}
+    daemon.drain_outbox.return_value = 2
+
+    DealBotHTTPHandler.daemon = daemon
+    DealBotHTTPHandler.gdrive_service = MagicMock()
+    DealBotHTTPHandler.folder_id = "folder"
+    DealBotHTTPHandler.gcs_storage = None
+    DealBotHTTPHandler.jobs = RunJobs()
+    DealBotHTTPHandler.hold_async_runs = False
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), DealBotHTTPHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", daemon, release
+    release.set()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _request(url: str, method: str = "GET") -> tuple[int, bytes]:
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, method=method), timeout=5) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def test_runs_are_async_and_coalesced(server) -> None:  # type: ignore[no-untyped-def]
+    """Test that POST /runs returns at once, retries join the run, and /health answers meanwhile."""
+    base, daemon, release = server
+
+    status, body = _request(f"{base}/runs", "POST")
+    job = json.loads(body)
+    assert status == 202 and not job["coalesced"]
+
+    status, body = _request(f"{base}/runs", "POST")
+    assert status == 200 and json.loads(body)["id"] == job["id"]
+    assert _request(f"{base}/daily-summary")[0] == 409
+
+    started = time.monotonic()
+    assert _request(f"{base}/health") == (200, b"OK")
+    assert time.monotonic() - started < 1
+    assert json.loads(_request(f"{base}/runs/{job['id']}")[1])["status"] == "running"
+
+    release.set()
+    for _ in range(100):
+        state = json.loads(_request(f"{base}/runs/{job['id']}")[1])
+        if state["status"] != "running":
+            break
+        time.sleep(0.02)
+
+    assert state["status"] == "succeeded" and state["triggers"] == 2
+    assert state["result"]["deals_found"] == 4 and state["result"]["messages_sent"] == 2
+    daemon.run_once.assert_called_once()
+
+
+def test_post_runs_holds_request_with_request_based_cpu(server) -> None:  # type: ignore[no-untyped-def]
+    """Test that POST /runs answers only once the run is done when CPU is tied to open requests."""
+    base, daemon, release = server
+    DealBotHTTPHandler.hold_async_runs = True
+    threading.Timer(0.2, release.set).start()
+
+    started = time.monotonic()
+    status, body = _request(f"{base}/runs", "POST")
+    job = json.loads(body)
+
+    assert status == 200 and job["status"] == "succeeded"
+    assert job["result"]["deals_found"] == 4
+    assert time.monotonic() - started >= 0.2
+
+
+def test_scheduler_trigger_waits_for_result(server) -> None:  # type: ignore[no-untyped-def]
+    """Test that GET / still answers after the run, with 500 when it fails."""
+    base, daemon, release = server
+    release.set()
+    assert _request(f"{base}/") == (200, b"Deal processing completed successfully")
+
+    daemon.run_once.side_effect = RuntimeError("boom")
+    assert _request(f"{base}/") == (500, b"Error: boom")
+    assert _request(f"{base}/runs/unknown")[0] == 404
+
+
+def test_database_conflict_fails_the_run(server, tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that losing the GCS upload race is reported as a failed run, not logged and forgotten."""
+    base, daemon, release = server
+    (tmp_path / "dealbot.db").write_bytes(b"")
+    DealBotHTTPHandler.gcs_storage = MagicMock()
+    DealBotHTTPHandler.gcs_storage.upload_database.side_effect = DatabaseConflict("dealbot.db", "dealbot.db.conflicts/x.db")
+    release.set()
+
+    status, body = _request(f"{base}/")
+
+    assert status == 500 and b"dealbot.db.conflicts/x.db" in body
+
+
+def test_failed_download_aborts_the_run(server) -> None:  # type: ignore[no-untyped-def]
+    """Test that a run never processes (or uploads) a database it couldn't bring up to date."""
+    base, daemon, release = server
+    DealBotHTTPHandler.gcs_storage = MagicMock()
+    DealBotHTTPHandler.gcs_storage.download_database.side_effect = DatabaseDownloadError("chunk missing")
+    release.set()
+
+    assert _request(f"{base}/") == (500, b"Error: chunk missing")
+    daemon.run_once.assert_not_called()
+    DealBotHTTPHandler.gcs_storage.upload_database.assert_not_called()
+
+
+def test_metrics_endpoint_reports_queues_and_runs(server) -> None:  # type: ignore[no-untyped-def]
+    """Test that GET /metrics serves the registry with outbox depth and finished runs."""
+    base, daemon, release = server
+    daemon.controller.outbox.counts.return_value = {"pending": 3, "failed": 1}
+    DealBotHTTPHandler.collect_metrics()  # run_http_server registers this as a collector
+    release.set()
+    _request(f"{base}/")
+
+    status, body = _request(f"{base}/metrics")
+    text = body.decode()
+    assert status == 200
+    assert 'dealbot_outbox_messages{status="pending"} 3.0' in text
+    assert 'dealbot_runs_total{kind="process",status="succeeded"}' in text
+    assert 'dealbot_run_duration_seconds_count{kind="process"}' in text
@@ -0,0 +1,86 @@
+"""Tests for the source file ledger."""
+
+import os
+from datetime import datetime
+
+from dealbot.storage.db import Database
+from dealbot.storage.ledger import SourceLedger
+
+
+def _write(path, text: str, mtime: float):  # type: ignore[no-untyped-def]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_discovery_skips_processed_files_across_restarts(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that processed files are skipped by a new ledger on the same DB."""
+    db_path = tmp_path / "dealbot.db"
+    source = tmp_path / "deals"
+    old = _write(source / "2025-11-19_0900_morning.txt", "old deals", 1_700_000_000)
+    new = _write(source / "nested" / "2025-11-19_1602_evening.txt", "new deals", 1_700_000_100)
+
+    db = Database(db_path)
+    ledger = SourceLedger(db)
+    assert ledger.discover(source) == [new, old]
+
+    ledger.mark_parsed(new, deals_found=3)
+    ledger.mark_processed(old, deals_found=2, deals_published=1, deals_filtered=1)
+    db.close()
+
+    db = Database(db_path)
+    ledger = SourceLedger(db)
+    # Parsed but never finished: retried
+    assert ledger.discover(source) == [new]
+    assert not ledger.needs_processing(old)
+
+    row = db.conn.execute("SELECT * FROM source_files WHERE path = ?", (str(old),)).fetchone()
+    assert row["status"] == "processed"
+    assert row["deals_published"] == 1
+    db.close()
+
+
+def test_changed_content_is_reprocessed_but_touch_is_not(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that only a content change (not an mtime change) makes a file new again."""
+    db = Database(tmp_path / "dealbot.db")
+    ledger = SourceLedger(db)
+    path = _write(tmp_path / "deals" / "2025-11-19_1602_evening.txt", "deals v1", 1_700_000_000)
+    ledger.discover(tmp_path / "deals")
+    ledger.mark_processed(path, 1, 1, 0)
+
+    # Re-downloaded with identical contents
+    _write(path, "deals v1", 1_700_000_500)
+    assert SourceLedger(db).discover(tmp_path / "deals") == []
+
+    _write(path, "deals v2", 1_700_000_900)
+    assert SourceLedger(db).discover(tmp_path / "deals") == [path]
+    db.close()
+
+
+def test_failed_files_are_retried_and_since_filter_applies(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test failure handling and the filename date cut-off."""
+    db = Database(tmp_path / "dealbot.db")
+    ledger = SourceLedger(db)
+    source = tmp_path / "deals"
+    early = _write(source / "2025-11-18_0800_morning.txt", "a", 1_700_000_000)
+    late = _write(source / "2025-11-19_2000_evening.txt", "b", 1_700_000_000)
+
+    ledger.mark_failed(late, "boom")
+    assert ledger.discover(source, since=datetime(2025, 11, 19)) == [late]
+    assert early in ledger.discover(source)
+    db.close()
+
+
+def test_out_of_window_files_are_not_fingerprinted(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that the filename date cut-off runs before any file is hashed."""
+    db = Database(tmp_path / "dealbot.db")
+    ledger = SourceLedger(db)
+    source = tmp_path / "deals"
+    early = _write(source / "2025-11-18_0800_morning.txt", "a", 1_700_000_000)
+    late = _write(source / "2025-11-19_2000_evening.txt", "b", 1_700_000_000)
+
+    assert ledger.discover(source, since=datetime(2025, 11, 19)) == [late]
+    assert str(late) in ledger._fingerprints
+    assert str(early) not in ledger._fingerprints
+    db.close()
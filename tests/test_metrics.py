@@ -0,0 +1,86 @@
+"""Tests for the Prometheus metrics registry and pipeline instrumentation."""
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from dealbot.utils.http import HttpTransport
+from dealbot.utils.metrics import (
+    CACHE_LOOKUPS,
+    HTTP_REQUESTS,
+    REGISTRY,
+    STAGE_CALLS,
+    STAGE_SECONDS,
+    MetricsRegistry,
+)
+from dealbot.utils.rate_limit import ServiceLimiter
+
+
+def test_render_prometheus_text_format() -> None:
+    """Test counters, gauges and cumulative histogram buckets in the exposition format."""
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls", ("service",))
+    depth = registry.gauge("queue_depth", "Depth")
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    registry.add_collector(lambda: depth.set(3))
+
+    calls.inc(service="whapi")
+    calls.inc(2, service="whapi")
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render()
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{service="whapi"} 3.0' in text
+    assert "queue_depth 3.0" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_sum 5.55" in text
+    assert "latency_seconds_count 3" in text
+
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Calls", ("service",))
+
+
+def test_limiter_slot_times_stage_and_outcome() -> None:
+    """Test that each service slot is recorded as a pipeline stage with ok/error outcomes."""
+    limiter = ServiceLimiter("test_stage", max_concurrent=1)
+    ok_before = STAGE_CALLS.value(stage="test_stage", outcome="ok")
+    count_before = STAGE_SECONDS.count(stage="test_stage")
+
+    with limiter.slot():
+        pass
+    with pytest.raises(RuntimeError):
+        with limiter.slot():
+            raise RuntimeError("boom")
+
+    assert STAGE_CALLS.value(stage="test_stage", outcome="ok") == ok_before + 1
+    assert STAGE_CALLS.value(stage="test_stage", outcome="error") >= 1
+    assert STAGE_SECONDS.count(stage="test_stage") == count_before + 2
+    assert 'dealbot_stage_waiting{stage="test_stage"} 0.0' in REGISTRY.render()
+
+
+def test_transport_counts_status_codes_and_errors() -> None:
+    """Test that external calls are counted by status code, or by error type when they raise."""
+    transport = HttpTransport()
+    transport.session = MagicMock()
+    transport.session.request.return_value = MagicMock(status_code=429)
+
+    transport.get("https://example.com", service="test_http")
+    transport.session.request.side_effect = requests.ConnectTimeout("slow")
+    with pytest.raises(requests.ConnectTimeout):
+        transport.get("https://example.com", service="test_http")
+
+    assert HTTP_REQUESTS.value(service="test_http", status="429") == 1
+    assert HTTP_REQUESTS.value(service="test_http", status="ConnectTimeout") == 1
+
+
+def test_cache_hit_ratio_is_derived_on_scrape() -> None:
+    """Test that the hit ratio gauge is filled from the lookup counters."""
+    CACHE_LOOKUPS.inc(cache="test_cache", source="mem", result="hit")
+    CACHE_LOOKUPS.inc(3, cache="test_cache", source="mem", result="miss")
+
+    assert 'dealbot_cache_hit_ratio{cache="test_cache",source="mem"} 0.25' in REGISTRY.render()
@@ -0,0 +1,168 @@
+"""Tests for the publish outbox and its worker."""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from dealbot.models import Deal, DealStatus, PriceInfo, ProcessedDeal, PublishResult, ShortLink
+from dealbot.services.publish_worker import PublishWorker
+from dealbot.storage.db import Database
+from dealbot.storage.dedup import DedupIndex
+from dealbot.storage.outbox import Outbox
+
+CHANNEL = "120363000000000000@newsletter"
+
+
+def _processed(asin: str) -> ProcessedDeal:
+    deal = Deal(title=f"Deal {asin}", url=f"https://amazon.es/dp/{asin}", asin=asin, status=DealStatus.QUEUED)
+    return ProcessedDeal(
+        deal=deal,
+        price_info=PriceInfo(asin=asin, title=deal.title, current_price=10.0),
+        adjusted_price=10.0,
+        short_link=ShortLink(short_url="https://s/x", long_url=deal.url, provider="test"),
+    )
+
+
+class _FakeWhapi:
+    """Fails the first `failures` sends, then succeeds; remembers (deal_id, JID) like WhapiService.
+
+    JIDs in `failing_jids` fail on their own (the others still get the message),
+    for as many sends as their count.
+    """
+
+    def __init__(self, db: Database, failures: int = 0, failing_jids: dict[str, int] | None = None) -> None:
+        self.db = db
+        self.failures = failures
+        self.failing_jids = dict(failing_jids or {})
+        self.sends: list[str] = []
+        self.deliveries: list[str] = []
+
+    def send_message(self, destinations, message, deal_id, image_url=None):  # type: ignore[no-untyped-def]
+        already = self.db.get_sent_destinations(deal_id)
+        pending = [dest for dest in destinations if dest not in already]
+        if pending and self.failures:
+            self.failures -= 1
+            return PublishResult(
+                deal_id=deal_id, destinations=destinations, message_ids={}, success=False, error="HTTP 503"
+            )
+        errors = []
+        for dest in pending:
+            if self.failing_jids.get(dest):
+                self.failing_jids[dest] -= 1
+                errors.append(f"{dest}: HTTP 503")
+                continue
+            self.sends.append(deal_id)
+            self.deliveries.append(dest)
+            self.db.record_destination(deal_id, dest, f"msg-{len(self.sends)}", datetime.now())
+        message_ids = self.db.get_sent_destinations(deal_id)
+        return PublishResult(
+            deal_id=deal_id, destinations=destinations, message_ids=message_ids,
+            success=bool(message_ids), error="; ".join(errors) or None,
+        )
+
+
+def test_enqueue_then_drain_publishes_atomically(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that queued deals are saved and count for dedup before they're sent, in queue order."""
+    db = Database(tmp_path / "dealbot.db")
+    outbox = Outbox(db.db_path)
+    whapi = _FakeWhapi(db)
+    worker = PublishWorker(outbox, whapi)  # type: ignore[arg-type]
+
+    first, second = _processed("B000000001"), _processed("B000000002")
+    outbox.enqueue(first, [CHANNEL], "first")
+    outbox.enqueue(second, [CHANNEL], "second")
+
+    assert db.get_deal(first.deal.deal_id)["status"] == "queued"  # type: ignore[index]
+    assert DedupIndex(db).is_duplicate("B000000001", 10.0)
+
+    assert worker.drain() == 2
+    assert whapi.sends == [first.deal.deal_id, second.deal.deal_id]
+    row = db.get_deal(first.deal.deal_id)
+    assert row["status"] == "published" and row["published_at"]  # type: ignore[index]
+    assert outbox.counts()["sent"] == 2
+
+
+def test_failed_sends_back_off_then_give_up(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that failures are retried after an exponential backoff and marked failed at max_attempts."""
+    db = Database(tmp_path / "dealbot.db")
+    outbox = Outbox(db.db_path, max_attempts=2, retry_base_seconds=60)
+    worker = PublishWorker(outbox, _FakeWhapi(db, failures=5))  # type: ignore[arg-type]
+    processed = _processed("B000000001")
+    outbox.enqueue(processed, [CHANNEL], "msg")
+
+    assert worker.drain() == 1  # Fails, then waits out the backoff
+    due = outbox.next_due()
+    assert due is not None and due > datetime.now() + timedelta(seconds=50)
+
+    outbox.conn.execute("UPDATE outbox SET next_attempt_at = ?", ("2000-01-01T00:00:00.000000",))
+    outbox.conn.commit()
+    assert worker.drain() == 1
+
+    assert outbox.counts()["failed"] == 1
+    assert db.get_deal(processed.deal.deal_id)["status"] == "failed"  # type: ignore[index]
+    assert not DedupIndex(db).is_duplicate("B000000001", 10.0)
+
+
+def test_partial_delivery_retries_only_missing_jids(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a message one JID didn't get stays queued and the retry sends only to that JID."""
+    group = "120363111111111111@g.us"
+    db = Database(tmp_path / "dealbot.db")
+    outbox = Outbox(db.db_path)
+    whapi = _FakeWhapi(db, failing_jids={group: 1})
+    worker = PublishWorker(outbox, whapi)  # type: ignore[arg-type]
+    outbox.enqueue(_processed("B000000001"), [CHANNEL, group], "msg")
+
+    assert worker.drain() == 1
+    assert outbox.counts()["sent"] == 0 and whapi.deliveries == [CHANNEL]
+
+    outbox.conn.execute("UPDATE outbox SET next_attempt_at = ?", ("2000-01-01T00:00:00.000000",))
+    outbox.conn.commit()
+    assert worker.drain() == 1
+
+    assert whapi.deliveries == [CHANNEL, group]
+    assert outbox.counts()["sent"] == 1
+
+
+def test_resume_after_crash_does_not_double_send(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a message sent before a crash (still "sending") is recovered without a second post."""
+    db = Database(tmp_path / "dealbot.db")
+    outbox = Outbox(db.db_path)
+    whapi = _FakeWhapi(db)
+    processed = _processed("B000000001")
+    outbox.enqueue(processed, [CHANNEL], "msg")
+
+    # Crash between the Whapi send and mark_sent()
+    claimed = outbox.claim()
+    whapi.send_message(claimed[0].recipients, claimed[0].message, claimed[0].deal_id)
+    outbox.close()
+
+    restarted = Outbox(db.db_path)
+    worker = PublishWorker(restarted, whapi)  # type: ignore[arg-type]
+    assert restarted.recover() == 1
+    assert worker.drain() == 1
+
+    assert whapi.sends == [processed.deal.deal_id]
+    assert db.get_deal(processed.deal.deal_id)["status"] == "published"  # type: ignore[index]
+
+
+def test_worker_thread_drains_on_notify(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that the background worker sends queued messages without the caller waiting."""
+    db = Database(tmp_path / "dealbot.db")
+    outbox = Outbox(db.db_path)
+    whapi = MagicMock()
+    whapi.send_message.return_value = PublishResult(
+        deal_id="x", destinations=[CHANNEL], message_ids={CHANNEL: "m1"}, success=True
+    )
+    worker = PublishWorker(outbox, whapi)
+    worker.start()
+    try:
+        outbox.enqueue(_processed("B000000001"), [CHANNEL], "msg")
+        worker.notify()
+        for _ in range(250):
+            if outbox.counts()["sent"]:
+                break
+            time.sleep(0.02)
+    finally:
+        worker.stop()
+
+    assert outbox.counts()["sent"] == 1
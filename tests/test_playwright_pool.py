@@ -0,0 +1,101 @@
+"""Tests for the pooled Playwright browser (with fake browser objects)."""
+
+import asyncio
+import threading
+
+from dealbot.services.playwright_scraper import PlaywrightBrowserPool, PlaywrightProductInfo
+
+
+class _FakePage:
+    async def close(self) -> None:
+        pass
+
+
+class _FakeContext:
+    def __init__(self) -> None:
+        self.pages_created = 0
+
+    async def new_page(self) -> _FakePage:
+        self.pages_created += 1
+        return _FakePage()
+
+    async def close(self) -> None:
+        pass
+
+
+class _FakeBrowser:
+    def is_connected(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+class _FakePool(PlaywrightBrowserPool):
+    """Pool that records concurrency instead of driving Chromium."""
+
+    def __init__(self, max_pages: int) -> None:
+        super().__init__(max_pages=max_pages)
+        self.contexts_created: list[str] = []
+        self.active = 0
+        self.peak = 0
+        self._counter_lock = threading.Lock()
+
+    async def _launch_browser(self) -> _FakeBrowser:
+        return _FakeBrowser()
+
+    async def _new_context(self, marketplace: str) -> _FakeContext:
+        self.contexts_created.append(marketplace)
+        return _FakeContext()
+
+    async def _scrape_page(self, page, asin: str, marketplace: str) -> PlaywrightProductInfo:  # type: ignore[no-untyped-def]
+        with self._counter_lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        with self._counter_lock:
+            self.active -= 1
+        return PlaywrightProductInfo(asin=asin, image_url=f"https://img/{asin}.jpg", success=True)
+
+
+def test_browser_launched_once_with_context_per_marketplace() -> None:
+    """Test that repeated scrapes reuse one browser and one context per marketplace."""
+    pool = _FakePool(max_pages=2)
+    try:
+        pool.scrape_sync("B000000001", "es")
+        pool.scrape_sync("B000000002", "es")
+        pool.scrape_sync("B000000003", "uk")
+
+        assert pool.launch_count == 1
+        assert pool.contexts_created == ["es", "uk"]
+        # The first page is kept warm and reused for the second ES scrape
+        assert pool._contexts["es"].pages_created == 1
+    finally:
+        pool.shutdown()
+
+
+def test_batch_scrape_respects_page_cap() -> None:
+    """Test that batch scrapes run concurrently but never exceed max_pages."""
+    pool = _FakePool(max_pages=3)
+    try:
+        asins = [f"B{i:09d}" for i in range(10)]
+        results = pool.scrape_many_sync(asins, "es")
+
+        assert set(results) == set(asins)
+        assert all(r.success for r in results.values())
+        assert pool.peak == 3
+        assert pool.launch_count == 1
+    finally:
+        pool.shutdown()
+
+
+def test_fast_mode_blocks_heavy_and_tracker_requests() -> None:
+    """Test which requests fast mode aborts."""
+    block = PlaywrightBrowserPool.should_block
+
+    assert block("image", "https://m.media-amazon.com/images/I/x.jpg")
+    assert block("stylesheet", "https://m.media-amazon.com/x.css")
+    assert block("font", "https://m.media-amazon.com/x.woff2")
+    assert block("script", "https://aax-eu.amazon-adsystem.com/e/dtb/bid")
+    assert not block("document", "https://www.amazon.es/dp/B000000001")
+    assert not block("script", "https://m.media-amazon.com/images/I/app.js")
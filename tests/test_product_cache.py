@@ -0,0 +1,94 @@
+"""Tests for the persistent product cache."""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from dealbot.models import Currency, PriceInfo
+from dealbot.services.amazon_paapi import AmazonPAAPIService
+from dealbot.storage.product_cache import ProductCache
+from dealbot.utils.config import Config
+
+
+def test_put_and_get_roundtrip(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that cached payloads survive a new cache instance (new process)."""
+    db_path = tmp_path / "dealbot.db"
+    cache = ProductCache(db_path)
+    cache.put("ES", "B000000001", "paapi", {"current_price": 9.99})
+    cache.close()
+
+    reopened = ProductCache(db_path)
+    assert reopened.get("es", "B000000001", "paapi") == {"current_price": 9.99}
+    assert reopened.get("es", "B000000001", "scrapula") is None
+
+
+def test_ttl_is_per_source(tmp_path, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test that short-TTL sources expire while long-TTL sources stay fresh."""
+    cache = ProductCache(tmp_path / "dealbot.db", ttl_hours={"paapi": 1, "media": 48})
+    cache.put("es", "B000000001", "paapi", {"current_price": 9.99})
+    cache.put("es", "B000000001", "media", {"image_url": "https://m.media-amazon.com/x.jpg"})
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 2 * 3600)
+
+    assert cache.get("es", "B000000001", "paapi") is None
+    assert cache.get("es", "B000000001", "media") is not None
+
+
+def test_purge_removes_entries_past_every_ttl(tmp_path, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test that purging keeps entries still fresh for their longest-lived source."""
+    cache = ProductCache(tmp_path / "dealbot.db", ttl_hours={"paapi": 1, "media": 48})
+    cache.put("es", "B000000001", "paapi", {"current_price": 9.99})
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 24 * 3600)
+    cache.put("es", "B000000002", "paapi", {"current_price": 5.0})
+
+    assert cache.purge_expired() == 0  # Within the longest (media) TTL
+    monkeypatch.setattr(time, "time", lambda: now + 80 * 3600)
+    assert cache.purge_expired() == 2
+    assert cache.conn.execute("SELECT COUNT(*) FROM product_cache").fetchone()[0] == 0
+
+
+def test_stats_count_hits_and_misses(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test hit/miss accounting used by the daemon status message."""
+    cache = ProductCache(tmp_path / "dealbot.db")
+    cache.put("es", "B000000001", "ratings", {"value": 4.5})
+
+    cache.get_many("es", ["B000000001", "B000000002"], "ratings")
+
+    assert cache.stats == {"ratings": {"hits": 1, "misses": 1}}
+    assert cache.summary().startswith("1 hits / 1 misses")
+
+    cache.reset_stats()
+    assert cache.summary() == "no lookups"
+
+
+def test_disabled_cache_never_hits(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a disabled cache stores nothing."""
+    cache = ProductCache(tmp_path / "dealbot.db", enabled=False)
+    cache.put("es", "B000000001", "paapi", {"current_price": 9.99})
+
+    assert cache.get("es", "B000000001", "paapi") is None
+
+
+def test_paapi_cache_hit_skips_api(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that PA-API serves fresh cache entries without calling the API."""
+    config = MagicMock(spec=Config)
+    config.require_env = MagicMock(return_value="dummy")
+    config.affiliate_tag = "test-21"
+    config.price_discrepancy_threshold = 0.15
+
+    cache = ProductCache(tmp_path / "dealbot.db")
+    cached = PriceInfo(asin="B000000001", title="Cached", current_price=8.0, list_price=16.0)
+    cache.put("ES", "B000000001", "paapi", cached.model_dump(mode="json"))
+
+    service = AmazonPAAPIService(config, cache=cache)
+    service._get_api = MagicMock()  # type: ignore[method-assign]
+
+    result = service.validate_price("B000000001", Currency.EUR, stated_price=10.0)
+
+    service._get_api.assert_not_called()
+    assert result.current_price == 8.0
+    assert result.discrepancy == pytest.approx(0.2)
+    assert result.needs_review is True
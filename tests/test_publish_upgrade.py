@@ -0,0 +1,81 @@
+"""Tests for upgrading preview results for publishing."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from dealbot.controller import DealController
+from dealbot.models import Deal, PriceInfo, ProcessedDeal, Rating, ShortLink
+from dealbot.services.enrichment import EnrichmentPlanner
+from dealbot.services.pricing import PricingService
+
+
+def _preview(asin: str, age_minutes: float = 0, price: float = 20.0) -> ProcessedDeal:
+    deal = Deal(title=f"Deal {asin}", url=f"https://amazon.es/dp/{asin}?tag=x-21", asin=asin, stated_price=price)
+    return ProcessedDeal(
+        deal=deal,
+        price_info=PriceInfo(
+            asin=asin, title=deal.title, current_price=price, list_price=40.0, savings_percentage=50.0,
+            main_image_url=f"https://img/{asin}.jpg", review_rating=4.5, review_count=10,
+        ),
+        adjusted_price=price,
+        validated_at=datetime.now() - timedelta(minutes=age_minutes),
+    )
+
+
+def _controller() -> DealController:
+    controller = DealController.__new__(DealController)
+    controller.config = MagicMock()
+    controller.config.price_max_age_minutes = 30
+    controller.amazon_api = MagicMock()
+    controller.shortlinks = MagicMock()
+    controller.shortlinks.get_or_create_many.side_effect = lambda urls: {
+        url: ShortLink(short_url="https://s/1", long_url=url, provider="test") for url in urls
+    }
+    controller.ratings = MagicMock()
+    controller.ratings.get_ratings.side_effect = lambda asins: {
+        asin: Rating(value=4.5, count=10, stars="★★★★☆") for asin in asins
+    }
+    controller.interstitial_server = None
+    controller.scrapula = None
+    controller.enrichment = EnrichmentPlanner([])
+    controller.ai_validator = None
+    controller.limits = MagicMock()
+    controller.pricing = MagicMock(spec=PricingService)
+    controller.pricing.adjust_price.side_effect = lambda price: price
+    return controller
+
+
+def test_fresh_preview_only_gets_publish_stages() -> None:
+    """Test that a fresh preview isn't re-validated and only missing stages run."""
+    controller = _controller()
+    fresh = _preview("B000000001")
+    linked = _preview("B000000002")
+    linked.short_link = ShortLink(short_url="https://s/0", long_url=linked.deal.url, provider="test")
+
+    controller.prepare_for_publish([fresh, linked])
+
+    controller.amazon_api.validate_prices.assert_not_called()
+    controller.shortlinks.get_or_create_many.assert_called_once_with([fresh.deal.url])
+    assert fresh.short_link.short_url == "https://s/1"
+    assert linked.short_link.short_url == "https://s/0"
+    assert fresh.rating is not None and linked.rating is not None
+
+
+def test_stale_prices_are_revalidated_in_one_batch() -> None:
+    """Test that only stale previews are re-checked, keeping data PA-API doesn't return."""
+    controller = _controller()
+    stale = _preview("B000000001", age_minutes=45)
+    fresh = _preview("B000000002", age_minutes=5)
+    controller.amazon_api.validate_prices.return_value = {
+        "B000000001": PriceInfo(asin="B000000001", title="t", current_price=18.0, availability="Now"),
+    }
+
+    controller.prepare_for_publish([stale, fresh])
+
+    (deals,), _ = controller.amazon_api.validate_prices.call_args
+    assert [d.asin for d in deals] == ["B000000001"]
+    assert stale.price_info.current_price == 18.0
+    assert stale.adjusted_price == 18.0
+    assert stale.price_info.main_image_url == "https://img/B000000001.jpg"  # Kept from preview
+    assert not stale.is_price_stale(30)
+    assert fresh.price_info.current_price == 20.0
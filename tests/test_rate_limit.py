@@ -0,0 +1,107 @@
+"""Tests for per-service rate limiting and the concurrent daemon pipeline."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from dealbot.daemon import DealBotDaemon
+from dealbot.models import Deal, PriceInfo, ProcessedDeal
+from dealbot.utils.config import Config
+from dealbot.utils.rate_limit import ServiceLimiter, ServiceLimits
+
+
+def _config(values: dict) -> MagicMock:
+    config = MagicMock(spec=Config)
+    config.get = MagicMock(side_effect=lambda key, default=None: values.get(key, default))
+    return config
+
+
+def test_limiter_caps_concurrency() -> None:
+    """Test that no more than max_concurrent calls run at once."""
+    limiter = ServiceLimiter("test", max_concurrent=2)
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def call() -> None:
+        nonlocal in_flight, peak
+        with limiter.slot():
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak == 2
+
+
+def test_limiter_spaces_call_starts() -> None:
+    """Test that min_interval is enforced between call starts."""
+    limiter = ServiceLimiter("test", max_concurrent=4, min_interval=0.05)
+    starts: list[float] = []
+
+    for _ in range(3):
+        with limiter.slot():
+            starts.append(time.monotonic())
+
+    assert starts[1] - starts[0] >= 0.045
+    assert starts[2] - starts[1] >= 0.045
+
+
+def test_service_limits_config_overrides() -> None:
+    """Test that config overrides replace the built-in defaults."""
+    config = _config({
+        "concurrency": {"services": {"paapi": {"max_concurrent": 3, "min_interval": 0.5}}}
+    })
+    limits = ServiceLimits(config)
+
+    assert limits.get("paapi").max_concurrent == 3
+    assert limits.get("paapi").min_interval == 0.5
+    assert limits.get("whapi").min_interval == ServiceLimits.DEFAULTS["whapi"][1]
+
+
+def test_process_file_publishes_in_rank_order(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that parallel processing still queues deals in file (rank) order."""
+    deals = [
+        Deal(title=f"Deal {i}", url=f"https://amazon.es/dp/B00000000{i}", asin=f"B00000000{i}")
+        for i in range(5)
+    ]
+
+    def enrich_deal(deal: Deal) -> ProcessedDeal:
+        # Earlier deals finish last to force out-of-order completion
+        time.sleep(0.02 * (5 - int(deal.asin[-1])))
+        return ProcessedDeal(
+            deal=deal,
+            price_info=PriceInfo(asin=deal.asin, title=deal.title, current_price=10.0),
+            adjusted_price=10.0,
+        )
+
+    published: list[str] = []
+
+    daemon = DealBotDaemon.__new__(DealBotDaemon)
+    daemon.config = _config({"concurrency": {"workers": 4}})
+    daemon.ledger = MagicMock()
+    daemon.stats = {"errors": []}
+    daemon.is_duplicate = MagicMock(return_value=False)
+    daemon.filter = MagicMock()
+    daemon.filter.precheck.return_value = (True, "ok")
+    daemon.filter.check_prices.return_value = (True, "ok")
+    daemon.filter.should_publish.return_value = (True, "ok")
+    daemon.controller = MagicMock()
+    daemon.controller.parse_file.return_value = deals
+    daemon.controller.enrich_deal.side_effect = enrich_deal
+    daemon.controller.enqueue_deal.side_effect = (
+        lambda processed, include_group=False: published.append(processed.deal.asin)
+    )
+
+    result = daemon.process_file(tmp_path / "deals.txt")
+
+    assert result["deals_published"] == 5
+    assert published == [deal.asin for deal in deals]
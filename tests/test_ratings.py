@@ -0,0 +1,88 @@
+"""Tests for batched, token-paced ratings lookups."""
+
+from unittest.mock import MagicMock
+
+from dealbot.models import Rating
+from dealbot.services import ratings as ratings_module
+from dealbot.services.ratings import KeepaProvider, RatingsService
+from dealbot.storage.product_cache import ProductCache
+from dealbot.utils.config import Config
+
+
+class _FakeKeepa:
+    """Answers /product requests; every ASIN has a 4.5 rating with 120 reviews."""
+
+    def __init__(self, tokens_left: int = 1000, refill_in_ms: int = 1000) -> None:
+        self.requests: list[list[str]] = []
+        self.tokens_left = tokens_left
+        self.refill_in_ms = refill_in_ms
+
+    def get(self, url: str, service: str, **kwargs):  # type: ignore[no-untyped-def]
+        asins = kwargs["params"]["asin"].split(",")
+        self.requests.append(asins)
+        self.tokens_left -= len(asins)
+        current = [-1] * 18
+        current[16], current[17] = 45, 120
+        response = MagicMock(status_code=200, ok=True, content=b"{}")
+        response.json.return_value = {
+            "tokensLeft": self.tokens_left,
+            "refillIn": self.refill_in_ms,
+            "refillRate": 20,
+            "products": [{"asin": asin, "stats": {"current": current}} for asin in asins],
+        }
+        return response
+
+
+def _keepa(transport: _FakeKeepa, monkeypatch, max_wait: float = 60) -> KeepaProvider:  # type: ignore[no-untyped-def]
+    monkeypatch.setattr(ratings_module, "get_transport", lambda: transport)
+    config = MagicMock(spec=Config)
+    config.env.return_value = "dummy"
+    config.get.return_value = max_wait
+    return KeepaProvider(config)
+
+
+def test_keepa_batches_up_to_100_asins(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test that 150 ASINs take two /product requests and ratings come from stats."""
+    transport = _FakeKeepa()
+    asins = [f"B{i:09d}" for i in range(150)]
+
+    ratings = _keepa(transport, monkeypatch).get_ratings(asins)
+
+    assert [len(r) for r in transport.requests] == [100, 50]
+    assert ratings["B000000149"] == Rating(value=4.5, count=120, stars=Rating.render_stars(4.5))
+
+
+def test_keepa_paces_on_token_balance(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test waiting for a refill when short of tokens, and skipping when it is too far away."""
+    sleeps: list[float] = []
+    monkeypatch.setattr(ratings_module.time, "sleep", sleeps.append)
+    transport = _FakeKeepa(tokens_left=110, refill_in_ms=5000)
+    provider = _keepa(transport, monkeypatch, max_wait=30)
+
+    provider.get_ratings([f"B{i:09d}" for i in range(100)])  # 10 tokens left
+    provider.get_ratings([f"C{i:09d}" for i in range(25)])  # 15 short: one refill (20) away
+
+    assert len(sleeps) == 1 and 0 < sleeps[0] <= 5
+    assert len(transport.requests) == 2
+
+    transport.tokens_left = -500
+    provider.get_ratings(["D000000000"])  # Balance report from this call...
+    assert provider.get_ratings(["D000000001"]) == {}  # ...puts the next refill minutes away
+    assert len(transport.requests) == 3
+
+
+def test_service_fetches_only_uncached_ratings(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that cached ratings are reused and the rest are fetched in one provider call."""
+    cache = ProductCache(tmp_path / "dealbot.db")
+    cache.put("ES", "B000000001", "ratings", {"value": 4.0, "count": 5, "stars": "★★★★☆"})
+    service = RatingsService.__new__(RatingsService)
+    service.enabled = True
+    service.cache = cache
+    service.provider = MagicMock()
+    service.provider.get_ratings.return_value = {"B000000002": Rating(value=3.5, count=2, stars="★★★½☆")}
+
+    ratings = service.get_ratings(["B000000001", "B000000002", "B000000003"])
+
+    service.provider.get_ratings.assert_called_once_with(["B000000002", "B000000003"], "ES")
+    assert ratings["B000000001"].value == 4.0 and ratings["B000000002"].value == 3.5
+    assert cache.get("ES", "B000000002", "ratings") is not None
@@ -0,0 +1,93 @@
+"""Tests for the cron scheduler's persisted history, catch-up and overlap rules."""
+
+import threading
+from datetime import datetime
+
+import pytz
+
+from dealbot.scheduler import DealBotScheduler
+from dealbot.storage.run_history import RunHistory
+
+MADRID = pytz.timezone("Europe/Madrid")
+
+
+def _at(day: int, hour: int, minute: int = 0) -> datetime:
+    return MADRID.localize(datetime(2026, 3, day, hour, minute))
+
+
+def test_restart_catches_up_missed_slot_once(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a restart at 06:01 still runs the morning slot, and only once."""
+    history = RunHistory(tmp_path / "dealbot.db")
+    history.finish(history.start("process_deals", _at(9, 18)), RunHistory.SUCCESS)
+    runs: list[int] = []
+
+    scheduler = DealBotScheduler(task_func=lambda: runs.append(1), history=history)
+    assert scheduler.run_pending(now=_at(10, 6, 1)) == 1
+
+    # A new process with the same history has nothing left to do
+    restarted = DealBotScheduler(task_func=lambda: runs.append(1), history=history)
+    assert restarted.run_pending(now=_at(10, 6, 2)) == 0
+    assert runs == [1]
+    assert restarted.get_next_run_time(now=_at(10, 6, 2)) == _at(10, 18)
+
+
+def test_interrupted_slot_is_caught_up_after_restart(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a run cut short by a crash is due again, subject to the catch-up policy."""
+    history = RunHistory(tmp_path / "dealbot.db")
+    history.finish(history.start("process_deals", _at(9, 18)), RunHistory.SUCCESS)
+    history.start("process_deals", _at(10, 6))  # Process died mid-run
+    assert history.recover() == 1
+    runs: list[int] = []
+
+    restarted = DealBotScheduler(task_func=lambda: runs.append(1), history=history, catch_up="latest")
+    assert restarted.due_runs(now=_at(10, 6, 30)) == [_at(10, 6)]
+    assert restarted.run_pending(now=_at(10, 6, 30)) == 1
+    assert [r["status"] for r in history.recent("process_deals")[:2]] == ["success", "interrupted"]
+
+    skipped = RunHistory(tmp_path / "none.db")
+    skipped.start("process_deals", _at(10, 6))
+    skipped.recover()
+    scheduler = DealBotScheduler(task_func=lambda: runs.append(1), history=skipped, catch_up="none")
+    assert scheduler.run_pending(now=_at(10, 6, 30)) == 0
+    assert skipped.recent("process_deals")[0]["error"] == "missed"
+    assert runs == [1]
+
+
+def test_catch_up_policies(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test latest/all/none after a day of downtime, limited to the catch-up window."""
+    def run(policy: str) -> tuple[int, list[dict]]:
+        history = RunHistory(tmp_path / f"{policy}.db")
+        history.finish(history.start("process_deals", _at(8, 6)), RunHistory.SUCCESS)
+        scheduler = DealBotScheduler(task_func=lambda: None, history=history, catch_up=policy, catch_up_hours=48)
+        return scheduler.run_pending(now=_at(9, 19)), history.recent("process_deals")
+
+    runs, recent = run("latest")
+    assert runs == 1
+    assert [r["status"] for r in recent[:3]] == ["success", "skipped", "skipped"]  # 9th 18:00 ran
+
+    assert run("all")[0] == 3  # 8th 18:00, 9th 06:00 and 18:00
+    runs, recent = run("none")
+    assert runs == 0 and recent[0]["error"] == "missed"
+
+
+def test_overlapping_run_is_skipped(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a slot coming up while another run is in progress is recorded as skipped."""
+    history = RunHistory(tmp_path / "dealbot.db")
+    started, release = threading.Event(), threading.Event()
+
+    def long_task() -> None:
+        started.set()
+        release.wait(5)
+
+    scheduler = DealBotScheduler(task_func=long_task, history=history)
+    manual = threading.Thread(target=scheduler.run_once_now)
+    manual.start()
+    started.wait(5)
+
+    assert scheduler.is_running
+    assert scheduler.run_task(_at(10, 6)) is False
+    release.set()
+    manual.join(5)
+
+    statuses = {(r["trigger"], r["status"]) for r in history.recent("process_deals")}
+    assert statuses == {("manual", "success"), ("schedule", "skipped")}
@@ -0,0 +1,129 @@
+"""Tests for non-blocking Scrapula task submission against a local stub server."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+import pytest
+
+from dealbot.services.scrapula import ScrapulaService
+
+
+class _StubScrapula(BaseHTTPRequestHandler):
+    """Minimal Scrapula API: tasks turn SUCCESS after a few polls.
+
+    Like the real API, /tasks/{id} answers {} once the task has finished;
+    the finished task is only found in /tasks?limit=50.
+    """
+
+    pending_polls = 3
+    polls: list[str] = []
+    release = threading.Event()
+
+    def log_message(self, format, *args) -> None:  # type: ignore[no-untyped-def]
+        pass
+
+    def _json(self, status: int, data: dict) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+        type(self).queries = payload["queries"]
+        self._json(200, {"id": "task-1"})
+
+    def do_GET(self) -> None:
+        type(self).polls.append(self.path)
+        finished = len(self.polls) > self.pending_polls and self.release.is_set()
+        if self.path == "/tasks/task-1":
+            # Hold the task pending until the test has checked submit() returned early
+            self._json(200, {} if finished else {"id": "task-1", "status": "PENDING"})
+            return
+        if self.path != "/tasks?limit=50":
+            self._json(404, {})
+            return
+
+        results = [
+            {
+                "asin": query.rsplit("/", 1)[-1],
+                "name": "Stub product",
+                "price": "9,99 €",
+                "strike_price": "19,99 €",
+                "image_1": "https://m.media-amazon.com/images/I/stub.jpg",
+            }
+            for query in self.queries
+        ]
+        task = {"id": "ui-task-1", "status": "SUCCESS", "results": results}
+        self._json(200, {"tasks": [{"id": "ui-task-0", "status": "SUCCESS"}, task] if finished else []})
+
+
+@pytest.fixture
+def stub_server() -> Iterator[str]:
+    _StubScrapula.polls = []
+    _StubScrapula.release = threading.Event()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubScrapula)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _service(base_url: str) -> ScrapulaService:
+    service = ScrapulaService("dummy")
+    service.base_url = base_url
+    service.min_poll_interval = 0.01
+    service.max_poll_interval = 0.05
+    return service
+
+
+def test_submit_batch_returns_before_task_completes(stub_server: str) -> None:
+    """Test that submit_batch doesn't block and get() waits for the one task."""
+    service = _service(stub_server)
+
+    job = service.submit_batch(["B000000001", "B000000002"], max_wait_seconds=10)
+    assert not job.done()
+
+    _StubScrapula.release.set()
+    info = job.get("B000000001", timeout=10)
+
+    assert info is not None and info.success
+    assert info.image_url == "https://m.media-amazon.com/images/I/stub.jpg"
+    assert job.result()["B000000002"].success
+    assert job.get("B999999999") is None
+
+    # The task list is only fetched once the task stops reporting a status
+    assert _StubScrapula.polls.count("/tasks?limit=50") == 1
+    assert _StubScrapula.polls[-1] == "/tasks?limit=50"
+
+
+def test_wait_for_completion_backs_off(stub_server: str, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test that poll intervals grow up to the configured maximum."""
+    service = _service(stub_server)
+    _StubScrapula.release.set()
+
+    sleeps: list[float] = []
+    monkeypatch.setattr("dealbot.services.scrapula.time.sleep", sleeps.append)
+
+    task = service._wait_for_completion("task-1", max_wait_seconds=10)
+
+    assert task is not None and task["status"] == "SUCCESS"
+    assert len(sleeps) == _StubScrapula.pending_polls
+    assert sleeps == sorted(sleeps)
+    assert sleeps[-1] <= service.max_poll_interval
+
+
+def test_timed_out_task_reports_errors(stub_server: str) -> None:
+    """Test that a task that never finishes yields per-ASIN errors, not an exception."""
+    service = _service(stub_server)
+
+    results = service.get_batch_product_data(["B000000001"], max_wait_seconds=0.2)  # type: ignore[arg-type]
+
+    assert results["B000000001"].success is False
+    assert "timed out" in (results["B000000001"].error or "")
@@ -0,0 +1,153 @@
+"""Tests for the short link registry and bulk creation."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from tenacity import wait_none
+
+from dealbot.models import ShortLink
+from dealbot.services import shortlinks as shortlinks_module
+from dealbot.services.shortlinks import CloudflareProvider, ShortLinkProvider, ShortLinkService
+from dealbot.storage.link_registry import ShortLinkRegistry, canonicalize_url
+
+
+class FakeProvider(ShortLinkProvider):
+    """Provider that records bulk calls."""
+
+    def __init__(self) -> None:
+        self.bulk_calls: list[list[str]] = []
+
+    def create_short_link(self, long_url: str, slug: str | None = None) -> ShortLink:
+        raise AssertionError("single create should not be used")
+
+    def create_short_links(self, long_urls: list[str]) -> list[ShortLink]:
+        self.bulk_calls.append(list(long_urls))
+        return [
+            ShortLink(short_url=f"https://s/{len(self.bulk_calls)}-{i}", long_url=url, provider="test")
+            for i, url in enumerate(long_urls)
+        ]
+
+
+def _service(registry: ShortLinkRegistry) -> tuple[ShortLinkService, FakeProvider]:
+    service = ShortLinkService.__new__(ShortLinkService)
+    service.config = MagicMock()
+    service.registry = registry
+    service.provider = FakeProvider()
+    return service, service.provider
+
+
+def test_canonicalize_strips_tracking_keeps_tag() -> None:
+    """Test that linkCode/th/psc are dropped and the affiliate tag is kept."""
+    url = "https://www.Amazon.es/dp/B000000001?th=1&tag=deals-21&linkCode=ogi&psc=1#reviews"
+
+    assert canonicalize_url(url) == "https://www.amazon.es/dp/B000000001?tag=deals-21"
+    assert canonicalize_url("https://amazon.es/dp/B000000001?tag=a-21") != canonicalize_url(
+        "https://amazon.es/dp/B000000001?tag=b-21"
+    )
+
+
+def test_batch_is_created_once_then_read_from_registry(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test one bulk call for the misses and registry reads afterwards, across reopen."""
+    path = tmp_path / "dealbot.db"
+    service, provider = _service(ShortLinkRegistry(path))
+    urls = [
+        "https://amazon.es/dp/B000000001?tag=deals-21&th=1",
+        "https://amazon.es/dp/B000000001?psc=1&tag=deals-21",  # Same canonical URL
+        "https://amazon.es/dp/B000000002?tag=deals-21",
+    ]
+
+    links = service.get_or_create_many(urls)
+
+    assert len(provider.bulk_calls) == 1 and len(provider.bulk_calls[0]) == 2
+    assert links[urls[0]].short_url == links[urls[1]].short_url
+    service.registry.close()
+
+    service, provider = _service(ShortLinkRegistry(path))
+    again = service.get_or_create_many(urls + ["https://amazon.es/dp/B000000003?tag=deals-21"])
+
+    assert provider.bulk_calls == [["https://amazon.es/dp/B000000003?tag=deals-21"]]
+    assert again[urls[2]].short_url == links[urls[2]].short_url
+
+
+def test_failed_bulk_falls_back_and_registers_confirmed_links(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that links the per-URL fallback created are used and registered."""
+    registry = ShortLinkRegistry(tmp_path / "dealbot.db")
+    service = ShortLinkService.__new__(ShortLinkService)
+    service.registry = registry
+    service.provider = MagicMock()
+    service.provider.create_short_links.side_effect = RuntimeError("worker down")
+    service.provider.create_short_link.side_effect = (
+        lambda url: ShortLink(short_url="https://s/fallback", long_url=url, provider="test")
+    )
+
+    links = service.get_or_create_many(["https://amazon.es/dp/B000000001?tag=deals-21"])
+
+    assert links["https://amazon.es/dp/B000000001?tag=deals-21"].short_url == "https://s/fallback"
+    assert registry.get("https://amazon.es/dp/B000000001?tag=deals-21").short_url == "https://s/fallback"
+
+
+def test_fallback_skips_only_the_failing_url(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that one URL failing in the per-URL fallback doesn't drop the other links."""
+    service = ShortLinkService.__new__(ShortLinkService)
+    service.registry = ShortLinkRegistry(tmp_path / "dealbot.db")
+    service.provider = MagicMock()
+    service.provider.create_short_links.side_effect = RuntimeError("worker down")
+
+    def create(url: str) -> ShortLink:
+        if url.endswith("B000000002"):
+            raise RuntimeError("bad url")
+        return ShortLink(short_url="https://s/ok", long_url=url, provider="test")
+
+    service.provider.create_short_link.side_effect = create
+    good, bad = "https://amazon.es/dp/B000000001", "https://amazon.es/dp/B000000002"
+
+    links = service.get_or_create_many([good, bad])
+
+    assert list(links) == [good] and links[good].short_url == "https://s/ok"
+
+
+def _cloudflare(monkeypatch, transport) -> CloudflareProvider:  # type: ignore[no-untyped-def]
+    monkeypatch.setattr(shortlinks_module, "get_transport", lambda: transport)
+    monkeypatch.setattr(CloudflareProvider._create_bulk.retry, "wait", wait_none())
+    monkeypatch.setattr(CloudflareProvider.create_short_link.retry, "wait", wait_none())
+    config = MagicMock()
+    config.env.return_value = "dummy"
+    config.shortlink_domain = "go.example.com"
+    return CloudflareProvider(config)
+
+
+def test_cloudflare_bulk_create_uses_deterministic_slugs(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test one /shorten/bulk request whose links are matched back to their URLs by slug."""
+    transport = MagicMock()
+    transport.post.side_effect = lambda url, service, json: MagicMock(json=MagicMock(return_value={
+        "links": [{"slug": item["slug"], "short_url": f"https://go.example.com/{item['slug']}"} for item in json["links"]]
+    }))
+    provider = _cloudflare(monkeypatch, transport)
+    urls = ["https://amazon.es/dp/B000000001?tag=deals-21", "https://amazon.es/dp/B000000002?tag=deals-21"]
+
+    links = provider.create_short_links(urls)
+
+    transport.post.assert_called_once()
+    assert transport.post.call_args.args[0] == "https://go.example.com/shorten/bulk"
+    assert [link.long_url for link in links] == urls
+    assert links[0].link_id == CloudflareProvider.slug_for(urls[0]) != links[1].link_id
+    assert links[0].short_url == f"https://go.example.com/{links[0].link_id}"
+
+
+def test_cloudflare_single_create(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test /shorten for one URL, raising (after retries) rather than inventing a link when the Worker is down."""
+    transport = MagicMock()
+    transport.post.return_value.json.return_value = {"short_url": "https://go.example.com/abc"}
+    provider = _cloudflare(monkeypatch, transport)
+    url = "https://amazon.es/dp/B000000001?tag=deals-21"
+
+    link = provider.create_short_link(url)
+
+    assert link.short_url == "https://go.example.com/abc"
+    assert transport.post.call_args.kwargs["json"] == {"url": url, "slug": CloudflareProvider.slug_for(url)}
+
+    transport.post.reset_mock()
+    transport.post.side_effect = ConnectionError("worker down")
+    with pytest.raises(ConnectionError):
+        provider.create_short_link(url)
+    assert transport.post.call_count == 3
@@ -0,0 +1,129 @@
+"""Tests for cheap-first staged evaluation in the daemon."""
+
+from unittest.mock import MagicMock
+
+from dealbot.daemon import DealBotDaemon, DealFilter
+from dealbot.models import Deal, PriceInfo, ProcessedDeal
+from dealbot.utils.config import Config
+
+
+def _deal(asin, stated=10.0, discount=40.0) -> Deal:  # type: ignore[no-untyped-def]
+    return Deal(
+        title=f"Deal {asin}",
+        url=f"https://amazon.es/dp/{asin}",
+        asin=asin,
+        stated_price=stated,
+        source_discount_pct=discount,
+    )
+
+
+def _price(asin: str, current: float = 10.0) -> PriceInfo:
+    return PriceInfo(asin=asin, title=asin, current_price=current, list_price=20.0, savings_percentage=50.0)
+
+
+def _daemon(controller: MagicMock) -> DealBotDaemon:
+    config = MagicMock(spec=Config)
+    config.get = MagicMock(side_effect=lambda key, default=None: default)
+
+    daemon = DealBotDaemon.__new__(DealBotDaemon)
+    daemon.config = config
+    daemon.controller = controller
+    daemon.filter = DealFilter(config)
+    daemon.ledger = MagicMock()
+    daemon.stats = {"errors": []}
+    daemon.is_duplicate = lambda asin, price=None: False
+    return daemon
+
+
+def test_expensive_stages_only_run_for_remaining_candidates(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that each stage only sees the previous stage's survivors."""
+    deals = [
+        Deal(title="No ASIN", url="https://example.com/x"),
+        _deal("B0000000LO", discount=10.0),   # parse: source discount
+        _deal("B0000000DU"),                  # parse: duplicate
+        _deal("B0000000PR"),                  # price: ratio 5x
+        _deal("B0000000NI"),                  # enrich: no image
+        _deal("B0000000AI"),                  # ai: rejected
+        _deal("B0000000OK"),                  # published
+    ]
+
+    def enrich_deal(deal: Deal) -> ProcessedDeal:
+        price_info = _price(deal.asin)
+        if deal.asin != "B0000000NI":
+            price_info.main_image_url = f"https://img/{deal.asin}.jpg"
+        return ProcessedDeal(deal=deal, price_info=price_info, adjusted_price=10.0)
+
+    def validate(processed_deals: list[ProcessedDeal]) -> None:
+        for processed in processed_deals:
+            processed.ai_approved = processed.deal.asin != "B0000000AI"
+
+    controller = MagicMock()
+    controller.parse_file.return_value = deals
+    controller.prefetched_price.side_effect = (
+        lambda asin: _price(asin, current=50.0 if asin == "B0000000PR" else 10.0)
+    )
+    controller.enrich_deal.side_effect = enrich_deal
+    controller.validate_deals_with_ai.side_effect = validate
+
+    daemon = _daemon(controller)
+    daemon.is_duplicate = lambda asin, price=None: asin == "B0000000DU"
+
+    result = daemon.process_file(tmp_path / "deals.txt")
+
+    assert result["deals_published"] == 1
+    assert result["deals_filtered"] == 6
+    assert result["duplicates_skipped"] == 1
+    assert result["stage_rejections"] == {"parse": 3, "price": 1, "enrich": 1, "ai": 1}
+
+    enriched = [c.args[0].asin for c in controller.enrich_deal.call_args_list]
+    assert enriched == ["B0000000NI", "B0000000AI", "B0000000OK"]
+    validated = [p.deal.asin for p in controller.validate_deals_with_ai.call_args.args[0]]
+    assert validated == ["B0000000AI", "B0000000OK"]
+    # Short links and ratings only for the published deal
+    assert [p.deal.asin for p in controller.finalize_deals.call_args.args[0]] == ["B0000000OK"]
+
+    controller.scrapula = None
+    controller.ratings = None
+    summary = daemon.stage_summary(result["stage_rejections"])
+    # parse: 3 x (paapi, shortlinks, deepseek); price: 2; enrich: 2; ai: 1
+    assert summary.startswith("14 calls avoided")
+
+
+def test_early_stages_agree_with_full_filter() -> None:
+    """Test that price-stage rejections are ones the full filter makes too."""
+    config = MagicMock(spec=Config)
+    deal_filter = DealFilter(config)
+    deal = _deal("B000000001", stated=10.0, discount=None)
+    price_info = _price("B000000001", current=10.0)
+    price_info.savings_percentage = 15.0
+    price_info.main_image_url = "https://img/x.jpg"
+
+    early, _ = deal_filter.check_prices(deal, price_info)
+    full, reason = deal_filter.should_publish(deal, ProcessedDeal(deal=deal, price_info=price_info, adjusted_price=10.0))
+
+    assert early is False and full is False
+    assert "INSUFFICIENT DISCOUNT" in reason
+    # Without PA-API's PVP, Scrapula/Playwright may still supply the discount
+    price_info.list_price = None
+    assert deal_filter.check_prices(deal, price_info)[0] is True
+
+
+def test_asin_listed_twice_in_one_file_is_published_once(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that a repeated ASIN is caught even though nothing is recorded for dedup before queueing."""
+    controller = MagicMock()
+    controller.parse_file.return_value = [_deal("B0000000OK"), _deal("B0000000OK", stated=9.0)]
+    controller.prefetched_price.side_effect = lambda asin: _price(asin)
+
+    def enrich_deal(deal: Deal) -> ProcessedDeal:
+        price_info = _price(deal.asin)
+        price_info.main_image_url = f"https://img/{deal.asin}.jpg"
+        return ProcessedDeal(deal=deal, price_info=price_info, adjusted_price=10.0, ai_approved=True)
+
+    controller.enrich_deal.side_effect = enrich_deal
+    daemon = _daemon(controller)
+
+    result = daemon.process_file(tmp_path / "deals.txt")
+
+    assert result["deals_published"] == 1
+    assert result["duplicates_skipped"] == 1
+    assert controller.enqueue_deal.call_count == 1
@@ -0,0 +1,65 @@
+"""Tests for the streaming TXT parser."""
+
+from dealbot.parsers.txt_parser import TxtParser
+
+CONTENT = """🔥 CHOLLOS AMAZON 🔥
+📅 19/11/2025
+
+🎯 #1 - 906°
+🇪🇸 Auriculares inalámbricos
+🇬🇧 Wireless earbuds
+💰 Precio/Price: €18.59 (PVP:€28.49)
+💸 Descuento/Discount: -€9.90 (-35%)
+🛒 https://www.amazon.es/dp/B0ABCDEFGH?tag=x-21
+━━━━━━━━━━
+🎯 #2 - 512°
+🇪🇸 Cafetera
+💰 Precio/Price: €80
+💸 Descuento/Discount: (-20%)
+🛒 https://www.amazon.es/dp/B0IJKLMNOP
+"""
+
+
+def test_parses_bilingual_blocks() -> None:
+    """Test fields extracted from a Chollometro-style export."""
+    first, second = TxtParser().parse_content(CONTENT)
+
+    assert first.asin == "B0ABCDEFGH"
+    assert first.title == "Wireless earbuds"
+    assert first.title_es == "Auriculares inalámbricos"
+    assert first.stated_price == 18.59
+    assert first.source_pvp == 28.49
+    assert first.source_discount_pct == 35.0
+
+    assert second.title == "Cafetera"
+    assert second.stated_price == 80.0
+    assert second.source_pvp == 100.0  # Derived from price and discount
+
+
+def test_yields_each_deal_before_reading_the_rest() -> None:
+    """Test that deals stream out as their block ends."""
+    consumed = 0
+
+    def lines():  # type: ignore[no-untyped-def]
+        nonlocal consumed
+        for line in CONTENT.splitlines(keepends=True):
+            consumed += 1
+            yield line
+
+    deals = TxtParser().iter_deals(lines())
+    first = next(deals)
+
+    assert first.asin == "B0ABCDEFGH"
+    assert consumed < len(CONTENT.splitlines())
+    assert [d.asin for d in deals] == ["B0IJKLMNOP"]
+
+
+def test_file_and_content_parsing_agree(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that reading from a handle matches parsing the whole string."""
+    path = tmp_path / "2025-11-19_1602_evening_whatsapp.txt"
+    path.write_text(CONTENT, encoding="utf-8")
+    parser = TxtParser()
+
+    from_file = [d.model_dump(exclude={"deal_id"}) for d in parser.parse_file(path)]
+    from_content = [d.model_dump(exclude={"deal_id"}) for d in parser.parse_content(CONTENT)]
+    assert from_file == from_content
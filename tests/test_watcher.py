@@ -0,0 +1,89 @@
+"""Tests for watch-mode ingestion."""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dealbot.daemon import DealBotDaemon
+from dealbot.watcher import SourceWatcher
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_partially_written_file_is_delivered_once_settled(tmp_path, use_inotify) -> None:  # type: ignore[no-untyped-def]
+    """Test that a file written in two parts is delivered once, complete, and temp files are ignored."""
+    (tmp_path / "old.txt").write_text("already here")
+    delivered: list[tuple[str, str]] = []
+    done = threading.Event()
+
+    def on_file(path: Path) -> None:
+        delivered.append((path.name, path.read_text()))
+        done.set()
+
+    watcher = SourceWatcher(tmp_path, on_file, settle_seconds=0.3, poll_interval=0.05, use_inotify=use_inotify)
+    thread = threading.Thread(target=watcher.run_forever, daemon=True)
+    thread.start()
+    time.sleep(0.2)
+
+    (tmp_path / ".deals.txt.part").write_text("temp")
+    target = tmp_path / "2026-03-10_1603_deals.txt"
+    with target.open("w") as f:
+        f.write("first half\n")
+        f.flush()
+        time.sleep(0.15)
+        f.write("second half\n")
+
+    assert done.wait(5)
+    time.sleep(0.4)
+    watcher.stop()
+    thread.join(10)
+
+    assert delivered == [("2026-03-10_1603_deals.txt", "first half\nsecond half\n")]
+
+
+def test_ingest_file_reuses_ledger_and_age_cutoff(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that watch mode skips old and already-processed files like scheduled runs do."""
+    daemon = DealBotDaemon.__new__(DealBotDaemon)
+    daemon.stats = {"errors": [], "files_processed": 0, "deals_found": 0, "deals_published": 0, "deals_filtered": 0}
+    daemon.ledger = MagicMock()
+    daemon.controller = MagicMock()
+    daemon.last_maintenance = datetime.now()
+    daemon.process_file = MagicMock(return_value={"deals_found": 3, "deals_published": 0, "deals_filtered": 3})
+
+    stale = datetime.now() - timedelta(days=2)
+    assert daemon.ingest_file(tmp_path / f"{stale:%Y-%m-%d_%H%M}_deals.txt") is None
+
+    daemon.ledger.needs_processing.return_value = False
+    assert daemon.ingest_file(tmp_path / "seen.txt") is None
+
+    daemon.ledger.needs_processing.return_value = True
+    fresh = tmp_path / f"{datetime.now():%Y-%m-%d_%H%M}_deals.txt"
+    assert daemon.ingest_file(fresh)["deals_found"] == 3  # type: ignore[index]
+    daemon.process_file.assert_called_once_with(fresh)
+    assert daemon.stats["files_processed"] == 1
+
+
+def test_ingest_file_purges_and_reloads_dedup_when_due(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that watch mode runs the batch path's maintenance at most once per interval."""
+    daemon = DealBotDaemon.__new__(DealBotDaemon)
+    daemon.stats = {"errors": [], "files_processed": 0, "deals_found": 0, "deals_published": 0, "deals_filtered": 0}
+    daemon.ledger = MagicMock()
+    daemon.controller = MagicMock()
+    daemon.controller.cache.purge_expired.return_value = 0
+    daemon.controller.ai_cache.purge_expired.return_value = 0
+    daemon.last_maintenance = None
+    daemon.process_file = MagicMock(return_value={"deals_found": 1, "deals_published": 0, "deals_filtered": 1})
+    fresh = tmp_path / f"{datetime.now():%Y-%m-%d_%H%M}_deals.txt"
+
+    daemon.ingest_file(fresh)
+    daemon.ingest_file(fresh)
+    assert daemon.controller.dedup.load.call_count == 1
+    assert daemon.controller.cache.purge_expired.call_count == 1
+
+    daemon.last_maintenance = datetime.now() - timedelta(minutes=DealBotDaemon.WATCH_MAINTENANCE_MINUTES + 1)
+    daemon.ingest_file(fresh)
+    assert daemon.controller.dedup.load.call_count == 2
+    assert daemon.controller.ai_cache.purge_expired.call_count == 2
@@ -0,0 +1,128 @@
+"""Tests for concurrent, idempotent WhatsApp fan-out."""
+
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from tenacity import wait_none
+
+from dealbot.services import whapi as whapi_module
+from dealbot.services.whapi import WhapiService
+from dealbot.storage.db import Database
+from dealbot.utils.config import Config
+
+CHANNEL = "120363000000000000@newsletter"
+GROUP = "120363111111111111@g.us"
+
+
+class _FakeTransport:
+    """Records posts; optional per-JID delay and number of failures before success."""
+
+    def __init__(self, delays: dict[str, float] | None = None, failures: dict[str, int] | None = None) -> None:
+        self.delays = delays or {}
+        self.failures = Counter(failures or {})
+        self.posts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def post(self, url: str, service: str, **kwargs):  # type: ignore[no-untyped-def]
+        jid = kwargs["json"]["to"]
+        time.sleep(self.delays.get(jid, 0))
+        with self._lock:
+            self.posts[jid] += 1
+            failing = self.failures[jid] > 0
+            self.failures[jid] -= 1
+        response = MagicMock()
+        if failing:
+            response.raise_for_status.side_effect = ConnectionError("boom")
+        response.json.return_value = {"id": f"msg-{jid}-{self.posts[jid]}"}
+        return response
+
+
+def _service(transport: _FakeTransport, monkeypatch, db: Database | None = None) -> WhapiService:  # type: ignore[no-untyped-def]
+    monkeypatch.setattr(whapi_module, "get_transport", lambda: transport)
+    config = MagicMock(spec=Config)
+    config.require_env = MagicMock(return_value="dummy")
+    service = WhapiService(config, db=db)
+    service.retry_wait = wait_none()
+    return service
+
+
+def test_destinations_are_sent_concurrently(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test that a slow group doesn't delay the channel and latency is per destination."""
+    transport = _FakeTransport(delays={CHANNEL: 0.05, GROUP: 0.3})
+    service = _service(transport, monkeypatch)
+
+    start = time.perf_counter()
+    result = service.send_message([CHANNEL, GROUP], "hola", "deal-1")
+    elapsed = time.perf_counter() - start
+
+    assert result.success
+    assert set(result.message_ids) == {CHANNEL, GROUP}
+    assert elapsed < 0.34
+    assert result.latencies_ms[CHANNEL] < result.latencies_ms[GROUP]
+
+
+def test_retries_are_per_destination(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test that a failing JID is retried without re-sending to the others."""
+    transport = _FakeTransport(failures={GROUP: 2})
+    service = _service(transport, monkeypatch)
+
+    result = service.send_message([CHANNEL, GROUP], "hola", "deal-1")
+
+    assert result.success and result.error is None
+    assert transport.posts == {CHANNEL: 1, GROUP: 3}
+
+
+def test_partial_failure_is_reported(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test that exhausting retries for one JID keeps the other's message."""
+    transport = _FakeTransport(failures={GROUP: 5})
+    service = _service(transport, monkeypatch)
+
+    result = service.send_message([CHANNEL, GROUP], "hola", "deal-1")
+
+    assert result.success
+    assert list(result.message_ids) == [CHANNEL]
+    assert result.error is not None and GROUP in result.error
+
+
+def test_deal_is_never_double_posted(tmp_path, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test the deal_id + JID idempotency key, including across service instances."""
+    db = Database(tmp_path / "dealbot.db")
+    transport = _FakeTransport()
+
+    first = _service(transport, monkeypatch, db=db).send_message([CHANNEL], "hola", "deal-1")
+    # New service instance (e.g. after a restart) adds the group for the same deal
+    second = _service(transport, monkeypatch, db=db).send_message([CHANNEL, GROUP], "hola", "deal-1")
+
+    assert transport.posts == {CHANNEL: 1, GROUP: 1}
+    assert second.message_ids[CHANNEL] == first.message_ids[CHANNEL]
+    assert db.get_sent_destinations("deal-1") == second.message_ids
+
+
+def test_non_idempotent_messages_always_send(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    """Test that status updates with a fixed id are not suppressed."""
+    transport = _FakeTransport()
+    service = _service(transport, monkeypatch)
+
+    service.send_message([CHANNEL], "status", "status_update", idempotent=False)
+    service.send_message([CHANNEL], "status", "status_update", idempotent=False)
+
+    assert transport.posts[CHANNEL] == 2
+
+
+def test_sends_are_recorded_safely_from_many_threads(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    """Test that concurrent send records (one per fan-out thread) all land."""
+    db = Database(tmp_path / "dealbot.db")
+    threads = [
+        threading.Thread(target=db.record_destination, args=(f"deal-{i}", CHANNEL, f"m{i}", datetime.now()))
+        for i in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(db.get_sent_destinations(f"deal-{i}") == {CHANNEL: f"m{i}"} for i in range(16))
+    assert db.conn.execute("SELECT COUNT(*) FROM destinations").fetchone()[0] == 16
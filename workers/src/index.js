@@ -1,8 +1,11 @@
 /**
  * Cloudflare Worker for short link management
- * Handles /shorten (create) and /:slug (redirect/interstitial)
+ * Handles /shorten (create), /shorten/bulk (create many) and /:slug (redirect/interstitial)
  */
 
+// Upper bound on links per bulk request (each one is a KV write)
+const MAX_BULK_LINKS = 100;
+
 const INTERSTITIAL_HTML = `
 <!DOCTYPE html>
 <html lang="en">
@@ -128,8 +131,48 @@ export default {
       }
     }
     
+    // POST /shorten/bulk - Create many short links in one request
+    if (request.method === 'POST' && url.pathname === '/shorten/bulk') {
+      try {
+        const body = await request.json();
+        const links = Array.isArray(body.links) ? body.links : null;
+        
+        if (!links || links.length === 0 || links.length > MAX_BULK_LINKS) {
+          return new Response(JSON.stringify({ error: `Expected 1-${MAX_BULK_LINKS} links` }), {
+            status: 400,
+            headers: { 'Content-Type': 'application/json' },
+          });
+        }
+        
+        if (links.some((link) => !link || !link.url || !link.slug)) {
+          return new Response(JSON.stringify({ error: 'Every link needs url and slug' }), {
+            status: 400,
+            headers: { 'Content-Type': 'application/json' },
+          });
+        }
+        
+        // Store in KV (writes run concurrently)
+        await Promise.all(links.map((link) => env.LINKS.put(link.slug, link.url)));
+        
+        const created = links.map((link) => ({
+          slug: link.slug,
+          short_url: `${url.origin}/${link.slug}`,
+        }));
+        
+        return new Response(JSON.stringify({ links: created }), {
+          status: 201,
+          headers: { 'Content-Type': 'application/json' },
+        });
+      } catch (err) {
+        return new Response(JSON.stringify({ error: err.message }), {
+          status: 500,
+          headers: { 'Content-Type': 'application/json' },
+        });
+      }
+    }
+    
     // GET /:slug - Redirect with interstitial
-    if (request.method === 'GET' && url.pathname !== '/' && url.pathname !== '/shorten') {
+    if (request.method === 'GET' && url.pathname !== '/' && !url.pathname.startsWith('/shorten')) {
       const slug = url.pathname.slice(1);
       const longUrl = await env.LINKS.get(slug);
       